@@ -1,29 +1,36 @@
-from fastapi import FastAPI, HTTPException, Request, Depends, status
+from fastapi import FastAPI, HTTPException, Request, Response, Depends, status
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 import sqlite3
 import os
 import json
+import base64
+import binascii
 import secrets
 import stripe
 import hashlib
 import hmac
 import jwt
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import List, Optional, Sequence
+from contextlib import closing
 from pydantic import BaseModel
 import subprocess
+import logging
 import time
 import asyncio
-from data.fetcher import DataFetcher
-from data.news_fetcher import NewsFetcher
-from indicators.calculations import IndicatorCalculator
-from core.filters.macro_filter import MacroFilter
 from config.config import DXY_SYMBOL, TNX_SYMBOL, SYMBOLS, DB_CLIENTS, DB_SIGNALS
 from config.manager import config_manager
 from core.client_manager import ClientManager
+from core.backtest_jobs import RESULTS_DB, BacktestJobManager
+from core.change_feed import EventBroadcaster, install_change_feed, parse_cursor
+from core.market_context import MarketContext
+from core.cycle_trace import cycle_rollup, recent_cycles
+from core.metrics import REGISTRY, MetricsPusher, render_all
+from core.memory import read_published
+from core import forensics
 from core.secure_config import protect_config_value, reveal_config_value, redact_config_value, encryption_available
 from core.db_utils import connect_sqlite, ensure_base_tables, write_audit_event
 
@@ -38,12 +45,8 @@ ADMIN_PASS = os.getenv("ADMIN_PASS")
 if not ADMIN_PASS:
     print("⚠️ WARNING: ADMIN_PASS not set. Backend will be inaccessible.")
 
-# Market Context Cache
-market_context_cache = {
-    "data": None,
-    "last_update": 0,
-    "ttl": 900 # 15 minutes
-}
+# Market Context: shared on-disk cache (also written by signal_service), refreshed in the background
+MARKET_CONTEXT = MarketContext()
 
 app = FastAPI(title="Trading Expert Admin Dashboard")
 
@@ -57,14 +60,39 @@ app.add_middleware(
     allow_origins=ALLOWED_ORIGINS,
     allow_methods=["GET", "POST", "PUT"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+HTTP_SECONDS = REGISTRY.histogram("http_request_seconds", "Admin API request latency", ("method", "route", "status"))
+METRICS_PUSHER = MetricsPusher("admin_server")
+
+@app.middleware("http")
+async def observe_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status_class = "5xx"
+    try:
+        response = await call_next(request)
+        status_class = f"{response.status_code // 100}xx"
+        return response
+    finally:
+        # Route template, not the raw path, so ids and cursors don't explode the label set
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        HTTP_SECONDS.observe(time.perf_counter() - start, method=request.method, route=route, status=status_class)
+
 # DATABASE PATHS MOVED TO config/config.py
 
 @app.on_event("startup")
 async def startup_event():
     # Native Engine: Reconciliation loop disabled until Native Sync is ready
-    pass
+    # MARKET_CONTEXT_REFRESH=0 leaves the market context to signal_service's refreshes
+    if os.getenv("MARKET_CONTEXT_REFRESH", "1") != "0":
+        MARKET_CONTEXT.start(DXY_SYMBOL, TNX_SYMBOL, SYMBOLS)
+    METRICS_PUSHER.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await MARKET_CONTEXT.stop()
+    await METRICS_PUSHER.stop()
 
 def ensure_db_schema():
     """V18.1: Automatic Schema Migration - Ensures all required columns exist.
@@ -195,6 +223,30 @@ def ensure_db_schema():
                 pass
         
         conn.commit()
+
+        # Keyset pagination (/api/signals): newest-first scans, optionally per filter column
+        for name, cols in (("idx_signals_ts", "timestamp, id"),
+                           ("idx_signals_symbol_ts", "symbol, timestamp, id"),
+                           ("idx_signals_strategy_ts", "strategy, timestamp, id"),
+                           ("idx_signals_gate_ts", "gate_status, timestamp, id")):
+            try:
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON signals({cols})")
+            except sqlite3.OperationalError:
+                # Legacy table without this column
+                pass
+        conn.commit()
+
+        # Forensic candles/events live in signal_forensics; move any still inline in old rows
+        try:
+            moved = forensics.migrate_inline(conn)
+            if moved:
+                print(f"✅ Moved forensics of {moved} signals to signal_forensics")
+        except Exception as e:
+            # Not fatal: the detail endpoint still reads rows that were not moved
+            print(f"⚠️ Forensics migration failed: {e}")
+
+        # Change feed: inserts, gate decisions and settlements land in `events` for /api/events
+        install_change_feed(conn, "signals")
     finally:
         if conn:
             conn.close()
@@ -1063,22 +1115,89 @@ async def stripe_webhook(request: Request):
 
     return {"status": "success"}
 
+# Columns /api/signals returns by default. The JSON blobs are the heavy ones: pick with fields=
+SIGNAL_LIST_FIELDS = (
+    "id", "timestamp", "symbol", "direction", "entry_price", "sl", "tp1", "tp2",
+    "reasoning", "timeframe", "confidence", "result", "closed_at", "max_tp_reached",
+    "trade_type", "quality_score", "regime", "expected_hold", "risk_details", "score_details",
+    "gate_status", "gate_reason",
+)
+# Loaded from signal_forensics (core.forensics) only when named in fields=
+SIGNAL_FORENSIC_FIELDS = ("forensic_candles", "forensic_events")
+SIGNAL_PAGE_MAX = 500
+
+def _encode_cursor(*values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+def _decode_cursor(cursor: str, shape: Sequence) -> list:
+    """Cursor → its values; 400 unless they are a list matching `shape` (one type per position)."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if (not isinstance(values, list) or len(values) != len(shape)
+            or any(isinstance(v, bool) or not isinstance(v, t) for v, t in zip(values, shape))):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+def _projection(fields: Optional[str], allowed: Sequence[str], required: Sequence[str] = ("id", "timestamp"),
+                default: Optional[Sequence[str]] = None) -> List[str]:
+    """Columns for a fields= list (`default`, else all of `allowed`, if empty). Keyset columns are always included."""
+    if not fields:
+        return list(default or allowed)
+    wanted = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in wanted if f not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return list(dict.fromkeys([*required, *wanted]))
+
 @app.get("/api/signals")
-async def get_signals(current_user: User = Depends(get_current_user)):
+async def get_signals(response: Response, limit: int = 50, before: Optional[str] = None,
+                      fields: Optional[str] = None, symbol: Optional[str] = None,
+                      strategy: Optional[str] = None, gate_status: Optional[str] = None,
+                      start: Optional[str] = None, end: Optional[str] = None,
+                      current_user: User = Depends(get_current_user)):
+    """
+    Newest-first signal page. Filters: symbol, strategy, gate_status, start <= timestamp < end.
+    When more rows exist, the X-Next-Cursor header holds the `before=` value for the next page.
+    """
+    columns = _projection(fields, SIGNAL_LIST_FIELDS + SIGNAL_FORENSIC_FIELDS, default=SIGNAL_LIST_FIELDS)
+    side = [c for c in columns if c in SIGNAL_FORENSIC_FIELDS]
+    columns = [c for c in columns if c not in SIGNAL_FORENSIC_FIELDS]
+    limit = max(1, min(limit, SIGNAL_PAGE_MAX))
+    where, params = [], []
+    for column, value in (("symbol", symbol), ("strategy", strategy), ("gate_status", gate_status)):
+        if value:
+            where.append(f"{column} = ?")
+            params.append(value)
+    if start:
+        where.append("timestamp >= ?")
+        params.append(start)
+    if end:
+        where.append("timestamp < ?")
+        params.append(end)
+    if before:
+        where.append("(timestamp, id) < (?, ?)")
+        params.extend(_decode_cursor(before, (str, int)))
+
     conn = None
     try:
         conn = get_db_connection(DB_SIGNALS)
-        # V18.0: Fetch all signal fidelity fields
-        cursor = conn.execute("""
-            SELECT 
-                id, timestamp, symbol, direction, entry_price, sl, tp1, tp2, 
-                reasoning, timeframe, confidence, result, closed_at, max_tp_reached,
-                trade_type, quality_score, regime, expected_hold, risk_details, score_details,
-                forensic_candles, forensic_events, gate_status, gate_reason
-            FROM signals 
-            ORDER BY timestamp DESC LIMIT 50
-        """)
-        return [dict(row) for row in cursor.fetchall()]
+        cursor = conn.execute(f"""
+            SELECT {', '.join(columns)}
+            FROM signals {'WHERE ' + ' AND '.join(where) if where else ''}
+            ORDER BY timestamp DESC, id DESC LIMIT ?
+        """, (*params, limit + 1))
+        rows = [dict(row) for row in cursor.fetchall()]
+        if len(rows) > limit:
+            rows = rows[:limit]
+            response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1]["timestamp"], rows[-1]["id"])
+        if side:
+            stored = forensics.load_many(conn, [row["id"] for row in rows])
+            for row in rows:
+                data = stored.get(row["id"], {})
+                row.update({field: data.get(field, []) for field in side})
+        return rows
     except Exception as e:
         print(f"Error fetching signals: {e}")
         return []
@@ -1095,7 +1214,9 @@ async def get_signal_detail(signal_id: int, current_user: User = Depends(get_cur
         row = conn.execute("SELECT * FROM signals WHERE id = ?", (signal_id,)).fetchone()
         if not row:
             raise HTTPException(status_code=404, detail="Signal not found")
-        return dict(row)
+        # Forensic candles/events are only loaded here, from signal_forensics
+        signal = dict(row)
+        return {**signal, **forensics.load(conn, signal_id, signal)}
     except Exception as e:
         if isinstance(e, HTTPException): raise e
         raise HTTPException(status_code=500, detail=str(e))
@@ -1103,48 +1224,8 @@ async def get_signal_detail(signal_id: int, current_user: User = Depends(get_cur
         if conn: conn.close()
 
 async def get_market_context():
-    """V19.0: Fetch and cache macro/news context for dashboard visibility."""
-    now = time.time()
-    if market_context_cache["data"] and (now - market_context_cache["last_update"]) < market_context_cache["ttl"]:
-        return market_context_cache["data"]
-
-    ctx = {"DXY": "NEUTRAL", "TNX": "NEUTRAL", "RISK": "NEUTRAL", "NEWS": "NO NEWS"}
-    try:
-        fetcher = DataFetcher()
-        # Non-blocking fetch
-        dxy_data = await fetcher.fetch_data_async(DXY_SYMBOL, "1h", period="10d")
-        tnx_data = await fetcher.fetch_data_async(TNX_SYMBOL, "1h", period="10d")
-        
-        bundle = {}
-        if dxy_data is not None and not dxy_data.empty:
-            bundle['DXY'] = IndicatorCalculator.add_indicators(dxy_data, "1h")
-        if tnx_data is not None and not tnx_data.empty:
-            bundle['^TNX'] = IndicatorCalculator.add_indicators(tnx_data, "1h")
-            
-        bias = MacroFilter.get_macro_bias(bundle)
-        ctx.update(bias)
-        
-        # News Check
-        news_fetcher = NewsFetcher()
-        events = news_fetcher.fetch_news()
-        relevant = news_fetcher.filter_relevant_news(events, SYMBOLS)
-        
-        # Check if any high impact news is coming in 30 mins
-        current_time_str = datetime.now().strftime('%Y%m%dT%H%M')
-        active_news = []
-        for e in relevant:
-            if e.get('impact') == 'High':
-                active_news.append(e.get('title'))
-        
-        if active_news:
-            ctx['NEWS'] = f"{len(active_news)} HIGH IMPACT EVENTS"
-            
-    except Exception as e:
-        print(f"Market Context Error: {e}")
-        
-    market_context_cache["data"] = ctx
-    market_context_cache["last_update"] = now
-    return ctx
+    """Cached macro/news context for the dashboard. Never fetches: MARKET_CONTEXT's refresher keeps it current."""
+    return MARKET_CONTEXT.context()
 
 @app.get("/api/stats")
 async def get_basic_stats(current_user: User = Depends(get_current_user)):
@@ -1388,31 +1469,26 @@ async def get_forensic_audit(regime: Optional[str] = None, current_user: User =
         conn = get_db_connection(DB_SIGNALS)
         conn.row_factory = sqlite3.Row
         
+        # event_tags is the signal's sorted event combination (core.forensics): no JSON to decode per row
         query = """
-            SELECT trade_type, result, forensic_events, entry_price, sl, tp1, max_tp_reached, regime 
-            FROM signals 
-            WHERE forensic_events IS NOT NULL 
-            AND forensic_events != '[]' 
-            AND result != 'OPEN'
+            SELECT s.trade_type, s.result, f.event_tags, s.entry_price, s.sl, s.tp1, s.max_tp_reached, s.regime
+            FROM signals s
+            JOIN signal_forensics f ON f.signal_id = s.id
+            WHERE f.event_tags != ''
+            AND s.result != 'OPEN'
         """
         params = []
         if regime and regime != "ALL":
-            query += " AND regime = ?"
+            query += " AND s.regime = ?"
             params.append(regime)
             
+        # signal_forensics is created by ensure_db_schema at startup
         rows = conn.execute(query, params).fetchall()
         
         audit_map = {} # key: event_mask (sorted string)
 
         for row in rows:
-            try:
-                events = json.loads(row['forensic_events'])
-            except:
-                continue
-                
-            # Create a unique tag combination for this signal
-            tags = sorted(list(set([ev['type'] for ev in events])))
-            mask = " + ".join(tags) if tags else "NONE"
+            mask = row['event_tags']
             
             if mask not in audit_map:
                 audit_map[mask] = {"count": 0, "wins": 0, "total_rr": 0}
@@ -1540,6 +1616,58 @@ async def get_logs(service: str, lines: int = 100, current_user: User = Depends(
     except Exception as e:
         return {"logs": f"Log retrieval failed: {str(e)}"}
 
+@app.get("/api/metrics/cycles")
+async def get_cycle_metrics(hours: float = 24, limit: int = 20, current_user: User = Depends(get_current_user)):
+    """Signal-service cycle latency: p50/p95 per stage over `hours`, plus the latest cycles."""
+    limit = max(1, min(limit, 200))
+    rollup, recent = await asyncio.gather(
+        asyncio.to_thread(cycle_rollup, DB_SIGNALS, hours),
+        asyncio.to_thread(recent_cycles, DB_SIGNALS, limit),
+    )
+    return {"rollup": rollup, "recent": recent}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics(request: Request):
+    """
+    Prometheus exposition for every service: this process live, the others from
+    their last push to the shared metrics DB. Scrapers authenticate with
+    METRICS_TOKEN as a bearer token; without one only loopback may scrape.
+    """
+    token = os.getenv("METRICS_TOKEN")
+    if token:
+        supplied = request.headers.get("Authorization", "")[len("Bearer "):]
+        if not hmac.compare_digest(supplied.encode(), token.encode()):
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+    elif (request.client.host if request.client else "") not in ("127.0.0.1", "::1", "localhost"):
+        raise HTTPException(status_code=403, detail="Set METRICS_TOKEN to scrape remotely")
+    body = await asyncio.to_thread(render_all, "admin_server")
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+@app.get("/api/debug/memory")
+async def get_memory_debug(top: int = 15, reset: bool = False, current_user: User = Depends(get_current_user)):
+    """
+    RSS against budget for every service as published with its last metrics push,
+    plus the tracemalloc growth (source lines, since the baseline) of the services
+    running with MEMORY_TRACE=1. This process is sampled live; `reset` re-baselines it.
+    """
+    top = max(1, min(top, 100))
+    watch = METRICS_PUSHER.memory
+    services = await asyncio.to_thread(read_published)
+    growth = await asyncio.to_thread(watch.diff, top, reset) if watch.tracing else None
+    services["admin_server"] = {**watch.sample(), "pid": os.getpid(), "taken_at": time.time(), "growth": growth}
+    return {"services": services}
+
+@app.post("/api/debug/memory/trace")
+async def set_memory_trace(request: Request, current_user: User = Depends(get_current_user)):
+    """Starts (re-baselining) or stops tracemalloc in admin_server: {"enabled": true|false}."""
+    data = await request.json()
+    watch = METRICS_PUSHER.memory
+    if data.get("enabled", True):
+        await asyncio.to_thread(watch.start_tracing)
+    else:
+        watch.stop_tracing()
+    return {"tracing": watch.tracing}
+
 # ═══════════════════════════════════════════════════════════════════════════
 # V31.0: EXECUTION LIFECYCLE APIs
 # ═══════════════════════════════════════════════════════════════════════════
@@ -1679,50 +1807,114 @@ async def get_observation_report(current_user: User = Depends(get_current_user))
 # V32.0: BACKTESTING APIs
 # ═══════════════════════════════════════════════════════════════════════════
 
-BACKTEST_PROGRESS = {}  # {job_id: {"progress": float, "status": str, "error": str|None}}
+# Jobs persist in backtest_results.db and run in worker processes (core.backtest_jobs);
+# these endpoints only enqueue and poll.
+BACKTEST_JOBS: Optional[BacktestJobManager] = None
+
+def backtest_jobs() -> BacktestJobManager:
+    """The job manager, created at startup (or first use) rather than when the module is imported."""
+    global BACKTEST_JOBS
+    if BACKTEST_JOBS is None:
+        BACKTEST_JOBS = BacktestJobManager(RESULTS_DB, max_workers=int(os.getenv("BACKTEST_JOB_WORKERS", "1")))
+    return BACKTEST_JOBS
+
+@app.on_event("startup")
+async def start_backtest_workers():
+    jobs = backtest_jobs()
+    # BACKTEST_JOB_WORKERS=0 leaves execution to a standalone `python -m core.backtest_jobs`
+    if int(os.getenv("BACKTEST_JOB_WORKERS", "1")) > 0:
+        jobs.start()
+
+@app.on_event("shutdown")
+async def stop_backtest_workers():
+    if BACKTEST_JOBS is not None:
+        await BACKTEST_JOBS.stop()
+
+# ═══════════════════════════════════════════════════════════════════════════
+# LIVE CHANGE FEED (Server-Sent Events)
+# ═══════════════════════════════════════════════════════════════════════════
+
+# One poller per process reads the trigger-fed `events` tables; viewers only hold a queue
+EVENTS = EventBroadcaster({"signals": DB_SIGNALS, "backtest": RESULTS_DB})
+SSE_KEEPALIVE_SECONDS = 15
+
+@app.on_event("startup")
+async def start_change_feed():
+    EVENTS.start()
+
+@app.on_event("shutdown")
+async def stop_change_feed():
+    await EVENTS.stop()
+
+def _sse(event: dict) -> str:
+    body = {k: event[k] for k in ("topic", "source", "row_id", "payload", "created_at")}
+    return f"id: {event['cursor']}\nevent: {event['topic']}\ndata: {json.dumps(body, default=str)}\n\n"
+
+@app.get("/api/events")
+async def stream_events(request: Request, token: Optional[str] = None, topics: Optional[str] = None,
+                        since: Optional[str] = None):
+    """
+    Server-Sent Events: signal, gate, settlement, execution and backtest deltas.
+    EventSource cannot send headers, so the JWT may come as ?token=. Reconnects
+    resume from Last-Event-ID (or ?since=) and replay what was missed.
+    """
+    auth = request.headers.get("Authorization", "")
+    await get_current_user(token or (auth[7:] if auth.startswith("Bearer ") else ""))
+    wanted = set(topics.split(",")) if topics else None
+    queue, replay = await EVENTS.subscribe(parse_cursor(request.headers.get("Last-Event-ID") or since), wanted)
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            for event in replay:
+                yield _sse(event)
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:   # dropped as a slow consumer or shutting down
+                    break
+                yield _sse(event)
+        finally:
+            EVENTS.unsubscribe(queue)
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 @app.post("/api/backtest/run")
 async def run_backtest(request: Request, current_user: User = Depends(get_current_user)):
-    """V32.0: Initiates a historical backtest run."""
-    from core.backtest_engine import BacktestEngine
+    """V32.0: Queues a historical backtest run."""
     data = await request.json()
     start_date = data.get("start_date", (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d'))
     end_date = data.get("end_date", datetime.now().strftime('%Y-%m-%d'))
-    
-    unique_id = secrets.token_hex(4)
-    BACKTEST_PROGRESS[unique_id] = {"progress": 0.0, "status": "running", "error": None}
-    
-    async def task():
-        try:
-            engine = BacktestEngine(start_date, end_date)
-            def update_prog(p): BACKTEST_PROGRESS[unique_id]["progress"] = round(p * 100, 1)
-            result = await engine.run(progress_callback=update_prog)
-            if isinstance(result, dict) and "error" in result:
-                BACKTEST_PROGRESS[unique_id] = {"progress": 0.0, "status": "error", "error": result["error"]}
-                print(f"❌ Backtest {unique_id} failed: {result['error']}")
-            else:
-                BACKTEST_PROGRESS[unique_id] = {"progress": 100.0, "status": "done", "error": None}
-                print(f"✅ Backtest {unique_id} completed successfully.")
-        except Exception as e:
-            print(f"💥 Backtest {unique_id} crashed: {e}")
-            import traceback; traceback.print_exc()
-            BACKTEST_PROGRESS[unique_id] = {"progress": 0.0, "status": "error", "error": str(e)}
-        
-    asyncio.create_task(task())
-    return {"job_id": unique_id, "status": "started"}
+    job_id = backtest_jobs().enqueue(start_date, end_date, symbols=data.get("symbols"))
+    return {"job_id": job_id, "status": "queued"}
 
 @app.get("/api/backtest/progress/{job_id}")
 async def get_backtest_progress(job_id: str, current_user: User = Depends(get_current_user)):
-    info = BACKTEST_PROGRESS.get(job_id, {"progress": 0.0, "status": "unknown", "error": None})
-    return {"progress": info["progress"], "status": info["status"], "error": info["error"]}
+    job = backtest_jobs().get(job_id)
+    if not job:
+        return {"progress": 0.0, "status": "unknown", "error": None}
+    return {"progress": job["progress"], "status": job["status"], "error": job["error"],
+            "run_id": job["run_id"], "checkpoint": job["checkpoint"], "attempts": job["attempts"]}
+
+@app.post("/api/backtest/cancel/{job_id}")
+async def cancel_backtest(job_id: str, current_user: User = Depends(get_current_user)):
+    if not backtest_jobs().cancel(job_id):
+        raise HTTPException(status_code=404, detail="No queued or running job with this id")
+    return {"job_id": job_id, "status": "cancelled"}
+
+@app.get("/api/backtest/jobs")
+async def list_backtest_jobs(limit: int = 50, current_user: User = Depends(get_current_user)):
+    return backtest_jobs().jobs(limit=min(limit, 500))
 
 @app.get("/api/backtest/latest_job")
 async def get_latest_job(current_user: User = Depends(get_current_user)):
-    """Returns the ID of the most recent job to allow UI re-attachment."""
-    if not BACKTEST_PROGRESS: return {"job_id": None}
-    # Get the most recent job_id
-    latest_id = list(BACKTEST_PROGRESS.keys())[-1]
-    return {"job_id": latest_id}
+    """Returns the ID of the most recent queued/running job to allow UI re-attachment."""
+    job = backtest_jobs().latest_active()
+    return {"job_id": job["id"] if job else None}
 
 @app.get("/api/backtest/runs")
 async def list_backtest_runs(current_user: User = Depends(get_current_user)):
@@ -1735,36 +1927,80 @@ async def list_backtest_runs(current_user: User = Depends(get_current_user)):
             d = dict(row)
             # If total_trades is None, it means it's either running or crashed
             if d.get("total_trades") is None:
-                # Check if it's currently in our active memory
-                # This is a bit of a heuristic since we don't store row ID in memory, 
-                # but for a single-user system it's fine.
+                # Not finalized yet: running, queued for resume, or abandoned
                 d["status"] = "IN_PROGRESS"
             else:
                 d["status"] = "COMPLETED"
             data.append(d)
         return data
 
+BACKTEST_START_BALANCE = 100000.0   # equity curve: 1.0 per pip mock
+BACKTEST_TRADE_PAGE_MAX = 5000
+BACKTEST_STREAM_CHUNK = 2000
+
+def _backtest_trade_rows(conn, run_id: int, columns: Sequence[str], after: Optional[Sequence], limit: int) -> list:
+    """One keyset page of a run's trades in time order (idx_backtest_signals_run_ts)."""
+    keyset = " AND (timestamp, id) > (?, ?)" if after else ""
+    return conn.execute(f"SELECT {', '.join(columns)} FROM backtest_signals WHERE run_id = ?{keyset} "
+                        "ORDER BY timestamp, id LIMIT ?", (run_id, *(after or ()), limit)).fetchall()
+
 @app.get("/api/backtest/results/{run_id}")
-async def get_backtest_results(run_id: int, current_user: User = Depends(get_current_user)):
-    db_path = "database/backtest_results.db"
-    with get_db_connection(db_path) as conn:
+async def get_backtest_results(run_id: int, request: Request, limit: int = 1000, after: Optional[str] = None,
+                               fields: Optional[str] = None, format: str = "json",
+                               current_user: User = Depends(get_current_user)):
+    """
+    A run's trades in time order with the running equity balance.
+    JSON: one page of `limit` trades; next_cursor continues it (balance included).
+    format=ndjson (or Accept: application/x-ndjson): the whole run streamed as
+    {"run": ...} then one trade per line, read from the DB in chunks.
+    """
+    db_path = backtest_jobs().db_path
+    with closing(get_db_connection(db_path)) as conn:
         run = conn.execute("SELECT * FROM backtest_runs WHERE id = ?", (run_id,)).fetchone()
-        trades = conn.execute("SELECT * FROM backtest_signals WHERE run_id = ?", (run_id,)).fetchall()
-        
-        # Calculate daily equity curve for chart
-        equity_curve = []
-        balance = 100000.0
-        sorted_trades = sorted([dict(t) for t in trades], key=lambda x: x['timestamp'])
-        
-        for t in sorted_trades:
-            balance += t['result_pips'] * 1.0 # 1.0 per pip mock
-            equity_curve.append({"time": t['timestamp'], "balance": balance})
-            
-        return {
-            "run": dict(run) if run else {},
-            "trades": [dict(t) for t in trades],
-            "equity_curve": equity_curve
-        }
+        available = [row["name"] for row in conn.execute("PRAGMA table_info(backtest_signals)")]
+        columns = _projection(fields, available, required=("id", "timestamp", "result_pips"))
+
+        if format != "ndjson" and "application/x-ndjson" not in request.headers.get("accept", ""):
+            balance, keyset = BACKTEST_START_BALANCE, None
+            if after:
+                *keyset, balance = _decode_cursor(after, (str, int, (int, float)))
+            limit = max(1, min(limit, BACKTEST_TRADE_PAGE_MAX))
+            trades = [dict(t) for t in _backtest_trade_rows(conn, run_id, columns, keyset, limit + 1)]
+            more = len(trades) > limit
+            trades = trades[:limit]
+
+            equity_curve = []
+            for t in trades:
+                balance += t['result_pips'] or 0.0
+                equity_curve.append({"time": t['timestamp'], "balance": balance})
+            return {
+                "run": dict(run) if run else {},
+                "trades": trades,
+                "equity_curve": equity_curve,
+                "next_cursor": _encode_cursor(trades[-1]['timestamp'], trades[-1]['id'], balance) if more else None,
+            }
+
+    def stream():
+        # Sync generator (runs in the threadpool): one short-lived connection per chunk
+        yield json.dumps({"run": dict(run) if run else {}}, default=str) + "\n"
+        balance, keyset = BACKTEST_START_BALANCE, None
+        while True:
+            with closing(get_db_connection(db_path)) as chunk_conn:
+                rows = _backtest_trade_rows(chunk_conn, run_id, columns, keyset, BACKTEST_STREAM_CHUNK)
+            if not rows:
+                return
+            lines = []
+            for row in rows:
+                t = dict(row)
+                balance += t['result_pips'] or 0.0
+                t['balance'] = balance
+                lines.append(json.dumps(t, default=str))
+            yield "\n".join(lines) + "\n"
+            if len(rows) < BACKTEST_STREAM_CHUNK:
+                return
+            keyset = (rows[-1]['timestamp'], rows[-1]['id'])
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 class SystemAction(BaseModel):
     action: str
@@ -1849,4 +2085,6 @@ if os.path.exists("dashboard"):
 
 if __name__ == "__main__":
     import uvicorn
+    # Root handler for library loggers (DirectMT5 via the manual execution endpoints); uvicorn only configures its own
+    logging.basicConfig(format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO)
     uvicorn.run(app, host="0.0.0.0", port=5000)
@@ -5,8 +5,12 @@ from typing import Optional
 from telegram import Bot
 from telegram.error import TelegramError
 from config.manager import config_manager
+from core.metrics import REGISTRY
 from core.signal_formatter import SignalFormatter
 
+SEND_SECONDS = REGISTRY.histogram("telegram_send_seconds", "Telegram send_message latency", ("kind",))
+SEND_FAILURES = REGISTRY.counter("telegram_send_failures_total", "Telegram sends that raised", ("kind",))
+
 
 class TelegramService:
     """
@@ -123,15 +127,18 @@ TP2 (20% Exit):   {tp2:.5f} ({'+' if direction == 'BUY' else '-'}{tp2_pips:.1f}
         any_success = False
         for chat_id in self.all_chat_ids:
             try:
-                await self.bot.send_message(
-                    chat_id=chat_id,
-                    text=message,
-                    parse_mode='HTML'
-                )
+                with SEND_SECONDS.time(kind="signal"):
+                    await self.bot.send_message(
+                        chat_id=chat_id,
+                        text=message,
+                        parse_mode='HTML'
+                    )
                 any_success = True
             except TelegramError as e:
+                SEND_FAILURES.inc(kind="signal")
                 print(f"❌ Telegram error sending to {chat_id}: {e}")
             except Exception as e:
+                SEND_FAILURES.inc(kind="signal")
                 print(f"❌ Error sending Telegram message to {chat_id}: {e}")
         return any_success
     
@@ -144,13 +151,15 @@ TP2 (20% Exit):   {tp2:.5f} ({'+' if direction == 'BUY' else '-'}{tp2_pips:.1f}
             return False
         
         try:
-            await self.bot.send_message(
-                chat_id=target_id, 
-                text=text,
-                parse_mode='HTML'
-            )
+            with SEND_SECONDS.time(kind="text"):
+                await self.bot.send_message(
+                    chat_id=target_id, 
+                    text=text,
+                    parse_mode='HTML'
+                )
             return True
         except Exception as e:
+            SEND_FAILURES.inc(kind="text")
             print(f"❌ Error sending Telegram message: {e}")
             return False
 
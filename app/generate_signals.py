@@ -7,6 +7,10 @@ from strategies.crt_strategy import CRTStrategy
 from strategies.advanced_pattern_strategy import AdvancedPatternStrategy
 from core.signal_formatter import SignalFormatter
 from core.market_status import MarketStatus
+from core.market_context import MarketContext
+from core.market_regime import PANEL_CONTEXT_KEY, RegimePanel, apply_regime_filter
+from core.correlation import RollingCorrelation
+from core.cycle_trace import span
 
 
 async def generate_signals():
@@ -22,61 +26,91 @@ async def generate_signals():
     print(f"Symbols: {len(settings.symbols)} pairs")
     print("=" * 60)
     
-    from data.news_fetcher import NewsFetcher
     from core.client_manager import ClientManager
     
     fetcher = DataFetcher()
     client_manager = ClientManager()
     crt_strategy = CRTStrategy()
     advanced_strategy = AdvancedPatternStrategy()
+
+    # Only compute the indicator columns the active strategies actually read
+    requirements = IndicatorCalculator.merge_requirements(
+        crt_strategy.REQUIRED_INDICATORS, advanced_strategy.REQUIRED_INDICATORS
+    )
     
-    # Fetch macro context (DXY, TNX) for all symbols
-    print("📊 Fetching macro context...")
-    market_context = {}
-    try:
-        dxy_data = await fetcher.fetch_data_async(settings.dxy_symbol, "1h", period="60d")
-        tnx_data = await fetcher.fetch_data_async(settings.tnx_symbol, "1h", period="60d")
-        
-        if dxy_data is not None and not dxy_data.empty:
-            market_context['DXY'] = IndicatorCalculator.add_indicators(dxy_data, "1h")
-        if tnx_data is not None and not tnx_data.empty:
-            market_context['^TNX'] = IndicatorCalculator.add_indicators(tnx_data, "1h")
-    except Exception as e:
-        print(f"⚠️  Warning: Could not fetch macro context: {e}")
-    
-    # Fetch news events (optional, can be empty)
-    news_events = []
-    try:
-        news_fetcher = NewsFetcher()
-        news_events = news_fetcher.get_upcoming_events() if hasattr(news_fetcher, 'get_upcoming_events') else []
-    except Exception as e:
-        # News fetching is optional
-        pass
+    # Macro context (DXY, TNX) and this week's calendar come from the shared
+    # market-context cache; it is refreshed here once it is older than its TTL
+    print("📊 Loading macro context...")
+    with span("macro_context"):
+        market_context, news_events = await MarketContext().bundle(
+            settings.dxy_symbol, settings.tnx_symbol, settings.symbols)
+    if not market_context:
+        print("⚠️  Warning: No macro context available")
     
     all_signals = []
     symbol_data = {}
 
+    async def fetch_timeframe(symbol: str, timeframe: str, period: str):
+        with span(f"fetch.{timeframe}", symbol):
+            return await fetcher.fetch_data_async(symbol, timeframe, period=period)
+
     async def fetch_symbol_bundle(symbol: str):
         sem = fetch_symbol_bundle.sem
         async with sem:
             m5_data, h1_data, d1_data = await asyncio.gather(
-                fetcher.fetch_data_async(symbol, "5m", period="5d"),
-                fetcher.fetch_data_async(symbol, "1h", period="30d"),
-                fetcher.fetch_data_async(symbol, "1d", period="365d"),
+                fetch_timeframe(symbol, "5m", "5d"),
+                fetch_timeframe(symbol, "1h", "30d"),
+                fetch_timeframe(symbol, "1d", "365d"),
             )
             return symbol, m5_data, h1_data, d1_data
 
     fetch_symbol_bundle.sem = asyncio.Semaphore(8)
     try:
-        fetched = await asyncio.gather(*(fetch_symbol_bundle(symbol) for symbol in settings.symbols))
+        with span("fetch"):
+            fetched = await asyncio.gather(*(fetch_symbol_bundle(symbol) for symbol in settings.symbols))
         symbol_data = {symbol: (m5, h1, d1) for symbol, m5, h1, d1 in fetched}
     except Exception as e:
         print(f"⚠️  Warning: Concurrent symbol fetch failed: {e}")
+
+    # H1 indicators for the whole universe up front: the regime panel classifies
+    # every symbol from them in one pass, and the strategies reuse the same frames
+    h1_frames = {}
+    for symbol, (_, h1_data, _) in symbol_data.items():
+        if h1_data is None or h1_data.empty:
+            continue
+        try:
+            with span("indicators.1h", symbol):
+                h1_frames[symbol] = IndicatorCalculator.add_indicators(
+                    h1_data, "1h", IndicatorCalculator.columns_for(requirements, 'h1'))
+        except Exception as e:
+            print(f"⚠️  Error processing {symbol}: {str(e)}")
+
+    # Completed H1 bars feed the rolling return correlations the gate's exposure check reads
+    try:
+        with span("correlation.update"):
+            correlations = RollingCorrelation.for_db(settings.db_signals)
+            if correlations.update(RollingCorrelation.closes(h1_frames)):
+                correlations.save(settings.db_signals)
+    except Exception as e:
+        print(f"⚠️  Correlation update skipped: {e}")
+
+    # V23.2: Market regime per symbol + universe aggregate (sets the global quality threshold)
+    regime_panel = None
+    try:
+        with span("regime.panel"):
+            regime_panel = RegimePanel.build(h1_frames)
+        with span("regime.apply"):
+            apply_regime_filter(regime_panel.aggregate, settings.db_clients)
+        # A copy: market_context is the shared macro cache's dict
+        market_context = {**(market_context or {}), PANEL_CONTEXT_KEY: regime_panel}
+    except Exception as e:
+        print(f"⚠️  Regime detection skipped: {e}")
     
     for symbol in settings.symbols:
         try:
-            # Fetch multi-timeframe data
-            m5_data, h1_data, d1_data = symbol_data.get(symbol, (None, None, None))
+            # Fetch multi-timeframe data; popped so each symbol's frames are released once analysed
+            m5_data, h1_data, d1_data = symbol_data.pop(symbol, (None, None, None))
+            h1_df = h1_frames.pop(symbol, None)
             
             
             # V16.1: Market Status Check (Prevent stale data processing)
@@ -86,13 +120,14 @@ async def generate_signals():
                 # print(f"zzz Market Closed for {symbol}")
                 continue
 
-            if m5_data is None or h1_data is None or d1_data is None or m5_data.empty or h1_data.empty or d1_data.empty:
+            if m5_data is None or h1_df is None or d1_data is None or m5_data.empty or d1_data.empty:
                 continue
                 
-            # Add indicators
-            m5_df = IndicatorCalculator.add_indicators(m5_data, "5m")
-            h1_df = IndicatorCalculator.add_indicators(h1_data, "1h")
-            d1_df = IndicatorCalculator.add_indicators(d1_data, "1d")
+            # Add indicators (H1 done above for the regime panel)
+            with span("indicators.5m", symbol):
+                m5_df = IndicatorCalculator.add_indicators(m5_data, "5m", IndicatorCalculator.columns_for(requirements, 'm5'))
+            with span("indicators.1d", symbol):
+                d1_df = IndicatorCalculator.add_indicators(d1_data, "1d", IndicatorCalculator.columns_for(requirements, 'd1'))
             
             data_bundle = {
                 'm5': m5_df,
@@ -101,12 +136,14 @@ async def generate_signals():
             }
             
             # V28.0: CRT Strategy — ALWAYS ON (locked)
-            crt_signal = await crt_strategy.analyze(symbol, data_bundle, news_events, market_context)
+            with span("strategy.CRT", symbol):
+                crt_signal = await crt_strategy.analyze(symbol, data_bundle, news_events, market_context)
             if crt_signal:
                 all_signals.append(('CRT', crt_signal))
 
             # V23: Advanced Patterns — ALWAYS ON (locked)
-            advanced_signal = await advanced_strategy.analyze(symbol, data_bundle, news_events, market_context)
+            with span("strategy.ADVANCED", symbol):
+                advanced_signal = await advanced_strategy.analyze(symbol, data_bundle, news_events, market_context)
             if advanced_signal:
                 all_signals.append(('ADVANCED', advanced_signal))
 
@@ -115,6 +152,13 @@ async def generate_signals():
             print(f"⚠️  Error processing {symbol}: {str(e)}")
             continue
     
+    # The gate holds each signal to its own symbol's regime threshold
+    if regime_panel is not None:
+        for _, signal in all_signals:
+            threshold = regime_panel.threshold(signal.get('symbol'))
+            if threshold is not None:
+                signal['regime_threshold'] = threshold
+
     # Display all signals
     print(f"\n📊 Total Base Signals Generated: {len(all_signals)}")
     print("=" * 60)
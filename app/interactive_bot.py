@@ -7,12 +7,14 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import functools
 import logging
 import sqlite3
 from telegram import Update
 from telegram.ext import Application, CommandHandler, ContextTypes
 from config.config import TELEGRAM_BOT_TOKEN
 from core.client_manager import ClientManager
+from core.metrics import REGISTRY, MetricsPusher
 
 # Enable logging
 logging.basicConfig(
@@ -20,6 +22,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+COMMAND_SECONDS = REGISTRY.histogram("bot_command_seconds", "Interactive bot command handling time", ("command",))
+COMMAND_ERRORS = REGISTRY.counter("bot_command_errors_total", "Interactive bot commands that raised", ("command",))
+
 class InteractiveBot:
     def __init__(self, token: str):
         self.token = token
@@ -27,13 +32,28 @@ class InteractiveBot:
         self.application = None
 
     def _set_up_handlers(self, application):
-        application.add_handler(CommandHandler("start", self.start))
-        application.add_handler(CommandHandler("register", self.register))
-        application.add_handler(CommandHandler("subscribe", self.subscribe))
-        application.add_handler(CommandHandler("status", self.status))
-        application.add_handler(CommandHandler("update_balance", self.update_balance))
-        application.add_handler(CommandHandler("settings", self.settings))
-        application.add_handler(CommandHandler("help", self.help))
+        for command, callback in [
+            ("start", self.start),
+            ("register", self.register),
+            ("subscribe", self.subscribe),
+            ("status", self.status),
+            ("update_balance", self.update_balance),
+            ("settings", self.settings),
+            ("help", self.help),
+        ]:
+            application.add_handler(CommandHandler(command, self._measured(command, callback)))
+
+    @staticmethod
+    def _measured(command: str, callback):
+        @functools.wraps(callback)
+        async def handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+            try:
+                with COMMAND_SECONDS.time(command=command):
+                    return await callback(update, context)
+            except Exception:
+                COMMAND_ERRORS.inc(command=command)
+                raise
+        return handler
 
     async def start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Send a message when the command /start is issued."""
@@ -164,6 +184,16 @@ class InteractiveBot:
         print("🤖 Starting Interactive Multi-Client Bot...")
         application = Application.builder().token(self.token).build()
         self._set_up_handlers(application)
+        pusher = MetricsPusher("interactive_bot")
+
+        async def start_pusher(_):
+            pusher.start()
+
+        async def stop_pusher(_):
+            await pusher.stop()
+
+        application.post_init = start_pusher
+        application.post_shutdown = stop_pusher
         application.run_polling()
 
 if __name__ == "__main__":
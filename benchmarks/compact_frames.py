@@ -0,0 +1,95 @@
+"""
+Compact Frame Benchmark
+=======================
+Measures memory per million bars and the accuracy cost of the opt-in
+float32/categorical representation (data.compact_frames).
+
+Runs fully offline on a synthetic EURUSD-like M1 random walk.
+
+Usage:
+    python -m benchmarks.compact_frames                 # 1M raw bars, 200k indicator bars
+    python -m benchmarks.compact_frames --bars 500000 --json out.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.getcwd())
+
+from benchmarks.fixtures import PIP, synthetic_m1
+from data.compact_frames import compact_frame, frame_nbytes, precision_deltas
+from indicators.calculations import IndicatorCalculator
+
+
+def per_million(nbytes: int, bars: int) -> float:
+    return nbytes / (1024 * 1024) * (1_000_000 / bars)
+
+
+def run(bars: int, indicator_bars: int) -> dict:
+    raw = synthetic_m1(bars)
+    raw_compact = compact_frame(raw)
+
+    enriched = IndicatorCalculator.add_indicators(synthetic_m1(indicator_bars), "1h")
+    enriched = IndicatorCalculator.get_market_structure(enriched)
+
+    start = time.perf_counter()
+    enriched_compact = compact_frame(enriched)
+    convert_ms = (time.perf_counter() - start) * 1000
+
+    # Storage rounding: float64 indicators stored as float32
+    storage = precision_deltas(enriched, enriched_compact)
+    # Compute-on-compact: indicators derived from float32 OHLC input
+    recomputed = IndicatorCalculator.add_indicators(compact_frame(synthetic_m1(indicator_bars)), "1h")
+    compute = precision_deltas(enriched, recomputed)
+
+    return {
+        "bars": bars,
+        "indicator_bars": indicator_bars,
+        "ohlcv_mb_per_million": {
+            "float64": round(per_million(frame_nbytes(raw), bars), 2),
+            "compact": round(per_million(frame_nbytes(raw_compact), bars), 2),
+        },
+        "enriched_mb_per_million": {
+            "float64": round(per_million(frame_nbytes(enriched), indicator_bars), 2),
+            "compact": round(per_million(frame_nbytes(enriched_compact), indicator_bars), 2),
+        },
+        "columns": len(enriched.columns),
+        "convert_ms": round(convert_ms, 1),
+        "price_max_abs_pips": round(max(storage[c]["max_abs"] for c in ("open", "high", "low", "close")) / PIP, 6),
+        "storage_deltas": storage,
+        "compute_deltas": compute,
+    }
+
+
+def print_report(result: dict):
+    print("=" * 64)
+    print("COMPACT FRAME BENCHMARK")
+    print("=" * 64)
+    o, e = result["ohlcv_mb_per_million"], result["enriched_mb_per_million"]
+    print(f"OHLCV     MB / 1M bars : float64 {o['float64']:>8.2f}  →  compact {o['compact']:>8.2f}")
+    print(f"Enriched  MB / 1M bars : float64 {e['float64']:>8.2f}  →  compact {e['compact']:>8.2f}"
+          f"  ({result['columns']} cols)")
+    print(f"Conversion time        : {result['convert_ms']} ms for {result['indicator_bars']:,} bars")
+    print(f"Max OHLC storage error : {result['price_max_abs_pips']} pips")
+    print("-" * 64)
+    print(f"{'column':<12} {'store max_rel':>14} {'recompute max_rel':>18}")
+    for col, stats in result["storage_deltas"].items():
+        comp = result["compute_deltas"].get(col, {}).get("max_rel", float("nan"))
+        print(f"{col:<12} {stats['max_rel']:>14.2e} {comp:>18.2e}")
+    print("=" * 64)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compact frame memory/accuracy benchmark")
+    parser.add_argument("--bars", type=int, default=1_000_000, help="Raw M1 bars for the OHLCV footprint")
+    parser.add_argument("--indicator-bars", type=int, default=200_000, help="Bars enriched with indicators")
+    parser.add_argument("--json", type=str, default=None, help="Optional path to write the JSON report")
+    args = parser.parse_args()
+
+    result = run(args.bars, args.indicator_bars)
+    print_report(result)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
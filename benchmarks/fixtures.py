@@ -0,0 +1,127 @@
+"""
+Benchmark Fixtures
+==================
+Deterministic offline inputs shared by the benchmarks: seeded OHLCV random
+walks, the same bars written as Dukascopy M1 exports, a canned signal and
+client list, and scratch SQLite databases.
+
+Every generator is seeded, so two runs (or two machines) time the same
+work and their numbers are comparable.
+
+Usage:
+    m1 = synthetic_m1(50_000)                                   # EURUSD-like M1
+    h1 = synthetic_ohlcv(2_000, "1h", seed=11)
+    write_dukascopy_csv(m1, "/tmp/duka/EURUSD/EURUSD_M1.csv")     # "Gmt time,Open,..." export
+"""
+import os
+import sqlite3
+from contextlib import closing
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+PIP = 0.0001
+FIXTURE_START = "2024-01-01"
+
+
+def synthetic_ohlcv(bars: int, freq: str = "1min", seed: int = 7, start: str = FIXTURE_START,
+                    base: float = 1.08, step_pips: float = 0.6, end: Optional[str] = None) -> pd.DataFrame:
+    """
+    EURUSD-like OHLCV random walk, quoted to 5 decimals like Dukascopy/MT5.
+    (Unquoted continuous prices make ADX/DI flip on 1e-8 noise, float64 or not.)
+    Step size scales with sqrt(bar length) so every timeframe has FX-like ranges.
+    With `end`, the bars finish there instead of starting at `start`.
+    """
+    rng = np.random.default_rng(seed)
+    scale = step_pips * PIP * np.sqrt(pd.Timedelta(freq) / pd.Timedelta("1min"))
+    close = base + np.cumsum(rng.normal(0, scale, bars))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    wick = np.abs(rng.normal(0, scale * 2 / 3, (2, bars)))
+    return pd.DataFrame({
+        "open": open_.round(5),
+        "high": (np.maximum(open_, close) + wick[0]).round(5),
+        "low": (np.minimum(open_, close) - wick[1]).round(5),
+        "close": close.round(5),
+        "volume": rng.gamma(2.0, 40.0, bars).round(2),
+    }, index=(pd.date_range(end=end, periods=bars, freq=freq, tz="UTC") if end
+              else pd.date_range(start, periods=bars, freq=freq, tz="UTC")))
+
+
+def synthetic_m1(bars: int, seed: int = 7) -> pd.DataFrame:
+    return synthetic_ohlcv(bars, "1min", seed=seed)
+
+
+def write_dukascopy_csv(df: pd.DataFrame, path: str) -> str:
+    """Writes bars in Dukascopy's standard export layout (see DukascopyLoader._iter_csv)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pd.DataFrame({
+        "Gmt time": df.index.strftime("%d.%m.%Y %H:%M:%S.000"),
+        "Open": df["open"], "High": df["high"], "Low": df["low"], "Close": df["close"],
+        "Volume": df["volume"],
+    }).to_csv(path, index=False)
+    return path
+
+
+def canned_signal(n: int = 0, symbol: str = "EURUSD=X") -> dict:
+    entry = round(1.0850 + n * PIP, 5)
+    return {
+        "symbol": symbol, "direction": "BUY", "entry_price": entry, "sl": round(entry - 20 * PIP, 5),
+        "tp0": round(entry + 15 * PIP, 5), "tp1": round(entry + 30 * PIP, 5), "tp2": round(entry + 50 * PIP, 5),
+        "timeframe": "5m", "trade_type": "CRT", "strategy": "CRT", "quality_score": 8.2, "confidence": "HIGH",
+        "regime": "TRENDING_BULL", "expected_hold": "2h", "session": "LONDON",
+        "timestamp": (pd.Timestamp(FIXTURE_START) + pd.Timedelta(minutes=5 * n)).isoformat(),
+        "reasoning": "H1 range sweep with M5 displacement back inside the range.",
+        "risk_details": {"lot_size": 0.1, "risk_percent": 1.0, "risk_cash": 10.0},
+        "score_details": {"alpha": 0.7, "trend": 0.8},
+        "current_atr": 0.0012, "avg_atr": 0.0011,
+    }
+
+
+def canned_clients(n: int, seed: int = 5) -> list:
+    rng = np.random.default_rng(seed)
+    return [{"telegram_chat_id": str(100_000 + i), "account_balance": float(rng.choice([100, 500, 1_000, 10_000])),
+             "risk_percent": float(rng.choice([0.5, 1.0, 2.0]))} for i in range(n)]
+
+
+# admin_server.ensure_db_schema's base table; SignalService._log_to_database adds the rest
+SIGNALS_DDL = """
+    CREATE TABLE IF NOT EXISTS signals (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        symbol TEXT, direction TEXT, entry_price REAL,
+        sl REAL DEFAULT 0.0, tp0 REAL DEFAULT 0.0, tp1 REAL DEFAULT 0.0, tp2 REAL DEFAULT 0.0,
+        reasoning TEXT, timeframe TEXT, confidence REAL DEFAULT 0.0, timestamp TEXT,
+        status TEXT DEFAULT 'OPEN', strategy TEXT, result_price REAL, result_pips REAL,
+        trade_type TEXT DEFAULT 'INSTITUTIONAL', quality_score REAL DEFAULT 0.0,
+        regime TEXT DEFAULT 'UNKNOWN', expected_hold TEXT DEFAULT 'UNKNOWN',
+        risk_details TEXT DEFAULT '{}', score_details TEXT DEFAULT '{}',
+        forensic_candles TEXT DEFAULT '[]', forensic_events TEXT DEFAULT '[]',
+        gate_status TEXT DEFAULT 'PASSED', gate_reason TEXT DEFAULT 'PASSED',
+        result TEXT DEFAULT 'OPEN', closed_at TIMESTAMP
+    )
+"""
+# init_db.py defaults (ExecutionGate._get_thresholds)
+SYSTEM_CONFIG = [
+    ("MIN_QUALITY_SCORE", "7.0"), ("MIN_EXECUTION_QUALITY", "5.0"), ("MAX_CORRELATED_EXPOSURE", "2"),
+    ("MAX_STRATEGY_EXPOSURE", "3"), ("MAX_SESSION_EXPOSURE", "4"),
+]
+
+
+def scratch_databases(root: str, history: int = 50) -> tuple:
+    """(signals_db, clients_db) under `root`: signals table with `history` settled/open rows, gate thresholds."""
+    os.makedirs(root, exist_ok=True)
+    signals_db, clients_db = os.path.join(root, "signals.db"), os.path.join(root, "clients.db")
+    with closing(sqlite3.connect(clients_db)) as conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS system_config (key TEXT PRIMARY KEY, value TEXT, type TEXT, updated_at TEXT)")
+        conn.executemany("INSERT OR REPLACE INTO system_config (key, value) VALUES (?, ?)", SYSTEM_CONFIG)
+        conn.commit()
+    with closing(sqlite3.connect(signals_db)) as conn:
+        conn.execute(SIGNALS_DDL)
+        for i in range(history):
+            s = canned_signal(i, symbol=("GBPUSD=X", "USDJPY=X", "AUDUSD=X")[i % 3])
+            conn.execute("INSERT INTO signals (timestamp, symbol, direction, entry_price, sl, tp0, tp1, tp2, "
+                         "quality_score, strategy, result) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                         (s["timestamp"], s["symbol"], s["direction"], s["entry_price"], s["sl"], s["tp0"],
+                          s["tp1"], s["tp2"], s["quality_score"], s["strategy"], "OPEN" if i % 5 == 0 else "TP1"))
+        conn.commit()
+    return signals_db, clients_db
@@ -0,0 +1,155 @@
+"""
+Startup / Import-Time Audit
+===========================
+Cold-start cost of the long-running services, measured the way systemd
+restarts them: a fresh interpreter per sample.
+
+  - time-to-ready: interpreter start until the service could do its first
+    unit of work (signal_service: SignalService constructed, ready for its
+    first cycle; admin_server: first HTTP response served). Checked against
+    STARTUP_BUDGETS.
+  - `-X importtime` breakdown: heaviest direct imports of each entry module
+    (cumulative) and heaviest modules overall (self time), so a new eager
+    import of yfinance/pandas/telegram shows up by name.
+
+Each sample runs in a scratch directory with scratch DB_SIGNALS/DB_CLIENTS,
+so imports that migrate schemas never touch the real databases.
+
+Usage:
+    python -m benchmarks.import_time                        # both services, report + budgets
+    python -m benchmarks.import_time admin_server --top 20
+    python -m benchmarks.import_time --check                # exit 1 when a budget is exceeded
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.append(os.getcwd())
+
+# Seconds from interpreter start to ready, median of the samples
+STARTUP_BUDGETS = {
+    "signal_service": 2.0,
+    "admin_server": 2.0,
+}
+READY_SNIPPETS = {
+    "signal_service": "import signal_service; signal_service.SignalService()",
+    "admin_server": ("from fastapi.testclient import TestClient; import admin_server; "
+                     "assert TestClient(admin_server.app).get('/metrics').status_code == 200"),
+}
+# Heavy optional stacks that must stay off a service's import path
+LAZY_MODULES = {
+    "signal_service": ("yfinance",),
+    "admin_server": ("yfinance", "pandas", "telegram"),
+}
+
+
+def _scratch_env(workdir: str) -> dict:
+    env = dict(os.environ)
+    env["DB_SIGNALS"] = os.path.join(workdir, "signals.db")
+    env["DB_CLIENTS"] = os.path.join(workdir, "clients.db")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+    return env
+
+
+def _run(args: List[str], workdir: str) -> subprocess.CompletedProcess:
+    # cwd=workdir: relative paths (database/, monitoring/, data/) land in the scratch dir too
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, env=_scratch_env(workdir),
+                          cwd=workdir, timeout=120)
+
+
+def time_to_ready(service: str, samples: int = 3) -> Dict[str, float]:
+    """Median/min seconds for a fresh interpreter to get `service` ready."""
+    workdir = tempfile.mkdtemp(prefix="startup_")
+    try:
+        seconds = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            proc = _run(["-c", READY_SNIPPETS[service]], workdir)
+            seconds.append(time.perf_counter() - start)
+            if proc.returncode != 0:
+                raise RuntimeError(f"{service} failed to start:\n{proc.stderr[-2000:]}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {"median_s": round(float(np.median(seconds)), 3), "min_s": round(float(min(seconds)), 3)}
+
+
+def import_profile(module: str) -> List[dict]:
+    """Parsed `-X importtime` rows for importing `module`: name, depth, self_ms, cumulative_ms."""
+    workdir = tempfile.mkdtemp(prefix="importtime_")
+    try:
+        proc = _run(["-X", "importtime", "-c", f"import {module}"], workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append({
+            "name": name.strip(),
+            "depth": (len(name) - len(name.lstrip(" ")) - 1) // 2,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+    return rows
+
+
+def audit(service: str, top: int = 10, samples: int = 3) -> dict:
+    rows = import_profile(service)
+    loaded = {row["name"] for row in rows}
+    entry = next((row for row in rows if row["name"] == service and row["depth"] == 0), None)
+    ready = time_to_ready(service, samples)
+    return {
+        "service": service,
+        "ready": ready,
+        "budget_s": STARTUP_BUDGETS[service],
+        "over_budget": ready["median_s"] > STARTUP_BUDGETS[service],
+        "import_ms": round(entry["cumulative_ms"], 1) if entry else None,
+        "eager_heavy": [name for name in LAZY_MODULES.get(service, ()) if name in loaded],
+        "direct_imports": sorted((r for r in rows if r["depth"] == 1), key=lambda r: -r["cumulative_ms"])[:top],
+        "self_time": sorted(rows, key=lambda r: -r["self_ms"])[:top],
+    }
+
+
+def print_audit(report: dict):
+    ready = report["ready"]
+    flag = "❌ OVER BUDGET" if report["over_budget"] else "✅"
+    print("=" * 70)
+    print(f"🚀 {report['service']}: ready in {ready['median_s']:.2f}s (budget {report['budget_s']:.1f}s) {flag}")
+    print(f"   import {report['import_ms']} ms"
+          + (f"  ⚠️ eager: {', '.join(report['eager_heavy'])}" if report["eager_heavy"] else ""))
+    print("-" * 70)
+    print("Heaviest direct imports (cumulative ms):")
+    for row in report["direct_imports"]:
+        print(f"  {row['name']:<40} {row['cumulative_ms']:>9.1f}")
+    print("Heaviest modules (self ms):")
+    for row in report["self_time"]:
+        print(f"  {row['name']:<40} {row['self_ms']:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Service cold-start and -X importtime audit")
+    parser.add_argument("services", nargs="*", default=list(STARTUP_BUDGETS), help="Services to audit")
+    parser.add_argument("--top", type=int, default=10, help="Rows per breakdown")
+    parser.add_argument("--samples", type=int, default=3, help="Fresh interpreters per time-to-ready")
+    parser.add_argument("--check", action="store_true", help="Exit 1 when a service is over budget")
+    parser.add_argument("--json", type=str, default=None, help="Optional path to write the reports")
+    args = parser.parse_args()
+
+    reports = [audit(service, args.top, args.samples) for service in args.services]
+    for report in reports:
+        print_audit(report)
+    print("=" * 70)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+    if args.check and any(r["over_budget"] or r["eager_heavy"] for r in reports):
+        sys.exit(1)
@@ -0,0 +1,150 @@
+"""
+MT5 Bridge Feed Benchmark
+=========================
+Throughput and export→consumer latency of the append-only bridge feed
+(mt5_bridge.signal_feed), against the old signals_mt5.json scheme
+(read, append, truncate to 50, rewrite with indent=4 on every export).
+
+  - export throughput: records/s committed by one writer
+  - latency: a writer process exports at a fixed rate while this process
+    polls like the EA; reported as p50/p95/max from append to delivery
+
+Usage:
+    python -m benchmarks.mt5_bridge_feed                     # 5k exports, 500 latency samples
+    python -m benchmarks.mt5_bridge_feed --records 20000 --json out.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.getcwd())
+
+from mt5_bridge.signal_feed import SignalFeed, SignalFeedReader
+
+SIGNAL = {
+    "symbol": "EURUSD=X", "direction": "BUY", "entry": 1.0850, "sl": 1.0830, "tp1": 1.0880,
+    "tp2": 1.0910, "tp3": 1.0950, "lots": 0.05, "quality": "A", "regime": "TRENDING", "strategy": "CRT",
+}
+
+
+def legacy_export(path: str, signal: dict):
+    """The previous SignalExporter.export_signal body (minus logging)."""
+    signals = []
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            signals = json.load(f)
+    signals.append(signal)
+    signals = signals[-50:]
+    with open(path, "w") as f:
+        json.dump(signals, f, indent=4)
+
+
+def throughput(records: int, root: str) -> dict:
+    feed = SignalFeed(os.path.join(root, "feed"))
+    start = time.perf_counter()
+    for i in range(records):
+        feed.append({**SIGNAL, "n": i})
+    feed_s = time.perf_counter() - start
+    feed.close()
+
+    legacy_path = os.path.join(root, "signals_mt5.json")
+    start = time.perf_counter()
+    for i in range(records):
+        legacy_export(legacy_path, {**SIGNAL, "n": i})
+    legacy_s = time.perf_counter() - start
+
+    reader = SignalFeedReader(os.path.join(root, "feed"))
+    start = time.perf_counter()
+    read = len(reader.poll())
+    read_s = time.perf_counter() - start
+
+    return {
+        "feed_exports_per_s": round(records / feed_s),
+        "legacy_exports_per_s": round(records / legacy_s),
+        "reader_records_per_s": round(read / read_s) if read_s else None,
+        "records_retained": read,
+    }
+
+
+def _writer(feed_dir: str, samples: int, interval: float):
+    feed = SignalFeed(feed_dir)
+    for i in range(samples):
+        feed.append({**SIGNAL, "n": i, "t_ns": time.time_ns()})
+        time.sleep(interval)
+    feed.close()
+
+
+def latency(samples: int, interval: float, poll_interval: float, root: str) -> dict:
+    feed_dir = os.path.join(root, "latency")
+    os.makedirs(feed_dir, exist_ok=True)
+    reader = SignalFeedReader(feed_dir)
+    writer = multiprocessing.Process(target=_writer, args=(feed_dir, samples, interval))
+    writer.start()
+
+    delays, polls = [], 0
+    deadline = time.time() + samples * interval + 30
+    while len(delays) < samples and time.time() < deadline:
+        for record in reader.poll():
+            delays.append((time.time_ns() - record["signal"]["t_ns"]) / 1e6)
+        polls += 1
+        time.sleep(poll_interval)
+    writer.join()
+
+    ms = np.array(delays) if delays else np.array([np.nan])
+    return {
+        "samples": len(delays),
+        "poll_interval_ms": poll_interval * 1000,
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "max_ms": round(float(ms.max()), 3),
+        "polls": polls,
+        "corrupt_lines": reader.corrupt,
+    }
+
+
+def run(records: int, samples: int, interval: float, poll_interval: float) -> dict:
+    root = tempfile.mkdtemp(prefix="mt5_feed_bench_")
+    try:
+        return {
+            "records": records,
+            "throughput": throughput(records, root),
+            "latency": latency(samples, interval, poll_interval, root),
+        }
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def print_report(result: dict):
+    t, l = result["throughput"], result["latency"]
+    print("=" * 64)
+    print("MT5 BRIDGE FEED BENCHMARK")
+    print("=" * 64)
+    print(f"Exports / s            : feed {t['feed_exports_per_s']:>10,}  |  legacy JSON {t['legacy_exports_per_s']:>8,}")
+    print(f"Reader records / s     : {t['reader_records_per_s']:,} ({t['records_retained']:,} retained)")
+    print(f"Latency (poll {l['poll_interval_ms']:g} ms) : p50 {l['p50_ms']} ms  p95 {l['p95_ms']} ms  "
+          f"max {l['max_ms']} ms  ({l['samples']} samples)")
+    print(f"Corrupt lines seen     : {l['corrupt_lines']}")
+    print("=" * 64)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MT5 bridge feed throughput/latency benchmark")
+    parser.add_argument("--records", type=int, default=5_000, help="Exports for the throughput run")
+    parser.add_argument("--samples", type=int, default=500, help="Exports for the latency run")
+    parser.add_argument("--interval", type=float, default=0.002, help="Seconds between latency-run exports")
+    parser.add_argument("--poll-interval", type=float, default=0.001, help="Reader poll interval (seconds)")
+    parser.add_argument("--json", type=str, default=None, help="Optional path to write the JSON report")
+    args = parser.parse_args()
+
+    result = run(args.records, args.samples, args.interval, args.poll_interval)
+    print_report(result)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
@@ -0,0 +1,162 @@
+"""
+Replay Soak Test
+================
+Drives the live signal pipeline through core.replay for many cycles (10k by
+default: ~35 simulated days of 5-minute cycles) and checks that the process
+memory stays flat.
+
+  1. Warm-up replay (WARMUP_CYCLES): imports, pools and caches fill up.
+  2. Baseline: RSS, plus a tracemalloc snapshot with --trace.
+  3. Soak replay over the next `cycles`, RSS sampled after every cycle.
+
+Module-level state (strategy dedup, sessions, the metrics registry) carries
+over from warm-up into the soak, as in a service that has been up for a
+month. The soak fails when the steady-state growth (core.replay.memory_trend)
+exceeds MAX_GROWTH_MB; --trace lists the source lines that grew. Traced runs
+are slower and their RSS includes tracemalloc's own bookkeeping.
+
+Bars come from a seeded synthetic M1 walk (benchmarks.fixtures) unless
+--store points at a real BarStore.
+
+Usage:
+    python -m benchmarks.soak                          # 10k cycles, synthetic EURUSD
+    python -m benchmarks.soak --cycles 2000 --trace
+    python -m benchmarks.soak --store data/bar_store --symbols EURUSD=X,GBPUSD=X --start 2024-03-04 --check
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+from contextlib import ExitStack, redirect_stderr, redirect_stdout
+from typing import List, Tuple
+
+import pandas as pd
+
+sys.path.append(os.getcwd())
+
+from benchmarks.fixtures import FIXTURE_START, synthetic_ohlcv, write_dukascopy_csv
+from core.memory import MemoryWatch, rss_bytes
+from core.replay import memory_trend, replay
+from data.bar_store import BarStore
+from data.dukascopy_loader import DukascopyLoader
+from signal_service import SIGNAL_INTERVAL
+
+SOAK_CYCLES = 10_000
+WARMUP_CYCLES = 200
+MAX_GROWTH_MB = 16.0
+# Bars needed before the first cycle: the H1 fetch looks back 30 days
+LOOKBACK_DAYS = 35
+# Points kept from the per-cycle RSS series in the report
+SERIES_POINTS = 200
+
+
+def synthetic_store(root: str, cycles: int, seed: int = 0) -> Tuple[BarStore, pd.Timestamp]:
+    """BarStore with enough synthetic EURUSD M1 bars for warm-up + `cycles`, and the first cycle's time."""
+    days = LOOKBACK_DAYS + (WARMUP_CYCLES + cycles) * SIGNAL_INTERVAL / 86400 + 1
+    write_dukascopy_csv(synthetic_ohlcv(int(days * 1440), "1min", seed=seed),
+                        os.path.join(root, "duka", "EURUSD", "EURUSD_M1.csv"))
+    store = BarStore(os.path.join(root, "store"))
+    DukascopyLoader(base_dir=os.path.join(root, "duka"), store=store).ingest("EURUSD=X")
+    return store, pd.Timestamp(FIXTURE_START) + pd.Timedelta(days=LOOKBACK_DAYS)
+
+
+async def soak(store: BarStore, start, symbols: List[str], workdir: str, cycles: int = SOAK_CYCLES,
+               warmup: int = WARMUP_CYCLES, clients: int = 4, trace: bool = False,
+               max_growth_mb: float = MAX_GROWTH_MB) -> dict:
+    """Warm-up replay, then `cycles` more from where it stopped; RSS trend of the second run."""
+    step = pd.Timedelta(seconds=SIGNAL_INTERVAL)
+    warm_end = pd.Timestamp(start) + warmup * step
+    end = warm_end + cycles * step
+    warm = await replay(str(start), str(warm_end), symbols, store, os.path.join(workdir, "warmup"), clients=clients)
+
+    watch = MemoryWatch("soak")
+    if trace:
+        watch.start_tracing()
+    baseline_mb = rss_bytes() / 1024 ** 2
+    try:
+        run = await replay(str(warm_end), str(end), symbols, store, os.path.join(workdir, "soak"), clients=clients)
+        growth = watch.diff() if trace else None
+    finally:
+        watch.stop_tracing()
+
+    memory = memory_trend(run["rss_mb"], warmup=0)
+    every = max(1, len(run["rss_mb"]) // SERIES_POINTS)
+    return {
+        "start": str(warm_end),
+        "end": str(end),
+        "symbols": list(symbols),
+        "warmup_cycles": warm["cycles"],
+        "cycles": run["cycles"],
+        "wall_seconds": run["wall_seconds"],
+        "cycles_per_second": run["cycles_per_second"],
+        "signals_sent": warm["signals_sent"] + run["signals_sent"],
+        "baseline_mb": round(baseline_mb, 1),
+        "memory": memory,
+        "max_growth_mb": max_growth_mb,
+        "flat": memory["growth_mb"] is not None and memory["growth_mb"] <= max_growth_mb,
+        "rss_series": run["rss_mb"][::every],
+        "tracemalloc_growth": growth,
+    }
+
+
+def print_report(report: dict) -> None:
+    memory = report["memory"]
+    flag = "✅ FLAT" if report["flat"] else f"❌ GROWING (> {report['max_growth_mb']}MB)"
+    print("=" * 70)
+    print(f"🧪 REPLAY SOAK  {report['start']} → {report['end']}  ({', '.join(report['symbols'])})")
+    print("=" * 70)
+    print(f"Cycles: {report['warmup_cycles']} warm-up + {report['cycles']} soak in {report['wall_seconds']}s "
+          f"({report['cycles_per_second']}/s), {report['signals_sent']} signals sent")
+    print(f"RSS: baseline {report['baseline_mb']}MB, {memory['start_mb']} → {memory['end_mb']}MB "
+          f"(peak {memory['peak_mb']}MB)")
+    print(f"Growth: {memory['growth_mb']}MB, {memory['slope_mb_per_1k']}MB/1k cycles  {flag}")
+    if report["tracemalloc_growth"]:
+        print("Top allocation growth since the baseline:")
+        for row in report["tracemalloc_growth"]:
+            print(f"  {row['size_diff_kb']:>10.1f} KB  {row['count_diff']:>8}  {row['where']}")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay soak test: memory must stay flat over many cycles")
+    parser.add_argument("--cycles", type=int, default=SOAK_CYCLES, help="Soak cycles after the warm-up")
+    parser.add_argument("--warmup", type=int, default=WARMUP_CYCLES, help="Warm-up cycles before the baseline")
+    parser.add_argument("--store", type=str, default=None, help="BarStore root (default: synthetic EURUSD bars)")
+    parser.add_argument("--symbols", type=str, default=None, help="Comma-separated symbols (with --store)")
+    parser.add_argument("--start", type=str, default=None, help="First warm-up cycle (with --store)")
+    parser.add_argument("--clients", type=int, default=4, help="Stub clients receiving broadcasts")
+    parser.add_argument("--max-growth", type=float, default=MAX_GROWTH_MB, help="Allowed steady-state growth (MB)")
+    parser.add_argument("--trace", action="store_true", help="List tracemalloc growth since the baseline")
+    parser.add_argument("--check", action="store_true", help="Exit 1 when memory is not flat")
+    parser.add_argument("--verbose", action="store_true", help="Show the service's own cycle output")
+    parser.add_argument("--json", type=str, default=None, help="Optional path to write the report")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="soak_")
+    try:
+        if args.store:
+            if not args.start:
+                sys.exit("❌ --start is required with --store")
+            bar_store, first = BarStore(args.store), pd.Timestamp(args.start)
+            symbols = args.symbols.split(",") if args.symbols else bar_store.symbols()
+        else:
+            print("📦 Generating synthetic bars...")
+            bar_store, first = synthetic_store(os.path.join(workdir, "bars"), args.cycles)
+            symbols = ["EURUSD=X"]
+        with open(os.devnull, "w") as devnull, ExitStack() as quiet:
+            if not args.verbose:
+                quiet.enter_context(redirect_stdout(devnull))
+                quiet.enter_context(redirect_stderr(devnull))
+            result = asyncio.run(soak(bar_store, first, symbols, workdir, cycles=args.cycles, warmup=args.warmup,
+                                      clients=args.clients, trace=args.trace, max_growth_mb=args.max_growth))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print_report(result)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2, default=str)
+    if args.check and not result["flat"]:
+        sys.exit(1)
@@ -0,0 +1,380 @@
+"""
+Benchmark Suite
+===============
+Reproducible, offline timings of the signal pipeline's hot paths, recorded
+to a JSON history and checked against regression thresholds.
+Replaces speed_test.py.
+
+Every case runs on seeded fixtures (benchmarks.fixtures) and scratch
+databases in a temporary directory: no network, no production DBs.
+
+  indicators.add_indicators   full default set on 5k M5 bars
+  strategy.crt_analyze        CRTStrategy.analyze on one M5/H1/D1 bundle that reaches scoring
+  regime.detect_regime        RegimePanel aggregate over a 4-symbol H1 map
+  gate.validate               ExecutionGate.validate against 50 historical signals
+  db.log_signal               SignalService._log_to_database (schema check + insert)
+  formatter.personalized      format_personalized_signal for 100 clients
+  dukascopy.load              30 days of Dukascopy M1 CSV resampled to M5
+  frames.compact              compact_frame on 50k enriched bars
+  backtest.engine_day         BacktestEngine.run, 2 symbols x 1 day, bars from a BarStore
+  startup.signal_service      fresh interpreter until SignalService is ready (benchmarks.import_time)
+  startup.admin_server        fresh interpreter until the first HTTP response
+
+Each case is timed `repeat` times after one warm-up call. A run is appended
+to the history file; its medians are compared with the median of the last
+BASELINE_RUNS earlier runs from the same host (so one recorded regression
+does not become the baseline that hides the next), and a case whose median
+grew by more than its threshold (THRESHOLDS, else DEFAULT_THRESHOLD) is a
+regression.
+
+Usage:
+    python -m benchmarks.suite                         # run all, compare, record
+    python -m benchmarks.suite --only gate,db --repeat 30
+    python -m benchmarks.suite --check                 # exit 1 on regression
+    python -m benchmarks.suite --no-record --json out.json
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stderr, redirect_stdout
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from unittest import mock
+
+import numpy as np
+
+sys.path.append(os.getcwd())
+
+from benchmarks.fixtures import (FIXTURE_START, canned_clients, canned_signal, scratch_databases, synthetic_m1,
+                                 synthetic_ohlcv, write_dukascopy_csv)
+from config.manager import config_manager
+
+HISTORY_PATH = "benchmarks/results/history.json"
+DEFAULT_REPEAT = 10
+# Allowed median growth against the baseline run
+DEFAULT_THRESHOLD = 0.25
+THRESHOLDS = {
+    "db.log_signal": 0.5,         # fsync-bound, noisy on shared disks
+    "gate.validate": 0.5,
+    "backtest.engine_day": 0.3,
+    "startup.signal_service": 0.3,   # process spawn jitter
+    "startup.admin_server": 0.3,
+}
+# Changes smaller than this are noise whatever the ratio
+MIN_DELTA_MS = 0.05
+# Earlier runs per host whose median medians form the baseline
+BASELINE_RUNS = 5
+# Inside the 07-18 UTC killzone: strategy cases must get past CRT's session check
+FIXTURE_END = "2024-01-31 10:55"
+CRT_SEED = 1
+OHLCV_AGG = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+
+CASES: Dict[str, dict] = {}
+
+
+def case(name: str, repeat: Optional[int] = None):
+    """Registers setup(ctx) -> zero-argument callable; only the callable is timed."""
+    def register(setup: Callable):
+        CASES[name] = {"setup": setup, "repeat": repeat}
+        return setup
+    return register
+
+
+class CaseContext:
+    """Per-case scratch directory and event loop."""
+
+    def __init__(self, workdir: str):
+        self.workdir = workdir
+        self._loop = None
+
+    def run(self, coro):
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(coro)
+
+    def close(self):
+        if self._loop is not None:
+            self._loop.close()
+
+
+def _prepared(bars: int, freq: str, timeframe: str, seed: int, columns=None):
+    from indicators.calculations import IndicatorCalculator
+    return IndicatorCalculator.add_indicators(synthetic_ohlcv(bars, freq, seed=seed, end=FIXTURE_END), timeframe, columns)
+
+
+@case("indicators.add_indicators")
+def _add_indicators(ctx: CaseContext):
+    from indicators.calculations import IndicatorCalculator
+    raw = synthetic_ohlcv(5_000, "5min", seed=3)
+    return lambda: IndicatorCalculator.add_indicators(raw.copy(), "5m")
+
+
+@case("strategy.crt_analyze")
+def _crt_analyze(ctx: CaseContext):
+    from core.alpha_combiner import AlphaCombiner
+    from indicators.calculations import IndicatorCalculator
+    from strategies.crt_strategy import CRTStrategy
+    strategy = CRTStrategy()
+    req = strategy.REQUIRED_INDICATORS
+    # One M5 walk resampled up, so the H1 reference range and the M5 sweep scan see the same prices
+    m5 = synthetic_ohlcv(300 * 288, "5min", seed=CRT_SEED, end=FIXTURE_END)
+    data = {
+        "m5": IndicatorCalculator.add_indicators(m5.iloc[-600:].copy(), "5m", req["m5"]),
+        "h1": IndicatorCalculator.add_indicators(m5.resample("1h").agg(OHLCV_AGG).iloc[-500:], "1h", req["h1"]),
+        "d1": IndicatorCalculator.add_indicators(m5.resample("1D").agg(OHLCV_AGG), "1d", req["d1"]),
+    }
+
+    def analyze():
+        return ctx.run(strategy.analyze("EURUSD=X", data, [], {}))
+
+    with mock.patch.object(AlphaCombiner, "calculate_quality_score",
+                           side_effect=AlphaCombiner.calculate_quality_score) as scored:
+        analyze()
+    if not scored.called:
+        raise RuntimeError("CRT fixture exits before scoring: the case would time an early return")
+    return analyze
+
+
+@case("regime.detect_regime")
+def _detect_regime(ctx: CaseContext):
+    from core.market_regime import REQUIRED_INDICATORS, detect_regime
+    h1_map = {symbol: _prepared(720, "1h", "1h", seed, REQUIRED_INDICATORS)
+              for seed, symbol in enumerate(("EURUSD=X", "GBPUSD=X", "USDJPY=X", "GC=F"))}
+    return lambda: detect_regime(h1_map)
+
+
+@case("gate.validate", repeat=50)
+def _gate_validate(ctx: CaseContext):
+    from core.execution_gate import ExecutionGate
+    signals_db, clients_db = scratch_databases(os.path.join(ctx.workdir, "db"))
+    signal = canned_signal(3)
+    now = datetime.fromisoformat(FIXTURE_START).replace(hour=12)
+    result = ExecutionGate.validate(signal, signals_db, clients_db, current_ts=now)
+    if result["reason"].startswith("GATE_SYSTEM_ERROR"):
+        raise RuntimeError(f"gate fixture broken: {result['reason']}")
+    return lambda: ExecutionGate.validate(signal, signals_db, clients_db, current_ts=now)
+
+
+@case("db.log_signal", repeat=50)
+def _log_signal(ctx: CaseContext):
+    from signal_service import SignalService
+    signals_db, clients_db = scratch_databases(os.path.join(ctx.workdir, "db"), history=0)
+    config_manager.set_runtime_override("db_signals", signals_db)
+    config_manager.set_runtime_override("db_clients", clients_db)
+    service = SignalService()
+    counter = iter(range(1, 10**9))
+
+    def log():
+        n = next(counter)
+        if not service._log_to_database({**canned_signal(n), "idempotency_key": f"bench-{n}"}):
+            raise RuntimeError("signal insert failed")
+    return log
+
+
+@case("formatter.personalized")
+def _personalized(ctx: CaseContext):
+    from core.signal_formatter import SignalFormatter
+    signal, clients = canned_signal(), canned_clients(100)
+    return lambda: [SignalFormatter.format_personalized_signal(signal, client) for client in clients]
+
+
+@case("dukascopy.load", repeat=5)
+def _dukascopy_load(ctx: CaseContext):
+    from data.dukascopy_loader import DukascopyLoader
+    base = os.path.join(ctx.workdir, "dukascopy")
+    write_dukascopy_csv(synthetic_m1(30 * 1440), os.path.join(base, "EURUSD", "EURUSD_M1.csv"))
+    loader = DukascopyLoader(base_dir=base)
+    return lambda: loader.load("EURUSD=X", timeframe="5min")
+
+
+@case("frames.compact")
+def _compact(ctx: CaseContext):
+    from data.compact_frames import compact_frame
+    from indicators.calculations import IndicatorCalculator
+    enriched = IndicatorCalculator.add_indicators(synthetic_m1(50_000), "1h")
+    return lambda: compact_frame(enriched)
+
+
+@case("backtest.engine_day", repeat=3)
+def _backtest_day(ctx: CaseContext):
+    import core.backtest_engine as backtest_engine
+    from data.bar_store import BarStore
+    from data.dukascopy_loader import DukascopyLoader
+
+    base = os.path.join(ctx.workdir, "dukascopy")
+    symbols = ["EURUSD=X", "GBPUSD=X"]
+    for seed, (symbol, folder) in enumerate(zip(symbols, ("EURUSD", "GBPUSD"))):
+        m1 = synthetic_ohlcv(22 * 1440, "1min", seed=seed, base=1.08 + 0.19 * seed)
+        write_dukascopy_csv(m1, os.path.join(base, folder, f"{folder}_M1.csv"))
+    store = BarStore(os.path.join(ctx.workdir, "bar_store"))
+    loader = DukascopyLoader(base_dir=base, store=store)
+    for symbol in symbols:
+        loader.ingest(symbol)
+    signals_db, clients_db = scratch_databases(os.path.join(ctx.workdir, "db"), history=0)
+    results_db = os.path.join(ctx.workdir, "db", "backtest.db")
+
+    def run():
+        # The engine reads gate thresholds from the module-level clients DB path
+        with mock.patch.object(backtest_engine, "DB_CLIENTS", clients_db):
+            engine = backtest_engine.BacktestEngine("2024-01-19", "2024-01-20", symbols=symbols,
+                                                    bar_store=store, results_db=results_db)
+            result = ctx.run(engine.run())
+        if "error" in result:
+            raise RuntimeError(result["error"])
+        return result
+    return run
+
+
+def _startup(service: str):
+    from benchmarks.import_time import READY_SNIPPETS, _run
+
+    def setup(ctx: CaseContext):
+        def start():
+            proc = _run(["-c", READY_SNIPPETS[service]], ctx.workdir)
+            if proc.returncode != 0:
+                raise RuntimeError(f"{service} failed to start:\n{proc.stderr[-2000:]}")
+        return start
+    return setup
+
+
+case("startup.signal_service", repeat=3)(_startup("signal_service"))
+case("startup.admin_server", repeat=3)(_startup("admin_server"))
+
+
+def time_case(name: str, repeat: Optional[int] = None) -> dict:
+    spec = CASES[name]
+    repeat = repeat or spec["repeat"] or DEFAULT_REPEAT
+    workdir = tempfile.mkdtemp(prefix="bench_")
+    ctx = CaseContext(workdir)
+    quiet = io.StringIO()
+    try:
+        with redirect_stdout(quiet), redirect_stderr(quiet):
+            fn = spec["setup"](ctx)
+            fn()   # warm-up: imports, caches, first-touch allocations
+            samples = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                fn()
+                samples.append((time.perf_counter() - start) * 1000)
+    finally:
+        ctx.close()
+        config_manager.clear_runtime_overrides()
+        shutil.rmtree(workdir, ignore_errors=True)
+    ms = np.array(samples)
+    return {
+        "median_ms": round(float(np.median(ms)), 4),
+        "min_ms": round(float(ms.min()), 4),
+        "p95_ms": round(float(np.percentile(ms, 95)), 4),
+        "runs": repeat,
+    }
+
+
+def host_id() -> str:
+    return f"{platform.node()}|{platform.machine()}|{os.cpu_count()}cpu|py{platform.python_version()}"
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def load_history(path: str) -> List[dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_history(path: str, history: List[dict]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(history, f, indent=1)
+    os.replace(tmp, path)
+
+
+def compare(results: Dict[str, dict], history: List[dict], host: str) -> Dict[str, dict]:
+    """Per case: baseline (median of the last BASELINE_RUNS runs on `host`), change and whether it regressed."""
+    report = {}
+    for name, result in results.items():
+        earlier = [run["results"][name]["median_ms"] for run in history
+                   if run.get("host") == host and name in run.get("results", {})][-BASELINE_RUNS:]
+        if not earlier:
+            report[name] = {"baseline_ms": None, "change": None, "regressed": False}
+            continue
+        base_ms, now_ms = round(float(np.median(earlier)), 4), result["median_ms"]
+        change = (now_ms - base_ms) / base_ms if base_ms else 0.0
+        threshold = THRESHOLDS.get(name, DEFAULT_THRESHOLD)
+        report[name] = {
+            "baseline_ms": base_ms,
+            "change": round(change, 4),
+            "threshold": threshold,
+            "regressed": change > threshold and now_ms - base_ms > MIN_DELTA_MS,
+        }
+    return report
+
+
+def run_suite(only: Optional[List[str]] = None, repeat: Optional[int] = None,
+              history_path: str = HISTORY_PATH, record: bool = True) -> dict:
+    names = [n for n in CASES if not only or any(n.startswith(prefix) for prefix in only)]
+    results = {}
+    for name in names:
+        print(f"⏱️  {name} ...", end=" ", flush=True)
+        results[name] = time_case(name, repeat)
+        print(f"{results[name]['median_ms']:.3f} ms")
+
+    history = load_history(history_path)
+    run = {
+        "at": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "host": host_id(),
+        "results": results,
+    }
+    run["comparison"] = compare(results, history, run["host"])
+    if record:
+        save_history(history_path, history + [run])
+    return run
+
+
+def print_report(run: dict):
+    print("=" * 78)
+    print(f"BENCHMARK SUITE  {run['at']}  commit {run['commit'] or '?'}")
+    print("=" * 78)
+    print(f"{'case':<28} {'median ms':>11} {'p95 ms':>10} {'baseline':>10} {'change':>9}")
+    for name, result in run["results"].items():
+        cmp = run["comparison"][name]
+        baseline = f"{cmp['baseline_ms']:.3f}" if cmp["baseline_ms"] is not None else "-"
+        change = f"{cmp['change']:+.1%}" if cmp["change"] is not None else "new"
+        flag = "  ❌ REGRESSION" if cmp["regressed"] else ""
+        print(f"{name:<28} {result['median_ms']:>11.3f} {result['p95_ms']:>10.3f} {baseline:>10} {change:>9}{flag}")
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmark suite with history and regression thresholds")
+    parser.add_argument("--only", type=str, default=None, help="Comma-separated case name prefixes")
+    parser.add_argument("--repeat", type=int, default=None, help="Timed runs per case (default per case)")
+    parser.add_argument("--history", type=str, default=HISTORY_PATH, help="JSON history file")
+    parser.add_argument("--no-record", action="store_true", help="Compare without appending to the history")
+    parser.add_argument("--check", action="store_true", help="Exit 1 when any case regressed")
+    parser.add_argument("--json", type=str, default=None, help="Optional path to write this run's report")
+    args = parser.parse_args()
+
+    run = run_suite(args.only.split(",") if args.only else None, args.repeat, args.history, not args.no_record)
+    print_report(run)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(run, f, indent=2)
+    if args.check and any(c["regressed"] for c in run["comparison"].values()):
+        sys.exit(1)
@@ -118,9 +118,22 @@ class ConfigManager:
         self._lock = RLock()
         self._runtime_overrides: dict[str, Any] = {}
         self._defaults = AppConfig()
-        self._config = self._load_config()
+        # Loaded on first read: importing this module must not open (or create) the clients DB
+        self._loaded: Optional[AppConfig] = None
         self._initialized = True
 
+    @property
+    def _config(self) -> AppConfig:
+        if self._loaded is None:
+            with self._lock:
+                if self._loaded is None:
+                    self._loaded = self._load_config()
+        return self._loaded
+
+    @_config.setter
+    def _config(self, value: AppConfig) -> None:
+        self._loaded = value
+
     def refresh(self) -> AppConfig:
         with self._lock:
             self._config = self._load_config()
@@ -203,13 +216,11 @@ class ConfigManager:
         return values
 
     def _read_db_values(self, db_path: Optional[str] = None) -> dict[str, Any]:
-        if db_path:
-            path = db_path
-        elif hasattr(self, "_config"):
-            path = self._config.db_clients
-        else:
-            path = self._defaults.db_clients
+        path = db_path or self._config.db_clients
         values: dict[str, Any] = {}
+        if not os.path.exists(path):
+            # sqlite3.connect would leave an empty DB behind for the real owner to trip over
+            return values
         try:
             conn = sqlite3.connect(path)
             conn.row_factory = sqlite3.Row
@@ -2,9 +2,11 @@ import sqlite3
 import json
 import os
 import math
+import numpy as np
 import pandas as pd
 from typing import Dict, Optional, List
 from .alpha_factors import AlphaFactors
+from . import forensics
 
 class AlphaCombiner:
     @staticmethod
@@ -43,10 +45,13 @@ class AlphaCombiner:
             return {'velocity': 0.4, 'zscore': 0.5, 'momentum': 0.05, 'volatility': 0.05}
 
     @staticmethod
-    def detect_regime(df: pd.DataFrame) -> str:
+    def detect_regime(df: pd.DataFrame, panel=None, symbol: Optional[str] = None) -> str:
         """
         V35.0: Relays to Unified Core Registry.
+        Reads `symbol`'s regime from the cycle's RegimePanel when it has one.
         """
+        if panel is not None and symbol in panel:
+            return panel.get(symbol)['regime']
         from core.market_regime import detect_regime
         return detect_regime(df)['regime']
 
@@ -57,17 +62,30 @@ class AlphaCombiner:
         More robust than normal approximation for small samples and extreme rates.
         """
         if n == 0: return {"lower": 0.0, "upper": 0.0}
-        
-        z = 1.96 # Approx for 95% confidence
-        upscale = 1 + (z**2 / n)
-        adj_p = p + (z**2 / (2 * n))
-        spread = z * math.sqrt((p * (1 - p) / n) + (z**2 / (4 * n**2)))
-        
+
+        lower, upper = AlphaCombiner.wilson_bounds(p, n)
         return {
-            "lower": round(max(0.0, (adj_p - spread) / upscale) * 100, 1),
-            "upper": round(min(1.0, (adj_p + spread) / upscale) * 100, 1)
+            "lower": round(float(lower) * 100, 1),
+            "upper": round(float(upper) * 100, 1)
         }
 
+    @staticmethod
+    def wilson_bounds(p, n, z: float = 1.96):
+        """
+        Vectorized Wilson score bounds as fractions (0-1) for arrays of rates and
+        sample sizes; the scalar calculate_wilson_interval is built on it.
+        n == 0 yields (0, 0).
+        """
+        p = np.asarray(p, dtype=np.float64)
+        n = np.asarray(n, dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            upscale = 1 + (z**2 / n)
+            adj_p = p + (z**2 / (2 * n))
+            spread = z * np.sqrt((p * (1 - p) / n) + (z**2 / (4 * n**2)))
+            lower = np.where(n > 0, np.maximum(0.0, (adj_p - spread) / upscale), 0.0)
+            upper = np.where(n > 0, np.minimum(1.0, (adj_p + spread) / upscale), 0.0)
+        return lower, upper
+
     @staticmethod
     def get_forensic_multiplier(events: List[Dict], regime: str = "NORMAL") -> float:
         """
@@ -75,8 +93,7 @@ class AlphaCombiner:
         """
         try:
             # 1. Build combination string
-            event_types = sorted([e.get('type') for e in events if e.get('type')])
-            combination = " + ".join(event_types)
+            combination = forensics.event_tags(events)
             if not combination: return 1.0
 
             # 2. Fetch System Configuration (Thresholds)
@@ -99,24 +116,29 @@ class AlphaCombiner:
             if os.path.exists(db_path):
                 with sqlite3.connect(db_path) as conn:
                     conn.row_factory = sqlite3.Row
-                    # Attempt look-up with regime context first
-                    stats = conn.execute("""
-                        SELECT 
-                            COUNT(*) as count,
-                            AVG(CASE WHEN result_pips > 0 THEN 1 ELSE 0 END) as win_rate
-                        FROM signals 
-                        WHERE regime = ? AND forensic_events LIKE ?
-                    """, (regime, f"%{combination}%")).fetchone()
-
-                    # Fallback to general combination if regime-specific sample size is too low
-                    if not stats or stats['count'] < threshold:
+                    # Event combinations are tagged in signal_forensics (see core.forensics);
+                    # the table is created by its writer, so a DB without it just has no history
+                    try:
+                        # Attempt look-up with regime context first
                         stats = conn.execute("""
                             SELECT 
                                 COUNT(*) as count,
-                                AVG(CASE WHEN result_pips > 0 THEN 1 ELSE 0 END) as win_rate
-                            FROM signals 
-                            WHERE forensic_events LIKE ?
-                        """, (f"%{combination}%",)).fetchone()
+                                AVG(CASE WHEN s.result_pips > 0 THEN 1 ELSE 0 END) as win_rate
+                            FROM signals s JOIN signal_forensics f ON f.signal_id = s.id
+                            WHERE s.regime = ? AND f.event_tags = ?
+                        """, (regime, combination)).fetchone()
+
+                        # Fallback to general combination if regime-specific sample size is too low
+                        if not stats or stats['count'] < threshold:
+                            stats = conn.execute("""
+                                SELECT 
+                                    COUNT(*) as count,
+                                    AVG(CASE WHEN s.result_pips > 0 THEN 1 ELSE 0 END) as win_rate
+                                FROM signals s JOIN signal_forensics f ON f.signal_id = s.id
+                                WHERE f.event_tags = ?
+                            """, (combination,)).fetchone()
+                    except sqlite3.OperationalError:
+                        stats = None
 
                     if stats and stats['count'] >= threshold:
                         wr = stats['win_rate'] * 100
@@ -2,6 +2,65 @@ import pandas as pd
 import numpy as np
 from typing import Dict
 
+# Block length for the cumulative-sum slope kernel. Re-anchoring the running
+# sums every block keeps x*y magnitudes small enough that float64 round-off
+# stays far below typical per-bar slopes, even over years of M1/M5 history.
+_SLOPE_BLOCK = 65536
+
+
+def _rolling_ols_slope(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Closed-form rolling OLS slope of `values` against x = 0..period-1.
+
+    slope = (n*Sxy - Sx*Sy) / (n*Sxx - Sx^2), with Sy and Sxy taken from
+    cumulative sums so the whole series costs O(N). Windows that contain a
+    NaN (or are not yet full) return NaN.
+    """
+    y = np.asarray(values, dtype=np.float64)
+    n_total = len(y)
+    out = np.full(n_total, np.nan)
+    if period < 2 or n_total < period:
+        return out
+
+    n = float(period)
+    sx = n * (n - 1) / 2.0
+    sxx = (n - 1) * n * (2 * n - 1) / 6.0
+    denom = n * sxx - sx * sx
+
+    last_start = n_total - period + 1
+    for block_start in range(0, last_start, _SLOPE_BLOCK):
+        block_stop = min(block_start + _SLOPE_BLOCK, last_start)
+        block = y[block_start:block_stop + period - 1]
+
+        nan_mask = np.isnan(block)
+        valid = block[~nan_mask]
+        anchor = valid[0] if len(valid) else 0.0
+        yb = np.where(nan_mask, 0.0, block - anchor)
+        idx = np.arange(len(yb), dtype=np.float64)
+
+        cy = np.concatenate(([0.0], np.cumsum(yb)))
+        cxy = np.concatenate(([0.0], np.cumsum(idx * yb)))
+        cnan = np.concatenate(([0], np.cumsum(nan_mask)))
+
+        # Window i covers block[i:i+period]; shift Sxy back to local x = 0..period-1
+        s = np.arange(block_stop - block_start)
+        e = s + period
+        sum_y = cy[e] - cy[s]
+        sum_xy = (cxy[e] - cxy[s]) - s * sum_y
+        slope = (n * sum_xy - sx * sum_y) / denom
+        slope[(cnan[e] - cnan[s]) > 0] = np.nan
+
+        out[block_start + period - 1:block_stop + period - 1] = slope
+    return out
+
+
+def _finite_or_zero(value) -> float:
+    """Per-bar factors return 0.0 when the batch value is undefined."""
+    if value is None or not np.isfinite(value):
+        return 0.0
+    return float(value)
+
+
 class AlphaFactors:
     @staticmethod
     def velocity_alpha(df: pd.DataFrame, period: int = 20) -> float:
@@ -11,15 +70,13 @@ class AlphaFactors:
         """
         if len(df) < period:
             return 0.0
-        
-        y = df['close'].tail(period).values
-        x = np.arange(len(y))
-        slope, intercept = np.polyfit(x, y, 1)
-        
+
+        slope = _rolling_ols_slope(df['close'].tail(period).values, period)[-1]
+
         # Normalize slope by ATR to get unitless velocity
         atr = df['atr'].iloc[-1]
         if atr == 0: return 0.0
-        
+
         velocity = slope / atr
         return velocity
 
@@ -31,18 +88,13 @@ class AlphaFactors:
         """
         if len(df) < period:
             return 0.0
-            
+
         ema_col = f'ema_{period}'
         if ema_col not in df.columns:
             return 0.0
-            
-        distance = df['close'].iloc[-1] - df[ema_col].iloc[-1]
-        std_dev = df['close'].tail(period).std()
-        
-        if std_dev == 0: return 0.0
-        
-        z_score = distance / std_dev
-        return z_score
+
+        z_score = AlphaFactors.zscore_series(df.tail(period), period).iloc[-1]
+        return _finite_or_zero(z_score)
 
     @staticmethod
     def relative_strength_alpha(symbol_df: pd.DataFrame, benchmark_df: pd.DataFrame) -> float:
@@ -54,16 +106,15 @@ class AlphaFactors:
         common_idx = symbol_df.index.intersection(benchmark_df.index)
         if len(common_idx) < 20:
             return 0.0
-            
+
         s_prices = symbol_df.loc[common_idx, 'close']
         b_prices = benchmark_df.loc[common_idx, 'close']
-        
+
         ratio = s_prices / b_prices
         # Return slope of the ratio
-        x = np.arange(len(ratio.tail(20)))
-        slope, _ = np.polyfit(x, ratio.tail(20).values, 1)
+        slope = _rolling_ols_slope(ratio.tail(20).values, 20)[-1]
         return slope
-    
+
     @staticmethod
     def momentum_alpha(df: pd.DataFrame, short_period: int = 10, long_period: int = 30) -> float:
         """
@@ -72,17 +123,14 @@ class AlphaFactors:
         """
         if len(df) < long_period:
             return 0.0
-        
-        short_roc = (df['close'].iloc[-1] / df['close'].iloc[-short_period] - 1) * 100
-        long_roc = (df['close'].iloc[-1] / df['close'].iloc[-long_period] - 1) * 100
-        
+
         # Normalize by ATR
         atr = df['atr'].iloc[-1]
         if atr == 0: return 0.0
-        
-        momentum = (short_roc - long_roc) / (atr * 10000)  # Normalize
+
+        momentum = AlphaFactors.momentum_series(df.tail(long_period), short_period, long_period).iloc[-1]
         return momentum
-    
+
     @staticmethod
     def volatility_regime_alpha(df: pd.DataFrame, period: int = 50) -> float:
         """
@@ -91,16 +139,73 @@ class AlphaFactors:
         """
         if len(df) < period:
             return 0.0
-        
-        current_atr = df['atr'].iloc[-1]
+
         avg_atr = df['atr'].tail(period).mean()
-        
         if avg_atr == 0: return 0.0
-        
-        # Volatility ratio: >1 = expanding, <1 = compressing
-        vol_ratio = current_atr / avg_atr
-        
+
         # Return normalized regime signal (-1 to 1)
         # 1.0 = high expansion, -1.0 = high compression
-        regime_signal = np.tanh((vol_ratio - 1.0) * 2.0)
+        regime_signal = AlphaFactors.volatility_regime_series(df.tail(period), period).iloc[-1]
         return regime_signal
+
+    # ── Batch API (whole-series, O(N)) ─────────────────────────────────────────
+    # The per-bar factors above are the last value of these series, so live
+    # scoring and research IC studies are computed by the same code.
+
+    @staticmethod
+    def rolling_slope(series: pd.Series, period: int = 20) -> pd.Series:
+        """Rolling linear-regression slope (price units per bar)."""
+        return pd.Series(_rolling_ols_slope(series.values, period), index=series.index)
+
+    @staticmethod
+    def velocity_series(df: pd.DataFrame, period: int = 20) -> pd.Series:
+        """Velocity for every bar: rolling OLS slope of close / ATR."""
+        slope = AlphaFactors.rolling_slope(df['close'], period)
+        return slope / df['atr'].replace(0, np.nan)
+
+    @staticmethod
+    def zscore_series(df: pd.DataFrame, period: int = 100) -> pd.Series:
+        """
+        Z-score of close vs ema_{period} for every bar.
+        Falls back to an EWM EMA when the indicator column is absent (raw research frames).
+        """
+        ema_col = f'ema_{period}'
+        if ema_col in df.columns:
+            ema = df[ema_col]
+        else:
+            ema = df['close'].ewm(span=period, adjust=False).mean()
+        std_dev = df['close'].rolling(period).std()
+        return (df['close'] - ema) / std_dev.replace(0, np.nan)
+
+    @staticmethod
+    def momentum_series(df: pd.DataFrame, short_period: int = 10, long_period: int = 30) -> pd.Series:
+        """
+        Momentum divergence for every bar, ATR-normalized.
+        ROC legs are measured against close[-period] (i.e. period-1 bars back), matching momentum_alpha.
+        """
+        close = df['close']
+        short_roc = (close / close.shift(short_period - 1) - 1) * 100
+        long_roc = (close / close.shift(long_period - 1) - 1) * 100
+        return (short_roc - long_roc) / (df['atr'].replace(0, np.nan) * 10000)
+
+    @staticmethod
+    def volatility_regime_series(df: pd.DataFrame, period: int = 50) -> pd.Series:
+        """tanh-squashed ATR expansion ratio for every bar (-1 compression, +1 expansion)."""
+        avg_atr = df['atr'].rolling(period).mean()
+        vol_ratio = df['atr'] / avg_atr.replace(0, np.nan)
+        return np.tanh((vol_ratio - 1.0) * 2.0)
+
+    @staticmethod
+    def factor_frame(df: pd.DataFrame, velocity_period: int = 20, zscore_period: int = 100,
+                     short_period: int = 10, long_period: int = 30,
+                     vol_period: int = 50) -> pd.DataFrame:
+        """
+        All four alpha factors for every bar of `df` (needs close + atr).
+        Undefined values (warm-up, zero ATR/std) are NaN so IC studies can dropna.
+        """
+        return pd.DataFrame({
+            'velocity': AlphaFactors.velocity_series(df, velocity_period),
+            'zscore': AlphaFactors.zscore_series(df, zscore_period),
+            'momentum': AlphaFactors.momentum_series(df, short_period, long_period),
+            'volatility': AlphaFactors.volatility_regime_series(df, vol_period),
+        }, index=df.index)
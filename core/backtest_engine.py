@@ -3,10 +3,15 @@ import numpy as np
 import sqlite3
 import asyncio
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Sequence
 from config.config import SYMBOLS, DB_SIGNALS, DB_CLIENTS
 from indicators.calculations import IndicatorCalculator
 from core.execution_gate import ExecutionGate
+from core.correlation import RollingCorrelation
+from data.bar_store import BarStore
+from data.compact_frames import compact_frame
+from data.dukascopy_loader import DukascopyLoader
+from data.frame_cache import FrameCache
 
 class BacktestEngine:
     """
@@ -14,13 +19,24 @@ class BacktestEngine:
     Engineered for high-fidelity signal verification and data integrity.
     """
     
-    def __init__(self, start_date: str, end_date: str, symbols: List[str] = SYMBOLS):
+    def __init__(self, start_date: str, end_date: str, symbols: List[str] = SYMBOLS, compact_frames: bool = False,
+                 bar_store: Optional[BarStore] = None, results_db: str = "database/backtest_results.db",
+                 close_stale_runs: bool = True, frame_cache: Optional[FrameCache] = None):
         self.start_date = start_date
         self.end_date = end_date
         self.symbols = symbols
-        self.results_db = "database/backtest_results.db"
+        # Opt-in float32/categorical frames for long simulations on the small VM
+        self.compact_frames = compact_frames
+        # Imported Dukascopy pyramid (data.dukascopy_import); consulted before any network fetch
+        self.bar_store = bar_store
+        # Downloaded bars and indicator-ready frames from earlier runs (data.frame_cache)
+        self.frame_cache = frame_cache
+        self.results_db = results_db
         self._initialize_database()
-        
+        # Job workers (core.backtest_jobs) resume runs instead, so they skip this cleanup
+        if close_stale_runs:
+            self.close_stale_runs(self.results_db)
+
     def _initialize_database(self) -> None:
         """Ensures schema integrity for simulation results."""
         with sqlite3.connect(self.results_db) as conn:
@@ -53,6 +69,7 @@ class BacktestEngine:
                     timestamp TEXT,
                     closed_at TEXT
                 );
+                CREATE INDEX IF NOT EXISTS idx_backtest_signals_run_ts ON backtest_signals(run_id, timestamp, id);
                 CREATE TABLE IF NOT EXISTS trade_reservations (
                     symbol TEXT PRIMARY KEY,
                     direction TEXT,
@@ -62,19 +79,40 @@ class BacktestEngine:
                     updated_at TEXT
                 );
             """)
-            # Cleanup past aborted runs (ghost trades/reservations that pollute new runs)
-            conn.execute("UPDATE backtest_signals SET result = 'CLOSED', closed_at = timestamp WHERE result = 'OPEN' AND (closed_at IS NULL OR closed_at = '')")
-            conn.execute("DELETE FROM trade_reservations")
+
+    @staticmethod
+    def close_stale_runs(results_db: str, keep_run_ids: Sequence[int] = ()) -> None:
+        """
+        Cleanup past aborted runs (ghost trades/reservations that pollute new runs).
+        Runs in `keep_run_ids`, and the runs of queued or running jobs
+        (core.backtest_jobs), are left resumable.
+        """
+        with sqlite3.connect(results_db, timeout=30) as conn:
+            if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'backtest_signals'").fetchone():
+                return
+            keep = {int(r) for r in keep_run_ids}
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'backtest_jobs'").fetchone():
+                keep.update(r[0] for r in conn.execute(
+                    "SELECT run_id FROM backtest_jobs WHERE status IN ('queued', 'running') AND run_id IS NOT NULL"))
+            keep_clause = f" AND run_id NOT IN ({','.join(str(r) for r in sorted(keep))})" if keep else ""
+            conn.execute("UPDATE backtest_signals SET result = 'CLOSED', closed_at = timestamp WHERE result = 'OPEN' "
+                         f"AND (closed_at IS NULL OR closed_at = ''){keep_clause}")
+            # Reservations carry no run id: they are only safe to drop when no run is still live
+            if not keep:
+                conn.execute("DELETE FROM trade_reservations")
             conn.commit()
 
-    async def run(self, progress_callback: Optional[Any] = None) -> Dict[str, Any]:
+    async def run(self, progress_callback: Optional[Any] = None, run_id: Optional[int] = None,
+                  checkpoint: Optional[str] = None, checkpoint_callback: Optional[Any] = None) -> Dict[str, Any]:
         """
         Executes a high-fidelity simulation across multiple timeframes.
-        """
-        all_data = await self._fetch_all_symbol_data()
-        if not all_data:
-            return {"error": "Insufficient data available for this range."}
 
+        Resumable: pass the run_id and checkpoint (ISO timestamp of the last fully
+        simulated bar) of an interrupted attempt. Signals persisted after the
+        checkpoint are discarded and the timeline continues from there.
+        checkpoint_callback(run_id, checkpoint) fires once the run header exists
+        (checkpoint None) and after every simulated UTC day.
+        """
         # Initialize the active institutional baseline only.
         from strategies.crt_strategy import CRTStrategy
         from strategies.advanced_pattern_strategy import AdvancedPatternStrategy
@@ -83,19 +121,41 @@ class BacktestEngine:
             CRTStrategy(),
             AdvancedPatternStrategy(),
         ]
+
+        all_data = await self._fetch_all_symbol_data(strategies)
+        if not all_data:
+            return {"error": "Insufficient data available for this range."}
         
-        run_id = self._create_run_header()
-        performance = {"total_pips": 0.0, "wins": 0, "signals": []}
-        
+        if run_id is None:
+            run_id = self._create_run_header()
+            performance = {"total_pips": 0.0, "wins": 0, "signals": []}
+        else:
+            performance = self._restore_performance(run_id, checkpoint)
+        if checkpoint_callback:
+            checkpoint_callback(run_id, checkpoint)
+
         # Build the master simulation timeline
         timeline = self._build_simulation_timeline(all_data)
-        print(f"\n🚀 Simulation Active: {len(timeline)} cycles across {len(strategies)} strategies.")
+        # Exposure correlations, fed with the H1 bars closed at each gated bar (point-in-time, incremental)
+        correlations = RollingCorrelation(all_data)
+        h1_bar = pd.Timedelta(hours=1)
+        h1_closes = RollingCorrelation.closes({symbol: tfs['h1'] for symbol, tfs in all_data.items()})
+        done = 0
+        if checkpoint:
+            done = int(np.searchsorted(pd.DatetimeIndex(timeline), pd.Timestamp(checkpoint), side="right")) if timeline else 0
+            print(f"\n⏩ Resuming run {run_id} after {checkpoint} ({done}/{len(timeline)} cycles done).")
+        print(f"\n🚀 Simulation Active: {len(timeline) - done} cycles across {len(strategies)} strategies.")
 
-        for i, ts in enumerate(timeline):
+        for i in range(done, len(timeline)):
+            ts = timeline[i]
             if progress_callback and i % 100 == 0:
                 progress_callback(i / len(timeline))
                 await asyncio.sleep(0)
 
+            # Checkpoint per simulated day: everything up to the previous bar is persisted
+            if checkpoint_callback and i > done and ts.date() != timeline[i - 1].date():
+                checkpoint_callback(run_id, timeline[i - 1].isoformat())
+
             for symbol, tfs in all_data.items():
                 if ts not in tfs['entry'].index:
                     continue
@@ -131,9 +191,11 @@ class BacktestEngine:
                     signal['run_id'] = run_id
 
                     # Execute Gate Validation
+                    # The H1 bar stamped within the last hour is still forming at ts: its close is future data
+                    correlations.update(h1_closes, until=ts - h1_bar)
                     gate = ExecutionGate.validate(
                         signal, self.results_db, DB_CLIENTS, 
-                        table_name='backtest_signals', current_ts=ts
+                        table_name='backtest_signals', current_ts=ts, correlations=correlations
                     )
 
                     trade_record = self._create_trade_record(run_id, strategy, symbol, ts, signal, gate)
@@ -153,6 +215,8 @@ class BacktestEngine:
             
             await asyncio.sleep(0)
 
+        if checkpoint_callback and len(timeline) > done:
+            checkpoint_callback(run_id, timeline[-1].isoformat())
         self._finalize_run(run_id, performance)
         return {
             "run_id": run_id,
@@ -180,7 +244,8 @@ class BacktestEngine:
             'closed_at': ts.isoformat() if gate['status'] == 'BLOCKED' else None
         }
 
-    def _simulate_exit(self, future_df: pd.DataFrame, signal: Dict) -> Dict:
+    @staticmethod
+    def _simulate_exit(future_df: pd.DataFrame, signal: Dict) -> Dict:
         """
         Models exit conditions with realistic execution friction (Spread + Slippage).
         V5.1.1: Institutional Audit Mode
@@ -240,11 +305,12 @@ class BacktestEngine:
             ts_set.update(filtered)
         return sorted(list(ts_set))
 
-    async def _fetch_all_symbol_data(self) -> Dict[str, Dict[str, pd.DataFrame]]:
+    async def _fetch_all_symbol_data(self, strategies: Optional[List[Any]] = None) -> Dict[str, Dict[str, pd.DataFrame]]:
         """Handles MTF data loading with fallback logic."""
         from data.fetcher import DataFetcher
         from data.deep_fetcher import DeepDataFetcher
         processed = {}
+        columns = self._indicator_columns(strategies)
         
         # Define ranges (padded for indicator warmup)
         start_dt = datetime.strptime(self.start_date, '%Y-%m-%d')
@@ -256,18 +322,17 @@ class BacktestEngine:
 
         is_deep_history = (datetime.now() - datetime.strptime(m5_start, '%Y-%m-%d')).days > 58
 
+        m5_fetcher = DeepDataFetcher if is_deep_history else DataFetcher
+
         for symbol in self.symbols:
             try:
-                if is_deep_history:
-                    m5 = await DeepDataFetcher.fetch_range_async(symbol, "5m", m5_start, fetch_end)
-                    m15 = await DeepDataFetcher.fetch_range_async(symbol, "15m", m5_start, fetch_end)
-                else:
-                    m5 = await DataFetcher.fetch_range_async(symbol, "5m", m5_start, fetch_end)
-                    m15 = await DataFetcher.fetch_range_async(symbol, "15m", m5_start, fetch_end)
-                    
-                h1 = await DataFetcher.fetch_range_async(symbol, "1h", h1_start, fetch_end)
-                d1 = await DataFetcher.fetch_range_async(symbol, "1d", d1_start, fetch_end)
-                
+                m5, m5_source = await self._prepared_frame(symbol, "5m", m5_start, fetch_end, columns['entry'], m5_fetcher)
+                # M15 follows M5: stored bars only when M5 came from the bar store
+                m15_fetcher = None if m5_source == "store" else m5_fetcher
+                m15, _ = await self._prepared_frame(symbol, "15m", m5_start, fetch_end, columns['m15'], m15_fetcher)
+                h1, _ = await self._prepared_frame(symbol, "1h", h1_start, fetch_end, columns['h1'], DataFetcher)
+                d1, _ = await self._prepared_frame(symbol, "1d", d1_start, fetch_end, columns['d1'], DataFetcher)
+
                 if h1 is None or d1 is None or h1.empty or d1.empty:
                     continue
 
@@ -276,16 +341,11 @@ class BacktestEngine:
                     continue
 
                 # Strict M5 enforce
-                entry_df = m5 
-                entry_tf = "5m"
-
-                processed[symbol] = {
-                    'entry': IndicatorCalculator.add_indicators(entry_df, entry_tf),
-                    'h1': IndicatorCalculator.add_indicators(h1, "1h"),
-                    'd1': IndicatorCalculator.add_indicators(d1, "1d")
-                }
+                processed[symbol] = {'entry': m5, 'h1': h1, 'd1': d1}
                 if m15 is not None and not m15.empty:
-                    processed[symbol]['m15'] = IndicatorCalculator.add_indicators(m15, "15m")
+                    processed[symbol]['m15'] = m15
+                if self.compact_frames:
+                    processed[symbol] = {tf: compact_frame(df) for tf, df in processed[symbol].items()}
 
             except Exception as e:
                 import traceback
@@ -293,11 +353,106 @@ class BacktestEngine:
                 # traceback.print_exc()
         return processed
 
+    async def _prepared_frame(self, symbol: str, timeframe: str, start: str, end: str,
+                              columns: Optional[set], fetcher: Any) -> tuple:
+        """
+        Indicator-ready bars for one timeframe and the source they came from
+        ("store", "deep", "yf" or None). `fetcher` None means bar store only.
+        With a frame cache, a prepared frame for the same symbol, timeframe,
+        range, columns, indicator fingerprint and source is loaded from disk.
+        """
+        if self._store_covers(symbol, timeframe):
+            source = "store"
+        elif fetcher is not None:
+            source = "deep" if fetcher.__name__ == "DeepDataFetcher" else "yf"
+        else:
+            return None, None
+
+        key = None
+        if self.frame_cache is not None:
+            key = FrameCache.key(symbol, timeframe, start, end, sorted(columns) if columns is not None else "all",
+                                 IndicatorCalculator.fingerprint(), source)
+            cached = self.frame_cache.get(key)
+            if cached is not None:
+                return cached, source
+
+        if source == "store":
+            bars = self._stored_bars(symbol, timeframe, start, end)
+        else:
+            bars = await self._fetched_bars(symbol, timeframe, start, end, fetcher, source)
+        if bars is None or bars.empty:
+            return bars, source
+
+        prepared = IndicatorCalculator.add_indicators(bars, timeframe, columns)
+        if key is not None:
+            self.frame_cache.put(key, prepared, end=end)
+        return prepared, source
+
+    async def _fetched_bars(self, symbol: str, timeframe: str, start: str, end: str,
+                            fetcher: Any, source: str) -> Optional[pd.DataFrame]:
+        """Network bars; with a frame cache only the date ranges not downloaded before are fetched."""
+        if self.frame_cache is None:
+            return await fetcher.fetch_range_async(symbol, timeframe, start, end)
+        for piece_start, piece_end in self.frame_cache.missing_ranges(symbol, timeframe, source, start, end):
+            piece = await fetcher.fetch_range_async(symbol, timeframe, piece_start, piece_end)
+            self.frame_cache.add_bars(symbol, timeframe, source, piece, piece_start, piece_end)
+        return self.frame_cache.read_bars(symbol, timeframe, source, start, end)
+
+    def _store_covers(self, symbol: str, timeframe: str) -> bool:
+        """True when the imported bar store spans the simulated range (self.start_date..self.end_date)."""
+        if self.bar_store is None:
+            return False
+        rule = DukascopyLoader.TIMEFRAME_RESAMPLE.get(timeframe, timeframe)
+        info = self.bar_store.info(symbol, rule)
+        if not info or not info.get("rows"):
+            return False
+        return (pd.Timestamp(info["first"]) <= pd.Timestamp(self.start_date, tz="UTC")
+                and pd.Timestamp(info["last"]) >= pd.Timestamp(self.end_date, tz="UTC"))
+
+    def _stored_bars(self, symbol: str, timeframe: str, start: str, end: str) -> Optional[pd.DataFrame]:
+        """
+        Bars from the imported bar store when it covers the simulated range
+        (self.start_date..self.end_date); None sends the caller to the network.
+        """
+        if not self._store_covers(symbol, timeframe):
+            return None
+        rule = DukascopyLoader.TIMEFRAME_RESAMPLE.get(timeframe, timeframe)
+        return self.bar_store.read(symbol, rule, start, end)
+
+    @staticmethod
+    def _indicator_columns(strategies: Optional[List[Any]]) -> Dict[str, Optional[set]]:
+        """
+        Per-frame indicator columns for the simulation: the union of the strategies'
+        declarations, plus the entry ATR context injected for the ExecutionGate.
+        """
+        requirements = IndicatorCalculator.merge_requirements(
+            *(getattr(s, 'REQUIRED_INDICATORS', None) for s in (strategies or [None]))
+        )
+        columns = {tf: IndicatorCalculator.columns_for(requirements, tf) for tf in ('m5', 'h1', 'd1', 'm15')}
+        entry = columns.pop('m5')
+        columns['entry'] = None if entry is None else entry | {'atr', 'atr_avg'}
+        return columns
+
     def _create_run_header(self) -> int:
         with sqlite3.connect(self.results_db) as conn:
             return conn.execute("INSERT INTO backtest_runs (run_name, start_date, end_date) VALUES (?,?,?)",
                                ("Institutional Audit", self.start_date, self.end_date)).lastrowid
 
+    def _restore_performance(self, run_id: int, checkpoint: Optional[str]) -> Dict[str, Any]:
+        """Drops signals after the checkpoint and rebuilds the running totals from the rest."""
+        with sqlite3.connect(self.results_db, timeout=30) as conn:
+            if checkpoint:
+                conn.execute("DELETE FROM backtest_signals WHERE run_id = ? AND timestamp > ?", (run_id, checkpoint))
+            else:
+                conn.execute("DELETE FROM backtest_signals WHERE run_id = ?", (run_id,))
+            rows = conn.execute("SELECT result, result_pips FROM backtest_signals WHERE run_id = ?", (run_id,)).fetchall()
+        signals = [{"result": result, "result_pips": pips or 0.0} for result, pips in rows]
+        return {
+            "total_pips": sum(s["result_pips"] for s in signals if s["result"] != "BLOCKED"),
+            "wins": sum(1 for s in signals if s["result_pips"] > 0),
+            "signals": signals,
+        }
+
     def _persist_signal(self, t: Dict) -> None:
         with sqlite3.connect(self.results_db) as conn:
             conn.execute("""
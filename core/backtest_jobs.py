@@ -0,0 +1,350 @@
+"""
+Backtest Job Manager
+====================
+Runs BacktestEngine simulations outside the web server process.
+
+  - Jobs live in the `backtest_jobs` table of backtest_results.db, so they
+    survive restarts. The API only enqueues and polls.
+  - A supervisor claims queued jobs and runs each in a worker process
+    (ProcessPoolExecutor, at most `max_workers` at once). CPU-bound
+    simulation never blocks the event loop.
+  - The engine checkpoints after every simulated day (run_id plus the last
+    fully simulated bar). A job whose worker died is re-queued and resumes
+    from its checkpoint. Signals after the checkpoint are re-simulated.
+
+Job status: queued → running → done | error | cancelled
+
+Usage:
+    jobs = BacktestJobManager(max_workers=1)
+    jobs.start()                                   # inside a running event loop
+    job_id = jobs.enqueue("2024-01-01", "2024-03-31")
+    jobs.get(job_id)   # {"status": "running", "progress": 42.0, "checkpoint": "...", ...}
+
+    # Standalone worker service instead of the admin server:
+    python -m core.backtest_jobs --workers 2
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import secrets
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import closing
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from core.change_feed import install_change_feed
+from core.db_utils import connect_sqlite
+
+RESULTS_DB = "database/backtest_results.db"
+
+ACTIVE_STATUSES = ("queued", "running")
+FINAL_STATUSES = ("done", "error", "cancelled")
+
+
+class JobCancelled(Exception):
+    """Raised inside a worker when its job was cancelled mid-run."""
+
+
+class BacktestJobManager:
+    """SQLite-backed queue of backtest jobs with a process-pool supervisor."""
+
+    POLL_INTERVAL = 1.0
+    # A job whose worker dies this many times is marked 'error' instead of re-queued
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, db_path: str = RESULTS_DB, max_workers: int = 1):
+        self.db_path = db_path
+        self.max_workers = max(1, max_workers)
+        self._task: Optional[asyncio.Task] = None
+        self.initialize(db_path)
+
+    @staticmethod
+    def initialize(db_path: str = RESULTS_DB) -> None:
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with closing(connect_sqlite(db_path)) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS backtest_jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    params TEXT NOT NULL,
+                    run_id INTEGER,
+                    checkpoint TEXT,
+                    progress REAL DEFAULT 0.0,
+                    attempts INTEGER DEFAULT 0,
+                    worker_pid INTEGER,
+                    result TEXT,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_backtest_jobs_status ON backtest_jobs(status, created_at)")
+            conn.commit()
+            # Progress/status changes reach the dashboard through the change feed
+            install_change_feed(conn, "backtest_jobs")
+
+    # ── Queue API (what the web server calls) ──────────────────────────────────
+
+    def enqueue(self, start_date: str, end_date: str, symbols: Optional[List[str]] = None,
+                compact_frames: bool = False) -> str:
+        job_id = secrets.token_hex(4)
+        params = {"start_date": start_date, "end_date": end_date, "symbols": symbols, "compact_frames": compact_frames}
+        with closing(connect_sqlite(self.db_path)) as conn:
+            conn.execute("INSERT INTO backtest_jobs (id, status, params, created_at) VALUES (?, 'queued', ?, ?)",
+                         (job_id, json.dumps(params), _now()))
+            conn.commit()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with closing(connect_sqlite(self.db_path)) as conn:
+            row = conn.execute("SELECT * FROM backtest_jobs WHERE id = ?", (job_id,)).fetchone()
+        return _job_dict(row) if row else None
+
+    def jobs(self, limit: int = 50) -> List[Dict[str, Any]]:
+        with closing(connect_sqlite(self.db_path)) as conn:
+            rows = conn.execute("SELECT * FROM backtest_jobs ORDER BY created_at DESC, rowid DESC LIMIT ?",
+                                (limit,)).fetchall()
+        return [_job_dict(r) for r in rows]
+
+    def latest_active(self) -> Optional[Dict[str, Any]]:
+        """Most recent queued/running job (lets the dashboard re-attach)."""
+        with closing(connect_sqlite(self.db_path)) as conn:
+            row = conn.execute("SELECT * FROM backtest_jobs WHERE status IN ('queued', 'running') "
+                               "ORDER BY created_at DESC, rowid DESC LIMIT 1").fetchone()
+        return _job_dict(row) if row else None
+
+    def cancel(self, job_id: str) -> bool:
+        """Queued jobs are cancelled at once; running jobs stop at their next progress tick."""
+        with closing(connect_sqlite(self.db_path)) as conn:
+            cur = conn.execute("UPDATE backtest_jobs SET status = 'cancelled', finished_at = ? "
+                               "WHERE id = ? AND status IN ('queued', 'running')", (_now(), job_id))
+            conn.commit()
+        return cur.rowcount > 0
+
+    # ── Supervisor ─────────────────────────────────────────────────────────────
+
+    def recover(self, lost: Sequence[str] = ()) -> int:
+        """
+        Re-queues 'running' jobs whose worker process is gone (server restart,
+        crash), plus the `lost` job ids. They resume from their checkpoint.
+        A claimed job holds its supervisor's pid until a worker picks it up.
+        Returns the number re-queued.
+        """
+        with closing(connect_sqlite(self.db_path)) as conn:
+            rows = conn.execute("SELECT id, worker_pid, attempts FROM backtest_jobs WHERE status = 'running'").fetchall()
+            orphaned = [r for r in rows if r["id"] in lost or not _pid_alive(r["worker_pid"])]
+            retry = [(r["id"],) for r in orphaned if r["attempts"] < self.MAX_ATTEMPTS]
+            failed = [(f"Worker died {r['attempts']} times", _now(), r["id"])
+                      for r in orphaned if r["attempts"] >= self.MAX_ATTEMPTS]
+            conn.executemany("UPDATE backtest_jobs SET status = 'queued', worker_pid = NULL WHERE id = ?", retry)
+            conn.executemany("UPDATE backtest_jobs SET status = 'error', error = ?, finished_at = ? WHERE id = ?", failed)
+            conn.commit()
+        return len(retry)
+
+    def claim(self) -> Optional[str]:
+        """Atomically moves the oldest queued job to 'running', owned by this process until a worker starts."""
+        conn = connect_sqlite(self.db_path)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT id FROM backtest_jobs WHERE status = 'queued' "
+                               "ORDER BY created_at, rowid LIMIT 1").fetchone()
+            if row:
+                conn.execute("UPDATE backtest_jobs SET status = 'running', attempts = attempts + 1, worker_pid = ?, "
+                             "started_at = COALESCE(started_at, ?) WHERE id = ?", (os.getpid(), _now(), row["id"]))
+            conn.commit()
+            return row["id"] if row else None
+        finally:
+            conn.close()
+
+    def fail(self, job_id: str, error: str) -> None:
+        """Marks a running job 'error' (a cancellation that got there first is kept)."""
+        _finish(self.db_path, job_id, "error", error=error)
+
+    def start(self) -> asyncio.Task:
+        """Starts the supervisor on the running event loop (idempotent)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.serve())
+        return self._task
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def serve(self) -> None:
+        """Claims queued jobs into the worker pool until cancelled."""
+        from core.backtest_engine import BacktestEngine
+
+        requeued = self.recover()
+        if requeued:
+            print(f"♻️ Backtest jobs: re-queued {requeued} interrupted job(s) for resume")
+        active_runs = [j["run_id"] for j in self.jobs(limit=1000)
+                       if j["status"] in ACTIVE_STATUSES and j["run_id"] is not None]
+        BacktestEngine.close_stale_runs(self.db_path, keep_run_ids=active_runs)
+
+        loop = asyncio.get_running_loop()
+        running: Dict[str, asyncio.Future] = {}
+        pool = self._new_pool()
+        try:
+            while True:
+                for job_id in [j for j, fut in running.items() if fut.done()]:
+                    future = running.pop(job_id)
+                    error = None if future.cancelled() else future.exception()
+                    if isinstance(error, BrokenProcessPool):
+                        # A worker was killed: start a fresh pool, resume its jobs from checkpoints
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        pool = self._new_pool()
+                        self.recover(lost=[job_id, *running])
+                        running.clear()
+                        break
+                    if error is not None or future.cancelled():
+                        # Failed outside run_job's own handling (e.g. unpicklable result): don't leave it 'running'
+                        self.fail(job_id, repr(error) if error is not None else "Worker future cancelled")
+                while len(running) < self.max_workers:
+                    job_id = self.claim()
+                    if job_id is None:
+                        break
+                    running[job_id] = loop.run_in_executor(pool, run_job, self.db_path, job_id)
+                await asyncio.sleep(self.POLL_INTERVAL)
+        finally:
+            # Unfinished jobs stay 'running' and are recovered (resumed) on the next start
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # Spawned (not forked) workers: the server process has a running event loop and threads
+        return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+# ── Worker process ─────────────────────────────────────────────────────────────
+
+def run_job(db_path: str, job_id: str) -> str:
+    """Process-pool worker: runs (or resumes) one job. Returns its final status."""
+    from core.backtest_engine import BacktestEngine
+    from data.dukascopy_import import imported_store
+    from data.frame_cache import FrameCache
+
+    job = _read_job(db_path, job_id)
+    if job is None or job["status"] != "running":
+        return job["status"] if job else "unknown"
+    _update(db_path, job_id, worker_pid=os.getpid(), error=None)
+
+    params = job["params"]
+    kwargs = {"symbols": params["symbols"]} if params.get("symbols") else {}
+
+    def on_progress(p: float):
+        # Cancellation is checked at the engine's progress ticks (every 100 bars)
+        if _read_job(db_path, job_id)["status"] == "cancelled":
+            raise JobCancelled(job_id)
+        _update(db_path, job_id, progress=round(p * 100, 1))
+
+    def on_checkpoint(run_id: int, checkpoint: Optional[str]):
+        _update(db_path, job_id, run_id=run_id, checkpoint=checkpoint)
+
+    try:
+        engine = BacktestEngine(params["start_date"], params["end_date"],
+                                compact_frames=params.get("compact_frames", False),
+                                bar_store=imported_store(), results_db=db_path, close_stale_runs=False,
+                                frame_cache=FrameCache(), **kwargs)
+        result = asyncio.run(engine.run(progress_callback=on_progress, run_id=job["run_id"],
+                                        checkpoint=job["checkpoint"], checkpoint_callback=on_checkpoint))
+    except JobCancelled:
+        print(f"🛑 Backtest job {job_id} cancelled.")
+        return "cancelled"
+    except Exception as e:
+        print(f"💥 Backtest job {job_id} crashed: {e}")
+        return _finish(db_path, job_id, "error", error=str(e))
+
+    if isinstance(result, dict) and "error" in result:
+        print(f"❌ Backtest job {job_id} failed: {result['error']}")
+        return _finish(db_path, job_id, "error", error=result["error"])
+    status = _finish(db_path, job_id, "done", progress=100.0, result=json.dumps(result, default=str))
+    if status == "done":
+        print(f"✅ Backtest job {job_id} completed (run {result.get('run_id')}).")
+    else:
+        print(f"🛑 Backtest job {job_id} finished after it was {status}; result discarded.")
+    return status
+
+
+# ── Internal ───────────────────────────────────────────────────────────────────
+
+def _read_job(db_path: str, job_id: str) -> Optional[Dict[str, Any]]:
+    with closing(connect_sqlite(db_path)) as conn:
+        row = conn.execute("SELECT * FROM backtest_jobs WHERE id = ?", (job_id,)).fetchone()
+    return _job_dict(row) if row else None
+
+
+def _finish(db_path: str, job_id: str, status: str, **fields) -> str:
+    """
+    Records a running job's final status. A cancellation (or recovery) that got
+    there first is kept; returns the status actually stored.
+    """
+    if _update(db_path, job_id, only_running=True, status=status, finished_at=_now(), **fields):
+        return status
+    job = _read_job(db_path, job_id)
+    return job["status"] if job else "unknown"
+
+
+def _update(db_path: str, job_id: str, only_running: bool = False, **fields) -> int:
+    """Sets `fields` on one job (only while it is 'running' if `only_running`). Returns rows changed."""
+    assignments = ", ".join(f"{name} = ?" for name in fields)
+    guard = " AND status = 'running'" if only_running else ""
+    for attempt in range(3):
+        try:
+            with closing(connect_sqlite(db_path)) as conn:
+                cur = conn.execute(f"UPDATE backtest_jobs SET {assignments} WHERE id = ?{guard}",
+                                   (*fields.values(), job_id))
+                conn.commit()
+            return cur.rowcount
+        except sqlite3.OperationalError:
+            if attempt == 2:
+                raise
+
+
+def _job_dict(row: sqlite3.Row) -> Dict[str, Any]:
+    job = dict(row)
+    job["params"] = json.loads(job["params"] or "{}")
+    job["result"] = json.loads(job["result"]) if job.get("result") else None
+    return job
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+# ── CLI ────────────────────────────────────────────────────────────────────────
+
+async def main():
+    parser = argparse.ArgumentParser(description="Backtest job worker service")
+    parser.add_argument("--workers", type=int, default=1, help="Concurrent backtests")
+    parser.add_argument("--db", default=RESULTS_DB)
+    args = parser.parse_args()
+
+    manager = BacktestJobManager(args.db, max_workers=args.workers)
+    print(f"🧵 Backtest job worker: {manager.max_workers} slot(s) on {manager.db_path}")
+    await manager.serve()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,260 @@
+"""
+Change Feed
+===========
+Pushes database changes to dashboard viewers instead of having every viewer
+re-run full queries on a timer.
+
+  1. SQLite triggers append every relevant change to an `events` table in the
+     same database (monotonic id, topic, row id, JSON payload). Writers need
+     no code changes: signal_service inserts, gate decisions, signal_tracker
+     settlements, trade_executor fills and backtest workers all publish
+     through their normal UPDATE/INSERT statements, from any process.
+  2. One EventBroadcaster per server process reads `WHERE id > cursor` from
+     each source database and fans the new events out to every subscriber.
+     Database load scales with the change rate, not viewers × poll rate.
+  3. Subscribers resume from a cursor (SSE Last-Event-ID): missed events are
+     replayed from the table, which keeps the last EVENTS_RETENTION events.
+     Retention is a trigger on `events` itself, so the table stays bounded
+     whether or not an admin server is running.
+
+Topics:
+    signal      new row in `signals` (includes its gate decision)
+    gate        gate_status / gate_reason changed
+    settlement  result / status / outcome / closed_at / max_tp_reached changed
+    execution   execution_status / fill changed
+    backtest    backtest job queued, progressed or finished
+
+Usage:
+    install_change_feed(conn, "signals")            # idempotent, at schema setup
+    feed = EventBroadcaster({"signals": DB_SIGNALS, "backtest": RESULTS_DB})
+    feed.start()
+    queue, replay = await feed.subscribe(parse_cursor(last_event_id))
+"""
+
+import asyncio
+import json
+import sqlite3
+from contextlib import closing
+from typing import Dict, List, Optional, Tuple
+
+from core.db_utils import connect_sqlite
+
+EVENTS_RETENTION = 10_000
+EVENTS_PRUNE_EVERY = 500    # inserts between retention deletes
+SUBSCRIBER_QUEUE_SIZE = 1_000
+
+# table -> (payload columns, insert topic, {update topic: watched columns})
+FEEDS = {
+    "signals": (
+        ("id", "timestamp", "symbol", "direction", "entry_price", "sl", "tp1", "tp2", "trade_type",
+         "quality_score", "regime", "gate_status", "gate_reason", "status", "result", "result_pips",
+         "outcome", "closed_at", "max_tp_reached", "execution_status", "fill_price"),
+        "signal",
+        {
+            "gate": ("gate_status", "gate_reason"),
+            "settlement": ("result", "status", "outcome", "closed_at", "max_tp_reached"),
+            "execution": ("execution_status", "fill_price", "filled_lot_size"),
+        },
+    ),
+    "backtest_jobs": (
+        ("id", "status", "progress", "error", "run_id", "checkpoint", "attempts"),
+        "backtest",
+        {"backtest": ("status", "progress", "error", "run_id")},
+    ),
+}
+
+
+def install_change_feed(conn: sqlite3.Connection, table: str, keep: int = EVENTS_RETENTION,
+                        prune_every: int = EVENTS_PRUNE_EVERY) -> None:
+    """
+    Creates the events table with its retention trigger and (re)creates
+    `table`'s feed triggers for the columns it actually has, so older schemas
+    simply publish fewer fields.
+    """
+    payload_cols, insert_topic, update_topics = FEEDS[table]
+    cursor = conn.cursor()
+    cursor.execute(f"PRAGMA table_info({table})")
+    existing = {row[1] for row in cursor.fetchall()}
+    if not existing:
+        return
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            topic TEXT NOT NULL,
+            row_id TEXT,
+            payload TEXT,
+            created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+        )
+    """)
+    payload = "json_object(" + ", ".join(f"'{c}', NEW.{c}" for c in payload_cols if c in existing) + ")"
+    insert = f"INSERT INTO events (topic, row_id, payload) VALUES ('{{topic}}', NEW.id, {payload});"
+
+    statements = ["DROP TRIGGER IF EXISTS events_retention",
+                  # Every `prune_every`-th insert trims the table back to the last `keep` events
+                  f"CREATE TRIGGER events_retention AFTER INSERT ON events "
+                  f"WHEN NEW.id % {int(prune_every)} = 0 "
+                  f"BEGIN DELETE FROM events WHERE id <= NEW.id - {int(keep)}; END",
+                  f"DROP TRIGGER IF EXISTS feed_{table}_insert",
+                  f"CREATE TRIGGER feed_{table}_insert AFTER INSERT ON {table} "
+                  f"BEGIN {insert.format(topic=insert_topic)} END"]
+    for topic, watched in update_topics.items():
+        watched = [c for c in watched if c in existing]
+        statements.append(f"DROP TRIGGER IF EXISTS feed_{table}_{topic}")
+        if not watched:
+            continue
+        # Only real changes publish: trackers rewrite unchanged values every cycle
+        changed = " OR ".join(f"NEW.{c} IS NOT OLD.{c}" for c in watched)
+        statements.append(f"CREATE TRIGGER feed_{table}_{topic} AFTER UPDATE OF {', '.join(watched)} ON {table} "
+                          f"WHEN {changed} BEGIN {insert.format(topic=topic)} END")
+    with conn:
+        for statement in statements:
+            conn.execute(statement)
+
+
+def read_events(db_path: str, after: int = 0, limit: int = 500) -> List[dict]:
+    """Events with id > after, oldest first. A database without a feed has none."""
+    try:
+        with closing(connect_sqlite(db_path)) as conn:
+            rows = conn.execute("SELECT id, topic, row_id, payload, created_at FROM events "
+                                "WHERE id > ? ORDER BY id LIMIT ?", (after, limit)).fetchall()
+    except sqlite3.OperationalError:
+        return []
+    return [{"id": r["id"], "topic": r["topic"], "row_id": r["row_id"],
+             "payload": json.loads(r["payload"] or "{}"), "created_at": r["created_at"]} for r in rows]
+
+
+def head_event_id(db_path: str) -> int:
+    try:
+        with closing(connect_sqlite(db_path)) as conn:
+            return conn.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+    except sqlite3.OperationalError:
+        return 0
+
+
+def prune_events(db_path: str, keep: int = EVENTS_RETENTION) -> int:
+    try:
+        with closing(connect_sqlite(db_path)) as conn:
+            deleted = conn.execute("DELETE FROM events WHERE id <= (SELECT MAX(id) FROM events) - ?",
+                                   (keep,)).rowcount
+            conn.commit()
+            return deleted
+    except sqlite3.OperationalError:
+        return 0
+
+
+def format_cursor(cursor: Dict[str, int]) -> str:
+    return ",".join(f"{name}:{cursor[name]}" for name in sorted(cursor))
+
+
+def parse_cursor(value: Optional[str]) -> Optional[Dict[str, int]]:
+    """'backtest:40,signals:12' -> {'backtest': 40, 'signals': 12}; None/garbage -> None."""
+    if not value:
+        return None
+    try:
+        return {name: int(pos) for name, pos in (part.split(":", 1) for part in value.split(","))}
+    except ValueError:
+        return None
+
+
+class EventBroadcaster:
+    """Polls each source database's events table once and fans out to subscribers."""
+
+    POLL_INTERVAL = 1.0
+
+    def __init__(self, sources: Dict[str, str]):
+        self.sources = sources
+        self.cursor: Dict[str, int] = {}
+        self.subscribers: Dict[asyncio.Queue, Optional[set]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self.cursor = {name: head_event_id(path) for name, path in self.sources.items()}
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for queue in list(self.subscribers):
+            self._close(queue)
+
+    async def subscribe(self, since: Optional[Dict[str, int]] = None,
+                        topics: Optional[set] = None) -> Tuple[asyncio.Queue, List[dict]]:
+        """
+        Registers a subscriber. Returns its live queue and the events it
+        missed since `since` (replayed up to the point live delivery starts).
+        """
+        self.start()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        snapshot = dict(self.cursor)
+        self.subscribers[queue] = topics
+        replay = []
+        if since:
+            replay = await asyncio.to_thread(self._replay, since, snapshot)
+        return queue, [e for e in replay if topics is None or e["topic"] in topics]
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self.subscribers.pop(queue, None)
+
+    async def poll(self) -> int:
+        """Reads and broadcasts new events from every source. Returns how many."""
+        async with self._lock:
+            return await self._poll_sources()
+
+    async def _poll_sources(self) -> int:
+        count = 0
+        for name, path in self.sources.items():
+            events = await asyncio.to_thread(read_events, path, self.cursor.get(name, 0))
+            if not events and head_event_id(path) < self.cursor.get(name, 0):
+                # Database was recreated: its ids restart
+                self.cursor[name] = 0
+            for event in events:
+                self.cursor[name] = event["id"]
+                self._broadcast({**event, "source": name, "cursor": format_cursor(self.cursor)})
+                count += 1
+        return count
+
+    def _broadcast(self, event: dict) -> None:
+        for queue, topics in list(self.subscribers.items()):
+            if topics is not None and event["topic"] not in topics:
+                continue
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow consumer: drop it; the client reconnects with its last cursor
+                self._close(queue)
+
+    def _close(self, queue: asyncio.Queue) -> None:
+        self.subscribers.pop(queue, None)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    def _replay(self, since: Dict[str, int], until: Dict[str, int]) -> List[dict]:
+        cursor = {name: since.get(name, until.get(name, 0)) for name in self.sources}
+        events = []
+        for name, path in self.sources.items():
+            after = cursor[name]
+            while after < until.get(name, 0):
+                batch = [e for e in read_events(path, after) if e["id"] <= until[name]]
+                if not batch:
+                    break
+                for event in batch:
+                    cursor[name] = event["id"]
+                    events.append({**event, "source": name, "cursor": format_cursor(cursor)})
+                after = batch[-1]["id"]
+        return events
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.poll()
+            except Exception as e:
+                print(f"⚠️ Change feed poll failed: {e}")
+            await asyncio.sleep(self.POLL_INTERVAL)
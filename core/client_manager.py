@@ -8,9 +8,12 @@ import os
 from datetime import datetime
 from typing import Optional, Dict, List
 
+from config.manager import config_manager
+
 class ClientManager:
-    def __init__(self, db_path: str = "database/clients.db"):
-        self.db_path = db_path
+    def __init__(self, db_path: Optional[str] = None):
+        # Defaults to the configured clients DB (DB_CLIENTS / runtime override)
+        self.db_path = db_path or config_manager.get("db_clients")
         self._init_database()
     
     def _init_database(self):
@@ -0,0 +1,260 @@
+"""
+Rolling Correlation Engine
+==========================
+Correlation of H1 log returns across the symbol universe, kept up to date
+one bar at a time so the ExecutionGate can ask "does this open position
+move with the new signal?" in O(1) per pair instead of matching currency
+codes or rebuilding a correlation matrix per signal.
+
+  - Pairwise Welford statistics (count, means, co-moments) over the last
+    `window` bars: each new bar is added, the bar leaving the window is
+    removed. A bar where a symbol has no close (weekend for FX, a gap in
+    the feed) only updates the pairs that both traded. The sums are
+    rebuilt from the window every `window` bars so float error from the
+    removals cannot accumulate.
+  - update() only feeds bars newer than the last one it saw and older than
+    `until` (default: all but the latest bar, which may still be forming),
+    so calling it every cycle with the same 30 days of H1 costs only the
+    new bars. Backtests pass until=<bar time> for point-in-time answers.
+  - State is cached in memory per signals DB (for_db) and persisted to the
+    `correlation_state` table of that DB, so a restarted service resumes
+    without re-warming and replays/backtests never see live state.
+
+Usage:
+    correlations = RollingCorrelation.for_db(db_signals)
+    correlations.update(RollingCorrelation.closes(h1_frames))   # each cycle
+    correlations.save(db_signals)
+    correlations.corr("EURUSD=X", "GBPUSD=X")                   # None until MIN_PERIODS shared bars
+"""
+
+import io
+from collections import deque
+from contextlib import closing
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.db_utils import connect_sqlite
+
+# H1 bars in the window (~4 trading weeks)
+CORRELATION_WINDOW = 500
+# Shared bars a pair needs before its correlation is trusted
+MIN_PERIODS = 100
+# |correlation| at or above which two positions count as the same exposure
+CORRELATION_THRESHOLD = 0.7
+STATE_NAME = "h1_returns"
+
+_ENGINES: Dict[str, "RollingCorrelation"] = {}
+
+
+class RollingCorrelation:
+    """Windowed pairwise correlation of log returns, updated incrementally per bar."""
+
+    def __init__(self, symbols: Iterable[str] = (), window: int = CORRELATION_WINDOW,
+                 min_periods: int = MIN_PERIODS):
+        self.window = window
+        self.min_periods = min_periods
+        self.symbols: List[str] = []
+        self._index: Dict[str, int] = {}
+        self.last_ts: Optional[pd.Timestamp] = None
+        self._last_close = np.empty(0)
+        # Returns currently in the window, oldest first (NaN = no bar for that symbol)
+        self._rows: deque = deque()
+        self._since_rebuild = 0
+        self._reset_stats(0)
+        self._add_symbols(symbols)
+
+    # ── Statistics ──────────────────────────────────────────────────────────
+    def _reset_stats(self, size: int) -> None:
+        # [i, j] is over the bars where both i and j have a return; _mean[i, j] is i's mean there
+        self._n = np.zeros((size, size))
+        self._mean = np.zeros((size, size))
+        self._m2 = np.zeros((size, size))
+        self._cov = np.zeros((size, size))
+
+    def _add_symbols(self, symbols: Iterable[str]) -> None:
+        new = [s for s in dict.fromkeys(symbols) if s not in self._index]
+        if not new:
+            return
+        old, size = len(self.symbols), len(self.symbols) + len(new)
+        for name in ("_n", "_mean", "_m2", "_cov"):
+            grown = np.zeros((size, size))
+            grown[:old, :old] = getattr(self, name)
+            setattr(self, name, grown)
+        self._last_close = np.concatenate([self._last_close, np.full(len(new), np.nan)])
+        self._rows = deque(np.concatenate([row, np.full(len(new), np.nan)]) for row in self._rows)
+        for symbol in new:
+            self._index[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+
+    def _apply(self, returns: np.ndarray, sign: int) -> None:
+        """Adds (sign=1) or removes (sign=-1) one bar of returns from every pair that has both."""
+        present = ~np.isnan(returns)
+        pair = np.outer(present, present)
+        x = np.where(present, returns, 0.0)
+        xi = np.broadcast_to(x[:, None], pair.shape)
+        n_old = self._n
+        n_new = n_old + sign * pair
+        safe = np.where(n_new > 0, n_new, 1)
+        mean_old = self._mean
+        if sign > 0:
+            mean_new = np.where(pair, mean_old + (xi - mean_old) / safe, mean_old)
+            # Welford: C += (x_i - mean_i,old) * (x_j - mean_j,new)
+            self._cov = self._cov + pair * (xi - mean_old) * (xi.T - mean_new.T)
+            self._m2 = self._m2 + pair * (xi - mean_old) * (xi - mean_new)
+        else:
+            mean_new = np.where(pair, np.where(n_new > 0, (mean_old * n_old - xi) / safe, 0.0), mean_old)
+            # Inverse step: C -= (x_i - mean_i,new) * (x_j - mean_j,old)
+            self._cov = self._cov - pair * (xi - mean_new) * (xi.T - mean_old.T)
+            self._m2 = self._m2 - pair * (xi - mean_new) * (xi - mean_old)
+        self._n, self._mean = n_new, mean_new
+
+    def _rebuild(self) -> None:
+        self._reset_stats(len(self.symbols))
+        for row in self._rows:
+            self._apply(row, 1)
+        self._since_rebuild = 0
+
+    # ── Feeding ─────────────────────────────────────────────────────────────
+    @staticmethod
+    def closes(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """Bars x symbols close matrix (outer-joined on time) from {symbol: ohlc_df}."""
+        series = {}
+        for symbol, df in frames.items():
+            if df is None or df.empty:
+                continue
+            column = "close" if "close" in df.columns else "Close"
+            series[symbol] = df[column].astype(float)
+        if not series:
+            return pd.DataFrame(dtype=float)
+        return pd.DataFrame(series).sort_index()
+
+    def push(self, ts, closes: Dict[str, float]) -> None:
+        """Feeds one bar: {symbol: close} at `ts` (symbols without a bar are simply absent)."""
+        self._add_symbols(closes)
+        price = np.full(len(self.symbols), np.nan)
+        for symbol, close in closes.items():
+            price[self._index[symbol]] = close
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = np.log(price / self._last_close)
+        returns[~np.isfinite(returns)] = np.nan
+        self._last_close = np.where(np.isnan(price) | (price <= 0), self._last_close, price)
+        self.last_ts = pd.Timestamp(ts)
+        if np.isnan(returns).all():
+            return
+        self._rows.append(returns)
+        self._apply(returns, 1)
+        if len(self._rows) > self.window:
+            self._apply(self._rows.popleft(), -1)
+            self._since_rebuild += 1
+            if self._since_rebuild >= self.window:
+                self._rebuild()
+
+    def update(self, closes: pd.DataFrame, until=None) -> int:
+        """
+        Feeds the rows of a closes() matrix after the last bar seen and before
+        `until` (default: all but the last row). Returns the number of bars fed.
+        """
+        if closes.empty:
+            return 0
+        index = closes.index
+        start = 0 if self.last_ts is None else int(index.searchsorted(_like(self.last_ts, index), side="right"))
+        stop = len(index) - 1 if until is None else int(index.searchsorted(_like(until, index), side="left"))
+        if stop <= start:
+            return 0
+        self._add_symbols(closes.columns)
+        block = closes.iloc[start:stop]
+        values = block.to_numpy(dtype=float)
+        columns = list(block.columns)
+        for ts, row in zip(block.index, values):
+            present = ~np.isnan(row)
+            self.push(ts, {columns[i]: row[i] for i in np.flatnonzero(present)})
+        return stop - start
+
+    # ── Queries ─────────────────────────────────────────────────────────────
+    def corr(self, a: str, b: str) -> Optional[float]:
+        """Correlation of a's and b's returns over their shared bars in the window; None if too few."""
+        i, j = self._index.get(a), self._index.get(b)
+        if i is None or j is None:
+            return None
+        if i == j:
+            return 1.0
+        if self._n[i, j] < self.min_periods:
+            return None
+        var_i, var_j = self._m2[i, j], self._m2[j, i]
+        if var_i <= 0 or var_j <= 0:
+            return None
+        return float(np.clip(self._cov[i, j] / np.sqrt(var_i * var_j), -1.0, 1.0))
+
+    def matrix(self) -> pd.DataFrame:
+        """Full correlation matrix (NaN where a pair has too few shared bars)."""
+        values = [[self.corr(a, b) for b in self.symbols] for a in self.symbols]
+        return pd.DataFrame(values, index=self.symbols, columns=self.symbols, dtype=float)
+
+    # ── Persistence ─────────────────────────────────────────────────────────
+    @classmethod
+    def for_db(cls, db_path: str) -> "RollingCorrelation":
+        """The in-memory engine for a signals DB, loaded from its correlation_state on first use."""
+        engine = _ENGINES.get(db_path)
+        if engine is None:
+            engine = _ENGINES[db_path] = cls.load(db_path) or cls()
+        return engine
+
+    def save(self, db_path: str) -> None:
+        buffer = io.BytesIO()
+        rows = np.array(self._rows) if self._rows else np.empty((0, len(self.symbols)))
+        np.savez_compressed(buffer, symbols=np.array(self.symbols, dtype=str), rows=rows,
+                            last_close=self._last_close,
+                            meta=np.array([self.window, self.min_periods, self._since_rebuild]),
+                            last_ts=np.array([self.last_ts.isoformat() if self.last_ts is not None else ""]))
+        with closing(connect_sqlite(db_path)) as conn:
+            ensure_correlation_table(conn)
+            conn.execute("INSERT OR REPLACE INTO correlation_state (name, updated_at, last_bar, bars, state) "
+                         "VALUES (?, ?, ?, ?, ?)",
+                         (STATE_NAME, datetime.utcnow().isoformat(),
+                          self.last_ts.isoformat() if self.last_ts is not None else None,
+                          len(self._rows), buffer.getvalue()))
+            conn.commit()
+
+    @classmethod
+    def load(cls, db_path: str) -> Optional["RollingCorrelation"]:
+        """The engine saved in db_path, or None (no state yet, or no such table)."""
+        try:
+            with closing(connect_sqlite(db_path)) as conn:
+                row = conn.execute("SELECT state FROM correlation_state WHERE name = ?", (STATE_NAME,)).fetchone()
+        except Exception:
+            return None
+        if not row:
+            return None
+        with np.load(io.BytesIO(row["state"])) as state:
+            window, min_periods, since_rebuild = (int(v) for v in state["meta"])
+            engine = cls(state["symbols"].tolist(), window=window, min_periods=min_periods)
+            engine._last_close = state["last_close"]
+            engine._rows = deque(state["rows"])
+            last_ts = str(state["last_ts"][0])
+        engine.last_ts = pd.Timestamp(last_ts) if last_ts else None
+        engine._rebuild()
+        engine._since_rebuild = since_rebuild
+        return engine
+
+
+def _like(ts, index: pd.DatetimeIndex) -> pd.Timestamp:
+    """`ts` in the timezone convention of `index` (yfinance bars are UTC-aware, stored bars naive UTC)."""
+    ts = pd.Timestamp(ts)
+    if index.tz is not None:
+        return ts.tz_localize("UTC").tz_convert(index.tz) if ts.tzinfo is None else ts.tz_convert(index.tz)
+    return ts.tz_convert("UTC").tz_localize(None) if ts.tzinfo is not None else ts
+
+
+def ensure_correlation_table(conn) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS correlation_state (
+            name TEXT PRIMARY KEY,
+            updated_at TEXT,
+            last_bar TEXT,
+            bars INTEGER,
+            state BLOB
+        )
+    """)
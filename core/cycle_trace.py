@@ -0,0 +1,181 @@
+"""
+Cycle Trace
+===========
+Per-stage latency for SignalService cycles.
+
+  - span("fetch.5m", "EURUSD=X") times a block with the monotonic clock and
+    adds it to the trace of the running cycle. Outside a traced cycle it is
+    a no-op, so instrumented code (generate_signals, strategies) runs
+    unchanged from scripts and tests.
+  - The active trace travels in a ContextVar, so tasks spawned with
+    asyncio.gather inside a cycle report to the same trace.
+  - Each cycle is stored as one `cycle_metrics` row (total + per-stage
+    count / total / slowest span and its label, and the service RSS after
+    the cycle); cycle_rollup() gives p50/p95 per stage over recent cycles.
+
+Stages are wall-clock per call. Spans of concurrent work (the per-symbol
+fetches) overlap, so their sum can exceed the enclosing "fetch" span.
+
+Usage:
+    trace = CycleTrace()
+    with tracing(trace):
+        ...
+        with span("gate", symbol):
+            ExecutionGate.validate_and_reserve(...)
+    record_cycle(DB_SIGNALS, trace, signals=3, sent=1)
+    cycle_rollup(DB_SIGNALS, hours=24)
+"""
+
+import json
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from core.db_utils import connect_sqlite
+
+CYCLE_METRICS_RETENTION_DAYS = 14
+
+_CURRENT: ContextVar[Optional["CycleTrace"]] = ContextVar("cycle_trace", default=None)
+
+
+class CycleTrace:
+    """Span aggregates for one cycle: name -> [count, total_s, max_s, label of the slowest]."""
+
+    def __init__(self, cycle: Optional[int] = None):
+        self.cycle = cycle
+        self.started_at = datetime.now()
+        self.stages: Dict[str, list] = {}
+        self._start = time.perf_counter()
+        self.total = None
+
+    def add(self, name: str, seconds: float, label: Optional[str] = None) -> None:
+        stage = self.stages.get(name)
+        if stage is None:
+            self.stages[name] = [1, seconds, seconds, label]
+            return
+        stage[0] += 1
+        stage[1] += seconds
+        if seconds > stage[2]:
+            stage[2] = seconds
+            stage[3] = label
+
+    def finish(self) -> float:
+        if self.total is None:
+            self.total = time.perf_counter() - self._start
+        return self.total
+
+    def summary(self) -> Dict[str, dict]:
+        return {name: {"count": count, "total_ms": round(total * 1000, 3), "max_ms": round(slowest * 1000, 3),
+                       "max_label": label}
+                for name, (count, total, slowest, label) in self.stages.items()}
+
+    def slowest(self, n: int = 3) -> List[tuple]:
+        """(name, total_ms) of the n most expensive stages."""
+        ranked = sorted(self.stages.items(), key=lambda item: item[1][1], reverse=True)[:n]
+        return [(name, round(stage[1] * 1000, 1)) for name, stage in ranked]
+
+
+@contextmanager
+def tracing(trace: CycleTrace):
+    """Makes `trace` the target of span() for the enclosed code (and tasks it spawns)."""
+    token = _CURRENT.set(trace)
+    try:
+        yield trace
+    finally:
+        _CURRENT.reset(token)
+        trace.finish()
+
+
+@contextmanager
+def span(name: str, label: Optional[str] = None):
+    trace = _CURRENT.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, time.perf_counter() - start, label)
+
+
+def ensure_cycle_metrics(conn: sqlite3.Connection) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS cycle_metrics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            cycle INTEGER,
+            started_at TEXT NOT NULL,
+            total_ms REAL NOT NULL,
+            signals INTEGER DEFAULT 0,
+            sent INTEGER DEFAULT 0,
+            stages TEXT,
+            rss_mb REAL
+        )
+    """)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(cycle_metrics)")}
+    if "rss_mb" not in columns:
+        conn.execute("ALTER TABLE cycle_metrics ADD COLUMN rss_mb REAL")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_cycle_metrics_started ON cycle_metrics(started_at)")
+
+
+def record_cycle(db_path: str, trace: CycleTrace, signals: int = 0, sent: int = 0,
+                 rss_mb: Optional[float] = None) -> None:
+    """Stores the finished cycle (with the process RSS after it) and drops rows past the retention window."""
+    cutoff = (datetime.now() - timedelta(days=CYCLE_METRICS_RETENTION_DAYS)).isoformat()
+    with closing(connect_sqlite(db_path)) as conn:
+        ensure_cycle_metrics(conn)
+        conn.execute("INSERT INTO cycle_metrics (cycle, started_at, total_ms, signals, sent, stages, rss_mb) "
+                     "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                     (trace.cycle, trace.started_at.isoformat(), round(trace.finish() * 1000, 3),
+                      signals, sent, json.dumps(trace.summary()), rss_mb))
+        conn.execute("DELETE FROM cycle_metrics WHERE started_at < ?", (cutoff,))
+        conn.commit()
+
+
+def recent_cycles(db_path: str, limit: int = 20, hours: Optional[float] = None) -> List[dict]:
+    """Most recent cycles first, stages decoded. A database without the table has none."""
+    since = (datetime.now() - timedelta(hours=hours)).isoformat() if hours else ""
+    try:
+        with closing(connect_sqlite(db_path)) as conn:
+            # SELECT *: tables written before rss_mb existed are read as-is until the service migrates them
+            rows = conn.execute("SELECT * FROM cycle_metrics WHERE started_at >= ? ORDER BY started_at DESC LIMIT ?",
+                                (since, limit)).fetchall()
+    except sqlite3.OperationalError:
+        return []
+    return [{"cycle": row["cycle"], "started_at": row["started_at"], "total_ms": row["total_ms"],
+             "signals": row["signals"], "sent": row["sent"], "stages": json.loads(row["stages"] or "{}"),
+             "rss_mb": row["rss_mb"] if "rss_mb" in row.keys() else None}
+            for row in rows]
+
+
+def cycle_rollup(db_path: str, hours: float = 24) -> dict:
+    """
+    p50/p95 over the last `hours` of cycles: for the whole cycle and for each
+    stage's per-cycle total (a stage absent from a cycle counts as 0 ms).
+    """
+    cycles = recent_cycles(db_path, limit=100_000, hours=hours)
+    if not cycles:
+        return {"cycles": 0, "hours": hours, "total_ms": None, "stages": {}}
+
+    def pct(values) -> dict:
+        arr = np.asarray(values, dtype=float)
+        return {"p50": round(float(np.percentile(arr, 50)), 1), "p95": round(float(np.percentile(arr, 95)), 1),
+                "max": round(float(arr.max()), 1)}
+
+    rss = [c["rss_mb"] for c in reversed(cycles) if c["rss_mb"] is not None]
+    names = sorted({name for c in cycles for name in c["stages"]})
+    stages = {name: pct([c["stages"].get(name, {}).get("total_ms", 0.0) for c in cycles]) for name in names}
+    return {
+        "cycles": len(cycles),
+        "hours": hours,
+        "total_ms": pct([c["total_ms"] for c in cycles]),
+        # Service RSS after each cycle, oldest to latest in the window: flat unless something leaks
+        "rss_mb": {"first": rss[0], "last": rss[-1], "max": max(rss)} if rss else None,
+        # Heaviest stages first
+        "stages": dict(sorted(stages.items(), key=lambda item: item[1]["p95"], reverse=True)),
+    }
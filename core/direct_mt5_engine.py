@@ -23,8 +23,7 @@ class DirectMT5Engine:
         self.server = server
         self.paper_mode = paper_mode
         self.initialized = False
-        
-        logging.basicConfig(level=logging.INFO)
+        # Handlers are left to the entry point; basicConfig here reconfigured the whole process's root logger
         self.logger = logging.getLogger("DirectMT5")
 
     def connect(self) -> bool:
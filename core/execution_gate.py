@@ -1,8 +1,16 @@
 import sqlite3
 import math
+import re
 from datetime import datetime
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Optional
 from core.db_utils import connect_sqlite
+from core.metrics import REGISTRY
+
+if TYPE_CHECKING:
+    from core.correlation import RollingCorrelation
+
+LOCK_WAIT_SECONDS = REGISTRY.histogram("sqlite_lock_wait_seconds", "Time spent acquiring SQLite write locks",
+                                       ("site",), buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0))
 
 class ExecutionGate:
     """
@@ -12,9 +20,12 @@ class ExecutionGate:
 
     @staticmethod
     def validate(signal: Dict, db_signals: str, db_clients: str,
-                 table_name: str = 'signals', current_ts: Optional[datetime] = None) -> Dict[str, str]:
+                 table_name: str = 'signals', current_ts: Optional[datetime] = None,
+                 correlations: Optional["RollingCorrelation"] = None) -> Dict[str, str]:
         """
         Validates a signal against institutional risk and inventory rules.
+        correlations: return correlations for the exposure check; defaults to
+        the engine persisted in db_signals (backtests pass their point-in-time one).
         """
         try:
             # 1. Load Configuration
@@ -57,6 +68,10 @@ class ExecutionGate:
             # 4. Threshold Validation
             thresholds = ExecutionGate._get_thresholds(db_clients)
             min_quality = thresholds.get('MIN_EXECUTION_QUALITY', 5.0)
+            # Live signals carry their own symbol's regime threshold (RegimePanel); the
+            # configured value is the universe aggregate the panel last wrote
+            if signal.get('regime_threshold') is not None:
+                min_quality = float(signal['regime_threshold'])
             if quality < min_quality:
                 return {"status": "BLOCKED", "reason": f"INSUFFICIENT_QUALITY ({quality:.2f})"}
 
@@ -64,7 +79,8 @@ class ExecutionGate:
             if max_daily_loss is not None and ExecutionGate._daily_loss_breached(db_signals, max_daily_loss, current_ts):
                 return {"status": "BLOCKED", "reason": f"DAILY_LOSS_LIMIT_REACHED ({max_daily_loss:.2f}%)"}
 
-            exposure_block = ExecutionGate._exposure_limit_breached(signal, db_signals, table_name, thresholds, run_id)
+            exposure_block = ExecutionGate._exposure_limit_breached(signal, db_signals, table_name, thresholds, run_id,
+                                                                    correlations)
             if exposure_block:
                 return exposure_block
 
@@ -144,12 +160,13 @@ class ExecutionGate:
 
     @staticmethod
     def validate_and_reserve(signal: Dict, db_signals: str, db_clients: str,
-                             table_name: str = 'signals', current_ts: Optional[datetime] = None) -> Dict[str, str]:
+                             table_name: str = 'signals', current_ts: Optional[datetime] = None,
+                             correlations: Optional["RollingCorrelation"] = None) -> Dict[str, str]:
         """
         Atomically validates and reserves symbol inventory before execution.
         This closes the check-then-insert race when multiple workers see the same burst.
         """
-        gate = ExecutionGate.validate(signal, db_signals, db_clients, table_name, current_ts)
+        gate = ExecutionGate.validate(signal, db_signals, db_clients, table_name, current_ts, correlations)
         if gate.get("status") != "PASSED":
             return gate
 
@@ -170,7 +187,8 @@ class ExecutionGate:
                         updated_at TEXT
                     )
                 """)
-                conn.execute("BEGIN IMMEDIATE")
+                with LOCK_WAIT_SECONDS.time(site="trade_reservations"):
+                    conn.execute("BEGIN IMMEDIATE")
                 active = conn.execute("""
                     SELECT signal_uid, direction
                     FROM trade_reservations
@@ -313,6 +331,8 @@ class ExecutionGate:
                         thresholds["MIN_EXECUTION_QUALITY"] = float(row["value"])
                     elif key == "MAX_DAILY_LOSS_PCT":
                         thresholds["MAX_DAILY_LOSS_PCT"] = float(row["value"])
+                    elif key == "EXPOSURE_CORRELATION":
+                        thresholds["EXPOSURE_CORRELATION"] = float(row["value"])
                     elif key == "MAX_CORRELATED_EXPOSURE":
                         thresholds["MAX_CORRELATED_EXPOSURE"] = float(row["value"])
                     elif key == "MAX_CURRENCY_EXPOSURE":
@@ -327,7 +347,8 @@ class ExecutionGate:
 
     @staticmethod
     def _exposure_limit_breached(signal: Dict, db_path: str, table_name: str,
-                                 thresholds: Dict[str, float], run_id: Optional[int]) -> Optional[Dict[str, str]]:
+                                 thresholds: Dict[str, float], run_id: Optional[int],
+                                 correlations: Optional["RollingCorrelation"] = None) -> Optional[Dict[str, str]]:
         max_corr = int(thresholds.get("MAX_CORRELATED_EXPOSURE", 2) or 0)
         max_strategy = int(thresholds.get("MAX_STRATEGY_EXPOSURE", 3) or 0)
         max_session = int(thresholds.get("MAX_SESSION_EXPOSURE", 4) or 0)
@@ -348,8 +369,10 @@ class ExecutionGate:
                 session_col = "session" if "session" in col_names else "market_session"
                 run_id_clause = " AND run_id = ? " if run_id is not None and "run_id" in col_names else ""
 
+                direction_value = "direction" if "direction" in col_names else "''"
+
                 sql = f"""
-                    SELECT symbol,
+                    SELECT symbol, {direction_value} AS direction_value,
                            {strategy_col if strategy_col in col_names else "''"} AS strategy_value
                            {"," + session_col + " AS session_value" if has_session else ", '' AS session_value"}
                     FROM {table_name}
@@ -370,13 +393,18 @@ class ExecutionGate:
         except Exception:
             return None
 
-        if max_corr > 0 and groups:
-            correlated = 0
-            for row in rows:
-                if groups.intersection(ExecutionGate._exposure_groups(row["symbol"] or "")):
-                    correlated += 1
-            if correlated >= max_corr:
-                return {"status": "BLOCKED", "reason": f"CORRELATED_EXPOSURE_LIMIT ({','.join(sorted(groups))})"}
+        if max_corr > 0 and rows:
+            if correlations is None:
+                from core.correlation import RollingCorrelation
+                correlations = RollingCorrelation.for_db(db_path)
+            from core.correlation import CORRELATION_THRESHOLD
+            min_corr = float(thresholds.get("EXPOSURE_CORRELATION", CORRELATION_THRESHOLD))
+            direction = signal.get("direction", "")
+            correlated = [row["symbol"] for row in rows
+                          if ExecutionGate._moves_with(symbol, direction, groups, row["symbol"] or "",
+                                                       row["direction_value"] or "", correlations, min_corr)]
+            if len(correlated) >= max_corr:
+                return {"status": "BLOCKED", "reason": f"CORRELATED_EXPOSURE_LIMIT ({','.join(sorted(set(correlated)))})"}
 
         if max_strategy > 0 and strategy:
             strategy_count = sum(1 for row in rows if str(row["strategy_value"] or "") == str(strategy))
@@ -390,6 +418,22 @@ class ExecutionGate:
 
         return None
 
+    @staticmethod
+    def _moves_with(symbol: str, direction: str, groups: set, other: str, other_direction: str,
+                    correlations: "RollingCorrelation", min_corr: float) -> bool:
+        """
+        Whether an open position on `other` adds to the new signal's exposure:
+        measured return correlation when the pair has enough shared bars (signed
+        by the two directions when both are known), else a shared currency group.
+        """
+        rho = correlations.corr(symbol, other)
+        if rho is None:
+            return bool(groups.intersection(ExecutionGate._exposure_groups(other)))
+        sides = {"BUY": 1, "SELL": -1}
+        if direction in sides and other_direction in sides:
+            return rho * sides[direction] * sides[other_direction] >= min_corr
+        return abs(rho) >= min_corr
+
     @staticmethod
     def _exposure_groups(symbol: str) -> set[str]:
         raw = (symbol or "").upper()
@@ -425,6 +469,13 @@ class ExecutionGate:
         except Exception:
             return False
 
+    @staticmethod
+    def reason_code(reason: str) -> str:
+        """Bounded label for a gate reason: 'EXISTING_POSITION_IN_EURUSD=X' -> 'EXISTING_POSITION'."""
+        match = re.match(r"[A-Z_]+", reason or "")
+        code = match.group(0) if match else "UNKNOWN"
+        return re.sub(r"_IN_.*$", "", code).rstrip("_") or "UNKNOWN"
+
     @staticmethod
     def _signal_uid(signal: Dict) -> str:
         import hashlib
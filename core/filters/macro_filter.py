@@ -2,6 +2,9 @@ import pandas as pd
 from typing import Dict, Optional
 
 class MacroFilter:
+    # Only the 20 EMA of each macro series is read
+    REQUIRED_INDICATORS = {"DXY": ("ema_20",), "^TNX": ("ema_20",)}
+
     @staticmethod
     def get_macro_bias(market_context: Dict[str, pd.DataFrame]) -> Dict[str, str]:
         """
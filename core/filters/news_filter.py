@@ -1,9 +1,8 @@
 from config.config import NEWS_WASH_ZONE, NEWS_IMPACT_LEVELS
 from core.filters.news_sentiment import NewsSentimentAnalyzer
+from data.economic_calendar import CalendarIndex
 from datetime import datetime
 import pytz
-import logging
-import pandas as pd
 
 class NewsFilter:
     @staticmethod
@@ -15,43 +14,18 @@ class NewsFilter:
             return []
 
         now_utc = datetime.now(pytz.UTC)
-        s_clean = symbol.replace('=X', '')
-        currencies = [s_clean[:3], s_clean[3:]]
-        
+        index = CalendarIndex.for_events(news_events)
         active_events = []
-        
-        for event in news_events:
-            if event.get('country') not in currencies:
-                continue
-                
-            if event.get('impact') not in NEWS_IMPACT_LEVELS:
-                continue
-
-            # Event time format: "2026-01-04T12:00:00-05:00" or similar
-            # FF JSON usually has "date": "2026-01-04T12:00:00-05:00"
-            try:
-                event_time = pd.to_datetime(event.get('date')).to_pydatetime()
-                if event_time.tzinfo is None:
-                    event_time = pytz.UTC.localize(event_time)
-                else:
-                    event_time = event_time.astimezone(pytz.UTC)
-                
-                # Check if within wash zone
-                time_diff = abs((event_time - now_utc).total_seconds()) / 60
-                
-                if time_diff <= NEWS_WASH_ZONE:
-                    bias = NewsSentimentAnalyzer.get_bias(event)
-                    active_events.append({
-                        'title': event.get('title'),
-                        'impact': event.get('impact'),
-                        'time': event_time,
-                        'minutes_away': round((event_time - now_utc).total_seconds() / 60, 1),
-                        'bias': bias
-                    })
-            except Exception as e:
-                logging.error(f"Error parsing news tool time: {e}")
-                continue
-                
+        for event_time, event in index.events_near(NewsFilter._currencies(symbol), now_utc,
+                                                   NEWS_WASH_ZONE, NEWS_IMPACT_LEVELS):
+            bias = NewsSentimentAnalyzer.get_bias(event)
+            active_events.append({
+                'title': event.get('title'),
+                'impact': event.get('impact'),
+                'time': event_time,
+                'minutes_away': round((event_time - now_utc).total_seconds() / 60, 1),
+                'bias': bias
+            })
         return active_events
 
     @staticmethod
@@ -59,12 +33,17 @@ class NewsFilter:
         """
         Returns False if there is a high-impact event within the NEWS_WASH_ZONE.
         """
-        upcoming = NewsFilter.get_upcoming_events(news_events, symbol)
+        if not news_events or "High" not in NEWS_IMPACT_LEVELS:
+            return True
         # Block only if impact is "High" for complete safety
-        for event in upcoming:
-            if event['impact'] == "High":
-                return False
-        return True
+        index = CalendarIndex.for_events(news_events)
+        return not index.has_event_near(NewsFilter._currencies(symbol), datetime.now(pytz.UTC),
+                                        NEWS_WASH_ZONE, ("High",))
+
+    @staticmethod
+    def _currencies(symbol: str) -> list:
+        s_clean = symbol.replace('=X', '')
+        return [s_clean[:3], s_clean[3:]]
     
     @staticmethod
     def is_safe_to_trade(news_events: list, symbol: str) -> bool:
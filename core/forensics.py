@@ -0,0 +1,166 @@
+"""
+Signal Forensics Store
+======================
+The forensic replay data of a signal (the candles around the setup and the
+ICT events the strategy saw) lives in `signal_forensics`, one row per
+signal, instead of as JSON text in every `signals` row. Hot queries over
+`signals` (the tracker, /api/signals, the gate) no longer carry it; the
+detail endpoint and the forensic viewer load it by signal id.
+
+  - candles: numeric fields packed column by column as float64, the rest
+    (timestamps) as JSON, all zlib-compressed into one blob.
+  - events: compact JSON, zlib-compressed.
+  - event_tags: the sorted, de-duplicated event types ("BOS + SWEEP"), so
+    the forensic audit and AlphaCombiner group signals by combination
+    without decompressing anything.
+
+Rows written before the side table existed are moved over by
+migrate_inline() (admin_server runs it at startup).
+
+Usage:
+    store(conn, signal_id, candles, events)     # in the signal's INSERT transaction
+    load(conn, signal_id)                       # {"forensic_candles": [...], "forensic_events": [...]}
+"""
+
+import json
+import sqlite3
+import zlib
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+EMPTY = ("", "[]")
+MIGRATE_BATCH = 500
+
+
+def ensure_forensics_table(conn) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS signal_forensics (
+            signal_id INTEGER PRIMARY KEY,
+            candles BLOB,
+            events BLOB,
+            event_tags TEXT DEFAULT ''
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_signal_forensics_tags ON signal_forensics(event_tags)")
+
+
+def event_tags(events: Iterable[dict]) -> str:
+    """'BOS + SWEEP': sorted unique event types, the combination key of the forensic audit."""
+    return " + ".join(sorted({str(e.get("type")) for e in events or () if isinstance(e, dict) and e.get("type")}))
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def encode_candles(candles: List[dict]) -> Optional[bytes]:
+    """Column-packed candles: JSON header line, then each numeric column as float64."""
+    if not candles:
+        return None
+    if not all(isinstance(c, dict) for c in candles):
+        header, packed = {"json": candles}, b""
+    else:
+        fields = list(dict.fromkeys(k for c in candles for k in c))
+        numeric = [f for f in fields if all(_is_number(c.get(f)) for c in candles)]
+        values = array("d", (float(c[f]) for f in numeric for c in candles))
+        header = {
+            "rows": len(candles),
+            "fields": fields,
+            "numeric": numeric,
+            "ints": [f for f in numeric if all(isinstance(c[f], int) for c in candles)],
+            "other": {f: [c.get(f) for c in candles] for f in fields if f not in numeric},
+        }
+        packed = values.tobytes()
+    return zlib.compress(json.dumps(header, separators=(",", ":")).encode() + b"\n" + packed)
+
+
+def decode_candles(blob: Optional[bytes]) -> List[dict]:
+    if not blob:
+        return []
+    raw = zlib.decompress(blob)
+    head, _, packed = raw.partition(b"\n")
+    header = json.loads(head)
+    if "json" in header:
+        return header["json"]
+    rows, ints = header["rows"], set(header["ints"])
+    values = array("d")
+    values.frombytes(packed)
+    columns = {f: values[i * rows:(i + 1) * rows] for i, f in enumerate(header["numeric"])}
+    columns = {f: [int(v) for v in col] if f in ints else list(col) for f, col in columns.items()}
+    columns.update(header["other"])
+    return [{f: columns[f][r] for f in header["fields"]} for r in range(rows)]
+
+
+def encode_events(events: List[dict]) -> Optional[bytes]:
+    return zlib.compress(json.dumps(events, separators=(",", ":")).encode()) if events else None
+
+
+def decode_events(blob: Optional[bytes]) -> List[dict]:
+    return json.loads(zlib.decompress(blob)) if blob else []
+
+
+def store(conn, signal_id: int, candles: Optional[List[dict]], events: Optional[List[dict]]) -> None:
+    """Writes a signal's forensics (nothing when it has none). Does not commit."""
+    if not candles and not events:
+        return
+    ensure_forensics_table(conn)
+    conn.execute("INSERT OR REPLACE INTO signal_forensics (signal_id, candles, events, event_tags) VALUES (?, ?, ?, ?)",
+                 (signal_id, encode_candles(candles), encode_events(events), event_tags(events)))
+
+
+def load_many(conn, signal_ids: Iterable[int]) -> Dict[int, dict]:
+    """{signal_id: {"forensic_candles", "forensic_events"}} for the ids that have forensics."""
+    ids = list(signal_ids)
+    if not ids:
+        return {}
+    try:
+        rows = conn.execute(f"SELECT signal_id, candles, events FROM signal_forensics "
+                            f"WHERE signal_id IN ({', '.join('?' * len(ids))})", ids).fetchall()
+    except sqlite3.OperationalError:
+        return {}
+    return {row[0]: {"forensic_candles": decode_candles(row[1]), "forensic_events": decode_events(row[2])}
+            for row in rows}
+
+
+def load(conn, signal_id: int, row: Optional[dict] = None) -> dict:
+    """A signal's forensics; falls back to the JSON still inline in `row` (not yet migrated)."""
+    stored = load_many(conn, [signal_id]).get(signal_id)
+    if stored:
+        return stored
+    inline = {}
+    for field in ("forensic_candles", "forensic_events"):
+        try:
+            inline[field] = json.loads((row or {}).get(field) or "[]")
+        except (TypeError, ValueError):
+            inline[field] = []
+    return inline
+
+
+def migrate_inline(conn, batch: int = MIGRATE_BATCH) -> int:
+    """Moves JSON forensics still stored in `signals` rows to the side table. Returns rows moved."""
+    ensure_forensics_table(conn)
+    moved, last_id = 0, 0
+    while True:
+        try:
+            rows = conn.execute("""
+                SELECT id, forensic_candles, forensic_events FROM signals
+                WHERE id > ? AND (COALESCE(forensic_candles, '') NOT IN ('', '[]')
+                                  OR COALESCE(forensic_events, '') NOT IN ('', '[]'))
+                ORDER BY id LIMIT ?
+            """, (last_id, batch)).fetchall()
+        except sqlite3.OperationalError:
+            return moved     # no signals table / forensic columns
+        if not rows:
+            return moved
+        for signal_id, candles, events in rows:
+            last_id = signal_id
+            try:
+                candles = json.loads(candles) if candles not in (None, *EMPTY) else []
+                events = json.loads(events) if events not in (None, *EMPTY) else []
+            except (TypeError, ValueError):
+                continue     # unreadable: leave it where it is
+            store(conn, signal_id, candles, events)
+            conn.execute("UPDATE signals SET forensic_candles = '[]', forensic_events = '[]' WHERE id = ?",
+                         (signal_id,))
+            moved += 1
+        conn.commit()
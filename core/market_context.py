@@ -0,0 +1,199 @@
+"""
+Shared Market Context
+=====================
+DXY/TNX macro frames, the derived risk bias and this week's calendar, kept in
+one on-disk cache that every process reads:
+
+  - signal_service (app.generate_signals) reuses the macro frames while they
+    are fresh and refreshes them inline otherwise. It needs current data.
+  - admin_server serves the cached summary as-is (stale-while-revalidate).
+    A background refresher task, not the request, brings it up to date, so
+    /api/stats never touches the network.
+
+Frames live in a FrameCache (data.frame_cache). The summary (bias, news
+headline, calendar events, refreshed_at) is one JSON file, replaced
+atomically after the frames are written.
+
+pandas, the frame cache and the indicator stack load on first use, so the
+admin server can import this (and answer its first requests) without them.
+
+Usage:
+    context = MarketContext()
+    frames, news = await context.bundle(DXY_SYMBOL, TNX_SYMBOL, SYMBOLS)   # signal generation
+    context.summary()                    # cached dict, never fetches
+    context.start(DXY_SYMBOL, TNX_SYMBOL, SYMBOLS)   # background refresher (inside a running loop)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from data.frame_cache import FrameCache
+
+CONTEXT_DIR = "data/market_context"
+# H1 macro bias: same lifetime the dashboard cache used before
+CONTEXT_TTL = 900
+MACRO_PERIOD = "60d"
+DEFAULT_CONTEXT = {"DXY": "NEUTRAL", "TNX": "NEUTRAL", "RISK": "NEUTRAL", "NEWS": "NO NEWS"}
+
+
+class MarketContext:
+    """Disk-backed macro context shared by the signal service and the admin server."""
+
+    def __init__(self, root: Optional[str] = None, ttl: float = CONTEXT_TTL):
+        self.root = root or CONTEXT_DIR
+        self.ttl = ttl
+        self._frames: Optional[FrameCache] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def frames(self) -> FrameCache:
+        if self._frames is None:
+            from data.frame_cache import FrameCache
+            self._frames = FrameCache(os.path.join(self.root, "frames"), max_bytes=64 * 1024 ** 2)
+        return self._frames
+
+    # ── Readers (no network) ───────────────────────────────────────────────────
+
+    def summary(self) -> Optional[dict]:
+        """Last refresh: {"context", "news_events", "refreshed_at"}; None before the first one."""
+        try:
+            with open(self._summary_path(), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def context(self) -> dict:
+        """The dashboard view of the cached context (defaults before the first refresh)."""
+        summary = self.summary()
+        if summary is None:
+            return dict(DEFAULT_CONTEXT)
+        return {**summary["context"], "refreshed_at": summary["refreshed_at"]}
+
+    def age(self) -> Optional[float]:
+        summary = self.summary()
+        return None if summary is None else time.time() - summary["refreshed_at"]
+
+    def is_fresh(self) -> bool:
+        age = self.age()
+        return age is not None and age < self.ttl
+
+    def cached_bundle(self) -> Tuple[Dict[str, pd.DataFrame], List[dict]]:
+        """Cached macro frames ('DXY', '^TNX') and calendar events, however old."""
+        summary = self.summary() or {}
+        frames = {}
+        for key in summary.get("frames", ()):
+            df = self.frames.get(key)
+            if df is not None:
+                frames[key] = df
+        return frames, summary.get("news_events", [])
+
+    # ── Refresh ────────────────────────────────────────────────────────────────
+
+    async def bundle(self, dxy_symbol: str, tnx_symbol: str,
+                     symbols: List[str]) -> Tuple[Dict[str, pd.DataFrame], List[dict]]:
+        """
+        Macro frames and calendar events: the cache while fresh, otherwise a
+        refresh. A failed refresh falls back to whatever is cached.
+        """
+        if not self.is_fresh():
+            try:
+                await self.refresh(dxy_symbol, tnx_symbol, symbols)
+            except Exception as e:
+                print(f"⚠️ Market context refresh failed, using cached context: {e}")
+        return self.cached_bundle()
+
+    async def refresh(self, dxy_symbol: str, tnx_symbol: str, symbols: List[str]) -> dict:
+        """Downloads DXY/TNX and the calendar, recomputes the bias and rewrites the cache."""
+        # The first refresh pulls in the fetch/indicator stack; import it off the event loop
+        DataFetcher, NewsFetcher = await asyncio.to_thread(self._fetch_modules)
+
+        fetcher = DataFetcher()
+        dxy_data, tnx_data = await asyncio.gather(
+            fetcher.fetch_data_async(dxy_symbol, "1h", period=MACRO_PERIOD),
+            fetcher.fetch_data_async(tnx_symbol, "1h", period=MACRO_PERIOD),
+        )
+        news_events = await NewsFetcher.fetch_news_async()
+        context, frames = await asyncio.to_thread(self._build, dxy_data, tnx_data, news_events, symbols)
+        if not frames:
+            # Keep the previous context rather than caching an outage for a whole TTL
+            raise RuntimeError(f"no macro data for {dxy_symbol} / {tnx_symbol}")
+
+        for key, df in frames.items():
+            self.frames.put(key, df)
+        summary = {"context": context, "news_events": news_events, "frames": sorted(frames),
+                   "refreshed_at": time.time()}
+        os.makedirs(self.root, exist_ok=True)
+        tmp = f"{self._summary_path()}.tmp-{os.getpid()}"
+        with open(tmp, "w") as f:
+            json.dump(summary, f, default=str)
+        os.replace(tmp, self._summary_path())
+        return summary
+
+    @staticmethod
+    def _fetch_modules():
+        from data.fetcher import DataFetcher
+        from data.news_fetcher import NewsFetcher
+        return DataFetcher, NewsFetcher
+
+    @staticmethod
+    def _build(dxy_data: Optional[pd.DataFrame], tnx_data: Optional[pd.DataFrame], news_events: List[dict],
+               symbols: List[str]) -> Tuple[dict, Dict[str, pd.DataFrame]]:
+        """CPU part of a refresh (indicators, bias, news headline); runs off the event loop."""
+        from core.filters.macro_filter import MacroFilter
+        from data.news_fetcher import NewsFetcher
+        from indicators.calculations import IndicatorCalculator
+
+        frames = {}
+        if dxy_data is not None and not dxy_data.empty:
+            frames['DXY'] = IndicatorCalculator.add_indicators(
+                dxy_data, "1h", columns=MacroFilter.REQUIRED_INDICATORS['DXY'])
+        if tnx_data is not None and not tnx_data.empty:
+            frames['^TNX'] = IndicatorCalculator.add_indicators(
+                tnx_data, "1h", columns=MacroFilter.REQUIRED_INDICATORS['^TNX'])
+
+        context = dict(DEFAULT_CONTEXT)
+        context.update(MacroFilter.get_macro_bias(frames))
+        relevant = NewsFetcher.filter_relevant_news(news_events, symbols)
+        high_impact = [e.get('title') for e in relevant if e.get('impact') == 'High']
+        if high_impact:
+            context['NEWS'] = f"{len(high_impact)} HIGH IMPACT EVENTS"
+        return context, frames
+
+    # ── Background refresher ───────────────────────────────────────────────────
+
+    def start(self, dxy_symbol: str, tnx_symbol: str, symbols: List[str]) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_forever(dxy_symbol, tnx_symbol, symbols))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _refresh_forever(self, dxy_symbol: str, tnx_symbol: str, symbols: List[str]) -> None:
+        while True:
+            age = self.age()
+            # Another process (signal_service) may have refreshed in the meantime
+            if age is None or age >= self.ttl:
+                try:
+                    await self.refresh(dxy_symbol, tnx_symbol, symbols)
+                    age = 0.0
+                except Exception as e:
+                    print(f"⚠️ Market context refresh failed: {e}")
+                    age = self.ttl - 60   # retry in a minute
+            await asyncio.sleep(max(5.0, self.ttl - (age or 0.0)))
+
+    def _summary_path(self) -> str:
+        return os.path.join(self.root, "context.json")
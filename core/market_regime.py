@@ -8,11 +8,26 @@ Based on backtested thresholds:
 - ADX > 25 → TRENDING  → Quality threshold = 5.0 (normal)
 - ADX 20-25 → MIXED    → Quality threshold = 6.5 (moderate filter)
 - ADX < 20 → RANGING   → Quality threshold = 8.0 (strict filter)
+
+RegimePanel classifies the whole universe in one pass: each symbol's H1
+bars are right-aligned (latest closed bar last) into a bars x symbols
+matrix, and ADX, ATR ratio and EMA spread come out as one array per
+measure. The signal cycle builds it once from the bars it already fetched;
+strategies read their symbol's regime from it and the aggregate sets the
+global quality threshold.
+
+Usage:
+    panel = RegimePanel.build({"EURUSD=X": h1_eur, "GBPUSD=X": h1_gbp})
+    panel.get("EURUSD=X")["regime"]       # 'TRENDING_BULL' | ... (detect_regime's dict)
+    panel.aggregate["quality_threshold"]  # universe-wide, for apply_regime_filter
 """
 
 import numpy as np
+import pandas as pd
 import sqlite3
+from collections import Counter
 from datetime import datetime
+from typing import Dict, Optional
 from core.db_utils import connect_sqlite, write_audit_event
 
 # --- REGIME THRESHOLDS ---
@@ -20,11 +35,24 @@ ADX_TRENDING  = 25.0   # Strong trend
 ADX_MIXED     = 20.0   # Transitioning
 ADX_RANGING   = 20.0   # Choppy / sideways
 
+# Indicator columns detect_regime reads from the H1 frame
+REQUIRED_INDICATORS = ("atr", "ema_20", "ema_200")
+
 # Quality scores per regime
 QUALITY_TRENDING = 5.0
 QUALITY_MIXED    = 6.5
 QUALITY_RANGING  = 8.0
 
+REGIME_THRESHOLDS = {
+    "TRENDING_BULL": QUALITY_TRENDING,
+    "TRENDING_BEAR": QUALITY_TRENDING,
+    "VOLATILE_RANGE": QUALITY_MIXED,
+    "LOW_VOL_RANGE": QUALITY_RANGING,
+}
+# Key under which generate_signals hands the cycle's panel to strategies in market_context
+PANEL_CONTEXT_KEY = "regime_panel"
+ADX_PERIOD = 14
+
 
 def _calc_adx(df, period=14) -> float:
     """Calculate Average Directional Index (ADX) from H1 OHLC data."""
@@ -73,12 +101,161 @@ def _calc_adx(df, period=14) -> float:
         return 20.0  # Neutral fallback
 
 
+def _wilder(values: np.ndarray, first: np.ndarray, period: int) -> np.ndarray:
+    """
+    Wilder smoothing down each column of a bars x symbols matrix: seeded with the
+    mean of the column's first `period` values (from row `first`), then
+    s[t] = s[t-1] * (p-1)/p + v[t] / p. Rows before the seed are NaN.
+    """
+    rows, cols = values.shape
+    seed_row = first + period - 1
+    seeded = np.full_like(values, np.nan)
+    has_seed = seed_row < rows
+    after = np.arange(rows)[:, None] > np.where(has_seed, seed_row, rows)[None, :]
+    seeded[after] = values[after]
+    sums = np.nancumsum(values, axis=0)
+    idx = np.flatnonzero(has_seed)
+    before = np.where(first[idx] > 0, sums[np.maximum(first[idx] - 1, 0), idx], 0.0)
+    seeded[seed_row[idx], idx] = (sums[seed_row[idx], idx] - before) / period
+    return pd.DataFrame(seeded).ewm(alpha=1 / period, adjust=False).mean().to_numpy()
+
+
+def _panel_adx(high: np.ndarray, low: np.ndarray, close: np.ndarray, first: np.ndarray,
+               period: int = ADX_PERIOD) -> np.ndarray:
+    """Latest ADX per column of right-aligned (NaN-padded) OHLC matrices; _calc_adx for many symbols at once."""
+    prev_high, prev_low, prev_close = (np.vstack([np.full((1, m.shape[1]), np.nan), m[:-1]])
+                                       for m in (high, low, close))
+    tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    tr[np.isnan(prev_close)] = np.nan
+    up, down = high - prev_high, prev_low - low
+    valid = ~np.isnan(tr)
+    dm_plus = np.where(valid, np.where(up > down, np.maximum(up, 0.0), 0.0), np.nan)
+    dm_minus = np.where(valid, np.where(down > up, np.maximum(down, 0.0), 0.0), np.nan)
+
+    atr = _wilder(tr, first + 1, period)
+    pdm = _wilder(dm_plus, first + 1, period)
+    mdm = _wilder(dm_minus, first + 1, period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        di_plus = np.where(atr > 0, 100 * pdm / atr, np.where(np.isnan(atr), np.nan, 0.0))
+        di_minus = np.where(atr > 0, 100 * mdm / atr, np.where(np.isnan(atr), np.nan, 0.0))
+        di_sum = di_plus + di_minus
+        dx = np.where(di_sum > 0, 100 * np.abs(di_plus - di_minus) / di_sum, np.where(np.isnan(di_sum), np.nan, 0.0))
+    adx = _wilder(dx, first + period, period)[-1]
+    return np.where(np.isnan(adx), 20.0, np.round(adx, 2))
+
+
+class RegimePanel:
+    """Per-symbol and aggregate regimes of a universe, computed together from aligned H1 arrays."""
+
+    def __init__(self, symbols, adx, vol_ratio, spread, enough, detail_period: int = 50):
+        self.symbols = list(symbols)
+        self.adx = np.asarray(adx, dtype=float)
+        self.vol_ratio = np.asarray(vol_ratio, dtype=float)
+        self.spread = np.asarray(spread, dtype=float)
+        self.enough = np.asarray(enough, dtype=bool)
+        self.period = detail_period
+        trending = self.adx > ADX_TRENDING
+        self.regimes = np.select(
+            [~self.enough, trending & (self.spread > 0.005), trending & (self.spread < -0.005), trending,
+             self.vol_ratio > 1.2],
+            ["LOW_VOL_RANGE", "TRENDING_BULL", "TRENDING_BEAR", "VOLATILE_RANGE", "VOLATILE_RANGE"],
+            default="LOW_VOL_RANGE",
+        )
+        self.thresholds = np.array([REGIME_THRESHOLDS[r] if ok else QUALITY_MIXED
+                                    for r, ok in zip(self.regimes, self.enough)], dtype=float)
+        self._index = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+    @classmethod
+    def build(cls, h1_map: Dict[str, "pd.DataFrame"], period: int = 50) -> "RegimePanel":
+        """Classifies every symbol of {symbol: h1_df}; frames shorter than `period` get the neutral result."""
+        symbols = list(h1_map)
+        lengths = np.array([0 if h1_map[s] is None else len(h1_map[s]) for s in symbols], dtype=int)
+        enough = lengths >= period
+        adx = np.full(len(symbols), 20.0)
+        vol_ratio = np.ones(len(symbols))
+        spread = np.zeros(len(symbols))
+        used = [i for i in range(len(symbols)) if enough[i]]
+        if used:
+            rows = int(lengths[used].max())
+            columns = {name: np.full((rows, len(used)), np.nan) for name in ("high", "low", "close", "atr")}
+            for col, i in enumerate(used):
+                df = h1_map[symbols[i]]
+                for name in columns:
+                    source = name if name in df.columns else name.capitalize()
+                    if source in df.columns:
+                        columns[name][rows - lengths[i]:, col] = df[source].to_numpy(dtype=float)
+                last = df.iloc[-1]
+                ema_long = last.get('ema_200', 0) or last.get('ema_trend', 0)
+                close = last.get('close', 1.0)
+                spread[i] = (last.get('ema_20', 0) - ema_long) / close if close != 0 else 0
+            first = rows - lengths[used]
+            # H1 frames lacking OHLC columns get the neutral ADX, as _calc_adx's fallback did
+            adx[used] = _panel_adx(columns["high"], columns["low"], columns["close"], first)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                atr_avg = np.nanmean(columns["atr"][-period:], axis=0)
+                ratio = columns["atr"][-1] / atr_avg
+            vol_ratio[used] = np.where((atr_avg != 0) & ~np.isnan(atr_avg), ratio, 1.0)
+        return cls(symbols, adx, vol_ratio, spread, enough, period)
+
+    def __contains__(self, symbol) -> bool:
+        return symbol in self._index
+
+    def get(self, symbol: str) -> Optional[dict]:
+        """detect_regime's result for one symbol, or None when it is not in the panel."""
+        i = self._index.get(symbol)
+        if i is None:
+            return None
+        return self._result(self.regimes[i], self.adx[i], self.vol_ratio[i], self.spread[i], self.enough[i])
+
+    def threshold(self, symbol: str) -> Optional[float]:
+        i = self._index.get(symbol)
+        return None if i is None else float(self.thresholds[i])
+
+    @property
+    def aggregate(self) -> dict:
+        """
+        The universe's regime: the most common per-symbol regime (ties go to the
+        stricter threshold), with median ADX / vol ratio and the regime breadth.
+        """
+        if not self.enough.any():
+            result = self._result("LOW_VOL_RANGE", 20.0, 1.0, 0.0, False)
+            if not self.symbols:
+                result['quality_threshold'] = QUALITY_TRENDING
+            return {**result, 'symbols': len(self.symbols), 'breadth': {}}
+        regimes = self.regimes[self.enough]
+        breadth = Counter(str(r) for r in regimes)
+        regime = max(breadth, key=lambda r: (breadth[r], REGIME_THRESHOLDS[r]))
+        adx = round(float(np.median(self.adx[self.enough])), 2)
+        vol_ratio = float(np.median(self.vol_ratio[self.enough]))
+        spread = float(np.median(self.spread[self.enough]))
+        result = self._result(regime, adx, vol_ratio, spread, True)
+        result['detail'] += f" ({breadth[regime]}/{len(regimes)} symbols)"
+        return {**result, 'symbols': len(self.symbols), 'breadth': dict(breadth)}
+
+    def _result(self, regime, adx, vol_ratio, spread, enough) -> dict:
+        if not enough:
+            return {
+                'regime': 'LOW_VOL_RANGE', 'adx': 20.0, 'vol_ratio': 1.0,
+                'quality_threshold': QUALITY_MIXED,
+                'detail': 'Insufficient data for regime calculation'
+            }
+        regime = str(regime)
+        return {
+            'regime': regime,
+            'adx': float(adx),
+            'vol_ratio': round(float(vol_ratio), 2),
+            'quality_threshold': REGIME_THRESHOLDS.get(regime, QUALITY_MIXED),
+            'detail': f"ADX={adx:.1f} | VolRatio={vol_ratio:.2f} | Spread={spread:.4f} → Regime: {regime}"
+        }
+
+
 def detect_regime(data_source, period=50) -> dict:
     """
     Improved 4-Cluster Regime Detector (V35.0)
     
     Args:
-        data_source: Either {symbol: h1_df} dict OR a single pd.DataFrame.
+        data_source: Either {symbol: h1_df} dict (the universe's aggregate
+            regime, see RegimePanel) OR a single pd.DataFrame.
         period: Lookback for ATR/Trend averaging.
 
     Returns:
@@ -89,80 +266,9 @@ def detect_regime(data_source, period=50) -> dict:
             'quality_threshold': float
         }
     """
-    # 1. Normalize input to a single dataframe for local or first in map for global
     if isinstance(data_source, dict):
-        if not data_source:
-            return {
-                'regime': 'LOW_VOL_RANGE', # Neutral fallback
-                'adx': 20.0,
-                'vol_ratio': 1.0,
-                'quality_threshold': 5.0
-            }
-        # Global: Process first symbol as proxy or potentially average (Simplified for Phase A)
-        symbol = list(data_source.keys())[0]
-        df = data_source[symbol]
-    else:
-        df = data_source
-
-    if df is None or len(df) < period:
-        return {
-            'regime': 'LOW_VOL_RANGE', 'adx': 20.0, 'vol_ratio': 1.0, 
-            'quality_threshold': QUALITY_MIXED,
-            'detail': 'Insufficient data for regime calculation'
-        }
-
-    last = df.iloc[-1]
-    
-    # 1. Trend Strength (ADX)
-    adx = _calc_adx(df)
-    
-    # 2. Volatility (ATR Ratio)
-    atr_now = last.get('atr', 0)
-    atr_avg = df['atr'].tail(period).mean()
-    vol_ratio = atr_now / atr_avg if (atr_avg and atr_avg != 0) else 1.0
-    
-    # 3. Directional Spread (Normalized EMA Distance)
-    # Using EMA20 vs EMA200 for long-term trend orientation
-    ema_short = last.get('ema_20', 0)
-    ema_long = last.get('ema_200', 0) or last.get('ema_trend', 0)
-    close = last.get('close', 1.0)
-    spread = (ema_short - ema_long) / close if close != 0 else 0
-    
-    # --- Clustering Logic ---
-    # Thresholds: ADX > 25 for trend, ATR_Ratio > 1.2 for volatile
-    if adx > 25:
-        if spread > 0.005: 
-            regime = "TRENDING_BULL"
-        elif spread < -0.005: 
-            regime = "TRENDING_BEAR"
-        else:
-            regime = "VOLATILE_RANGE"  # Strong ADX but no clear EMA spread = Volatile
-    elif vol_ratio > 1.2:
-        regime = "VOLATILE_RANGE"
-    else:
-        regime = "LOW_VOL_RANGE"
-
-    # Map thresholds to the new clusters
-    thresholds = {
-        "TRENDING_BULL": QUALITY_TRENDING,
-        "TRENDING_BEAR": QUALITY_TRENDING,
-        "VOLATILE_RANGE": QUALITY_MIXED,
-        "LOW_VOL_RANGE": QUALITY_RANGING
-    }
-    
-    threshold = thresholds.get(regime, QUALITY_MIXED)
-    adx_str = f"ADX={adx:.1f}"
-    vol_str = f"VolRatio={vol_ratio:.2f}"
-    spread_str = f"Spread={spread:.4f}"
-    detail = f"{adx_str} | {vol_str} | {spread_str} → Regime: {regime}"
-
-    return {
-        'regime': regime,
-        'adx': adx,
-        'vol_ratio': round(vol_ratio, 2),
-        'quality_threshold': threshold,
-        'detail': detail
-    }
+        return RegimePanel.build(data_source, period).aggregate
+    return RegimePanel.build({None: data_source}, period).get(None)
 
 
 def apply_regime_filter(regime_result: dict, db_clients_path: str):
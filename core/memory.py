@@ -0,0 +1,179 @@
+"""
+Memory Budgets
+==============
+Keeps the long-running services' memory flat instead of leaving it to
+memory_guard's restart-everything fallback.
+
+  - Each service has a budget (MEMORY_BUDGETS_MB). MemoryWatch.sample()
+    reads the process RSS into the `process_resident_memory_bytes` gauge,
+    which MetricsPusher refreshes before every push (so /metrics carries
+    RSS over time per service) and SignalService after every cycle (also
+    stored per cycle in cycle_metrics.rss_mb). memory_guard restarts only
+    the services whose last pushed RSS is over budget.
+  - Leak hunting: with MEMORY_TRACE=1 in a service's environment (or on
+    demand in admin_server) tracemalloc runs and diff() lists the source
+    lines whose allocations grew since the baseline snapshot. Traced
+    services publish their top growth with each metrics push; admin_server
+    serves all of it on GET /api/debug/memory.
+  - BoundedDict is the drop-in for module/class level caches: an insertion
+    ordered dict that forgets its oldest entries beyond `maxsize`.
+
+Usage:
+    watch = MemoryWatch("signal_service")
+    watch.sample()                  # {"service", "rss_mb", "budget_mb", "over_budget"}
+    watch.start_tracing()           # baseline snapshot
+    watch.diff(top=10)              # [{"where", "size_kb", "size_diff_kb", "count_diff"}, ...]
+    _fired_today = BoundedDict(maxsize=512)
+"""
+
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+from contextlib import closing
+from typing import Dict, List, Optional
+
+from core.db_utils import connect_sqlite
+from core.metrics import REGISTRY
+
+# Steady-state RSS each service is expected to stay under
+MEMORY_BUDGETS_MB = {
+    "signal_service": 400,
+    "signal_tracker": 250,
+    "interactive_bot": 250,
+    "admin_server": 300,
+}
+DEFAULT_BUDGET_MB = 300
+TRACE_ENV = "MEMORY_TRACE"
+TRACE_FRAMES = 1
+TRACE_TOP = 15
+
+RSS_BYTES = REGISTRY.gauge("process_resident_memory_bytes", "Resident set size of the process")
+BUDGET_BYTES = REGISTRY.gauge("process_memory_budget_bytes", "Memory budget of the service")
+
+
+def rss_bytes() -> int:
+    """Current resident set size; peak RSS where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class BoundedDict(OrderedDict):
+    """Insertion-ordered dict that drops its oldest entries beyond `maxsize` (re-setting a key renews it)."""
+
+    def __init__(self, *args, maxsize: int = 1024, **kwargs):
+        self.maxsize = maxsize
+        super().__init__(*args, **kwargs)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
+
+    def copy(self):
+        return type(self)(self, maxsize=self.maxsize)
+
+
+class MemoryWatch:
+    """RSS against a service's budget, plus tracemalloc growth since a baseline."""
+
+    def __init__(self, service: str, budget_mb: Optional[float] = None):
+        self.service = service
+        self.budget_mb = budget_mb or MEMORY_BUDGETS_MB.get(service, DEFAULT_BUDGET_MB)
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._over_budget = False
+        if os.getenv(TRACE_ENV, "").lower() in ("1", "true", "yes"):
+            self.start_tracing()
+
+    def sample(self) -> dict:
+        rss = rss_bytes()
+        RSS_BYTES.set(rss)
+        BUDGET_BYTES.set(self.budget_mb * 1024 ** 2)
+        over = rss > self.budget_mb * 1024 ** 2
+        if over and not self._over_budget:
+            print(f"⚠️ {self.service} over its memory budget: {rss / 1024 ** 2:.0f}MB > {self.budget_mb}MB")
+        self._over_budget = over
+        return {"service": self.service, "rss_mb": round(rss / 1024 ** 2, 1), "budget_mb": self.budget_mb,
+                "over_budget": over}
+
+    @property
+    def tracing(self) -> bool:
+        return self._baseline is not None and tracemalloc.is_tracing()
+
+    def start_tracing(self, frames: int = TRACE_FRAMES) -> None:
+        """Starts tracemalloc if needed and takes the baseline later diffs compare with."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self._baseline = tracemalloc.take_snapshot()
+
+    def stop_tracing(self) -> None:
+        self._baseline = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def diff(self, top: int = TRACE_TOP, reset: bool = False) -> List[dict]:
+        """Source lines with the largest allocation growth since the baseline (or the last reset)."""
+        if not self.tracing:
+            return []
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+        stats = snapshot.compare_to(self._baseline, "lineno")
+        if reset:
+            self._baseline = snapshot
+        return [{"where": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                 "size_kb": round(stat.size / 1024, 1), "size_diff_kb": round(stat.size_diff / 1024, 1),
+                 "count_diff": stat.count_diff}
+                for stat in stats[:top] if stat.size_diff > 0]
+
+    def publish(self, db_path: Optional[str] = None, sample: Optional[dict] = None, top: int = TRACE_TOP) -> None:
+        """Stores RSS and (when tracing) the top growth for GET /api/debug/memory."""
+        from core import metrics
+        db_path = db_path or metrics.METRICS_DB
+        sample = sample or self.sample()
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with closing(connect_sqlite(db_path)) as conn:
+            ensure_memory_table(conn)
+            conn.execute("INSERT OR REPLACE INTO service_memory (service, pid, taken_at, rss_mb, budget_mb, growth) "
+                         "VALUES (?, ?, ?, ?, ?, ?)",
+                         (self.service, os.getpid(), time.time(), sample["rss_mb"], self.budget_mb,
+                          json.dumps(self.diff(top)) if self.tracing else None))
+            conn.commit()
+
+
+def ensure_memory_table(conn) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS service_memory (
+            service TEXT PRIMARY KEY,
+            pid INTEGER,
+            taken_at REAL NOT NULL,
+            rss_mb REAL,
+            budget_mb REAL,
+            growth TEXT
+        )
+    """)
+
+
+def read_published(db_path: Optional[str] = None) -> Dict[str, dict]:
+    """{service: {"pid", "taken_at", "rss_mb", "budget_mb", "over_budget", "growth"}} from the metrics DB."""
+    from core import metrics
+    db_path = db_path or metrics.METRICS_DB
+    if not os.path.exists(db_path):
+        return {}
+    with closing(connect_sqlite(db_path)) as conn:
+        ensure_memory_table(conn)
+        rows = conn.execute("SELECT service, pid, taken_at, rss_mb, budget_mb, growth FROM service_memory").fetchall()
+    return {row["service"]: {"pid": row["pid"], "taken_at": row["taken_at"], "rss_mb": row["rss_mb"],
+                             "budget_mb": row["budget_mb"], "over_budget": row["rss_mb"] > row["budget_mb"],
+                             "growth": json.loads(row["growth"]) if row["growth"] else None}
+            for row in rows}
@@ -0,0 +1,350 @@
+"""
+Service Metrics
+===============
+In-process counters, gauges and fixed-bucket histograms, exposed in the
+Prometheus text format.
+
+Only admin_server speaks HTTP, so every service pushes a snapshot of its
+registry to the shared `service_metrics` table (monitoring/metrics.db) every
+METRICS_PUSH_INTERVAL seconds:
+
+  - GET /metrics on admin_server renders its own registry plus every pushed
+    snapshot, each series labelled with service="...".
+  - The push time doubles as a heartbeat: the watchdog and alert service
+    read it instead of grepping `ps aux` / asking systemctl.
+  - Each push also refreshes the process RSS against the service's memory
+    budget (core.memory).
+
+Metrics are declared once, at import time, next to the code that updates
+them; the registry returns the existing metric when a name is re-declared.
+
+Usage:
+    FETCH_FAILURES = REGISTRY.counter("data_fetch_failures_total", "Fetches returning no data", ("timeframe",))
+    FETCH_FAILURES.inc(timeframe="5m")
+    with TELEGRAM_SECONDS.time(kind="text"):
+        await bot.send_message(...)
+
+    pusher = MetricsPusher("signal_service"); pusher.start()   # inside the service's event loop
+    python -m core.metrics                                      # print everything pushed
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from core.db_utils import connect_sqlite
+
+METRICS_DB = "monitoring/metrics.db"
+METRICS_PUSH_INTERVAL = 30
+# Seconds: 5 ms .. 2 min covers SQLite waits, Telegram sends and yfinance downloads
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str], lock: threading.Lock):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = lock
+        self._series: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def value(self, **labels):
+        return self._series.get(self._key(labels))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            series = [[list(key), value] for key, value in self._series.items()]
+        return {"type": self.kind, "help": self.help, "labels": list(self.labels), "series": series}
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._series[self._key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Fixed upper bounds; each series keeps per-bucket counts, sum and count."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str], lock: threading.Lock,
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels, lock)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+                    break
+            series["sum"] += value
+            series["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            series = [[list(key), {"counts": list(v["counts"]), "sum": v["sum"], "count": v["count"]}]
+                      for key, v in self._series.items()]
+        return {"type": self.kind, "help": self.help, "labels": list(self.labels),
+                "buckets": list(self.buckets), "series": series}
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._declare(Counter, name, help, labels)
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._declare(Gauge, name, help, labels)
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._declare(Histogram, name, help, labels, buckets=buckets)
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {name: metric.snapshot() for name, metric in sorted(self._metrics.items())}
+
+    def render(self, labels: Optional[dict] = None) -> str:
+        return render_snapshot(self.snapshot(), labels)
+
+    def push(self, service: str, db_path: Optional[str] = None) -> None:
+        """Stores this process's snapshot as `service`'s current metrics (also its heartbeat)."""
+        db_path = db_path or METRICS_DB
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with closing(connect_sqlite(db_path)) as conn:
+            ensure_metrics_table(conn)
+            conn.execute("INSERT OR REPLACE INTO service_metrics (service, pid, pushed_at, snapshot) "
+                         "VALUES (?, ?, ?, ?)", (service, os.getpid(), time.time(), json.dumps(self.snapshot())))
+            conn.commit()
+
+    def _declare(self, cls, name, help, labels, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labels, self._lock, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"metric {name} already registered as a {metric.kind}")
+            return metric
+
+
+REGISTRY = MetricsRegistry()
+REGISTRY.gauge("process_start_time_seconds", "Unix time the process started").set(time.time())
+
+
+def ensure_metrics_table(conn: sqlite3.Connection) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS service_metrics (
+            service TEXT PRIMARY KEY,
+            pid INTEGER,
+            pushed_at REAL NOT NULL,
+            snapshot TEXT NOT NULL
+        )
+    """)
+
+
+def read_pushed(db_path: Optional[str] = None) -> Dict[str, dict]:
+    """{service: {"pid", "pushed_at", "age_seconds", "snapshot"}}; empty without a metrics DB."""
+    db_path = db_path or METRICS_DB
+    if not os.path.exists(db_path):
+        return {}
+    try:
+        with closing(connect_sqlite(db_path)) as conn:
+            rows = conn.execute("SELECT service, pid, pushed_at, snapshot FROM service_metrics").fetchall()
+    except sqlite3.OperationalError:
+        return {}
+    now = time.time()
+    return {row["service"]: {"pid": row["pid"], "pushed_at": row["pushed_at"],
+                             "age_seconds": now - row["pushed_at"], "snapshot": json.loads(row["snapshot"])}
+            for row in rows}
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: Optional[dict] = None) -> str:
+    pairs = list((extra or {}).items()) + list(zip(names, values))
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _number(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def render_snapshot(snapshot: Dict[str, dict], labels: Optional[dict] = None,
+                    header: bool = True) -> str:
+    """Prometheus text exposition (format 0.0.4) of a registry snapshot."""
+    lines: List[str] = []
+    for name, metric in snapshot.items():
+        if header:
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+        for values, value in metric["series"]:
+            if metric["type"] != "histogram":
+                lines.append(f"{name}{_labels(metric['labels'], values, labels)} {_number(value)}")
+                continue
+            series_labels = dict(labels or {}, **dict(zip(metric["labels"], values)))
+            cumulative = 0
+            for bound, count in zip(metric["buckets"], value["counts"]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels((), (), dict(series_labels, le=_number(bound)))} {cumulative}")
+            # Observations above the last bound only show up in +Inf
+            lines.append(f"{name}_bucket{_labels((), (), dict(series_labels, le='+Inf'))} {value['count']}")
+            lines.append(f"{name}_sum{_labels(metric['labels'], values, labels)} {_number(value['sum'])}")
+            lines.append(f"{name}_count{_labels(metric['labels'], values, labels)} {value['count']}")
+    return "\n".join(lines) + ("\n" if lines else "")
+
+
+def render_all(local_service: Optional[str] = None, db_path: Optional[str] = None) -> str:
+    """
+    Every pushed snapshot (plus this process's live registry as `local_service`),
+    merged so each metric name gets one HELP/TYPE header.
+    """
+    pushed = read_pushed(db_path)
+    snapshots = {service: entry["snapshot"] for service, entry in pushed.items()}
+    if local_service:
+        snapshots[local_service] = REGISTRY.snapshot()
+
+    merged: Dict[str, Dict[str, dict]] = {}
+    for service, snapshot in sorted(snapshots.items()):
+        for name, metric in snapshot.items():
+            merged.setdefault(name, {})[service] = metric
+    lines = []
+    for name, by_service in sorted(merged.items()):
+        first = next(iter(by_service.values()))
+        lines.append(f"# HELP {name} {first['help']}\n# TYPE {name} {first['type']}\n")
+        for service, metric in by_service.items():
+            lines.append(render_snapshot({name: metric}, {"service": service}, header=False))
+    heartbeat = ["# HELP service_last_push_seconds Unix time of each service's last metrics push",
+                 "# TYPE service_last_push_seconds gauge"]
+    for service, entry in sorted(pushed.items()):
+        heartbeat.append(f'service_last_push_seconds{{service="{service}"}} {entry["pushed_at"]:.3f}')
+    return "".join(lines) + "\n".join(heartbeat) + "\n"
+
+
+def histogram_quantile(metric: dict, q: float, **labels) -> Optional[float]:
+    """Upper bucket bound holding the q-quantile of a snapshot histogram (summed over unmatched labels)."""
+    counts, total = [0] * len(metric["buckets"]), 0
+    for values, value in metric["series"]:
+        series_labels = dict(zip(metric["labels"], values))
+        if all(series_labels.get(k) == str(v) for k, v in labels.items()):
+            counts = [a + b for a, b in zip(counts, value["counts"])]
+            total += value["count"]
+    if total == 0:
+        return None
+    seen = 0
+    for bound, count in zip(metric["buckets"], counts):
+        seen += count
+        if seen >= q * total:
+            return bound
+    return float("inf")
+
+
+def counter_total(metric: Optional[dict], **labels) -> float:
+    """Sum of a snapshot counter (or a histogram's observation count) over matching series."""
+    if not metric:
+        return 0.0
+    total = 0.0
+    for values, value in metric["series"]:
+        series_labels = dict(zip(metric["labels"], values))
+        if all(series_labels.get(k) == str(v) for k, v in labels.items()):
+            total += value["count"] if metric["type"] == "histogram" else value
+    return total
+
+
+class MetricsPusher:
+    """Background task pushing REGISTRY for one service every `interval` seconds."""
+
+    def __init__(self, service: str, interval: float = METRICS_PUSH_INTERVAL, db_path: Optional[str] = None,
+                 memory=None):
+        self.service = service
+        self.interval = interval
+        self.db_path = db_path
+        self._task: Optional[asyncio.Task] = None
+        # RSS (and tracemalloc growth when traced) goes out with every push (core.memory)
+        if memory is None:
+            from core.memory import MemoryWatch
+            memory = MemoryWatch(service)
+        self.memory = memory
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.push()   # final state
+
+    async def push(self) -> None:
+        try:
+            await asyncio.to_thread(self._push)
+        except Exception as e:
+            print(f"⚠️ Metrics push failed for {self.service}: {e}")
+
+    def _push(self) -> None:
+        sample = self.memory.sample()
+        REGISTRY.push(self.service, self.db_path)
+        self.memory.publish(self.db_path, sample)
+
+    async def _run(self) -> None:
+        while True:
+            await self.push()
+            await asyncio.sleep(self.interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print pushed service metrics (Prometheus text format)")
+    parser.add_argument("--db", default=METRICS_DB, help="Shared metrics database")
+    args = parser.parse_args()
+    print(render_all(db_path=args.db), end="")
@@ -0,0 +1,443 @@
+"""
+Market Replay
+=============
+Runs the live pipeline offline over recorded bars, as fast as the code allows,
+for deterministic load tests and latency profiling without market hours.
+
+  - ReplayFeed serves a BarStore (data.dukascopy_import) through
+    DataFetcher's "replay" provider: only bars already closed at the
+    simulated clock, over the same lookback periods the live fetches ask for.
+  - SimulatedClock stands in for datetime.now()/utcnow() in the modules that
+    make time decisions (market hours, sessions, dedup windows, gate
+    reservations, settlement timestamps). Time only moves when the service
+    waits, so a cycle costs its real CPU/IO time and nothing else.
+  - ReplayService is the real SignalService (regime detection, generation,
+    gate, DB logging, broadcast, execution) whose waits advance the clock
+    and run the ReplayTracker (the real SignalTracker settling against
+    recorded prices) every TRACKING_INTERVAL of simulated time.
+  - Telegram and MT5 are stub sinks that count what would have been sent.
+  - The process RSS is sampled after every cycle (memory_trend), which is
+    what the soak test (benchmarks.soak) checks for flatness.
+
+Everything is written to scratch databases under the work directory; the
+configured signals/clients/metrics DBs are never touched. The macro context
+(DXY/TNX) is rebuilt from the store when it holds those symbols; calendar
+events are not replayed.
+
+Usage:
+    python -m core.replay --start 2024-03-04 --end 2024-03-09 --symbols EURUSD=X,GBPUSD=X
+    python -m core.replay --start 2024-03-04 --end 2024-03-05 --store data/bar_store --clients 200 --json replay.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import ExitStack, closing, redirect_stdout
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from config.manager import config_manager
+from core.memory import rss_bytes
+from data.bar_store import BarStore
+from data.dukascopy_loader import DukascopyLoader
+from signal_service import SignalService
+from signal_tracker import TRACKING_INTERVAL, SignalTracker
+
+BAR_STORE_DIR = "data/bar_store"
+# Modules whose `datetime` is swapped for the simulated clock
+CLOCK_MODULES = (
+    "signal_service", "signal_tracker", "core.execution_gate", "core.market_status", "core.market_regime",
+    "core.filters.session_filter", "core.filters.news_filter", "strategies.crt_strategy",
+)
+REPLAY_ADMIN_CHAT = "replay-admin"
+DEFAULT_CLIENTS = 25
+# Bar lengths behind DataFetcher._drop_incomplete_bar's timeframes
+BAR_LENGTHS = {"1min": "1min", "5min": "5min", "15min": "15min", "30min": "30min", "1h": "1h", "4h": "4h", "1D": "1D"}
+
+# init_db.py / admin_server.ensure_db_schema essentials; SignalService adds the rest
+SIGNALS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS signals (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        symbol TEXT, direction TEXT, entry_price REAL,
+        sl REAL DEFAULT 0.0, tp0 REAL DEFAULT 0.0, tp1 REAL DEFAULT 0.0, tp2 REAL DEFAULT 0.0,
+        reasoning TEXT, timeframe TEXT, confidence REAL DEFAULT 0.0, timestamp TEXT,
+        status TEXT DEFAULT 'OPEN', strategy TEXT, result_price REAL, result_pips REAL,
+        trade_type TEXT DEFAULT 'INSTITUTIONAL', quality_score REAL DEFAULT 0.0,
+        regime TEXT DEFAULT 'UNKNOWN', expected_hold TEXT DEFAULT 'UNKNOWN',
+        risk_details TEXT DEFAULT '{}', score_details TEXT DEFAULT '{}',
+        forensic_candles TEXT DEFAULT '[]', forensic_events TEXT DEFAULT '[]',
+        gate_status TEXT DEFAULT 'PASSED', gate_reason TEXT DEFAULT 'PASSED'
+    );
+    CREATE TABLE IF NOT EXISTS paper_account (
+        id INTEGER PRIMARY KEY DEFAULT 1,
+        balance REAL DEFAULT 100000.0, equity REAL DEFAULT 100000.0, last_daily_reset_date TEXT
+    );
+    INSERT OR IGNORE INTO paper_account (id, balance, equity) VALUES (1, 100000.0, 100000.0);
+"""
+CLIENTS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS system_config (key TEXT PRIMARY KEY, value TEXT, type TEXT DEFAULT 'string', updated_at TEXT);
+    CREATE TABLE IF NOT EXISTS weight_overrides (event_type TEXT PRIMARY KEY, multiplier REAL DEFAULT 1.0, is_active INTEGER DEFAULT 1);
+"""
+SYSTEM_CONFIG = [
+    ("MIN_QUALITY_SCORE", "7.0", "float"), ("MIN_EXECUTION_QUALITY", "5.0", "float"),
+    ("MAX_CORRELATED_EXPOSURE", "2", "int"), ("MAX_STRATEGY_EXPOSURE", "3", "int"),
+    ("MAX_SESSION_EXPOSURE", "4", "int"), ("system_status", "ACTIVE", "string"),
+]
+
+
+class SimulatedClock:
+    """Naive-UTC wall clock that only moves when told to."""
+
+    def __init__(self, start):
+        self._now = pd.Timestamp(start).tz_localize(None).to_pydatetime()
+
+    def now(self) -> datetime:
+        return self._now
+
+    def set(self, when: datetime) -> None:
+        self._now = when
+
+    def advance(self, seconds: float) -> None:
+        self._now += timedelta(seconds=seconds)
+
+    def datetime_class(self):
+        """A datetime subclass whose now()/utcnow() read this clock (patched into CLOCK_MODULES)."""
+        clock = self
+
+        class ReplayDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                now = clock.now()
+                if tz is not None:
+                    now = now.replace(tzinfo=timezone.utc).astimezone(tz)
+                return cls.combine(now.date(), now.timetz())
+
+            @classmethod
+            def utcnow(cls):
+                return cls.combine(clock.now().date(), clock.now().time())
+
+        return ReplayDatetime
+
+
+class ReplayFeed:
+    """Bars from a BarStore as the live fetches would have returned them at the simulated clock."""
+
+    def __init__(self, store: BarStore, clock: SimulatedClock):
+        self.store = store
+        self.clock = clock
+        # (symbol, rule) -> full series; sliced per request, read from disk once
+        self._series: Dict[Tuple[str, str], Optional[pd.DataFrame]] = {}
+
+    def bars(self, symbol: str, timeframe: str, period: str) -> Optional[pd.DataFrame]:
+        rule = DukascopyLoader.TIMEFRAME_RESAMPLE.get(timeframe, timeframe)
+        df = self._load(symbol, rule)
+        if df is None:
+            return None
+        now = pd.Timestamp(self.clock.now(), tz="UTC")
+        # Closed bars only: a bar stamped t is complete at t + its length
+        hi = int(df.index.searchsorted(now - pd.Timedelta(BAR_LENGTHS.get(rule, rule)), side="right"))
+        lo = int(df.index.searchsorted(now - self._period(period), side="left"))
+        if hi <= lo:
+            return None
+        return df.iloc[lo:hi].copy()
+
+    def latest(self, symbol: str) -> Optional[Tuple[pd.Timestamp, float]]:
+        """(bar time, close) of the last closed M1 bar, or M5 when the store has no M1."""
+        for timeframe in ("1min", "5min"):
+            df = self.bars(symbol, timeframe, "1d")
+            if df is not None and not df.empty:
+                return df.index[-1], float(df["close"].iloc[-1])
+        return None
+
+    def _load(self, symbol: str, rule: str) -> Optional[pd.DataFrame]:
+        key = (symbol, rule)
+        if key not in self._series:
+            self._series[key] = self.store.read(symbol, rule) if self.store.has(symbol, rule) else None
+        return self._series[key]
+
+    @staticmethod
+    def _period(period: str) -> pd.Timedelta:
+        """yfinance lookback ("5d", "3mo", "1y") as calendar time."""
+        period = str(period).lower()
+        if period.endswith("mo"):
+            return pd.Timedelta(days=30 * int(period[:-2]))
+        if period.endswith("y"):
+            return pd.Timedelta(days=365 * int(period[:-1]))
+        return pd.Timedelta(period)
+
+
+class ReplayMarketContext:
+    """MarketContext.bundle over the feed; rebuilt once its simulated age passes the TTL."""
+
+    def __init__(self, feed: ReplayFeed):
+        from core.market_context import CONTEXT_TTL
+        self.feed = feed
+        self.ttl = timedelta(seconds=CONTEXT_TTL)
+        self._built_at: Optional[datetime] = None
+        self._frames: Dict[str, pd.DataFrame] = {}
+
+    async def bundle(self, dxy_symbol: str, tnx_symbol: str, symbols: List[str]):
+        from core.market_context import MACRO_PERIOD, MarketContext
+        now = self.feed.clock.now()
+        if self._built_at is None or now - self._built_at >= self.ttl:
+            dxy = self.feed.bars(dxy_symbol, "1h", MACRO_PERIOD)
+            tnx = self.feed.bars(tnx_symbol, "1h", MACRO_PERIOD)
+            _, self._frames = MarketContext._build(dxy, tnx, [], symbols)
+            self._built_at = now
+        return self._frames, []
+
+
+class RecordingBot:
+    """Telegram Bot stand-in: counts messages instead of sending them."""
+
+    def __init__(self):
+        self.messages = 0
+        self.chats = set()
+
+    async def send_message(self, chat_id, text, parse_mode=None, **kwargs):
+        self.messages += 1
+        self.chats.add(str(chat_id))
+
+
+class RecordingExecutor:
+    """TradeExecutor stand-in: every gate-passed signal is a paper fill."""
+
+    def __init__(self):
+        self.trades = 0
+
+    async def execute_trade(self, signal: dict) -> dict:
+        self.trades += 1
+        return {"status": "paper", "ticket": self.trades}
+
+
+class ReplayTracker(SignalTracker):
+    """The live tracker, pricing open signals from the feed and writing to the replay DB."""
+
+    def __init__(self, feed: ReplayFeed, db_path: str):
+        super().__init__()
+        self.feed = feed
+        self.db_path = db_path
+
+    def get_db_connection(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _fetch_latest_price(self, symbol: str):
+        latest = self.feed.latest(symbol)
+        if latest is None:
+            return None
+        self.price_times[symbol], price = latest
+        return price
+
+
+class ReplayService(SignalService):
+    """SignalService whose waits advance the simulated clock and drive the tracker."""
+
+    def __init__(self, clock: SimulatedClock, end: datetime, tracker: ReplayTracker):
+        super().__init__()
+        self.clock = clock
+        self.end = end
+        self.tracker = tracker
+        self.track_every = timedelta(seconds=TRACKING_INTERVAL)
+        self.next_track = clock.now() + self.track_every
+        self.cycle_ms: List[float] = []
+        self.rss_mb: List[float] = []
+        self.generated = 0
+        self.sent = 0
+        # Stub Telegram sink; the admin chat skips the subscription check like the live primary chat
+        self.telegram.bot = RecordingBot()
+        self.telegram.chat_id = REPLAY_ADMIN_CHAT
+        self.telegram.all_chat_ids = [REPLAY_ADMIN_CHAT]
+
+    async def run_cycle(self):
+        start = time.perf_counter()
+        total, sent = await super().run_cycle()
+        self.cycle_ms.append((time.perf_counter() - start) * 1000)
+        self.rss_mb.append(rss_bytes() / 1024 ** 2)
+        self.generated += total
+        self.sent += sent
+        return total, sent
+
+    async def _wait(self, seconds: float):
+        target = self.clock.now() + timedelta(seconds=seconds)
+        while self.next_track <= target:
+            self.clock.set(self.next_track)
+            await self.tracker.track_once()
+            self.next_track += self.track_every
+        self.clock.set(target)
+        if target >= self.end:
+            self.running = False
+        await asyncio.sleep(0)
+
+
+def prepare_databases(workdir: str, clients: int = DEFAULT_CLIENTS) -> Tuple[str, str]:
+    """Scratch (signals_db, clients_db) with gate thresholds and `clients` subscribed stub clients."""
+    from core.client_manager import ClientManager
+    os.makedirs(workdir, exist_ok=True)
+    signals_db, clients_db = os.path.join(workdir, "signals.db"), os.path.join(workdir, "clients.db")
+    with closing(sqlite3.connect(signals_db)) as conn:
+        conn.executescript(SIGNALS_SCHEMA)
+    with closing(sqlite3.connect(clients_db)) as conn:
+        conn.executescript(CLIENTS_SCHEMA)
+        conn.executemany("INSERT OR REPLACE INTO system_config (key, value, type) VALUES (?, ?, ?)", SYSTEM_CONFIG)
+        conn.commit()
+    manager = ClientManager(clients_db)
+    balances = (100.0, 500.0, 1_000.0, 10_000.0)
+    for i in range(clients):
+        chat_id = str(900_000 + i)
+        manager.register_client(chat_id, balances[i % len(balances)], risk_percent=1.0 + i % 3 * 0.5)
+        manager.update_subscription(chat_id, days=3650)
+    return signals_db, clients_db
+
+
+def memory_trend(rss_mb: List[float], warmup: float = 0.1) -> dict:
+    """
+    RSS over a run's cycles. The first `warmup` fraction (imports, caches
+    filling) is excluded; growth compares the medians of the first and last
+    tenth of the rest, slope is a least-squares fit per 1k cycles.
+    """
+    if not rss_mb:
+        return {"start_mb": None, "end_mb": None, "peak_mb": None, "growth_mb": None, "slope_mb_per_1k": None}
+    steady = np.asarray(rss_mb[int(len(rss_mb) * warmup):] or rss_mb)
+    tenth = max(1, len(steady) // 10)
+    slope = np.polyfit(np.arange(len(steady)), steady, 1)[0] * 1000 if len(steady) > 1 else 0.0
+    return {
+        "start_mb": round(float(rss_mb[0]), 1),
+        "end_mb": round(float(rss_mb[-1]), 1),
+        "peak_mb": round(float(max(rss_mb)), 1),
+        "growth_mb": round(float(np.median(steady[-tenth:]) - np.median(steady[:tenth])), 1),
+        "slope_mb_per_1k": round(float(slope), 2),
+    }
+
+
+def _db_counts(signals_db: str, column: str) -> Dict[str, int]:
+    with closing(sqlite3.connect(signals_db)) as conn:
+        try:
+            rows = conn.execute(f"SELECT {column}, COUNT(*) FROM signals WHERE {column} IS NOT NULL "
+                                f"GROUP BY {column}").fetchall()
+        except sqlite3.OperationalError:
+            return {}
+    return {str(key): count for key, count in rows}
+
+
+async def replay(start: str, end: str, symbols: List[str], store: BarStore, workdir: str,
+                 clients: int = DEFAULT_CLIENTS, auto_trade: bool = True) -> dict:
+    """
+    Replays [start, end) through ReplayService and returns its throughput report.
+    Must run on the main thread (SignalService installs signal handlers).
+    """
+    from core.cycle_trace import cycle_rollup
+    from data.fetcher import DataFetcher
+
+    clock = SimulatedClock(start)
+    end_at = pd.Timestamp(end).tz_localize(None).to_pydatetime()
+    feed = ReplayFeed(store, clock)
+    signals_db, clients_db = prepare_databases(os.path.join(workdir, "db"), clients)
+    executor = RecordingExecutor()
+
+    with ExitStack() as stack:
+        for key, value in (("db_signals", signals_db), ("db_clients", clients_db), ("data_provider", "replay"),
+                           ("symbols", list(symbols)), ("mt5_auto_trade", auto_trade), ("multi_client_mode", True)):
+            config_manager.set_runtime_override(key, value)
+        stack.callback(config_manager.clear_runtime_overrides)
+        DataFetcher.set_replay_feed(feed)
+        stack.callback(DataFetcher.set_replay_feed, None)
+
+        replay_datetime = clock.datetime_class()
+        for module in CLOCK_MODULES:
+            stack.enter_context(mock.patch(f"{module}.datetime", replay_datetime))
+        stack.enter_context(mock.patch("app.generate_signals.MarketContext", lambda: ReplayMarketContext(feed)))
+        stack.enter_context(mock.patch("core.trade_executor._executor", executor))
+        # Keep replay heartbeats away from the watchdog's view of the live services
+        stack.enter_context(mock.patch("core.metrics.METRICS_DB", os.path.join(workdir, "metrics.db")))
+        # Each run starts from a clean pattern dedup (it is keyed by bar date)
+        stack.enter_context(mock.patch.dict("strategies.advanced_pattern_strategy.AdvancedPatternStrategy._fired_today",
+                                            clear=True))
+
+        service = ReplayService(clock, end_at, ReplayTracker(feed, signals_db))
+        wall_start = time.perf_counter()
+        await service.run()
+        wall = time.perf_counter() - wall_start
+
+    simulated_days = (end_at - pd.Timestamp(start).tz_localize(None).to_pydatetime()).total_seconds() / 86400
+    cycle_ms = np.asarray(service.cycle_ms or [0.0])
+    return {
+        "start": str(start),
+        "end": str(end),
+        "symbols": list(symbols),
+        "simulated_days": round(simulated_days, 3),
+        "cycles": len(service.cycle_ms),
+        "wall_seconds": round(wall, 3),
+        "cycles_per_second": round(len(service.cycle_ms) / wall, 2) if wall else None,
+        "simulated_days_per_hour": round(simulated_days / wall * 3600, 1) if wall else None,
+        "cycle_ms": {"p50": round(float(np.percentile(cycle_ms, 50)), 1),
+                     "p95": round(float(np.percentile(cycle_ms, 95)), 1),
+                     "max": round(float(cycle_ms.max()), 1)},
+        "signals_generated": service.generated,
+        "signals_sent": service.sent,
+        "gate": _db_counts(signals_db, "gate_status"),
+        "outcomes": _db_counts(signals_db, "outcome"),
+        "memory": memory_trend(service.rss_mb),
+        "rss_mb": [round(v, 1) for v in service.rss_mb],
+        "telegram_messages": service.telegram.bot.messages,
+        "trades": executor.trades,
+        "stages": cycle_rollup(signals_db, hours=24)["stages"],
+        "signals_db": signals_db,
+    }
+
+
+def print_report(report: dict) -> None:
+    print("=" * 70)
+    print(f"🎞️  MARKET REPLAY  {report['start']} → {report['end']}  ({', '.join(report['symbols'])})")
+    print("=" * 70)
+    print(f"Simulated: {report['simulated_days']} days in {report['wall_seconds']}s wall "
+          f"({report['simulated_days_per_hour']} sim-days/hour)")
+    print(f"Cycles: {report['cycles']} ({report['cycles_per_second']}/s)  "
+          f"p50 {report['cycle_ms']['p50']}ms  p95 {report['cycle_ms']['p95']}ms  max {report['cycle_ms']['max']}ms")
+    print(f"Signals: {report['signals_generated']} generated, {report['signals_sent']} sent  gate {report['gate']}")
+    print(f"Sinks: {report['telegram_messages']} Telegram messages, {report['trades']} trades  "
+          f"settled {report['outcomes']}")
+    memory = report["memory"]
+    print(f"RSS: {memory['start_mb']} → {memory['end_mb']}MB (peak {memory['peak_mb']}MB, "
+          f"steady-state growth {memory['growth_mb']}MB, {memory['slope_mb_per_1k']}MB/1k cycles)")
+    print("Heaviest stages (p95 ms per cycle):")
+    for name, stats in list(report["stages"].items())[:6]:
+        print(f"  {name:<24} p50 {stats['p50']:>8}  p95 {stats['p95']:>8}")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded bars through the live signal pipeline")
+    parser.add_argument("--start", required=True, help="Simulated start (UTC date or timestamp)")
+    parser.add_argument("--end", required=True, help="Simulated end (exclusive)")
+    parser.add_argument("--symbols", type=str, default=None, help="Comma-separated symbols (default: all in the store)")
+    parser.add_argument("--store", type=str, default=BAR_STORE_DIR, help="BarStore root (data.dukascopy_import)")
+    parser.add_argument("--clients", type=int, default=DEFAULT_CLIENTS, help="Stub clients receiving broadcasts")
+    parser.add_argument("--no-trade", action="store_true", help="Skip the stub MT5 execution path")
+    parser.add_argument("--workdir", type=str, default=None, help="Scratch directory (default: a new temp dir)")
+    parser.add_argument("--verbose", action="store_true", help="Show the service's own cycle output")
+    parser.add_argument("--json", type=str, default=None, help="Optional path to write the report")
+    args = parser.parse_args()
+
+    bar_store = BarStore(args.store)
+    symbols = args.symbols.split(",") if args.symbols else bar_store.symbols()
+    if not symbols:
+        sys.exit(f"❌ No symbols in {args.store}; import bars first (python -m data.dukascopy_import)")
+    workdir = args.workdir or tempfile.mkdtemp(prefix="replay_")
+    with open(os.devnull, "w") as devnull, (ExitStack() if args.verbose else redirect_stdout(devnull)):
+        result = asyncio.run(replay(args.start, args.end, symbols, bar_store, workdir,
+                                    clients=args.clients, auto_trade=not args.no_trade))
+    print_report(result)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2, default=str)
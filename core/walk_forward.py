@@ -0,0 +1,334 @@
+"""
+Walk-Forward Optimization Harness
+=================================
+Tunes strategy parameters (CRTStrategy.TOXIC_HOURS, the ATR range bounds,
+target boosts, MIN_QUALITY_SCORE, ...) on rolling in-sample windows and
+measures each choice on the out-of-sample window that follows it.
+
+    |---- IS 1 ----|- OOS 1 -|
+              |---- IS 2 ----|- OOS 2 -|
+                        |---- IS 3 ----|- OOS 3 -|
+
+Cost model:
+  - Data loading and indicator computation happen ONCE for the whole range
+    (BacktestEngine._fetch_all_symbol_data). Indicators are causal, so each
+    window simply reads its slice of the shared frames.
+  - Per-bar snapshot boundaries (H1/D1/M15 positions of every entry bar) are
+    computed once and shared by every grid point.
+  - Each grid point makes ONE signal pass over the full timeline. Strategies
+    only see data up to the bar, so a trade is the same whichever window
+    includes it; windows are then pure bookkeeping on the trade list.
+  So runtime ≈ grid size × one signal pass, with grid points spread across a
+  process pool (data is shipped once per worker).
+
+Trades are exited with BacktestEngine's friction model and scored in R.
+The ExecutionGate is not applied: it keeps state in the backtest DB, which
+cannot be shared across parallel grid points.
+
+Usage:
+    python -m core.walk_forward --start 2024-01-01 --end 2024-12-31 --is-days 90 --oos-days 30
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from config.config import SYMBOLS
+from core.backtest_engine import BacktestEngine
+from strategies.crt_strategy import CRTStrategy
+
+DEFAULT_GRID = {
+    "RANGE_ATR_MIN": [0.3, 0.4, 0.5],
+    "RANGE_ATR_MAX": [2.0, 2.5, 3.0],
+    "TARGET_BOOST_LOW_VOL": [1.4, 1.8],
+    "MIN_QUALITY_SCORE": [6.0, 7.0, 8.0],
+}
+
+OBJECTIVES = ("expectancy", "net_r", "profit_factor", "sharpe")
+
+# Entry bars skipped at the start of the history (matches BacktestEngine.run)
+WARMUP_BARS = 100
+
+# Worker-process globals, filled once per worker by _init_worker
+_WORKER_DATA: Dict[str, Dict[str, pd.DataFrame]] = {}
+_WORKER_BARS: List[tuple] = []
+
+
+def expand_grid(grid: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """{"A": [1, 2], "B": [3]} → [{"A": 1, "B": 3}, {"A": 2, "B": 3}]"""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def score_trades(r: np.ndarray, objective: str = "expectancy", min_trades: int = 20) -> float:
+    """Objective value of a set of trade R-multiples; -inf below min_trades."""
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective '{objective}' (expected one of {OBJECTIVES})")
+    r = np.asarray(r, dtype=np.float64)
+    if len(r) < max(1, min_trades):
+        return float("-inf")
+    if objective == "expectancy":
+        return float(r.mean())
+    if objective == "net_r":
+        return float(r.sum())
+    if objective == "profit_factor":
+        losses = -r[r < 0].sum()
+        return float(r[r > 0].sum() / losses) if losses > 0 else float("inf")
+    # sharpe (per-trade, scaled by sqrt(trades))
+    std = r.std(ddof=1) if len(r) > 1 else 0.0
+    return float(r.mean() / std * np.sqrt(len(r))) if std > 0 else 0.0
+
+
+class WalkForwardOptimizer:
+    """
+    Rolling in-sample/out-of-sample parameter selection on cached frames.
+
+    Usage:
+        wf = WalkForwardOptimizer("2024-01-01", "2024-12-31", grid={"RANGE_ATR_MAX": [2.0, 2.5]})
+        report = await wf.run()
+        report["windows"]   # best params + IS/OOS scores per window
+        report["equity"]    # stitched out-of-sample cumulative R
+    """
+
+    def __init__(
+        self,
+        start_date: str,
+        end_date: str,
+        strategy_cls: type = CRTStrategy,
+        grid: Optional[Dict[str, Sequence[Any]]] = None,
+        in_sample_days: int = 90,
+        out_of_sample_days: int = 30,
+        objective: str = "expectancy",
+        min_trades: int = 20,
+        symbols: List[str] = SYMBOLS,
+        workers: Optional[int] = None,
+        engine: Optional[BacktestEngine] = None,
+    ):
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Unknown objective '{objective}' (expected one of {OBJECTIVES})")
+        self.start_date = start_date
+        self.end_date = end_date
+        self.strategy_cls = strategy_cls
+        self.param_sets = expand_grid(grid if grid is not None else DEFAULT_GRID)
+        for params in self.param_sets:
+            strategy_cls().with_params(**params)   # fail fast on unknown names
+        self.in_sample_days = in_sample_days
+        self.out_of_sample_days = out_of_sample_days
+        self.objective = objective
+        self.min_trades = min_trades
+        self.symbols = symbols
+        self.workers = workers or os.cpu_count() or 1
+        self.engine = engine
+
+    # ── Public API ─────────────────────────────────────────────────────────────
+
+    async def run(self, data: Optional[Dict[str, Dict[str, pd.DataFrame]]] = None) -> Dict[str, Any]:
+        """
+        Loads data once (unless `data` is given in BacktestEngine's processed
+        format), evaluates the grid and returns:
+            windows: DataFrame, one row per window with the chosen params
+            trades:  DataFrame of stitched out-of-sample trades
+            equity:  Series of cumulative out-of-sample R
+            summary: dict of stitched OOS metrics
+        """
+        if data is None:
+            engine = self.engine or BacktestEngine(self.start_date, self.end_date, self.symbols)
+            data = await engine._fetch_all_symbol_data([self.strategy_cls()])
+        if not data:
+            return {"error": "Insufficient data available for this range."}
+
+        windows = self.windows()
+        if not windows:
+            return {"error": "Range shorter than one in-sample + out-of-sample window."}
+
+        bars = entry_bars(data, self.start_date, self.end_date)
+        print(f"🔁 Walk-forward: {len(self.param_sets)} param sets × {len(windows)} windows, "
+              f"{len(bars):,} entry bars, {min(self.workers, len(self.param_sets))} workers")
+        trades = await self.evaluate_grid(data, bars)
+        return self.select(trades, windows)
+
+    def windows(self) -> List[tuple]:
+        """(is_start, oos_start, oos_end) UTC timestamps, rolled forward by one OOS length."""
+        start = pd.Timestamp(self.start_date, tz="UTC")
+        end = pd.Timestamp(self.end_date, tz="UTC") + pd.Timedelta(days=1)
+        is_len = pd.Timedelta(days=self.in_sample_days)
+        oos_len = pd.Timedelta(days=self.out_of_sample_days)
+        result = []
+        while start + is_len < end:
+            oos_start = start + is_len
+            result.append((start, oos_start, min(oos_start + oos_len, end)))
+            start += oos_len
+        return result
+
+    async def evaluate_grid(self, data: Dict[str, Dict[str, pd.DataFrame]], bars: List[tuple]) -> List[pd.DataFrame]:
+        """One signal pass per param set; returns a trade frame per param set."""
+        if self.workers <= 1 or len(self.param_sets) == 1:
+            return [await _signal_pass(self.strategy_cls().with_params(**params), data, bars)
+                    for params in self.param_sets]
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(self.param_sets)),
+                                 initializer=_init_worker, initargs=(data, bars)) as pool:
+            return list(await asyncio.gather(*(
+                loop.run_in_executor(pool, _evaluate_params, (self.strategy_cls, params))
+                for params in self.param_sets
+            )))
+
+    def select(self, trades: List[pd.DataFrame], windows: List[tuple]) -> Dict[str, Any]:
+        """
+        Picks the best param set per in-sample window and stitches its OOS trades.
+        A window where no param set reaches min_trades in-sample has no optimum:
+        it is reported with valid=False and empty params, and trades nothing OOS.
+        """
+        rows, stitched = [], []
+        for is_start, oos_start, oos_end in windows:
+            is_scores = [
+                score_trades(t.loc[(t["timestamp"] >= is_start) & (t["timestamp"] < oos_start), "r"],
+                             self.objective, self.min_trades)
+                for t in trades
+            ]
+            window = {"is_start": is_start, "oos_start": oos_start, "oos_end": oos_end}
+            if np.isneginf(is_scores).all():
+                rows.append({**window, "valid": False, **dict.fromkeys(self.param_sets[0]),
+                             "is_score": None, "is_trades": 0, "oos_score": None, "oos_trades": 0, "oos_net_r": 0.0})
+                continue
+            best = int(np.argmax(is_scores))
+            chosen = trades[best]
+            is_trades = chosen[(chosen["timestamp"] >= is_start) & (chosen["timestamp"] < oos_start)]
+            oos = chosen[(chosen["timestamp"] >= oos_start) & (chosen["timestamp"] < oos_end)]
+            stitched.append(oos.assign(window=len(rows)))
+            rows.append({
+                **window, "valid": True,
+                **self.param_sets[best],
+                "is_score": is_scores[best], "is_trades": len(is_trades),
+                "oos_score": score_trades(oos["r"], self.objective, min_trades=1),
+                "oos_trades": len(oos), "oos_net_r": float(oos["r"].sum()),
+            })
+
+        if not stitched:
+            stitched = [trades[0].iloc[:0].assign(window=pd.Series(dtype=int))]
+        oos_trades = pd.concat(stitched, ignore_index=True).sort_values("timestamp", ignore_index=True)
+        equity = pd.Series(oos_trades["r"].cumsum().to_numpy(), index=pd.DatetimeIndex(oos_trades["timestamp"]),
+                           name="oos_equity_r")
+        r = oos_trades["r"].to_numpy()
+        drawdown = float((np.maximum.accumulate(np.concatenate(([0.0], equity.to_numpy()))) -
+                          np.concatenate(([0.0], equity.to_numpy()))).max()) if len(r) else 0.0
+        summary = {
+            "objective": self.objective,
+            "param_sets": len(self.param_sets),
+            "windows": len(windows),
+            "invalid_windows": sum(not row["valid"] for row in rows),
+            "oos_trades": int(len(r)),
+            "oos_net_r": float(r.sum()) if len(r) else 0.0,
+            "oos_expectancy": float(r.mean()) if len(r) else 0.0,
+            "oos_win_rate": float((r > 0).mean() * 100) if len(r) else 0.0,
+            "oos_max_drawdown_r": drawdown,
+        }
+        return {"windows": pd.DataFrame(rows), "trades": oos_trades, "equity": equity, "summary": summary}
+
+
+# ── Shared per-bar preparation ─────────────────────────────────────────────────
+
+def entry_bars(data: Dict[str, Dict[str, pd.DataFrame]], start_date: str, end_date: str) -> List[tuple]:
+    """
+    Every simulated entry bar as (ts, symbol, entry_pos, h1_end, d1_end, m15_end),
+    in timeline order. The *_end positions slice each higher timeframe up to
+    and including the bar, exactly like BacktestEngine.run's `index <= ts`.
+    """
+    start = pd.Timestamp(start_date, tz="UTC")
+    end = pd.Timestamp(end_date, tz="UTC") + pd.Timedelta(days=1)
+    bars = []
+    for symbol, tfs in data.items():
+        index = tfs["entry"].index
+        positions = np.flatnonzero((index >= start) & (index < end))
+        positions = positions[positions >= WARMUP_BARS]
+        stamps = index[positions]
+        ends = {tf: tfs[tf].index.searchsorted(stamps, side="right") if tf in tfs else None
+                for tf in ("h1", "d1", "m15")}
+        for k, pos in enumerate(positions):
+            bars.append((stamps[k], symbol, int(pos), int(ends["h1"][k]), int(ends["d1"][k]),
+                         None if ends["m15"] is None else int(ends["m15"][k])))
+    bars.sort(key=lambda b: (b[0], b[1]))
+    return bars
+
+
+def _init_worker(data: Dict[str, Dict[str, pd.DataFrame]], bars: List[tuple]):
+    global _WORKER_DATA, _WORKER_BARS
+    _WORKER_DATA, _WORKER_BARS = data, bars
+
+
+def _evaluate_params(task: tuple) -> pd.DataFrame:
+    """Process-pool worker: one signal pass for one param set."""
+    strategy_cls, params = task
+    strategy = strategy_cls().with_params(**params)
+    return asyncio.run(_signal_pass(strategy, _WORKER_DATA, _WORKER_BARS))
+
+
+async def _signal_pass(strategy, data: Dict[str, Dict[str, pd.DataFrame]], bars: List[tuple]) -> pd.DataFrame:
+    trades = []
+    for ts, symbol, pos, h1_end, d1_end, m15_end in bars:
+        tfs = data[symbol]
+        entry_df = tfs["entry"]
+        bundle = {
+            "entry": entry_df.iloc[:pos + 1],
+            "h1": tfs["h1"].iloc[:h1_end],
+            "d1": tfs["d1"].iloc[:d1_end],
+        }
+        if m15_end is not None:
+            bundle["m15"] = tfs["m15"].iloc[:m15_end]
+
+        signal = await strategy.analyze(symbol, bundle, [], {})
+        if not signal:
+            continue
+        outcome = BacktestEngine._simulate_exit(entry_df.iloc[pos + 1:], signal)
+        if outcome["result"] in ("OPEN", "ERROR"):
+            continue
+        trades.append({
+            "timestamp": ts, "symbol": symbol, "direction": signal["direction"],
+            "result": outcome["result"], "r": float(outcome["pips"]),
+            "quality_score": signal.get("quality_score", 0.0),
+        })
+    return pd.DataFrame(trades, columns=["timestamp", "symbol", "direction", "result", "r", "quality_score"])
+
+
+# ── CLI ────────────────────────────────────────────────────────────────────────
+
+async def main():
+    parser = argparse.ArgumentParser(description="Walk-forward parameter optimization")
+    parser.add_argument("--start", required=True, help="YYYY-MM-DD")
+    parser.add_argument("--end", required=True, help="YYYY-MM-DD")
+    parser.add_argument("--is-days", type=int, default=90)
+    parser.add_argument("--oos-days", type=int, default=30)
+    parser.add_argument("--objective", choices=OBJECTIVES, default="expectancy")
+    parser.add_argument("--min-trades", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    wf = WalkForwardOptimizer(args.start, args.end, in_sample_days=args.is_days,
+                              out_of_sample_days=args.oos_days, objective=args.objective,
+                              min_trades=args.min_trades, workers=args.workers)
+    report = await wf.run()
+    if "error" in report:
+        print(f"❌ Error: {report['error']}")
+        return
+
+    print("=" * 80)
+    print("📊 WALK-FORWARD WINDOWS")
+    print("=" * 80)
+    print(report["windows"].to_string(index=False))
+    print("-" * 80)
+    s = report["summary"]
+    if s["invalid_windows"]:
+        print(f"⚠️ {s['invalid_windows']} window(s) had no param set with {args.min_trades}+ in-sample trades: "
+              f"not traded out of sample")
+    print(f"✅ Stitched OOS: {s['oos_trades']} trades | {s['oos_net_r']:.1f}R net | "
+          f"{s['oos_expectancy']:.3f}R/trade | WR {s['oos_win_rate']:.1f}% | MaxDD {s['oos_max_drawdown_r']:.1f}R")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
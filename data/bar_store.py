@@ -0,0 +1,242 @@
+"""
+Columnar Bar Store
+==================
+Append-only on-disk OHLCV cache, one directory per (symbol, timeframe):
+
+    data/bar_store/<SYMBOL>/<timeframe>/
+        index.i8        int64 UTC nanoseconds, strictly increasing
+        open.<dt> ...   one raw little-endian array per column (f8 or f4)
+        meta.json       row count, coverage and dtypes (written last = commit)
+
+Column files are plain arrays, so reads memory-map them and slice the requested
+date range with a binary search on the index — no parsing, no full load.
+A crash between writing column bytes and meta.json leaves extra trailing bytes
+which are ignored on read and truncated on the next append.
+
+Usage:
+    store = BarStore("data/bar_store")
+    store.append("EURUSD=X", "5min", m5_df)
+    df = store.read("EURUSD=X", "5min", start="2024-01-01", end="2024-03-31")
+"""
+
+import json
+import os
+import shutil
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from data.compact_frames import QUOTE_COLUMNS, fits_float32, upcast_quotes
+
+BAR_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+class BarStore:
+    """Memory-mappable columnar cache of OHLCV bars."""
+
+    def __init__(self, root: str = "data/bar_store", compact: bool = False):
+        """
+        Args:
+            root:    Directory holding the store.
+            compact: Store float32 columns (see data.compact_frames).
+        """
+        self.root = root
+        self.compact = compact
+
+    # ── Public API ─────────────────────────────────────────────────────────────
+
+    def has(self, symbol: str, timeframe: str) -> bool:
+        meta = self.info(symbol, timeframe)
+        return bool(meta and meta.get("rows"))
+
+    def info(self, symbol: str, timeframe: str) -> Optional[dict]:
+        """Returns the committed metadata for a series, or None."""
+        path = os.path.join(self._series_dir(symbol, timeframe), "meta.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def symbols(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(d for d in os.listdir(self.root)
+                      if os.path.isdir(os.path.join(self.root, d)) and not d.startswith("."))
+
+    def timeframes(self, symbol: str) -> List[str]:
+        folder = os.path.join(self.root, self._safe_name(symbol))
+        if not os.path.isdir(folder):
+            return []
+        return sorted(tf for tf in os.listdir(folder) if self.has(symbol, tf))
+
+    def append(self, symbol: str, timeframe: str, df: pd.DataFrame) -> int:
+        """
+        Appends bars newer than the stored last timestamp. Older/duplicate rows are
+        dropped, so re-appending an overlapping range is harmless.
+        Returns the number of rows written.
+        """
+        if df is None or df.empty:
+            return 0
+
+        folder = self._series_dir(symbol, timeframe)
+        os.makedirs(folder, exist_ok=True)
+        meta = self.info(symbol, timeframe) or self._new_meta(df)
+        self._truncate_uncommitted(folder, meta)
+
+        index_ns = self._index_ns(df.index)
+        order_ok = len(index_ns) < 2 or bool(np.all(np.diff(index_ns) > 0))
+        if not order_ok:
+            df = df[~df.index.duplicated(keep="first")].sort_index()
+            index_ns = self._index_ns(df.index)
+        if meta["rows"]:
+            keep = index_ns > meta["last_ns"]
+            df, index_ns = df[keep], index_ns[keep]
+        if df.empty:
+            return 0
+
+        columns = {col: df[col].to_numpy(dtype=np.float64, na_value=np.nan) if col in df.columns
+                   else np.full(len(df), np.nan) for col in meta["dtypes"]}
+        # A float32 quote column whose new bars no longer fit (e.g. BTC crossing 100k) is widened first
+        narrowed = [col for col, dtype in meta["dtypes"].items()
+                    if dtype == "<f4" and col in QUOTE_COLUMNS and not fits_float32(columns[col])]
+        for col in narrowed:
+            self._widen(folder, meta, col)
+
+        with open(os.path.join(folder, "index.i8"), "ab") as f:
+            index_ns.astype("<i8").tofile(f)
+        for col, dtype in meta["dtypes"].items():
+            with open(self._column_path(folder, col, dtype), "ab") as f:
+                columns[col].astype(dtype).tofile(f)
+
+        if not meta["rows"]:
+            meta["first_ns"] = int(index_ns[0])
+        meta["last_ns"] = int(index_ns[-1])
+        meta["rows"] += len(df)
+        meta["first"] = pd.Timestamp(meta["first_ns"], tz="UTC").isoformat()
+        meta["last"] = pd.Timestamp(meta["last_ns"], tz="UTC").isoformat()
+        self._write_meta(folder, meta)
+        for col in narrowed:
+            os.remove(self._column_path(folder, col, "<f4"))
+        return len(df)
+
+    def read(
+        self,
+        symbol: str,
+        timeframe: str,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> Optional[pd.DataFrame]:
+        """
+        Reads bars in [start, end] (inclusive, "YYYY-MM-DD" or any Timestamp-like;
+        a date-only end covers the whole day). Returns None if the series is absent.
+        """
+        meta = self.info(symbol, timeframe)
+        if not meta or not meta["rows"]:
+            return None
+        folder = self._series_dir(symbol, timeframe)
+        rows = meta["rows"]
+
+        index = np.memmap(os.path.join(folder, "index.i8"), dtype="<i8", mode="r", shape=(rows,))
+        lo = 0 if start is None else int(np.searchsorted(index, self._bound_ns(start, False), side="left"))
+        hi = rows if end is None else int(np.searchsorted(index, self._bound_ns(end, True), side="right"))
+        if hi <= lo:
+            return None
+
+        data = {}
+        for col, dtype in meta["dtypes"].items():
+            column = np.memmap(self._column_path(folder, col, dtype), dtype=dtype, mode="r", shape=(rows,))
+            data[col] = np.array(column[lo:hi])
+        stamps = pd.DatetimeIndex(np.array(index[lo:hi]).view("datetime64[ns]"), name="datetime")
+        # Same index unit as freshly parsed CSV bars
+        df = pd.DataFrame(data, index=stamps.as_unit("us").tz_localize("UTC"))
+        if self.compact or any(dt.endswith("4") for dt in meta["dtypes"].values()):
+            df.attrs["compact"] = True
+        return df
+
+    def clear(self, symbol: str, timeframe: Optional[str] = None):
+        """Deletes one series, or every timeframe of a symbol."""
+        path = os.path.join(self.root, self._safe_name(symbol))
+        if timeframe is not None:
+            path = os.path.join(path, timeframe)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+
+    def replace(self, source: str, symbol: str, timeframe: str):
+        """
+        Moves the `source` series over `symbol`'s, replacing it with two renames
+        (the old series is deleted afterwards). A missing source clears the target.
+        """
+        src, dst = self._series_dir(source, timeframe), self._series_dir(symbol, timeframe)
+        old = dst + ".old"
+        if os.path.isdir(old):
+            shutil.rmtree(old)
+        if os.path.isdir(dst):
+            os.replace(dst, old)
+        if os.path.isdir(src):
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            os.replace(src, dst)
+        if os.path.isdir(old):
+            shutil.rmtree(old)
+
+    # ── Internal ───────────────────────────────────────────────────────────────
+
+    def _new_meta(self, df: pd.DataFrame) -> dict:
+        columns = [c for c in BAR_COLUMNS if c in df.columns]
+        compact = self.compact or all(df[c].dtype == np.float32 for c in columns)
+        # Quotes stay float64 for symbols whose precision float32 cannot hold (see data.compact_frames)
+        dtypes = {c: "<f4" if compact and (c not in QUOTE_COLUMNS or fits_float32(df[c])) else "<f8"
+                  for c in columns}
+        return {"rows": 0, "first_ns": None, "last_ns": None, "first": None, "last": None, "dtypes": dtypes}
+
+    def _widen(self, folder: str, meta: dict, col: str):
+        """Rewrites a committed float32 column as float64 (the f4 file is removed once meta is written)."""
+        rows = meta["rows"]
+        old = self._column_path(folder, col, "<f4")
+        values = np.fromfile(old, dtype="<f4", count=rows) if rows else np.empty(0, dtype="<f4")
+        upcast_quotes(pd.Series(values)).to_numpy().astype("<f8").tofile(self._column_path(folder, col, "<f8"))
+        meta["dtypes"][col] = "<f8"
+
+    def _truncate_uncommitted(self, folder: str, meta: dict):
+        """Drops bytes written by an append that never reached meta.json."""
+        rows = meta["rows"]
+        files = [(os.path.join(folder, "index.i8"), 8)]
+        files += [(self._column_path(folder, c, dt), np.dtype(dt).itemsize) for c, dt in meta["dtypes"].items()]
+        for path, itemsize in files:
+            if os.path.exists(path) and os.path.getsize(path) != rows * itemsize:
+                with open(path, "r+b") as f:
+                    f.truncate(rows * itemsize)
+
+    def _write_meta(self, folder: str, meta: dict):
+        tmp = os.path.join(folder, "meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, os.path.join(folder, "meta.json"))
+
+    def _series_dir(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.root, self._safe_name(symbol), timeframe)
+
+    @staticmethod
+    def _column_path(folder: str, col: str, dtype: str) -> str:
+        return os.path.join(folder, f"{col}.{dtype.lstrip('<')}")
+
+    @staticmethod
+    def _safe_name(symbol: str) -> str:
+        return symbol.replace("/", "_").replace(os.sep, "_")
+
+    @staticmethod
+    def _index_ns(index: pd.DatetimeIndex) -> np.ndarray:
+        if index.tz is None:
+            index = index.tz_localize("UTC")
+        return index.tz_convert("UTC").as_unit("ns").asi8
+
+    @staticmethod
+    def _bound_ns(value, is_end: bool) -> int:
+        ts = pd.Timestamp(value)
+        if ts.tzinfo is None:
+            ts = ts.tz_localize("UTC")
+        if is_end and isinstance(value, str) and len(value) == 10:
+            ts = ts + pd.Timedelta(days=1) - pd.Timedelta(1, "ns")
+        return ts.tz_convert("UTC").as_unit("ns").value
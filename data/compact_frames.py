@@ -0,0 +1,136 @@
+"""
+Compact Bar Frames
+==================
+Opt-in memory-lean representation for long OHLCV/indicator histories.
+
+Years of M1/M5 bars held as float64 (plus an object-dtype `regime` column)
+cost hundreds of MB per symbol on the VM. A compact frame stores:
+  - volume and indicators as float32 (~7 significant digits: derived values
+    whose error stays far below spread/slippage)
+  - quotes (open/high/low/close) as float32 only when every quote survives
+    the float32 round trip exactly (upcast_quotes). FX majors to 5 decimals
+    and JPY crosses to 3 fit; BTC above 100k to 2 decimals (8 significant
+    digits) does not and keeps float64. The decision is made per frame, i.e.
+    per symbol.
+  - low-cardinality label columns (regime, session, ...) as categoricals
+  - boolean flags (fvg_*, bos_*) as uint8
+
+Indicators are always computed in float64 (add_indicators works on an
+upcast copy of compact OHLC) and compacted afterwards for storage.
+
+Usage:
+    from data.compact_frames import compact_frame, frame_nbytes
+    df = compact_frame(IndicatorCalculator.add_indicators(df, "5m"))
+"""
+
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+# Columns that keep float64 even in compact mode. Empty by default: indicators
+# tolerate float32 and quotes are checked per frame (QUOTE_COLUMNS).
+FLOAT64_COLUMNS: set = set()
+
+# Raw quotes: float32 only if upcast_quotes restores every value exactly
+QUOTE_COLUMNS = ("open", "high", "low", "close")
+
+# A string column becomes categorical when unique values are at most this
+# fraction of its length (regime labels easily qualify, free text does not).
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+def compact_frame(df: Optional[pd.DataFrame], keep_float64: Iterable[str] = ()) -> Optional[pd.DataFrame]:
+    """
+    Returns a copy of `df` with float32 numerics, categorical labels and uint8 flags.
+    Index and column order are preserved; df.attrs (indicator memo) is carried over.
+    """
+    if df is None or df.empty:
+        return df
+
+    keep = FLOAT64_COLUMNS | set(keep_float64)
+    converted = {}
+    for col in df.columns:
+        series = df[col]
+        dtype = series.dtype
+        if pd.api.types.is_bool_dtype(dtype):
+            # Nullable booleans treat missing as False, matching how flags are read
+            converted[col] = series.fillna(False).astype(np.uint8)
+        elif pd.api.types.is_float_dtype(dtype):
+            if col not in keep and dtype != np.float32 and (col not in QUOTE_COLUMNS or fits_float32(series)):
+                converted[col] = series.astype(np.float32)
+        elif isinstance(dtype, pd.CategoricalDtype):
+            continue
+        elif pd.api.types.is_string_dtype(dtype) or pd.api.types.is_object_dtype(dtype):
+            if series.nunique(dropna=True) <= max(1, len(series) * CATEGORY_MAX_UNIQUE_RATIO):
+                converted[col] = series.astype("category")
+
+    out = df.assign(**converted) if converted else df.copy()
+    out.attrs = dict(df.attrs)
+    out.attrs["compact"] = True
+    return out
+
+
+def upcast_quotes(series: pd.Series) -> pd.Series:
+    """
+    float32 prices back to float64, snapped to 7 significant digits.
+
+    A plain astype leaves 1.08512 as 1.0851199626922607; indicators that branch
+    on tiny differences (ADX +DM/-DM ties) then diverge from the float64 run.
+    For quotes of at most 7 significant digits snapping recovers the exact
+    float64 of the original; compact_frame only stores quotes as float32 when
+    that holds (fits_float32).
+    """
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        magnitude = np.floor(np.log10(np.abs(values)))
+    decimals = np.where(np.isfinite(magnitude), 6 - magnitude, 0)
+    scale = np.power(10.0, decimals)
+    snapped = np.where(decimals >= 0, np.round(values * scale) / scale, np.round(values / (1 / scale)) * (1 / scale))
+    return pd.Series(snapped, index=series.index, name=series.name)
+
+
+def fits_float32(values) -> bool:
+    """True if float32 storage plus upcast_quotes gives back exactly these float64 quotes."""
+    original = pd.Series(np.asarray(values, dtype=np.float64))
+    restored = upcast_quotes(original.astype(np.float32)).to_numpy()
+    return bool(np.array_equal(restored, original.to_numpy(), equal_nan=True))
+
+
+def is_compact(df: Optional[pd.DataFrame]) -> bool:
+    """True if the frame was produced by compact_frame."""
+    return df is not None and bool(df.attrs.get("compact"))
+
+
+def frame_nbytes(df: Optional[pd.DataFrame]) -> int:
+    """Deep memory footprint of a frame (index included) in bytes."""
+    if df is None:
+        return 0
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def precision_deltas(reference: pd.DataFrame, compact: pd.DataFrame) -> Dict[str, Dict[str, float]]:
+    """
+    Per numeric column: max absolute difference of `compact` against the float64
+    `reference`, and that difference relative to the column's mean magnitude
+    (point-wise ratios blow up for oscillators crossing zero, e.g. zscore_20).
+    Columns missing from either side are skipped.
+    """
+    report = {}
+    for col in reference.columns:
+        if col not in compact.columns or not pd.api.types.is_numeric_dtype(reference[col].dtype):
+            continue
+        if pd.api.types.is_bool_dtype(reference[col].dtype):
+            continue
+        ref = reference[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        cmp = compact[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        mask = np.isfinite(ref) & np.isfinite(cmp)
+        if not mask.any():
+            continue
+        max_abs = float(np.abs(ref[mask] - cmp[mask]).max())
+        scale = float(np.abs(ref[mask]).mean())
+        report[col] = {
+            "max_abs": max_abs,
+            "max_rel": max_abs / scale if scale > 0 else 0.0,
+        }
+    return report
@@ -0,0 +1,273 @@
+"""
+Dukascopy Bulk Import
+=====================
+One-off import of every Dukascopy M1 CSV into the columnar BarStore, so
+backtests and research scripts open a ready-made timeframe instead of
+re-parsing years of CSVs on every run.
+
+  1. Every symbol/year file is parsed in a process pool. Each worker streams
+     its file (DukascopyLoader chunked parser) into a private staging series
+     and builds the resample pyramid M1 → M5 → M15 → H1 → H4 → D1, each
+     level from the one below.
+  2. Per symbol, the staged files are merged in time order into a hidden
+     series that then replaces the live one (BarStore.replace). A bar whose
+     bucket straddles two files is combined (first open, max high, min low,
+     last close, summed volume).
+  3. data/bar_store/manifest.json records the source files (size/mtime),
+     plus rows and date coverage per timeframe. Unchanged symbols are skipped
+     on the next run.
+
+Files that overlap in time cannot be merged independently (keep-first
+dedup needs the earlier file), so such a symbol is re-ingested serially.
+
+Usage:
+    python -m data.dukascopy_import                      # all symbol folders
+    python -m data.dukascopy_import EURUSD GBPUSD --workers 4
+    python -m data.dukascopy_import --force              # rebuild everything
+
+    # Afterwards:
+    loader = DukascopyLoader(store=imported_store())
+    h1 = loader.load("EURUSD=X", timeframe="1h", start_date="2023-01-01")
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from data.bar_store import BarStore
+from data.dukascopy_loader import DUKASCOPY_TO_YFINANCE, DukascopyLoader
+
+PYRAMID = ("1min", "5min", "15min", "1h", "4h", "1D")
+MANIFEST_NAME = "manifest.json"
+STAGING_DIR = ".staging"
+
+
+def imported_store(root: str = "data/bar_store") -> Optional[BarStore]:
+    """The BarStore written by this importer, or None if nothing was imported yet."""
+    return BarStore(root) if os.path.exists(os.path.join(root, MANIFEST_NAME)) else None
+
+
+def read_manifest(root: str = "data/bar_store") -> dict:
+    path = os.path.join(root, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"version": 1, "symbols": {}}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def import_dukascopy(
+    base_dir:   str = "data/dukascopy",
+    store_root: str = "data/bar_store",
+    symbols:    Optional[Sequence[str]] = None,
+    timeframes: Sequence[str] = PYRAMID,
+    workers:    Optional[int] = None,
+    chunk_rows: int = DukascopyLoader.DEFAULT_CHUNK_ROWS,
+    force:      bool = False,
+) -> dict:
+    """
+    Imports Dukascopy CSV folders into the bar store and updates the manifest.
+
+    Args:
+        base_dir:   Folder with <SYMBOL>/*.csv
+        store_root: BarStore root (manifest.json lives here)
+        symbols:    Folder names or yfinance tickers to import (default: all)
+        timeframes: Pyramid levels to build; M1 is always included
+        workers:    Process pool size (default: CPU count, 1 = in-process)
+        chunk_rows: CSV rows parsed per chunk inside each worker
+        force:      Rebuild symbols whose files did not change
+
+    Returns:
+        The updated manifest dict.
+    """
+    rules = DukascopyLoader.pyramid_rules(("1min",) + tuple(timeframes))
+    store = BarStore(store_root)
+    staging_root = os.path.join(store_root, STAGING_DIR)
+    manifest = read_manifest(store_root)
+
+    # ── Work list: one task per CSV of every symbol that changed ─────────────
+    plan = {}
+    for folder, ticker in _symbol_folders(base_dir, symbols).items():
+        paths = sorted(os.path.join(base_dir, folder, name)
+                       for name in os.listdir(os.path.join(base_dir, folder)) if name.endswith(".csv"))
+        files = {os.path.basename(p): _fingerprint(p) for p in paths}
+        previous = manifest["symbols"].get(ticker, {})
+        up_to_date = (
+            not force
+            and {n: {k: f[k] for k in ("size", "mtime")} for n, f in previous.get("files", {}).items()} == files
+            and set(rules) <= set(previous.get("timeframes", {}))
+        )
+        if paths and not up_to_date:
+            plan[ticker] = (folder, paths, files)
+        elif paths:
+            print(f"  ⏭️  {ticker:12s} unchanged since {previous.get('imported_at', '?')}")
+
+    tasks = [(path, staging_root, f"{ticker}@{i}", rules, chunk_rows)
+             for ticker, (_, paths, _) in plan.items() for i, path in enumerate(paths)]
+    if not tasks:
+        return manifest
+
+    # ── Parse + per-file pyramid in parallel ─────────────────────────────────
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    print(f"📥 Importing {len(tasks)} files for {len(plan)} symbols ({min(workers, len(tasks))} workers)")
+    if workers <= 1 or len(tasks) == 1:
+        staged = [_import_file(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            staged = list(pool.map(_import_file, tasks))
+
+    # ── Merge staged pieces per symbol, record the manifest ─────────────────
+    staging = BarStore(staging_root)
+    for ticker, (folder, paths, files) in plan.items():
+        pieces = sorted((p for p in staged if p["key"].startswith(f"{ticker}@") and p["first_ns"] is not None),
+                        key=lambda p: p["first_ns"])
+        overlapping = any(b["first_ns"] <= a["last_ns"] for a, b in zip(pieces, pieces[1:]))
+        if overlapping:
+            print(f"  ⚠️  {ticker}: files overlap in time, re-ingesting serially")
+            DukascopyLoader(base_dir=base_dir).ingest(ticker, rules, chunk_rows, store=store)
+        else:
+            # Merged under a hidden key and swapped in per timeframe: readers and a
+            # crashed run never see a cleared or half-merged series
+            merged = DukascopyLoader.STAGING_PREFIX + ticker
+            store.clear(merged)
+            try:
+                for rule in rules:
+                    _merge_pieces(store, staging, merged, rule, [p["key"] for p in pieces])
+                for rule in rules:
+                    store.replace(merged, ticker, rule)
+            finally:
+                store.clear(merged)
+
+        for piece in staged:
+            if piece["key"].startswith(f"{ticker}@"):
+                name = os.path.basename(piece["path"])
+                files[name] = dict(files[name], rows=piece["rows"], first=piece["first"], last=piece["last"])
+
+        coverage = {}
+        for rule in rules:
+            info = store.info(ticker, rule) or {}
+            coverage[rule] = {"rows": info.get("rows", 0), "first": info.get("first"), "last": info.get("last")}
+        manifest["symbols"][ticker] = {
+            "folder": folder,
+            "imported_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "files": files,
+            "timeframes": coverage,
+        }
+        m1 = coverage["1min"]
+        print(f"  ✅ {ticker:12s} {m1['rows']:>10,} M1 bars  [{(m1['first'] or '?')[:10]} → {(m1['last'] or '?')[:10]}]")
+
+    shutil.rmtree(staging_root, ignore_errors=True)
+    manifest.update(version=1, source=base_dir, updated_at=datetime.now(timezone.utc).isoformat(timespec="seconds"))
+    _write_manifest(store_root, manifest)
+    print(f"⏱️  Import finished in {time.perf_counter() - started:.1f}s")
+    return manifest
+
+
+# ── Internal ───────────────────────────────────────────────────────────────────
+
+def _import_file(task: tuple) -> dict:
+    """Process-pool worker: one CSV → staged pyramid under a unique key."""
+    path, staging_root, key, rules, chunk_rows = task
+    staging = BarStore(staging_root)
+    staging.clear(key)
+    loader = DukascopyLoader(base_dir=os.path.dirname(path))
+    rows = loader._stream_files([path], staging, key, rules, chunk_rows)
+    m1 = staging.info(key, "1min") or {}
+    return {
+        "path": path, "key": key, "rows": rows.get("1min", 0),
+        "first_ns": m1.get("first_ns"), "last_ns": m1.get("last_ns"),
+        "first": m1.get("first"), "last": m1.get("last"),
+    }
+
+
+def _merge_pieces(store: BarStore, staging: BarStore, symbol: str, rule: str, keys: List[str]):
+    """
+    Appends staged per-file series in time order. The last bar of each piece is
+    held back so a bucket split across two files is combined into one bar.
+    Memory: one file's worth of one timeframe at a time.
+    """
+    held = None
+    for key in keys:
+        bars = staging.read(key, rule)
+        if bars is None or bars.empty:
+            continue
+        if held is not None:
+            if bars.index[0] == held.index[0]:
+                bars = pd.concat([_combine_bars(held, bars.iloc[:1]), bars.iloc[1:]])
+            else:
+                store.append(symbol, rule, held)
+        store.append(symbol, rule, bars.iloc[:-1])
+        held = bars.iloc[-1:]
+    if held is not None:
+        store.append(symbol, rule, held)
+
+
+def _combine_bars(first: pd.DataFrame, second: pd.DataFrame) -> pd.DataFrame:
+    """Merges two partial bars of the same bucket (single-row frames)."""
+    merged = first.copy()
+    merged["high"] = max(first["high"].iloc[0], second["high"].iloc[0])
+    merged["low"] = min(first["low"].iloc[0], second["low"].iloc[0])
+    merged["close"] = second["close"].iloc[0]
+    if "volume" in merged.columns:
+        merged["volume"] = first["volume"].iloc[0] + second["volume"].iloc[0]
+    return merged
+
+
+def _symbol_folders(base_dir: str, symbols: Optional[Sequence[str]]) -> Dict[str, str]:
+    """Maps symbol folder name → yfinance ticker, filtered by `symbols`."""
+    if not os.path.isdir(base_dir):
+        return {}
+    wanted = {s.upper() for s in symbols} if symbols else None
+    result = {}
+    for folder in sorted(os.listdir(base_dir)):
+        if not os.path.isdir(os.path.join(base_dir, folder)):
+            continue
+        ticker = DUKASCOPY_TO_YFINANCE.get(folder.upper(), folder)
+        if wanted is None or folder.upper() in wanted or ticker.upper() in wanted:
+            result[folder] = ticker
+    return result
+
+
+def _fingerprint(path: str) -> dict:
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime": int(stat.st_mtime)}
+
+
+def _write_manifest(root: str, manifest: dict):
+    os.makedirs(root, exist_ok=True)
+    tmp = os.path.join(root, MANIFEST_NAME + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(root, MANIFEST_NAME))
+
+
+# ── CLI ────────────────────────────────────────────────────────────────────────
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import Dukascopy M1 CSVs into the bar store")
+    parser.add_argument("symbols", nargs="*", help="Folder names or tickers (default: all)")
+    parser.add_argument("--base-dir", default="data/dukascopy")
+    parser.add_argument("--store", default="data/bar_store")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count)")
+    parser.add_argument("--chunk-rows", type=int, default=DukascopyLoader.DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--force", action="store_true", help="Rebuild symbols whose CSVs did not change")
+    args = parser.parse_args()
+
+    manifest = import_dukascopy(args.base_dir, args.store, args.symbols or None,
+                                workers=args.workers, chunk_rows=args.chunk_rows, force=args.force)
+
+    # Open latency check: what a backtest pays to get its timeframe
+    store = BarStore(args.store)
+    for ticker, entry in manifest["symbols"].items():
+        for rule in entry["timeframes"]:
+            start = time.perf_counter()
+            df = store.read(ticker, rule)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"  📂 {ticker:12s} {rule:>6s}: {0 if df is None else len(df):>10,} bars opened in {elapsed:6.1f} ms")
@@ -19,15 +19,21 @@ Dukascopy CSV format (GMT):
 This loader:
   - Reads and cleans the Dukascopy M1 format
   - Resamples to M5, M15, M30, H1 on request
+  - Streams large CSVs in chunks into the columnar BarStore (ingest), after
+    which load() reads the requested range straight from the store
   - Maps Dukascopy symbol names to yfinance ticker format
   - Returns a standard OHLCV DataFrame ready for IndicatorCalculator
 """
 
 import os
 import glob
+import numpy as np
 import pandas as pd
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Dict, Iterator, Optional, Sequence
+
+from data.bar_store import BAR_COLUMNS, BarStore
+from data.compact_frames import compact_frame
 
 # ── Symbol Mapping ─────────────────────────────────────────────────────────────
 # Maps common Dukascopy naming variants to our yfinance-compatible tickers
@@ -74,6 +80,11 @@ class DukascopyLoader:
 
         # Load M30 data for Gold
         df = loader.load("GC=F", timeframe="30min")
+
+        # Multi-year histories: stream once into the bar store, then load from it
+        loader = DukascopyLoader(store=BarStore("data/bar_store"))
+        loader.ingest("EURUSD=X")
+        df = loader.load("EURUSD=X", timeframe="5min", start_date="2024-01-01")
     """
 
     TIMEFRAME_RESAMPLE = {
@@ -91,13 +102,27 @@ class DukascopyLoader:
         "1h":    "1h",
     }
 
-    def __init__(self, base_dir: str = "data/dukascopy"):
+    # Timeframes written by ingest(); every one must tile a UTC day
+    INGEST_TIMEFRAMES = ("1min", "5min", "15min", "30min", "1h", "4h", "1D")
+    # ~500k M1 rows ≈ 1 year of FX per chunk, a few tens of MB while parsing
+    DEFAULT_CHUNK_ROWS = 500_000
+    # ingest() builds a symbol's series under this hidden key (BarStore.symbols() skips dot-dirs)
+    STAGING_PREFIX = ".ingest-"
+
+    def __init__(self, base_dir: str = "data/dukascopy", compact: bool = False,
+                 store: Optional[BarStore] = None):
         """
         Args:
             base_dir: Root directory where Dukascopy CSVs are stored.
                       Expects structure: base_dir/<SYMBOL>/*.csv
+            compact:  Keep bars as float32 (see data.compact_frames) to roughly
+                      halve memory for multi-year M1 histories.
+            store:    Optional BarStore. ingest() writes to it and load() reads
+                      from it whenever it holds the requested timeframe.
         """
         self.base_dir = base_dir
+        self.compact = compact
+        self.store = store
 
     def load(
         self,
@@ -119,6 +144,13 @@ class DukascopyLoader:
             DataFrame with columns [open, high, low, close, volume]
             indexed by UTC datetime, or None if no data found.
         """
+        rule = self.TIMEFRAME_RESAMPLE.get(timeframe, timeframe)
+        if self.store is not None and self.store.has(symbol, rule):
+            df = self.store.read(symbol, rule, start_date, end_date)
+            if df is not None and self.compact:
+                df = compact_frame(df)
+            return df
+
         m1_df = self._load_m1(symbol)
         if m1_df is None or m1_df.empty:
             return None
@@ -133,9 +165,111 @@ class DukascopyLoader:
             return None
 
         # Resample to target timeframe
-        rule = self.TIMEFRAME_RESAMPLE.get(timeframe, timeframe)
         return self._resample(m1_df, rule)
 
+    def ingest(
+        self,
+        symbol:     str,
+        timeframes: Sequence[str] = INGEST_TIMEFRAMES,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        store:      Optional[BarStore] = None,
+    ) -> Dict[str, int]:
+        """
+        Streams every M1 CSV of `symbol` into the bar store, resampling each
+        chunk to all `timeframes` on the fly. Peak memory is one chunk plus the
+        current (incomplete) UTC day, instead of the whole multi-year history.
+
+        Bars are only written once their bucket is complete: each chunk emits
+        everything before the UTC midnight preceding its last row and carries
+        the rest into the next chunk (every timeframe tiles the day, so a day
+        boundary closes a bucket in all of them). Rows at or before the last
+        seen timestamp are dropped, matching _load_m1's keep='first' dedup of
+        overlapping files. Existing store series for the symbol are rebuilt:
+        bars stream into a hidden staging series that replaces them only once
+        every file has been read, so a failure partway leaves the old series
+        untouched (and is re-raised).
+
+        Returns:
+            Rows written per timeframe rule, e.g. {"1min": 372960, "5min": 74592, ...}
+        """
+        store = store or self.store
+        if store is None:
+            raise ValueError("ingest() needs a BarStore (pass store= or DukascopyLoader(store=...))")
+
+        rules = self.pyramid_rules(timeframes)
+        folder = self._find_folder(symbol)
+        csv_paths = glob.glob(os.path.join(folder, "*.csv")) if folder else []
+        if not csv_paths:
+            return {rule: 0 for rule in rules}
+
+        staging = self.STAGING_PREFIX + symbol
+        store.clear(staging)
+        try:
+            written = self._stream_files(self._chronological(csv_paths), store, staging, rules, chunk_rows,
+                                         strict=True)
+            for rule in rules:
+                store.replace(staging, symbol, rule)
+        finally:
+            store.clear(staging)
+        return written
+
+    @classmethod
+    def pyramid_rules(cls, timeframes: Sequence[str]) -> list:
+        """
+        Resample rules for `timeframes`, finest first. Raises ValueError for a
+        timeframe that does not tile a UTC day (it could not be streamed).
+        """
+        day = pd.Timedelta(days=1)
+        spans = {}
+        for tf in timeframes:
+            rule = cls.TIMEFRAME_RESAMPLE.get(tf, tf)
+            try:
+                span = pd.Timedelta(rule)
+            except ValueError:
+                span = None
+            if span is None or span > day or day % span:
+                raise ValueError(f"Timeframe {rule} does not tile a UTC day and cannot be streamed")
+            spans.setdefault(rule, span)
+        return sorted(spans, key=spans.get)
+
+    def _stream_files(self, csv_paths: list, store: BarStore, key: str, rules: list,
+                      chunk_rows: int, strict: bool = False) -> Dict[str, int]:
+        """
+        Chunked parse → carry-over → pyramid append for an ordered list of CSVs.
+        A file that fails is skipped with a warning, or re-raised when `strict`.
+        """
+        written = {rule: 0 for rule in rules}
+        carry, watermark, late_rows = None, None, 0
+        for path in csv_paths:
+            try:
+                for chunk in self._iter_csv(path, chunk_rows):
+                    if not chunk.index.is_monotonic_increasing:
+                        chunk = chunk.sort_index()
+                    chunk = chunk[~chunk.index.duplicated(keep='first')]
+                    if watermark is not None:
+                        late = chunk.index <= watermark
+                        late_rows += int(late.sum())
+                        chunk = chunk[~late]
+                    if chunk.empty:
+                        continue
+                    watermark = chunk.index[-1]
+
+                    block = chunk if carry is None else pd.concat([carry, chunk])
+                    cutoff = block.index[-1].floor("1D")
+                    complete = block.index < cutoff
+                    self._emit(store, key, rules, block[complete], written)
+                    carry = block[~complete]
+            except Exception as e:
+                print(f"  ⚠️  Failed to ingest {path}: {e}")
+                if strict:
+                    raise
+
+        if carry is not None:
+            self._emit(store, key, rules, carry, written)
+        if late_rows:
+            print(f"  ⚠️  {key}: skipped {late_rows:,} duplicate/out-of-order M1 rows")
+        return written
+
     def load_for_event(
         self,
         symbol:        str,
@@ -223,6 +357,38 @@ class DukascopyLoader:
         combined = combined[~combined.index.duplicated(keep='first')]
         return combined
 
+    def _chronological(self, csv_paths: list) -> list:
+        """
+        Orders CSVs by their first timestamp. Dukascopy names them
+        "..._01.07.2023-31.12.2023.csv", which does not sort by name.
+        """
+        def first_stamp(path):
+            try:
+                chunk = next(self._iter_csv(path, chunk_rows=1), None)
+            except Exception:
+                chunk = None
+            if chunk is None or chunk.empty:
+                return pd.Timestamp.max.tz_localize("UTC")
+            return chunk.index[0]
+
+        return sorted(sorted(csv_paths), key=first_stamp)
+
+    def _emit(self, store: BarStore, symbol: str, rules: list, m1: pd.DataFrame, written: Dict[str, int]):
+        """
+        Appends complete M1 rows to the store as a resample pyramid: each rule
+        is built from the coarsest finer level that nests into it (M1 → M5 →
+        M15 → H1 → H4 → D1), not from M1 every time.
+        """
+        if m1.empty:
+            return
+        built = [(pd.Timedelta("1min"), m1)]
+        for rule in rules:
+            span = pd.Timedelta(rule)
+            source = next(df for step, df in reversed(built) if span % step == pd.Timedelta(0))
+            bars = self._resample(source, rule)
+            built.append((span, bars))
+            written[rule] += store.append(symbol, rule, bars)
+
     def _find_folder(self, symbol: str) -> Optional[str]:
         """Finds the folder for a given symbol (yfinance or Dukascopy name)."""
         if not os.path.isdir(self.base_dir):
@@ -249,74 +415,150 @@ class DukascopyLoader:
     def _parse_csv(self, path: str) -> Optional[pd.DataFrame]:
         """
         Parses a single Dukascopy M1 CSV file into a standard OHLCV DataFrame.
-
-        Handles two common Dukascopy formats:
-          1. "Gmt time,Open,High,Low,Close,Volume"   (standard)
-          2. "Date,Time,Open,High,Low,Close,Volume"  (older export)
+        Whole-file read; ingest() streams the same parser chunk by chunk.
         """
         try:
-            # Peek at header to detect format
-            with open(path, 'r') as f:
-                first_line = f.readline().strip().lower()
-
-            if "gmt time" in first_line:
-                df = pd.read_csv(path, parse_dates=["Gmt time"],
-                                 date_format="%d.%m.%Y %H:%M:%S.%f")
-                df.rename(columns={"Gmt time": "datetime"}, inplace=True)
-
-            elif "local time" in first_line:
-                df = pd.read_csv(path, parse_dates=["Local time"],
-                                 date_format="%d.%m.%Y %H:%M:%S.%f")
-                df.rename(columns={"Local time": "datetime"}, inplace=True)
-
-            elif "date" in first_line and "time" in first_line:
-                df = pd.read_csv(path)
-                df["datetime"] = pd.to_datetime(
-                    df["Date"].astype(str) + " " + df["Time"].astype(str)
-                )
-                df.drop(columns=["Date", "Time"], errors='ignore', inplace=True)
-
-            elif "," in first_line and len(first_line.split(",")) >= 6 and not any(c.isalpha() for c in first_line.replace(".","").replace(":","").replace(",","")):
-                # No-header MetaTrader format: 2024.01.01,17:00,1.104270,...
-                df = pd.read_csv(path, header=None, names=["date", "time", "open", "high", "low", "close", "volume"])
-                df["datetime"] = pd.to_datetime(df["date"].astype(str) + " " + df["time"].astype(str))
-                df.drop(columns=["date", "time"], inplace=True)
-
-            else:
-                # Try generic parse with first column as datetime
-                df = pd.read_csv(path, parse_dates=[0])
-                df.rename(columns={df.columns[0]: "datetime"}, inplace=True)
-
-            # Normalize column names to lowercase
-            df.columns = [c.lower().strip() for c in df.columns]
-            df.rename(columns={
-                "open":   "open",
-                "high":   "high",
-                "low":    "low",
-                "close":  "close",
-                "volume": "volume",
-            }, inplace=True)
-
-            # Set UTC-aware datetime index
-            df["datetime"] = pd.to_datetime(df["datetime"], utc=True, errors='coerce')
-            df.dropna(subset=["datetime"], inplace=True)
-            df.set_index("datetime", inplace=True)
-
-            # Keep only OHLCV
-            keep = [c for c in ["open", "high", "low", "close", "volume"] if c in df.columns]
-            df = df[keep]
-
-            # Ensure numeric
-            for col in keep:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            df.dropna(subset=["open", "high", "low", "close"], inplace=True)
-
-            return df
+            frames = list(self._iter_csv(path))
+            df = frames[0] if frames else None
+            if df is None:
+                return None
+            return compact_frame(df) if self.compact else df
 
         except Exception as e:
             print(f"  ⚠️  Failed to parse {path}: {e}")
             return None
 
+    def _iter_csv(self, path: str, chunk_rows: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """
+        Yields normalized OHLCV frames from one CSV, `chunk_rows` rows at a time
+        (the whole file in one frame when None).
+
+        Handles the common Dukascopy/MT exports:
+          1. "Gmt time,Open,High,Low,Close,Volume"   (standard)
+          2. "Local time,Open,High,Low,Close,Volume"
+          3. "Date,Time,Open,High,Low,Close,Volume"  (older export)
+          4. No-header MetaTrader "2024.01.01,17:00,1.104270,..."
+          5. Anything else with the datetime in the first column
+
+        Prices are read with explicit float64 dtypes; a file with non-numeric
+        prices is re-read leniently (bad rows dropped), resuming after the last
+        timestamp already yielded so streamed chunks are never replayed.
+        """
+        # Peek at header to detect format
+        with open(path, 'r') as f:
+            header = f.readline().strip()
+        first_line = header.lower()
+        columns = [c for c in header.split(",")]
+        names = None
+
+        if "gmt time" in first_line or "local time" in first_line:
+            kind = "fixed"
+            time_cols = [c for c in columns if c.strip().lower() in ("gmt time", "local time")][:1]
+
+        elif "date" in first_line and "time" in first_line:
+            kind = "split"
+            time_cols = [c for c in columns if c.strip().lower() in ("date", "time")]
+
+        elif "," in first_line and len(columns) >= 6 and not any(c.isalpha() for c in first_line.replace(".","").replace(":","").replace(",","")):
+            # No-header MetaTrader format: 2024.01.01,17:00,1.104270,...
+            kind = "split"
+            names = ["date", "time", "open", "high", "low", "close", "volume"]
+            columns, time_cols = names, ["date", "time"]
+
+        else:
+            kind = "generic"
+            time_cols = columns[:1]
+
+        text_dtypes = {c: str for c in time_cols}
+        typed = dict(text_dtypes, **{c: np.float64 for c in columns if c.strip().lower() in BAR_COLUMNS})
+        last = None
+        try:
+            for chunk in self._read_chunks(path, chunk_rows, names, typed, kind, time_cols):
+                if not chunk.empty:
+                    last = chunk.index.max() if last is None else max(last, chunk.index.max())
+                yield chunk
+        except ValueError as e:
+            print(f"  ⚠️  {os.path.basename(path)}: non-numeric prices ({e}), re-reading leniently")
+            for chunk in self._read_chunks(path, chunk_rows, names, text_dtypes, kind, time_cols):
+                yield chunk if last is None else chunk[chunk.index > last]
+
+    def _read_chunks(self, path, chunk_rows, names, dtypes, kind, time_cols) -> Iterator[pd.DataFrame]:
+        options = dict(header=None if names else 0, names=names, dtype=dtypes)
+        if chunk_rows is None:
+            yield self._normalize_chunk(pd.read_csv(path, **options), kind, time_cols)
+            return
+        with pd.read_csv(path, chunksize=chunk_rows, **options) as reader:
+            for raw in reader:
+                yield self._normalize_chunk(raw, kind, time_cols)
+
+    def _normalize_chunk(self, raw: pd.DataFrame, kind: str, time_cols: list) -> pd.DataFrame:
+        """Raw CSV rows → UTC-indexed float OHLCV (unparseable rows dropped)."""
+        if kind == "fixed":
+            stamps = self._parse_timestamps(raw[time_cols[0]])
+        elif kind == "split":
+            stamps = pd.to_datetime(raw[time_cols[0]].astype(str) + " " + raw[time_cols[1]].astype(str),
+                                    utc=True, errors='coerce')
+        else:
+            stamps = pd.to_datetime(raw[time_cols[0]], utc=True, errors='coerce')
+
+        df = raw.drop(columns=time_cols)
+        # Normalize column names to lowercase
+        df.columns = [c.lower().strip() for c in df.columns]
+        df.index = pd.DatetimeIndex(stamps, name="datetime")
+        df = df[df.index.notna()]
+
+        # Keep only OHLCV, ensure numeric
+        keep = [c for c in BAR_COLUMNS if c in df.columns]
+        df = df[keep]
+        for col in keep:
+            if df[col].dtype != np.float64:
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+        return df.dropna(subset=["open", "high", "low", "close"])
+
+    @staticmethod
+    def _parse_timestamps(values: pd.Series) -> pd.DatetimeIndex:
+        """
+        Fast path for Dukascopy's fixed-width "dd.mm.YYYY HH:MM:SS.fff" stamps:
+        the digits are sliced out of a byte matrix and combined arithmetically
+        (days-from-civil), ~5x faster than format-based pd.to_datetime. Any row that
+        deviates from the layout sends the whole chunk to pd.to_datetime.
+        """
+        try:
+            raw = np.asarray(values.to_numpy(), dtype="S24")
+        except (UnicodeEncodeError, ValueError, TypeError):
+            raw = None
+
+        if raw is not None and len(raw):
+            b = raw.view(np.uint8).reshape(len(raw), 24)
+            d = b.astype(np.int64) - 48
+            digits = [0, 1, 3, 4, 6, 7, 8, 9, 11, 12, 14, 15, 17, 18, 20, 21, 22]
+            layout_ok = (
+                (b[:, 23] == 0).all()
+                and (b[:, [2, 5, 19]] == ord(".")).all()
+                and (b[:, 10] == ord(" ")).all()
+                and (b[:, [13, 16]] == ord(":")).all()
+                and ((d[:, digits] >= 0) & (d[:, digits] <= 9)).all()
+            )
+            if layout_ok:
+                day = d[:, 0] * 10 + d[:, 1]
+                month = d[:, 3] * 10 + d[:, 4]
+                year = d[:, 6] * 1000 + d[:, 7] * 100 + d[:, 8] * 10 + d[:, 9]
+                # Howard Hinnant's days_from_civil
+                y = year - (month <= 2)
+                era = y // 400
+                yoe = y - era * 400
+                doy = (153 * (month + np.where(month > 2, -3, 9)) + 2) // 5 + day - 1
+                days = era * 146097 + yoe * 365 + yoe // 4 - yoe // 100 + doy - 719468
+                seconds = ((days * 24 + d[:, 11] * 10 + d[:, 12]) * 60 + d[:, 14] * 10 + d[:, 15]) * 60 \
+                    + d[:, 17] * 10 + d[:, 18]
+                micros = seconds * 1_000_000 + (d[:, 20] * 100 + d[:, 21] * 10 + d[:, 22]) * 1000
+                return pd.DatetimeIndex(micros.view("datetime64[us]")).tz_localize("UTC")
+
+        stamps = pd.to_datetime(values, format="%d.%m.%Y %H:%M:%S.%f", utc=True, errors='coerce')
+        if stamps.isna().all():
+            stamps = pd.to_datetime(values, utc=True, errors='coerce')
+        return pd.DatetimeIndex(stamps)
+
     def _resample(self, df: pd.DataFrame, rule: str) -> pd.DataFrame:
         """Resamples M1 OHLCV data to a coarser timeframe."""
         agg = {
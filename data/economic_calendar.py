@@ -0,0 +1,102 @@
+"""
+Economic Calendar Index
+=======================
+The weekly calendar parsed once into per-(currency, impact) arrays of sorted
+UTC timestamps. "Is there High-impact USD news within ±30 minutes of now" is
+two bisects instead of a pd.to_datetime per event, per symbol, per strategy
+call.
+
+Strategies receive the same event list for every symbol in a cycle, so
+CalendarIndex.for_events() keeps the index of the most recent lists and
+rebuilds only when a new calendar arrives.
+
+Usage:
+    index = CalendarIndex.for_events(news_events)
+    index.has_event_near({"EUR", "USD"}, now_utc, 30, ("High",))
+    for event_time, event in index.events_near({"EUR", "USD"}, now_utc, 30, NEWS_IMPACT_LEVELS):
+        ...
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+# Recently indexed event lists (by identity), newest last
+INDEX_MEMO_SIZE = 4
+
+
+class CalendarIndex:
+    """Sorted event times per (currency, impact) for O(log n) window queries."""
+
+    _memo: List[Tuple[list, int, "CalendarIndex"]] = []
+
+    def __init__(self, events: Iterable[dict]):
+        entries: Dict[Tuple[str, str], List[Tuple[float, datetime, dict]]] = {}
+        for event in events:
+            event_time = self.event_time(event)
+            if event_time is None:
+                continue
+            key = (event.get('country'), event.get('impact'))
+            entries.setdefault(key, []).append((event_time.timestamp(), event_time, event))
+
+        self._times: Dict[Tuple[str, str], List[float]] = {}
+        self._events: Dict[Tuple[str, str], List[Tuple[datetime, dict]]] = {}
+        for key, rows in entries.items():
+            rows.sort(key=lambda row: row[0])
+            self._times[key] = [row[0] for row in rows]
+            self._events[key] = [(row[1], row[2]) for row in rows]
+
+    @classmethod
+    def for_events(cls, events: list) -> "CalendarIndex":
+        """Index for an event list, reused while the same (unchanged) list is passed in."""
+        for memo_events, size, index in cls._memo:
+            if memo_events is events and size == len(events):
+                return index
+        index = cls(events)
+        # The memo holds the list itself, so its id cannot be recycled while cached
+        cls._memo = (cls._memo + [(events, len(events), index)])[-INDEX_MEMO_SIZE:]
+        return index
+
+    @staticmethod
+    def event_time(event: dict) -> Optional[datetime]:
+        """UTC time of a calendar event (FF JSON dates are ISO with offset); None if unparseable."""
+        raw = event.get('date')
+        if not raw:
+            return None
+        try:
+            event_time = datetime.fromisoformat(raw) if isinstance(raw, str) else None
+        except ValueError:
+            event_time = None
+        if event_time is None:
+            try:
+                event_time = pd.to_datetime(raw).to_pydatetime()
+            except (ValueError, TypeError):
+                return None
+        if event_time.tzinfo is None:
+            return event_time.replace(tzinfo=timezone.utc)
+        return event_time.astimezone(timezone.utc)
+
+    def events_near(self, currencies: Iterable[str], at: datetime, minutes: float,
+                    impacts: Iterable[str]) -> List[Tuple[datetime, dict]]:
+        """(utc time, event) pairs within ±minutes of `at`, in time order."""
+        low, high = at.timestamp() - minutes * 60, at.timestamp() + minutes * 60
+        found = []
+        for currency in currencies:
+            for impact in impacts:
+                times = self._times.get((currency, impact))
+                if times:
+                    found.extend(self._events[(currency, impact)][bisect_left(times, low):bisect_right(times, high)])
+        found.sort(key=lambda pair: pair[0])
+        return found
+
+    def has_event_near(self, currencies: Iterable[str], at: datetime, minutes: float,
+                       impacts: Iterable[str]) -> bool:
+        low, high = at.timestamp() - minutes * 60, at.timestamp() + minutes * 60
+        for currency in currencies:
+            for impact in impacts:
+                times = self._times.get((currency, impact))
+                if times and bisect_left(times, low) < bisect_right(times, high):
+                    return True
+        return False
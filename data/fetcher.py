@@ -1,33 +1,53 @@
-import yfinance as yf
 import pandas as pd
-try:
-    from curl_cffi import requests as requests_cffi
-except ImportError:
-    import requests as requests_cffi
 from typing import Dict, Optional
 from config.config import SYMBOLS, NARRATIVE_TF, STRUCTURE_TF, ENTRY_TF, INSTITUTIONAL_TF
 from config.manager import config_manager
+from core.metrics import REGISTRY
 from indicators.calculations import IndicatorCalculator
 import warnings
 import logging
+import time
 from datetime import timedelta
 
+# yfinance (~1s to import with its pandas/bs4/curl_cffi stack) loads on the first
+# network fetch, not with this module: replay/MT5-only processes never pay for it
+
 # Suppress noisy warnings
 warnings.simplefilter(action='ignore', category=FutureWarning)
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 logging.getLogger('yfinance').setLevel(logging.CRITICAL)
 
+FETCH_SECONDS = REGISTRY.histogram("data_fetch_seconds", "Market data fetch latency", ("timeframe",))
+FETCH_FAILURES = REGISTRY.counter("data_fetch_failures_total", "Market data fetches returning no bars", ("timeframe",))
+# Seconds before the HTTP session (cookie jar, connection pool) is replaced by a fresh one
+SESSION_MAX_AGE = 6 * 3600
+
 class DataFetcher:
     _session = None
+    _session_born = 0.0
+    # Recorded-bar source behind provider "replay" (core.replay.ReplayFeed)
+    _replay_feed = None
 
     @staticmethod
     def _get_provider() -> str:
         """Fetch current data provider from the centralized config manager."""
         return config_manager.get("data_provider", "yfinance", refresh=True)
 
+    @staticmethod
+    def set_replay_feed(feed) -> None:
+        """Attaches (or with None detaches) the bar source served when data_provider is "replay"."""
+        DataFetcher._replay_feed = feed
+
     @staticmethod
     def _get_session():
+        if DataFetcher._session is not None and time.monotonic() - DataFetcher._session_born > SESSION_MAX_AGE:
+            try:
+                DataFetcher._session.close()
+            except Exception:
+                pass
+            DataFetcher._session = None
         if DataFetcher._session is None:
+            DataFetcher._session_born = time.monotonic()
             try:
                 from curl_cffi import requests as curl_requests
                 # impersonate="chrome" is critical for bypassing Yahoo Finance anti-scraping
@@ -46,6 +66,7 @@ class DataFetcher:
         Fetch historical data for a symbol with exponential backoff.
         """
         import time
+        import yfinance as yf
         max_retries = 3
         backoff = 2
         
@@ -105,6 +126,7 @@ class DataFetcher:
         Fetch historical data for a symbol within a date range with retries.
         """
         import time
+        import yfinance as yf
         max_retries = 3
         backoff = 2
         
@@ -159,9 +181,22 @@ class DataFetcher:
     @staticmethod
     async def fetch_data_async(symbol: str, timeframe: str, period: str = "5d") -> Optional[pd.DataFrame]:
         """Asynchronous fetch with intelligent provider routing (MT5 vs yfinance)."""
+        with FETCH_SECONDS.time(timeframe=timeframe):
+            df = await DataFetcher._fetch_data_async(symbol, timeframe, period)
+        if df is None or df.empty:
+            FETCH_FAILURES.inc(timeframe=timeframe)
+        return df
+
+    @staticmethod
+    async def _fetch_data_async(symbol: str, timeframe: str, period: str) -> Optional[pd.DataFrame]:
         import asyncio
         provider = DataFetcher._get_provider()
 
+        # 0. Offline replay: recorded bars closed at the simulated clock, never the network
+        if provider == "replay":
+            feed = DataFetcher._replay_feed
+            return feed.bars(symbol, timeframe, period) if feed is not None else None
+
         # 1. Attempt MT5 Broker Fetch if selected AND available
         from core.direct_mt5_engine import MT5_AVAILABLE
         if provider == "mt5" and MT5_AVAILABLE and not any(m in symbol for m in ["DXY", "DX-Y", "TNX", "^TNX"]):
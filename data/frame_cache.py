@@ -0,0 +1,262 @@
+"""
+Prepared Frame Cache
+====================
+Content-addressed disk cache for backtest data preparation, so repeat and
+overlapping-range runs skip both the network and IndicatorCalculator.
+
+Two kinds of entries share one LRU size budget:
+
+  prepared  Indicator-enriched frames. Key = hash of (symbol, timeframe,
+            range, indicator columns, IndicatorCalculator.fingerprint(),
+            data source). Hits are exact: same inputs, same frame.
+  raw       Downloaded bars per (symbol, timeframe, source) with the date
+            range they cover. An overlapping range only downloads the
+            uncovered head/tail (missing_ranges) and merges it in.
+
+Each entry is a directory of raw little-endian column arrays plus an int64
+ns index, read via np.memmap. Text columns (e.g. `regime`) are stored as
+int32 category codes. meta.json is written last and commits the entry.
+Its mtime is the LRU clock: reads touch it, and put() evicts the
+least-recently-used entries beyond max_bytes.
+
+Ranges that reach past the fetch time (a backtest ending today) are still
+forming, so such entries expire after OPEN_RANGE_TTL.
+
+Usage:
+    cache = FrameCache("data/frame_cache", max_bytes=2 * 1024**3)
+    key = cache.key("EURUSD=X", "5m", "2024-01-01", "2024-02-01", sorted(cols), fingerprint, "yf")
+    df = cache.get(key)
+    if df is None:
+        df = prepare(...)
+        cache.put(key, df, end="2024-02-01")
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+# Entries whose range extends past their fetch time are refreshed after this
+OPEN_RANGE_TTL = pd.Timedelta(minutes=15)
+
+
+class FrameCache:
+    """LRU-bounded, memory-mappable cache of prepared and raw bar frames."""
+
+    def __init__(self, root: str = "data/frame_cache", max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(*parts) -> str:
+        """Stable content key for any JSON-serializable parts."""
+        blob = json.dumps(parts, sort_keys=True, default=str).encode()
+        return hashlib.sha256(blob).hexdigest()[:32]
+
+    # ── Prepared frames ────────────────────────────────────────────────────────
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        meta = self._meta(key)
+        if meta is None or self._expired(meta):
+            return None
+        df = self._read(key, meta)
+        os.utime(self._meta_path(key))
+        return df
+
+    def put(self, key: str, df: pd.DataFrame, end: Optional[str] = None, **info) -> None:
+        """Stores `df` under `key`; `end` marks the range end for open-range expiry."""
+        if df is None or df.empty:
+            return
+        self._write(key, df, {"kind": "prepared", "end": end, **info})
+        self.evict()
+
+    # ── Raw downloaded bars ────────────────────────────────────────────────────
+
+    def missing_ranges(self, symbol: str, timeframe: str, source: str,
+                       start: str, end: str) -> List[Tuple[str, str]]:
+        """Date ranges of [start, end) not yet covered by the raw series."""
+        meta = self._meta(self._raw_key(symbol, timeframe, source))
+        if meta is None:
+            return [(start, end)]
+        covered_start, covered_end = meta["covered_start"], meta["covered_end"]
+        # Days from the fetch day on were still forming when downloaded
+        if covered_end > meta["fetched_day"] and self._expired({**meta, "end": covered_end}):
+            covered_end = meta["fetched_day"]
+        if end <= covered_start or start >= covered_end:
+            return [(start, end)]
+        missing = []
+        if start < covered_start:
+            missing.append((start, covered_start))
+        if end > covered_end:
+            missing.append((covered_end, end))
+        return missing
+
+    def add_bars(self, symbol: str, timeframe: str, source: str, df: Optional[pd.DataFrame],
+                 start: str, end: str) -> None:
+        """Merges bars downloaded for [start, end) into the raw series (newer rows win)."""
+        if df is None or df.empty:
+            return
+        key = self._raw_key(symbol, timeframe, source)
+        meta = self._meta(key)
+        now = pd.Timestamp.now(tz="UTC")
+        covered_end = min(end, (now + pd.Timedelta(days=1)).strftime('%Y-%m-%d'))
+        fetched_day = now.strftime('%Y-%m-%d')
+
+        if meta is not None and start <= meta["covered_end"] and covered_end >= meta["covered_start"]:
+            existing = self._read(key, meta)
+            df = pd.concat([existing, df[existing.columns.intersection(df.columns)]])
+            df = df[~df.index.duplicated(keep="last")].sort_index()
+            start = min(start, meta["covered_start"])
+            if covered_end < meta["covered_end"]:
+                # Head-only refill: the tail keeps its original download day
+                covered_end, fetched_day = meta["covered_end"], meta["fetched_day"]
+        self._write(key, df, {"kind": "raw", "symbol": symbol, "timeframe": timeframe, "source": source,
+                              "covered_start": start, "covered_end": covered_end, "fetched_day": fetched_day})
+        self.evict()
+
+    def read_bars(self, symbol: str, timeframe: str, source: str,
+                  start: str, end: str) -> Optional[pd.DataFrame]:
+        key = self._raw_key(symbol, timeframe, source)
+        meta = self._meta(key)
+        if meta is None:
+            return None
+        df = self._read(key, meta)
+        os.utime(self._meta_path(key))
+        df = df[(df.index >= pd.Timestamp(start, tz="UTC")) & (df.index < pd.Timestamp(end, tz="UTC"))]
+        return df if not df.empty else None
+
+    # ── Maintenance ────────────────────────────────────────────────────────────
+
+    def entries(self) -> List[dict]:
+        """Committed entries with key, bytes and last access (oldest first)."""
+        result = []
+        if not os.path.isdir(self.root):
+            return result
+        for name in os.listdir(self.root):
+            path = self._meta_path(name)
+            if os.path.exists(path):
+                result.append({"key": name, "bytes": self._meta(name).get("bytes", 0),
+                               "accessed": os.path.getmtime(path)})
+        return sorted(result, key=lambda e: e["accessed"])
+
+    def size(self) -> int:
+        return sum(e["bytes"] for e in self.entries())
+
+    def evict(self) -> int:
+        """Deletes least-recently-used entries until under max_bytes. Returns bytes freed."""
+        entries = self.entries()
+        total = sum(e["bytes"] for e in entries)
+        freed = 0
+        for entry in entries:
+            if total - freed <= self.max_bytes:
+                break
+            shutil.rmtree(os.path.join(self.root, entry["key"]), ignore_errors=True)
+            freed += entry["bytes"]
+        return freed
+
+    def clear(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    # ── Internal ───────────────────────────────────────────────────────────────
+
+    def _write(self, key: str, df: pd.DataFrame, meta: dict) -> None:
+        """Writes a complete entry next to the old one, then swaps directories."""
+        os.makedirs(self.root, exist_ok=True)
+        folder = os.path.join(self.root, key)
+        staging = f"{folder}.tmp-{os.getpid()}"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+
+        index = pd.DatetimeIndex(df.index)
+        index_ns = (index.tz_convert("UTC") if index.tz is not None else index).as_unit("ns").asi8
+        index_ns.astype("<i8").tofile(os.path.join(staging, "index.i8"))
+        columns, nbytes = {}, index_ns.nbytes
+        for i, col in enumerate(df.columns):
+            values, spec = self._encode(df[col])
+            spec["file"] = f"{i}.bin"
+            values.tofile(os.path.join(staging, spec["file"]))
+            columns[col] = spec
+            nbytes += values.nbytes
+
+        meta.update({
+            "rows": len(df), "bytes": nbytes, "columns": columns,
+            "index_name": index.name, "index_tz": str(index.tz) if index.tz is not None else None,
+            "index_unit": index.unit, "indicators": sorted(df.attrs.get("indicators", ())),
+            "written_at": pd.Timestamp.now(tz="UTC").isoformat(),
+        })
+        with open(os.path.join(staging, "meta.json"), "w") as f:
+            json.dump(meta, f)
+
+        retired = f"{folder}.old-{os.getpid()}"
+        if os.path.isdir(folder):
+            os.replace(folder, retired)
+        os.replace(staging, folder)
+        shutil.rmtree(retired, ignore_errors=True)
+
+    def _read(self, key: str, meta: dict) -> pd.DataFrame:
+        folder = os.path.join(self.root, key)
+        rows = meta["rows"]
+        index_ns = np.memmap(os.path.join(folder, "index.i8"), dtype="<i8", mode="r", shape=(rows,))
+        index = pd.DatetimeIndex(index_ns.view("datetime64[ns]"), name=meta["index_name"])
+        if meta["index_tz"]:
+            index = index.tz_localize("UTC").tz_convert(meta["index_tz"])
+        index = index.as_unit(meta["index_unit"])
+
+        data = {}
+        for col, spec in meta["columns"].items():
+            values = np.memmap(os.path.join(folder, spec["file"]), dtype=spec["dtype"], mode="r", shape=(rows,))
+            # Read-only views: pages load lazily, pandas copies on first write
+            data[col] = self._decode(np.asarray(values), spec)
+        df = pd.DataFrame(data, index=index)
+        if meta.get("indicators"):
+            df.attrs["indicators"] = set(meta["indicators"])
+        return df
+
+    @staticmethod
+    def _encode(series: pd.Series) -> Tuple[np.ndarray, dict]:
+        if pd.api.types.is_bool_dtype(series.dtype):
+            return series.to_numpy(dtype="|b1"), {"dtype": "|b1"}
+        if pd.api.types.is_numeric_dtype(series.dtype) and not isinstance(series.dtype, pd.CategoricalDtype):
+            dtype = np.dtype(series.dtype).newbyteorder("<")
+            return series.to_numpy(dtype=dtype), {"dtype": dtype.str}
+        # Text / categorical: int32 codes (-1 = missing) + categories
+        categorical = series.astype("category")
+        return categorical.cat.codes.to_numpy(dtype="<i4"), {
+            "dtype": "<i4", "categories": [str(c) for c in categorical.cat.categories],
+            "categorical": isinstance(series.dtype, pd.CategoricalDtype),
+        }
+
+    @staticmethod
+    def _decode(values: np.ndarray, spec: dict):
+        if "categories" not in spec:
+            return values
+        decoded = pd.Categorical.from_codes(values, categories=spec["categories"])
+        return decoded if spec.get("categorical") else np.asarray(decoded.astype(object))
+
+    def _meta(self, key: str) -> Optional[dict]:
+        path = self._meta_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.root, key, "meta.json")
+
+    def _raw_key(self, symbol: str, timeframe: str, source: str) -> str:
+        return "raw-" + self.key(symbol, timeframe, source)
+
+    @staticmethod
+    def _expired(meta: dict) -> bool:
+        written = pd.Timestamp(meta["written_at"])
+        if meta.get("end") is None or pd.Timestamp(meta["end"], tz="UTC") <= written:
+            return False
+        return pd.Timestamp.now(tz="UTC") - written > OPEN_RANGE_TTL
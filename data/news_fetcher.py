@@ -1,9 +1,18 @@
+import json
+import os
+import time
+import tempfile
 import requests
 import pandas as pd
 from datetime import datetime, timezone
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from config.config import NEWS_WASH_ZONE, NEWS_IMPACT_LEVELS
 
+# Last good calendar (outage fallback) and its HTTP validators
+CALENDAR_DIR = "data/calendar"
+# FF publishes the week's calendar once and revises it rarely; don't ask more than every 10 min
+CALENDAR_TTL = 600
+
 class NewsFetcher:
     CALENDAR_URL = "https://nfs.forexfactory1.com/ff_calendar_thisweek.json"
 
@@ -11,17 +20,74 @@ class NewsFetcher:
     def fetch_news() -> List[Dict]:
         """
         Fetches the Forex Factory economic calendar for the current week.
+
+        The last good copy is kept on disk: within CALENDAR_TTL it is returned
+        without a request, after that the request is conditional (ETag /
+        Last-Modified, so an unchanged calendar is a bodyless 304), and during
+        an outage it is served as-is.
         """
+        cached, meta = NewsFetcher._load_cached()
+        if cached is not None and time.time() - meta.get('fetched_at', 0) < CALENDAR_TTL:
+            return cached
+
+        headers = {}
+        if cached is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
         try:
-            response = requests.get(NewsFetcher.CALENDAR_URL, timeout=10)
+            response = requests.get(NewsFetcher.CALENDAR_URL, headers=headers, timeout=10)
+            if response.status_code == 304 and cached is not None:
+                NewsFetcher._store_cached(cached, {**meta, 'fetched_at': time.time()})
+                return cached
             if response.status_code == 200:
                 events = response.json()
+                validators = {'etag': response.headers.get('ETag'),
+                              'last_modified': response.headers.get('Last-Modified')}
+                NewsFetcher._store_cached(events, {
+                    **{k: v for k, v in validators.items() if isinstance(v, str)},
+                    'fetched_at': time.time(),
+                })
                 return events
-            else:
-                return []
         except Exception:
-            # Silent fail — system defaults to no-news safety (allow all trades)
-            return []
+            pass
+        # Silent fail — last known calendar, else no-news safety (allow all trades)
+        return cached if cached is not None else []
+
+    @staticmethod
+    async def fetch_news_async() -> List[Dict]:
+        """fetch_news without blocking the event loop."""
+        import asyncio
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, NewsFetcher.fetch_news)
+
+    @staticmethod
+    def _load_cached() -> Tuple[Optional[List[Dict]], Dict]:
+        try:
+            with open(os.path.join(CALENDAR_DIR, "calendar.json"), "r") as f:
+                events = json.load(f)
+            with open(os.path.join(CALENDAR_DIR, "meta.json"), "r") as f:
+                return events, json.load(f)
+        except (OSError, ValueError):
+            return None, {}
+
+    @staticmethod
+    def _store_cached(events: List[Dict], meta: Dict) -> None:
+        try:
+            os.makedirs(CALENDAR_DIR, exist_ok=True)
+            for name, payload in (("calendar.json", events), ("meta.json", meta)):
+                # Unique temp name: concurrent refreshes (processes or executor threads) never share one
+                fd, tmp = tempfile.mkstemp(prefix=f"{name}.", suffix=".tmp", dir=CALENDAR_DIR)
+                try:
+                    with os.fdopen(fd, "w") as f:
+                        json.dump(payload, f)
+                    os.replace(tmp, os.path.join(CALENDAR_DIR, name))
+                except BaseException:
+                    os.unlink(tmp)
+                    raise
+        except OSError as e:
+            print(f"⚠️ Could not persist the economic calendar: {e}")
 
     @staticmethod
     def get_upcoming_events() -> List[Dict]:
@@ -1,7 +1,4 @@
 import time
-import json
-import os
-from datetime import datetime
 try:
     import MetaTrader5 as mt5
 except ImportError:
@@ -10,13 +7,15 @@ except ImportError:
 
 from config.config import MT5_LOGIN, MT5_PASSWORD, MT5_SERVER, SPREAD_PIPS, SLIPPAGE_PIPS
 from core.filters.risk_manager import RiskManager
+from mt5_bridge.signal_feed import SignalFeedReader
 
 class MT5Handler:
     """
     MT5 Execution Layer (V16.1)
     Bridges Alpha Core signals to live MT5 orders.
     """
-    BRIDGE_FILE = "mt5_bridge/signals_mt5.json"
+    FEED_DIR = "mt5_bridge/feed"
+    MAX_SIGNAL_AGE_MINUTES = 60
 
     def __init__(self):
         self.connected = False
@@ -33,22 +32,21 @@ class MT5Handler:
 
     def run(self):
         print("🔄 MT5 Monitor active. Watching for signals...")
+        # Resumes after the last signal this handler acknowledged (feed/mt5_handler.seq)
+        reader = SignalFeedReader(self.FEED_DIR, consumer="mt5_handler")
         while True:
             try:
-                if os.path.exists(self.BRIDGE_FILE):
-                    with open(self.BRIDGE_FILE, 'r') as f:
-                        signals = json.load(f)
-                    
-                    if signals:
-                        # Process the latest signal that hasn't been executed
-                        latest_signal = signals[-1]
-                        if not latest_signal.get('executed'):
-                            self.execute_signal(latest_signal)
-                            
-                            # Mark as executed in the JSON file
-                            latest_signal['executed'] = True
-                            with open(self.BRIDGE_FILE, 'w') as f:
-                                json.dump(signals, f, indent=4)
+                for record in reader.poll(max_age_minutes=self.MAX_SIGNAL_AGE_MINUTES):
+                    try:
+                        done = self.execute_signal(record["signal"])
+                    except Exception as e:
+                        print(f"⚠️ Execution error on feed seq {record['seq']}: {e}")
+                        done = False
+                    if not done:
+                        # Not acknowledged: retried next poll until it ages out
+                        reader.rewind(record["seq"])
+                        break
+                    reader.ack(record["seq"])
                 
                 time.sleep(1) # Poll every second
             except Exception as e:
@@ -56,6 +54,7 @@ class MT5Handler:
                 time.sleep(5)
 
     def execute_signal(self, signal):
+        """Returns False when the signal should be retried (no connection, order rejected)."""
         symbol = signal['symbol'].replace("=X", "") # Normalize for MT5
         direction = signal['direction']
         entry = signal['entry']
@@ -68,14 +67,14 @@ class MT5Handler:
             self.connect()
             if not self.connected:
                 print("❌ Aborting: MT5 not connected.")
-                return
+                return False
 
         # Pre-Flight: Live Spread Check
         if mt5:
             symbol_info = mt5.symbol_info(symbol)
             if symbol_info is None:
                 print(f"❌ Symbol {symbol} not found in MT5.")
-                return
+                return True
             
             if not symbol_info.visible:
                 mt5.symbol_select(symbol, True)
@@ -88,7 +87,7 @@ class MT5Handler:
             
             if live_spread_pips > (SPREAD_PIPS + SLIPPAGE_PIPS) * 1.5:
                 print(f"⚠️ High Spread Detected ({live_spread_pips} pips). Skipping for safety.")
-                return
+                return True
 
         # Execute Market Order
         if mt5:
@@ -112,10 +111,11 @@ class MT5Handler:
             result = mt5.order_send(request)
             if result.retcode != mt5.TRADE_RETCODE_DONE:
                 print(f"❌ Order failed: {result.comment} (Code: {result.retcode})")
-            else:
-                print(f"💰 Order Executed: {direction} {signal['lots']} {symbol} at {result.price}")
+                return False
+            print(f"💰 Order Executed: {direction} {signal['lots']} {symbol} at {result.price}")
         else:
             print(f"📝 [MOCK] Executed {direction} {signal['lots']} {symbol} at {entry}")
+        return True
 
 if __name__ == "__main__":
     handler = MT5Handler()
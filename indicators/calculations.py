@@ -1,16 +1,97 @@
+import hashlib
 import pandas as pd
 import pandas_ta_classic as ta
+from typing import Dict, Iterable, List, Optional, Set
 from config.config import (
     EMA_FAST, EMA_SLOW, RSI_PERIOD, ATR_PERIOD, ATR_AVG_PERIOD, 
     EMA_TREND, ADR_PERIOD
 )
 from datetime import time
+from data.compact_frames import upcast_quotes
+
+# Bump whenever a builder's output changes: invalidates cached prepared frames
+# (data.frame_cache) that were keyed by fingerprint().
+INDICATOR_VERSION = 1
+
+# ── Indicator Column Registry ────────────────────────────────────────────────
+# Every column add_indicators can produce, with the columns it depends on and a
+# builder returning {column: series}. `ema_<N>` columns are resolved on demand.
+def _ema_spec(length: int):
+    return (), lambda df: {f'ema_{length}': ta.ema(df['close'], length=length)}
+
+
+def _adx_builder(df: pd.DataFrame) -> dict:
+    # pandas_ta_classic: adx(high, low, close, length) -> returns DF with ADX, DIP, DIN
+    adx_df = ta.adx(df['high'], df['low'], df['close'], length=14)
+    if adx_df is None:
+        return {}
+    return {'adx': adx_df['ADX_14'], 'di_plus': adx_df['DMP_14'], 'di_minus': adx_df['DMN_14']}
+
+
+def _zscore_builder(df: pd.DataFrame) -> dict:
+    # Z-Score (20-period) for Statistical Arbitrage strategy
+    rolling_mean = df['close'].rolling(20).mean()
+    rolling_std = df['close'].rolling(20).std()
+    return {'zscore_20': (df['close'] - rolling_mean) / rolling_std.replace(0, float('nan'))}
+
+
+def _ema_slope_builder(df: pd.DataFrame) -> dict:
+    ema_trend = df[f'ema_{EMA_TREND}']
+    return {'ema_slope': ((ema_trend - ema_trend.shift(3)) / ema_trend.shift(3)) * 100}
+
+
+def _regime_builder(df: pd.DataFrame) -> dict:
+    regime = pd.Series("RANGING", index=df.index)
+    regime[(df['vol_ratio'] > 1.2) & (df['ema_slope'].abs() > 0.05)] = "TRENDING"
+    regime[(df['vol_ratio'] < 0.8)] = "CHOPPY"
+    return {'regime': regime}
+
+
+def _h4_levels_builder(df: pd.DataFrame) -> dict:
+    h4_lvls = IndicatorCalculator.calculate_h4_levels(df)
+    return {'h4_high': h4_lvls['h4_high'], 'h4_low': h4_lvls['h4_low']}
+
+
+INDICATOR_SPECS = {
+    'rsi':       ((), lambda df: {'rsi': ta.rsi(df['close'], length=RSI_PERIOD)}),
+    'atr':       ((), lambda df: {'atr': ta.atr(df['high'], df['low'], df['close'], length=ATR_PERIOD)}),
+    'adx':       ((), _adx_builder),
+    'di_plus':   ((), _adx_builder),
+    'di_minus':  ((), _adx_builder),
+    # ATR Average for volatility filter
+    'atr_avg':   (('atr',), lambda df: {'atr_avg': df['atr'].rolling(window=ATR_AVG_PERIOD).mean()}),
+    'atr_ma_20': (('atr',), lambda df: {'atr_ma_20': df['atr'].rolling(window=20).mean()}),  # Restored for Price Action
+    'adr':       ((), lambda df: {'adr': IndicatorCalculator.calculate_adr(df)}),
+    'h4_high':   ((), _h4_levels_builder),
+    'h4_low':    ((), _h4_levels_builder),
+    'zscore_20': ((), _zscore_builder),
+    # Regime Detection
+    'ema_slope': ((f'ema_{EMA_TREND}',), _ema_slope_builder),
+    'vol_ratio': (('atr',), lambda df: {'vol_ratio': df['atr'] / df['atr'].rolling(50).mean()}),
+    'regime':    (('vol_ratio', 'ema_slope'), _regime_builder),
+}
+
+# Full column set, in the historical add_indicators order. ADR is only added on
+# the H1 anchor timeframe and H4 swing levels only on H4, as before.
+def default_columns(timeframe: str) -> tuple:
+    timeframe_cols = {'h1': ('adr',), 'h4': ('h4_high', 'h4_low')}.get(timeframe, ())
+    return (
+        f'ema_{EMA_FAST}', f'ema_{EMA_SLOW}', f'ema_{EMA_TREND}',
+        'ema_20', 'ema_50', 'ema_100', 'ema_200',  # ema_200 for swing strategy mean reversion
+        'rsi', 'atr', 'adx', 'di_plus', 'di_minus', 'atr_avg', 'atr_ma_20',
+    ) + timeframe_cols + ('zscore_20', 'ema_slope', 'vol_ratio', 'regime')
+
 
 class IndicatorCalculator:
     @staticmethod
-    def add_indicators(df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    def add_indicators(df: pd.DataFrame, timeframe: str, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
         """
-        Adds EMA, RSI, and ATR to the dataframe.
+        Adds EMA, RSI, ATR, ADX, z-score and regime columns to the dataframe.
+
+        columns: Only compute these indicator columns (plus their dependencies).
+                 None computes the full default set for the timeframe.
+        Computed columns are memoized in df.attrs, so repeat calls are free.
+        Compact (float32) input is left untouched: the result is a float64 copy.
         """
         if df.empty:
             return df
@@ -26,58 +107,87 @@ class IndicatorCalculator:
         # Standardize column casing (V35.1 Recovery)
         df.columns = [c.lower() for c in df.columns]
 
-        # EMAs
-        df[f'ema_{EMA_FAST}'] = ta.ema(df['close'], length=EMA_FAST)
-        df[f'ema_{EMA_SLOW}'] = ta.ema(df['close'], length=EMA_SLOW)
-        
-        df[f'ema_{EMA_TREND}'] = ta.ema(df['close'], length=EMA_TREND)
-        df['ema_20'] = ta.ema(df['close'], length=20)
-        df['ema_50'] = ta.ema(df['close'], length=50)
-        df['ema_100'] = ta.ema(df['close'], length=100)
-        df['ema_200'] = ta.ema(df['close'], length=200)  # For swing strategy mean reversion
+        # Compact (float32) bars are restored to their float64 quotes first: ADX/DI
+        # sign decisions on tiny high/low diffs drift by points otherwise. That
+        # happens on a copy, so the caller's compact frame stays compact.
+        compact_quotes = [col for col in ('open', 'high', 'low', 'close')
+                          if col in df.columns and df[col].dtype == 'float32']
+        if compact_quotes:
+            attrs = {k: v for k, v in df.attrs.items() if k != 'compact'}
+            df = df.assign(**{col: upcast_quotes(df[col]) for col in compact_quotes})
+            df.attrs = attrs
 
-        # RSI
-        df['rsi'] = ta.rsi(df['close'], length=RSI_PERIOD)
+        if columns is None:
+            columns = default_columns(timeframe)
 
-        # ATR
-        df['atr'] = ta.atr(df['high'], df['low'], df['close'], length=ATR_PERIOD)
-        
-        # ADX (Average Directional Index) for trend strength
-        # pandas_ta_classic: adx(high, low, close, length) -> returns DF with ADX, DIP, DIN
-        adx_df = ta.adx(df['high'], df['low'], df['close'], length=14)
-        if adx_df is not None:
-            df['adx'] = adx_df['ADX_14']
-            df['di_plus'] = adx_df['DMP_14']
-            df['di_minus'] = adx_df['DMN_14']
-        
-        # ATR Average for volatility filter
-        df['atr_avg'] = df['atr'].rolling(window=ATR_AVG_PERIOD).mean()
-        df['atr_ma_20'] = df['atr'].rolling(window=20).mean() # Restored for Price Action
-        
-        # ADR (Average Daily Range) - Only for H1 as it's the anchor TF for daily range
-        if timeframe == "h1":
-            df['adr'] = IndicatorCalculator.calculate_adr(df)
-            
-        if timeframe == "h4":
-            h4_lvls = IndicatorCalculator.calculate_h4_levels(df)
-            df['h4_high'] = h4_lvls['h4_high']
-            df['h4_low'] = h4_lvls['h4_low']
-            
-        # Z-Score (20-period) for Statistical Arbitrage strategy
-        rolling_mean = df['close'].rolling(20).mean()
-        rolling_std = df['close'].rolling(20).std()
-        df['zscore_20'] = (df['close'] - rolling_mean) / rolling_std.replace(0, float('nan'))
-
-        # Regime Detection
-        ema_trend_col = f'ema_{EMA_TREND}'
-        df['ema_slope'] = ((df[ema_trend_col] - df[ema_trend_col].shift(3)) / df[ema_trend_col].shift(3)) * 100
-        df['vol_ratio'] = df['atr'] / df['atr'].rolling(50).mean()
-        df['regime'] = "RANGING"
-        df.loc[(df['vol_ratio'] > 1.2) & (df['ema_slope'].abs() > 0.05), 'regime'] = "TRENDING"
-        df.loc[(df['vol_ratio'] < 0.8), 'regime'] = "CHOPPY"
+        computed = set(df.attrs.get('indicators', ()))
+        for column in IndicatorCalculator.resolve_columns(columns):
+            if column in computed and column in df.columns:
+                continue
+            _, builder = IndicatorCalculator._column_spec(column)
+            for name, series in builder(df).items():
+                df[name] = series
+                computed.add(name)
+        df.attrs['indicators'] = computed
 
         return df
 
+    @staticmethod
+    def fingerprint() -> str:
+        """Short hash of INDICATOR_VERSION and the configured indicator periods."""
+        params = (INDICATOR_VERSION, EMA_FAST, EMA_SLOW, EMA_TREND, RSI_PERIOD,
+                  ATR_PERIOD, ATR_AVG_PERIOD, ADR_PERIOD)
+        return hashlib.sha256(repr(params).encode()).hexdigest()[:16]
+
+    @staticmethod
+    def _column_spec(column: str):
+        if column.startswith('ema_') and column[4:].isdigit():
+            return _ema_spec(int(column[4:]))
+        if column not in INDICATOR_SPECS:
+            raise ValueError(f"Unknown indicator column: {column}")
+        return INDICATOR_SPECS[column]
+
+    @staticmethod
+    def resolve_columns(columns: Iterable[str]) -> List[str]:
+        """
+        Expands requested indicator columns with their dependencies.
+        Returns a de-duplicated list in computation order (dependencies first).
+        """
+        ordered: List[str] = []
+
+        def visit(column: str):
+            if column in ordered:
+                return
+            deps, _ = IndicatorCalculator._column_spec(column)
+            for dep in deps:
+                visit(dep)
+            ordered.append(column)
+
+        for column in columns:
+            visit(column)
+        return ordered
+
+    @staticmethod
+    def merge_requirements(*declarations: Optional[Dict[str, Iterable[str]]]) -> Optional[Dict[str, Set[str]]]:
+        """
+        Union of per-timeframe REQUIRED_INDICATORS declarations from strategies/filters.
+        Returns None (compute everything) if any consumer did not declare its columns.
+        """
+        merged: Dict[str, Set[str]] = {}
+        for declaration in declarations:
+            if declaration is None:
+                return None
+            for tf, cols in declaration.items():
+                merged.setdefault(tf, set()).update(cols)
+        return merged
+
+    @staticmethod
+    def columns_for(requirements: Optional[Dict[str, Set[str]]], tf: str) -> Optional[Set[str]]:
+        """Columns to compute for one timeframe key; None means the full default set."""
+        if requirements is None:
+            return None
+        return requirements.get(tf, set())
+
     @staticmethod
     def get_market_structure(df: pd.DataFrame) -> pd.DataFrame:
         """
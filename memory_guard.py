@@ -7,12 +7,16 @@ import subprocess
 THRESHOLD_MB = 150  # Restart services if available memory < 150MB
 SLEEP_INTERVAL = 300 # Run every 5 minutes
 
-SERVICES = [
-    "smc-signal-service.service",
-    "smc-interactive-bot.service",
-    "smc-admin-dashboard.service",
-    "smc-signal-tracker.service"
-]
+# Service name (as pushed to the metrics DB) -> systemd unit
+SERVICE_UNITS = {
+    "signal_service": "smc-signal-service.service",
+    "interactive_bot": "smc-interactive-bot.service",
+    "admin_server": "smc-admin-dashboard.service",
+    "signal_tracker": "smc-signal-tracker.service",
+}
+SERVICES = list(SERVICE_UNITS.values())
+# Published RSS older than this belongs to a process that is no longer pushing
+STALE_AFTER = 600
 
 def clear_system_caches():
     """Clears pagecache, dentries, and inodes."""
@@ -25,7 +29,25 @@ def clear_system_caches():
     except Exception as e:
         print(f"❌ Error clearing cache: {e}")
 
+def restart_over_budget():
+    """Restarts only the services whose last published RSS exceeds their budget (core.memory)."""
+    from core.memory import read_published
+    restarted = []
+    for service, entry in read_published().items():
+        unit = SERVICE_UNITS.get(service)
+        if not unit or not entry["over_budget"] or time.time() - entry["taken_at"] > STALE_AFTER:
+            continue
+        print(f"🚨 {service} at {entry['rss_mb']:.0f}MB > {entry['budget_mb']:.0f}MB budget. Restarting {unit}...")
+        subprocess.run(["sudo", "systemctl", "restart", unit])
+        restarted.append(service)
+    return restarted
+
 def check_memory_and_guard():
+    try:
+        restart_over_budget()
+    except Exception as e:
+        print(f"❌ Error reading service memory: {e}")
+
     mem = psutil.virtual_memory()
     available_mb = mem.available / (1024 * 1024)
     
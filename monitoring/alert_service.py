@@ -61,7 +61,7 @@ class AlertService:
             return False
     
     async def check_service_down(self):
-        """Alert if service is not running."""
+        """Alert if the signal service stopped pushing metrics (or, before its first push, systemd says so)."""
         status = self.monitor.check_service_status()
         
         if not status['is_running']:
@@ -72,6 +72,42 @@ class AlertService:
                 "Please investigate immediately."
             )
             await self.send_alert(message, alert_type="service_down")
+
+    async def check_stale_services(self):
+        """Alert for any other service whose metrics heartbeat went stale."""
+        for service, heartbeat in self.monitor.get_service_heartbeats().items():
+            if service == 'signal_service' or heartbeat['is_running']:
+                continue
+            message = (
+                f"⚠️ <b>{service} Silent</b>\n\n"
+                f"No metrics pushed for {heartbeat['age_seconds'] / 60:.0f} minutes "
+                f"(last: {heartbeat['last_push']}, pid {heartbeat['pid']}).\n\n"
+                "The process is down or its event loop is stuck."
+            )
+            await self.send_alert(message, alert_type=f"service_down_{service}")
+
+    async def check_fetch_failures(self, threshold: float = 0.5):
+        """Alert if most market-data fetches return nothing."""
+        rate = self.monitor.get_fetch_failure_rate()
+        if rate is not None and rate > threshold:
+            message = (
+                f"⚠️ <b>Data Feed Failing</b>\n\n"
+                f"{rate:.0%} of data fetches returned no bars since the service started.\n"
+                f"Threshold: {threshold:.0%}\n\n"
+                "Check the data provider and rate limits."
+            )
+            await self.send_alert(message, alert_type="fetch_failures")
+
+    async def check_telegram_latency(self, threshold_seconds: float = 5.0):
+        """Alert if Telegram sends are slow enough to delay signals."""
+        p95 = self.monitor.get_telegram_latency_p95()
+        if p95 is not None and p95 > threshold_seconds:
+            message = (
+                f"⚠️ <b>Telegram Slow</b>\n\n"
+                f"p95 send latency is above {threshold_seconds:g}s (bucket ≤ {p95:g}s).\n\n"
+                "Signals reach clients late."
+            )
+            await self.send_alert(message, alert_type="telegram_latency")
     
     async def check_signal_drought(self, hours: int = 2):
         """Alert if no signals generated in N hours."""
@@ -127,6 +163,9 @@ class AlertService:
         print(f"🔍 Running health checks at {datetime.now().isoformat()}")
         
         await self.check_service_down()
+        await self.check_stale_services()
+        await self.check_fetch_failures()
+        await self.check_telegram_latency()
         await self.check_signal_drought(hours=2)
         await self.check_win_rate_anomaly(threshold=45.0)
         await self.check_signal_count_anomaly()
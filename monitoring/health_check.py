@@ -1,12 +1,19 @@
 import requests
 import subprocess
 import os
+import sys
 import time
 import logging
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.metrics import read_pushed
+from monitoring.health_monitor import HEARTBEAT_STALE_SECONDS
+
 # Configuration
 URL = "http://localhost:5000"
-EXPECTED_PROCESSES = ["signal_service.py", "admin_server.py"]
+# Services must have pushed metrics (core.metrics) within HEARTBEAT_STALE_SECONDS
+EXPECTED_SERVICES = ["signal_service", "admin_server"]
 MAX_RETRIES = 3
 CHECK_INTERVAL = 300 # 5 minutes
 
@@ -16,12 +23,10 @@ logging.basicConfig(
     format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
-def check_process(name):
-    try:
-        output = subprocess.check_output(["ps", "aux"]).decode()
-        return name in output
-    except Exception:
-        return False
+def check_heartbeat(service, pushed=None):
+    pushed = read_pushed() if pushed is None else pushed
+    entry = pushed.get(service)
+    return entry is not None and entry["age_seconds"] <= HEARTBEAT_STALE_SECONDS
 
 def check_dashboard():
     try:
@@ -42,11 +47,13 @@ def main():
     retries = 0
     while True:
         dashboard_up = check_dashboard()
-        processes_up = all(check_process(p) for p in EXPECTED_PROCESSES)
+        pushed = read_pushed()
+        services_up = {s: check_heartbeat(s, pushed) for s in EXPECTED_SERVICES}
+        processes_up = all(services_up.values())
         
         if not dashboard_up or not processes_up:
             retries += 1
-            logging.warning(f"🕵️  Health Check Failed ({retries}/{MAX_RETRIES}). Dashboard: {dashboard_up}, Processes: {processes_up}")
+            logging.warning(f"🕵️  Health Check Failed ({retries}/{MAX_RETRIES}). Dashboard: {dashboard_up}, Heartbeats: {services_up}")
             
             if retries >= MAX_RETRIES:
                 restart_services()
@@ -1,20 +1,31 @@
 """
 Health Monitor for Signal Service
 Tracks daily signal count, win rate trends, and service status.
+
+Service status comes from the metrics each service pushes to the shared
+metrics DB (core.metrics): a push older than HEARTBEAT_STALE_SECONDS means
+the process is gone or its event loop is stuck.
 """
 import sqlite3
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, Optional
 import subprocess
 
+from core.cycle_trace import cycle_rollup
+from core.metrics import METRICS_DB, METRICS_PUSH_INTERVAL, counter_total, histogram_quantile, read_pushed
+
+# Four missed pushes
+HEARTBEAT_STALE_SECONDS = 4 * METRICS_PUSH_INTERVAL
+
 
 class HealthMonitor:
     """Monitor signal service health and performance metrics."""
     
     def __init__(self, signals_db_path: str = "database/signals.db"):
         self.signals_db = signals_db_path
-        self.metrics_db = "monitoring/metrics.db"
+        self.metrics_db = METRICS_DB
         self._init_metrics_db()
     
     def _init_metrics_db(self):
@@ -97,8 +108,52 @@ class HealthMonitor:
             print(f"Error calculating win rate: {e}")
             return None
     
-    def check_service_status(self) -> Dict[str, any]:
-        """Check if systemd service is running."""
+    def get_service_metrics(self) -> Dict[str, dict]:
+        """Latest pushed snapshot per service, with its age."""
+        try:
+            return read_pushed(self.metrics_db)
+        except Exception as e:
+            print(f"Error reading service metrics: {e}")
+            return {}
+
+    def get_service_heartbeats(self) -> Dict[str, dict]:
+        """Liveness of every service that has pushed metrics at least once."""
+        heartbeats = {}
+        for service, entry in self.get_service_metrics().items():
+            started = entry['snapshot'].get('process_start_time_seconds', {}).get('series') or [[[], None]]
+            start_time = started[0][1]
+            is_running = entry['age_seconds'] <= HEARTBEAT_STALE_SECONDS
+            heartbeats[service] = {
+                'is_running': is_running,
+                'pid': entry['pid'],
+                'last_push': datetime.fromtimestamp(entry['pushed_at']).isoformat(),
+                'age_seconds': round(entry['age_seconds'], 1),
+                'uptime_seconds': int(time.time() - start_time) if is_running and start_time else 0,
+            }
+        return heartbeats
+
+    def get_fetch_failure_rate(self) -> Optional[float]:
+        """Share of signal_service data fetches that returned no bars since it started."""
+        snapshot = self.get_service_metrics().get('signal_service', {}).get('snapshot', {})
+        fetches = counter_total(snapshot.get('data_fetch_seconds'))
+        if not fetches:
+            return None
+        return counter_total(snapshot.get('data_fetch_failures_total')) / fetches
+
+    def get_telegram_latency_p95(self) -> Optional[float]:
+        """Upper bound (seconds) of the p95 Telegram send latency in signal_service."""
+        snapshot = self.get_service_metrics().get('signal_service', {}).get('snapshot', {})
+        histogram = snapshot.get('telegram_send_seconds')
+        return histogram_quantile(histogram, 0.95) if histogram else None
+
+    def check_service_status(self, service: str = 'signal_service') -> Dict[str, any]:
+        """Heartbeat from the service's metrics push; systemctl only for a service that never pushed."""
+        heartbeat = self.get_service_heartbeats().get(service)
+        if heartbeat is not None:
+            return {**heartbeat, 'last_check': datetime.now().isoformat()}
+        return self._systemd_status()
+
+    def _systemd_status(self) -> Dict[str, any]:
         try:
             result = subprocess.run(
                 ['systemctl', 'is-active', 'smc-signal-service'],
@@ -179,6 +234,14 @@ class HealthMonitor:
         conn.commit()
         conn.close()
     
+    def get_cycle_latency(self, hours: int = 24) -> Dict[str, any]:
+        """p50/p95 cycle and per-stage latency recorded by the signal service."""
+        try:
+            return cycle_rollup(self.signals_db, hours=hours)
+        except Exception as e:
+            print(f"Error reading cycle metrics: {e}")
+            return {'cycles': 0, 'hours': hours, 'total_ms': None, 'stages': {}}
+    
     def get_health_summary(self) -> Dict[str, any]:
         """Generate comprehensive health summary."""
         return {
@@ -188,7 +251,9 @@ class HealthMonitor:
             'win_rate_7d': self.get_win_rate(days=7),
             'win_rate_30d': self.get_win_rate(days=30),
             'service_status': self.check_service_status(),
-            'last_signal': self.get_last_signal_time()
+            'services': self.get_service_heartbeats(),
+            'last_signal': self.get_last_signal_time(),
+            'cycle_latency': self.get_cycle_latency()
         }
 
 
@@ -205,3 +270,11 @@ if __name__ == "__main__":
     print(f"Win Rate (7d): {summary['win_rate_7d']:.2f}%" if summary['win_rate_7d'] else "Win Rate (7d): N/A")
     print(f"Service Running: {'✅ Yes' if summary['service_status']['is_running'] else '❌ No'}")
     print(f"Last Signal: {summary['last_signal']}")
+    latency = summary.get('cycle_latency')
+    if latency and latency['cycles']:
+        print(f"Cycle Time (24h, {latency['cycles']} cycles): "
+              f"p50 {latency['total_ms']['p50'] / 1000:.1f}s | p95 {latency['total_ms']['p95'] / 1000:.1f}s")
+        for stage, pct in list(latency['stages'].items())[:5]:
+            print(f"  {stage:<20} p50 {pct['p50']:>9.1f}ms | p95 {pct['p95']:>9.1f}ms")
+    else:
+        print("Cycle Time: N/A")
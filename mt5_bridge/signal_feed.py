@@ -0,0 +1,251 @@
+"""
+MT5 Bridge Signal Feed
+======================
+Append-only, sequence-numbered record log between the signal pipeline and
+MT5 consumers (the EA, or execution/mt5_handler.py). Replaces rewriting
+signals_mt5.json on every export.
+
+On disk (FEED_DIR):
+    000000000001.log     segment, named after its first sequence number
+    000000000513.log     newest segment: the only one ever written to
+    <name>.seq           a consumer's last acknowledged sequence number
+
+One record per line, plain text so an MQL5 EA can FileReadString() it:
+
+    <seq>|<crc32 hex>|<compact JSON>\\n
+
+  - The writer appends whole lines with a single O_APPEND write; nothing is
+    ever rewritten, so a reader never sees a truncated file.
+  - A line is committed once its newline is on disk. Readers stop at an
+    unterminated tail and retry it on the next poll; the CRC (over
+    "<seq>|<json>") rejects torn or corrupted lines.
+  - Segments roll at SEGMENT_BYTES; only the newest MAX_SEGMENTS are kept,
+    so expiry is deleting whole old files instead of filtering a rewrite.
+
+Contract: one writer process (signal_service); any number of readers, each
+polling with its own last-seen sequence number.
+
+Usage:
+    feed = SignalFeed()
+    seq = feed.append({"symbol": "EURUSD=X", "direction": "BUY", ...})
+
+    reader = SignalFeedReader(consumer="mt5_handler")   # resumes from mt5_handler.seq
+    for record in reader.poll(max_age_minutes=60):
+        if not execute(record["signal"]):
+            reader.rewind(record["seq"]); break         # redelivered by the next poll
+        reader.ack(record["seq"])
+"""
+
+import json
+import os
+import zlib
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+FEED_DIR = "mt5_bridge/feed"
+SEGMENT_BYTES = 1024 * 1024
+MAX_SEGMENTS = 8
+
+
+def encode_record(seq: int, signal: dict) -> bytes:
+    body = json.dumps(signal, separators=(",", ":"), default=str)
+    crc = zlib.crc32(f"{seq}|{body}".encode())
+    return f"{seq}|{crc:08x}|{body}\n".encode()
+
+
+def decode_record(line: bytes) -> Optional[Tuple[int, dict]]:
+    """(seq, signal) for a well-formed line, None for a torn or corrupted one."""
+    try:
+        seq, crc, body = line.decode().rstrip("\n").split("|", 2)
+        if int(crc, 16) != zlib.crc32(f"{seq}|{body}".encode()):
+            return None
+        return int(seq), json.loads(body)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def list_segments(feed_dir: str) -> List[Tuple[int, str]]:
+    """(first_seq, path) for every segment, oldest first."""
+    try:
+        names = os.listdir(feed_dir)
+    except FileNotFoundError:
+        return []
+    return sorted((int(name[:-4]), os.path.join(feed_dir, name))
+                  for name in names if name.endswith(".log") and name[:-4].isdigit())
+
+
+class SignalFeed:
+    """Single-writer side of the feed."""
+
+    def __init__(self, feed_dir: str = FEED_DIR, segment_bytes: int = SEGMENT_BYTES,
+                 max_segments: int = MAX_SEGMENTS, fsync: bool = False):
+        self.feed_dir = feed_dir
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        self.fsync = fsync
+        os.makedirs(feed_dir, exist_ok=True)
+        self._fd: Optional[int] = None
+        self._size = 0
+        self.last_seq = self._recover()
+
+    def append(self, signal: dict) -> int:
+        """Commits one record and returns its sequence number."""
+        seq = self.last_seq + 1
+        if self._fd is None or self._size >= self.segment_bytes:
+            self._roll(seq)
+        data = encode_record(seq, signal)
+        os.write(self._fd, data)
+        if self.fsync:
+            os.fsync(self._fd)
+        self._size += len(data)
+        self.last_seq = seq
+        return seq
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def expire_segments(self) -> int:
+        """Deletes the oldest sealed segments beyond max_segments. Returns how many."""
+        sealed = list_segments(self.feed_dir)[:-1]
+        stale = sealed[:max(0, len(sealed) + 1 - self.max_segments)]
+        for _, path in stale:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        return len(stale)
+
+    def _roll(self, first_seq: int) -> None:
+        self.close()
+        path = os.path.join(self.feed_dir, f"{first_seq:012d}.log")
+        self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._size = os.fstat(self._fd).st_size
+        self.expire_segments()
+
+    def _recover(self) -> int:
+        """Last committed sequence number; reopens the newest segment for appending."""
+        segments = list_segments(self.feed_dir)
+        if not segments:
+            return 0
+        first_seq, path = segments[-1]
+        with open(path, "rb") as f:
+            data = f.read()
+        last_seq = first_seq - 1
+        for line in data.splitlines(keepends=True):
+            record = decode_record(line) if line.endswith(b"\n") else None
+            if record is not None:
+                last_seq = record[0]
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+        if data and not data.endswith(b"\n"):
+            # Crashed mid-write: terminate the torn line so readers skip it and move on
+            os.write(self._fd, b"\n")
+        self._size = os.fstat(self._fd).st_size
+        return last_seq
+
+
+class SignalFeedReader:
+    """
+    Polling consumer (the Python stand-in for the EA). Remembers its segment
+    and byte offset, so a poll reads only what was appended since the last.
+    """
+
+    def __init__(self, feed_dir: str = FEED_DIR, last_seq: Optional[int] = None,
+                 consumer: Optional[str] = None):
+        self.feed_dir = feed_dir
+        self.cursor_path = os.path.join(feed_dir, f"{consumer}.seq") if consumer else None
+        if last_seq is None:
+            last_seq = self._load_cursor()
+        self.last_seq = last_seq
+        self.corrupt = 0
+        self._segment: Optional[Tuple[int, str]] = None
+        self._offset = 0
+
+    def poll(self, max_age_minutes: Optional[float] = None) -> List[dict]:
+        """
+        New records as {"seq", "signal"}, oldest first. Records exported more
+        than max_age_minutes ago are skipped (MT5 must not trade stale data).
+        """
+        segments = list_segments(self.feed_dir)
+        if not segments:
+            return []
+        if self._segment not in segments:
+            self._seek(segments)
+
+        records = []
+        while True:
+            records.extend(self._read_segment())
+            later = [s for s in segments if s[0] > self._segment[0]]
+            if not later:
+                break
+            self._segment, self._offset = later[0], 0
+
+        if max_age_minutes is not None:
+            now = datetime.now()
+            records = [r for r in records if not self._expired(r["signal"], now, max_age_minutes)]
+        return records
+
+    def ack(self, seq: int) -> None:
+        """Persists `seq` as processed, so a restarted consumer resumes after it."""
+        if self.cursor_path is None:
+            return
+        tmp = f"{self.cursor_path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(str(seq))
+        os.replace(tmp, self.cursor_path)
+
+    def rewind(self, seq: int) -> None:
+        """Makes the next poll redeliver from `seq` on (a record that failed to process)."""
+        if seq <= self.last_seq:
+            self.last_seq = seq - 1
+            self._segment = None
+
+    def _seek(self, segments: List[Tuple[int, str]]) -> None:
+        """Positions at the segment holding last_seq + 1 (or the oldest one left)."""
+        candidates = [s for s in segments if s[0] <= self.last_seq + 1]
+        self._segment = candidates[-1] if candidates else segments[0]
+        self._offset = 0
+        if self._segment[0] > self.last_seq + 1:
+            print(f"⚠️ MT5 feed reader fell behind retention: seq {self.last_seq + 1}.."
+                  f"{self._segment[0] - 1} were expired before being read")
+
+    def _read_segment(self) -> List[dict]:
+        try:
+            with open(self._segment[1], "rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        # Only newline-terminated lines are committed; the rest is read next time
+        end = data.rfind(b"\n") + 1
+        self._offset += end
+        records = []
+        for line in data[:end].splitlines():
+            record = decode_record(line)
+            if record is None:
+                if line:
+                    self.corrupt += 1
+                continue
+            seq, signal = record
+            if seq > self.last_seq:
+                self.last_seq = seq
+                records.append({"seq": seq, "signal": signal})
+        return records
+
+    def _load_cursor(self) -> int:
+        if self.cursor_path is None:
+            return 0
+        try:
+            with open(self.cursor_path, "r") as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    @staticmethod
+    def _expired(signal: dict, now: datetime, max_age_minutes: float) -> bool:
+        try:
+            exported_at = datetime.fromisoformat(signal["exported_at"])
+        except (KeyError, TypeError, ValueError):
+            return False
+        return (now - exported_at).total_seconds() / 60 >= max_age_minutes
@@ -8,6 +8,7 @@ import pandas as pd
 import numpy as np
 from scipy.stats import spearmanr
 import warnings
+from core.alpha_factors import AlphaFactors
 
 warnings.simplefilter(action='ignore', category=FutureWarning)
 warnings.filterwarnings("ignore", category=DeprecationWarning)
@@ -56,10 +57,7 @@ def slope_pct(s, n=3):
 # ── Alpha Factors (vectorized) ────────────────────────────────────────────────
 
 def alpha_velocity(df, n=20):
-    def _slope(y):
-        x = np.arange(len(y))
-        return np.polyfit(x, y, 1)[0] if len(y) >= 2 else 0.0
-    slp = df['Close'].rolling(n).apply(_slope, raw=True)
+    slp = AlphaFactors.rolling_slope(df['Close'], n)
     return slp / df['atr']
 
 def alpha_zscore(df, n=100):
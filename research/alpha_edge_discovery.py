@@ -57,11 +57,12 @@ class AlphaEdgeDiscovery:
         return all_data
 
     def calculate_alphas_and_returns(self, df):
-        # Calculate Alphas
-        df['alpha_velocity'] = df.apply(lambda row: AlphaFactors.velocity_alpha(df.loc[:row.name]), axis=1)
-        df['alpha_zscore'] = df.apply(lambda row: AlphaFactors.mean_reversion_zscore(df.loc[:row.name]), axis=1)
-        df['alpha_momentum'] = df.apply(lambda row: AlphaFactors.momentum_alpha(df.loc[:row.name]), axis=1)
-        df['alpha_volatility'] = df.apply(lambda row: AlphaFactors.volatility_regime_alpha(df.loc[:row.name]), axis=1)
+        # Calculate Alphas (whole-series batch API, same definitions as live scoring)
+        factors = AlphaFactors.factor_frame(df)
+        df['alpha_velocity'] = factors['velocity'].fillna(0.0)
+        df['alpha_zscore'] = factors['zscore'].fillna(0.0)
+        df['alpha_momentum'] = factors['momentum'].fillna(0.0)
+        df['alpha_volatility'] = factors['volatility'].fillna(0.0)
         
         # Calculate Forward Returns (next N bars)
         fwd_period = 12 if self.timeframe == "h1" else 72
@@ -8,6 +8,7 @@ from datetime import datetime
 
 import pandas as pd
 
+from data.dukascopy_import import imported_store
 from data.dukascopy_loader import DukascopyLoader
 from data.fetcher import DataFetcher
 from indicators.calculations import IndicatorCalculator
@@ -32,7 +33,7 @@ def _load_dukascopy(symbol, days, loader):
 
 
 async def run_diagnostics():
-    loader = DukascopyLoader(base_dir="data/dukascopy")
+    loader = DukascopyLoader(base_dir="data/dukascopy", store=imported_store())
     h1_df, m15_df, d1_df = _load_dukascopy(SYMBOL, DAYS, loader)
 
     counts = {
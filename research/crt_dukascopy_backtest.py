@@ -10,6 +10,8 @@ HOW TO GET DUKASCOPY DATA (FREE, goes back to 2003):
   3. Set your date range (recommend 2023-01-01 to today for 2+ years)
   4. Download → save CSV to:
        data/dukascopy/EURUSD/EURUSD_Candlestick_1_M_BID_01.01.2023-04.05.2025.csv
+  5. Optional, once: python3 -m data.dukascopy_import
+     (later runs open H1/M15/D1 from the bar store instead of re-parsing CSVs)
 
 SUPPORTED DUKASCOPY SYMBOLS:
   Forex:  EURUSD, GBPUSD, USDJPY, GBPJPY, AUDUSD, USDCAD, NZDUSD
@@ -35,6 +37,7 @@ from datetime import datetime
 import pandas as pd
 
 from strategies.crt_strategy import CRTStrategy
+from data.dukascopy_import import imported_store
 from data.dukascopy_loader import DukascopyLoader
 from data.fetcher import DataFetcher
 from indicators.calculations import IndicatorCalculator
@@ -220,7 +223,7 @@ def load_symbol_data(symbol, days, loader):
 # ─────────────────────────────────────────────────────────────────────────────
 
 async def run_dukascopy_backtest(days=365):
-    loader       = DukascopyLoader(base_dir="data/dukascopy")
+    loader       = DukascopyLoader(base_dir="data/dukascopy", store=imported_store())
     duka_symbols = loader.list_available_symbols()
 
     print(SEPARATOR)
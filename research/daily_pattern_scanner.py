@@ -11,15 +11,16 @@ Outputs:
   5. Intraday Volatility Profile — when ATR expands (best for breakouts)
 
 This is pure empirical analysis — no indicators, just raw price behavior.
+Bars come from the local caches via research.pattern_framework.load_bars.
+
+Usage:
+    python -m research.daily_pattern_scanner
 """
-import yfinance as yf
 import pandas as pd
-import numpy as np
 import warnings
 from scipy import stats
 
-warnings.simplefilter(action='ignore', category=FutureWarning)
-warnings.filterwarnings("ignore", category=DeprecationWarning)
+from research.pattern_framework import load_bars
 
 SYMBOLS = {
     "EURUSD=X": "EURUSD",
@@ -35,19 +36,14 @@ SYMBOLS = {
 DAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri']
 
 
-def fetch(ticker, period="365d"):
-    df = yf.download(ticker, period=period, interval="1h",
-                     progress=False, auto_adjust=True)
-    if df.empty:
+def fetch(ticker, days=365):
+    bars = load_bars(ticker, timeframe="1h", days=days)
+    if bars is None or bars.empty:
         return None
-    if isinstance(df.columns, pd.MultiIndex):
-        df.columns = df.columns.get_level_values(0)
-    df.index = pd.to_datetime(df.index)
-    if df.index.tz is not None:
-        df.index = df.index.tz_convert('UTC')
+    df = bars[['open', 'high', 'low', 'close']].copy()
     # Candle return (%)
-    df['ret']  = (df['Close'] - df['Open']) / df['Open'] * 100
-    df['atr1'] = (df['High'] - df['Low']) / df['Open'] * 100  # candle range %
+    df['ret']  = (df['close'] - df['open']) / df['open'] * 100
+    df['atr1'] = (df['high'] - df['low']) / df['open'] * 100  # candle range %
     df['hour'] = df.index.hour
     df['dow']  = df.index.dayofweek   # 0=Mon
     df['date'] = df.index.date
@@ -257,6 +253,8 @@ def run():
 
 
 if __name__ == "__main__":
+    warnings.simplefilter(action='ignore', category=FutureWarning)
+    warnings.filterwarnings("ignore", category=DeprecationWarning)
     print("🔍 Daily Pattern Scanner — Empirical Market Behavior Analysis")
     print("   365 days × 1h bars × 8 symbols\n")
     run()
@@ -1,7 +1,8 @@
 import sqlite3
 import pandas as pd
 import numpy as np
-import itertools
+
+from research.grid_search import grid_search
 
 DB_PATH = "database/signals_vm.db"
 
@@ -21,7 +22,20 @@ def load_signals():
     df['is_win'] = df['result'].isin(['TP1', 'TP2', 'TP3']).astype(int)
     return df
 
-def find_edges():
+def build_dimensions(df, qualities, regime_blocks, toxic_bans, type_filters):
+    """One boolean mask per filter value, computed once for the whole grid."""
+    everything = np.ones(len(df), dtype=bool)
+    return [
+        ('q', [(q, df['quality_score'].values >= q) for q in qualities]),
+        ('blocked_regimes', [("+".join(rb) if rb else "None",
+                              ~df['regime'].isin(rb).values if rb else everything) for rb in regime_blocks]),
+        ('banned_symbols', [("+".join(tb) if tb else "None",
+                             ~df['symbol'].isin(tb).values if tb else everything) for tb in toxic_bans]),
+        ('trade_types', [("+".join(types) if types else "All",
+                          df['trade_type'].isin(types).values if types else everything) for types in type_filters]),
+    ]
+
+def find_edges(workers=None):
     df = load_signals()
     
     qualities = [6.0, 7.0, 7.5, 8.0, 8.5]
@@ -43,58 +57,21 @@ def find_edges():
         ['CRT', 'ADVANCED_PATTERN']
     ]
 
-    results = []
-    
-    for q, rb, tb, types in itertools.product(qualities, regime_blocks, toxic_bans, type_filters):
-        d = df.copy()
-        
-        # apply quality
-        d = d[d['quality_score'] >= q]
-        
-        # apply regime
-        if rb:
-            d = d[~d['regime'].isin(rb)]
-            
-        # apply toxic ban
-        if tb:
-            d = d[~d['symbol'].isin(tb)]
-            
-        # apply trade type
-        if types:
-            d = d[d['trade_type'].isin(types)]
-            
-        n = len(d)
-        if n < 50:
-            continue
-            
-        wins = d['is_win'].sum()
-        wr = wins / n
-        avg_rr = d['tp1_dist'].mean() / d['sl_dist'].mean() if d['sl_dist'].mean() > 0 else 0
-        exp = (wr * avg_rr) - ((1 - wr) * 1.0)
-        
-        results.append({
-            'q': q,
-            'blocked_regimes': "+".join(rb) if rb else "None",
-            'banned_symbols': "+".join(tb) if tb else "None",
-            'trade_types': "+".join(types) if types else "All",
-            'trades': n,
-            'wr': round(wr * 100, 1),
-            'rr': round(avg_rr, 2),
-            'exp': round(exp, 3)
-        })
-
-    results_df = pd.DataFrame(results)
+    dimensions = build_dimensions(df, qualities, regime_blocks, toxic_bans, type_filters)
+    tested = int(np.prod([len(options) for _, options in dimensions]))
+    results_df = grid_search(df, dimensions, min_trades=50, workers=workers)
     if results_df.empty:
         print("No robust edges found.")
         return
 
-    # Sort strongly by Expectancy
-    best = results_df.sort_values(by='exp', ascending=False).head(10)
+    # Significant (BH-corrected) edges first, then by Expectancy
+    best = results_df.head(10)
     
     print("\n" + "="*80)
     print(" 🚀 TOP 10 HIGH-EXPECTANCY EDGES FOUND")
+    print(f" {tested} combinations tested | {int(results_df['significant'].sum())} significant after FDR correction")
     print("="*80)
-    print(best.to_string(index=False))
+    print(best.drop(columns=['p_value']).to_string(index=False))
 
 if __name__ == "__main__":
     find_edges()
@@ -0,0 +1,189 @@
+"""
+Filter Grid Search Engine
+=========================
+Evaluates every combination of signal filters (quality floor × regime block ×
+symbol ban × trade type × ...) without copying or re-filtering the signals
+frame per combination.
+
+How:
+  1. Each filter option is a boolean mask over the signals, built once.
+  2. Signals with the same membership across ALL option masks are
+     interchangeable for every combination, so they collapse into groups
+     (typically a few hundred) with summed stats: trades, wins, TP/SL
+     distances, winning R.
+  3. A block of combinations becomes a (combos × groups) mask (bitwise AND of
+     one option row per dimension), and all stats follow from one matrix
+     product with the group stats. Blocks are sharded across a process pool.
+  4. Each combination is tested for a positive edge (win rate above the
+     breakeven rate implied by its R:R). p-values are corrected for the
+     number of combinations tried (Benjamini-Hochberg FDR, Bonferroni flag).
+
+Usage:
+    dims = [
+        ("q", [(q, df["quality_score"].values >= q) for q in (6.0, 7.0, 8.0)]),
+        ("regime", [("None", all_true), ("CHOPPY", ~df["regime"].isin(["CHOPPY"]).values)]),
+    ]
+    results = grid_search(df, dims, min_trades=50)
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+from core.alpha_combiner import AlphaCombiner
+
+# (dimension name, [(option label, boolean mask over signals), ...])
+Dimension = Tuple[str, List[Tuple[object, np.ndarray]]]
+
+# Group stats columns, in matrix order
+STATS = ("trades", "wins", "tp1_dist", "sl_dist", "win_r", "tp1_count", "sl_count")
+
+# Upper bound on (combos × groups) cells per block (float64 → ~32 MB)
+BLOCK_CELLS = 4_000_000
+
+
+def grid_search(
+    df: pd.DataFrame,
+    dimensions: Sequence[Dimension],
+    min_trades: int = 50,
+    workers: Optional[int] = None,
+    alpha: float = 0.05,
+) -> pd.DataFrame:
+    """
+    Scores every combination of one option per dimension.
+
+    Args:
+        df:         Resolved signals with is_win, tp1_dist and sl_dist columns
+        dimensions: Filter options per dimension (see Dimension)
+        min_trades: Combinations with fewer trades are dropped
+        workers:    Process pool size (default: CPU count, 1 = in-process)
+        alpha:      Significance level for the corrected `significant` flag
+
+    Returns:
+        One row per surviving combination: the option labels plus trades, wr,
+        rr, exp, pf, wilson_low/high (%), p_value, q_value, bonferroni,
+        significant. Sorted by significance, then expectancy.
+    """
+    group_masks, stats = _group_signals(df, dimensions)
+    sizes = [len(options) for _, options in dimensions]
+    total = int(np.prod(sizes))
+    block = max(1, BLOCK_CELLS // max(1, stats.shape[0]))
+    ranges = [(start, min(start + block, total)) for start in range(0, total, block)]
+
+    workers = workers or os.cpu_count() or 1
+    tasks = [(start, end, sizes, group_masks, stats) for start, end in ranges]
+    if workers <= 1 or len(tasks) == 1:
+        parts = [_evaluate_block(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            parts = list(pool.map(_evaluate_block, tasks))
+
+    combos = np.concatenate([p[0] for p in parts]) if parts else np.empty(0, dtype=np.int64)
+    totals = np.concatenate([p[1] for p in parts]) if parts else np.empty((0, len(STATS)))
+    keep = totals[:, 0] >= min_trades
+    combos, totals = combos[keep], totals[keep]
+
+    results = pd.DataFrame({
+        name: np.asarray([label for label, _ in options], dtype=object)[idx]
+        for (name, options), idx in zip(dimensions, np.unravel_index(combos, sizes))
+    })
+    results = pd.concat([results, _metrics(totals, total, alpha)], axis=1)
+    return results.sort_values(["significant", "exp"], ascending=False, ignore_index=True)
+
+
+def _group_signals(df: pd.DataFrame, dimensions: Sequence[Dimension]):
+    """
+    Collapses signals into membership groups.
+    Returns per-dimension (options × groups) masks and (groups × STATS) sums.
+    """
+    masks = np.vstack([np.asarray(mask, dtype=bool) for _, options in dimensions for _, mask in options])
+    signatures, group = np.unique(masks.T, axis=0, return_inverse=True)
+    group = group.ravel()
+    n_groups = len(signatures)
+
+    is_win = df["is_win"].to_numpy(dtype=np.float64)
+    tp1 = df["tp1_dist"].to_numpy(dtype=np.float64)
+    sl = df["sl_dist"].to_numpy(dtype=np.float64)
+    # Missing distances are skipped per column, like pandas mean() in the per-combination filter
+    tp1_ok, sl_ok = ~np.isnan(tp1), ~np.isnan(sl)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        win_r = np.where((is_win > 0) & tp1_ok & (sl > 0), tp1 / sl, 0.0)
+
+    stats = np.column_stack([
+        np.bincount(group, minlength=n_groups).astype(np.float64),
+        np.bincount(group, weights=is_win, minlength=n_groups),
+        np.bincount(group, weights=np.where(tp1_ok, tp1, 0.0), minlength=n_groups),
+        np.bincount(group, weights=np.where(sl_ok, sl, 0.0), minlength=n_groups),
+        np.bincount(group, weights=win_r, minlength=n_groups),
+        np.bincount(group, weights=tp1_ok, minlength=n_groups),
+        np.bincount(group, weights=sl_ok, minlength=n_groups),
+    ])
+
+    group_masks, offset = [], 0
+    for _, options in dimensions:
+        group_masks.append(signatures[:, offset:offset + len(options)].T.copy())
+        offset += len(options)
+    return group_masks, stats
+
+
+def _evaluate_block(task: tuple):
+    """Process-pool worker: stats for combinations [start, end)."""
+    start, end, sizes, group_masks, stats = task
+    combos = np.arange(start, end, dtype=np.int64)
+    idx = np.unravel_index(combos, sizes)
+    selected = group_masks[0][idx[0]]
+    for masks, choice in zip(group_masks[1:], idx[1:]):
+        selected = selected & masks[choice]
+    return combos, selected.astype(np.float64) @ stats
+
+
+def _metrics(totals: np.ndarray, tested: int, alpha: float) -> pd.DataFrame:
+    n, wins, tp1, sl, win_r, tp1_count, sl_count = totals.T
+    losses = n - wins
+    with np.errstate(divide="ignore", invalid="ignore"):
+        wr = np.where(n > 0, wins / n, 0.0)
+        rr = np.where((sl > 0) & (tp1_count > 0), (tp1 / tp1_count) / (sl / sl_count), 0.0)
+        exp = wr * rr - (1 - wr)
+        pf = np.where(losses > 0, win_r / losses, np.inf)
+
+        # One-sided test of win rate vs the breakeven rate for this R:R
+        breakeven = np.where(rr > 0, 1 / (1 + rr), 1.0)
+        z = (wins - n * breakeven) / np.sqrt(n * breakeven * (1 - breakeven))
+    p_value = np.where(np.isfinite(z), 1 - ndtr(np.nan_to_num(z)), 1.0)
+    q_value = _benjamini_hochberg(p_value, tested)
+    lower, upper = AlphaCombiner.wilson_bounds(wr, n)
+
+    return pd.DataFrame({
+        "trades": n.astype(np.int64),
+        "wr": np.round(wr * 100, 1),
+        "wilson_low": np.round(lower * 100, 1),
+        "wilson_high": np.round(upper * 100, 1),
+        "rr": np.round(rr, 2),
+        "exp": np.round(exp, 3),
+        "pf": np.round(pf, 2),
+        "p_value": p_value,
+        "q_value": q_value,
+        "bonferroni": p_value * tested < alpha,
+        "significant": q_value < alpha,
+    })
+
+
+def _benjamini_hochberg(p_value: np.ndarray, tested: int) -> np.ndarray:
+    """
+    BH-adjusted q-values. `tested` counts every combination evaluated, including
+    those later dropped for min_trades, so the correction is not understated.
+    """
+    if len(p_value) == 0:
+        return p_value
+    m = max(tested, len(p_value))
+    order = np.argsort(p_value)
+    ranked = p_value[order] * m / np.arange(1, len(p_value) + 1)
+    ranked = np.minimum.accumulate(ranked[::-1])[::-1]
+    q_value = np.empty_like(ranked)
+    q_value[order] = np.minimum(ranked, 1.0)
+    return q_value
+
@@ -0,0 +1,212 @@
+"""
+Pattern Research Framework
+==========================
+Shared plumbing for pattern scans (research/pattern_scanner.py,
+research/daily_pattern_scanner.py):
+
+  1. Bars come from local caches: the imported BarStore (data.dukascopy_import),
+     then Dukascopy CSVs, then a yfinance download that is cached in the bar
+     store under .research/ so re-runs do not hit the network.
+  2. Detectors are registered functions. A detector receives prepared bars
+     (open/high/low/close + atr, rsi) and returns (buy_mask, sell_mask), two
+     boolean arrays over the bars. There are no row loops and no frame copies.
+  3. Every entry of every pattern is resolved by one vectorized first-touch
+     simulation over a (entries × fwd bars) window.
+
+Adding a pattern:
+    @register_pattern("Inside Bar Break")
+    def inside_bar(bars):
+        inside = (bars['high'] < bars['high'].shift()) & (bars['low'] > bars['low'].shift())
+        prev = inside.shift(fill_value=False).to_numpy()
+        return prev & (bars['close'] > bars['high'].shift()).to_numpy(), \\
+               prev & (bars['close'] < bars['low'].shift()).to_numpy()
+
+Usage:
+    results = scan(["EURUSD=X", "GC=F"], timeframe="1h", days=180)
+"""
+
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data.bar_store import BarStore
+from data.dukascopy_import import imported_store
+from data.dukascopy_loader import DukascopyLoader
+
+FWD_BARS   = 4    # bars to check for TP/SL hit (4h on 1h data)
+RR         = 2.0  # reward:risk ratio for all patterns
+ATR_PERIOD = 14
+
+# yfinance fallback cache (dot-dir: hidden from BarStore.symbols())
+RESEARCH_CACHE = "data/bar_store/.research"
+# yfinance cache is refreshed when its last bar is older than this
+CACHE_MAX_AGE = pd.Timedelta(days=1)
+
+Detector = Callable[[pd.DataFrame], Tuple[np.ndarray, np.ndarray]]
+PATTERNS: Dict[str, Detector] = {}
+
+
+def register_pattern(name: str):
+    """Decorator: adds a (buy_mask, sell_mask) detector to PATTERNS under `name`."""
+    def decorator(func: Detector) -> Detector:
+        PATTERNS[name] = func
+        return func
+    return decorator
+
+
+# ── Data ──────────────────────────────────────────────────────────────────────
+
+def load_bars(symbol: str, timeframe: str = "1h", days: int = 180,
+              store: Optional[BarStore] = None, loader: Optional[DukascopyLoader] = None,
+              cache: Optional[BarStore] = None) -> Optional[pd.DataFrame]:
+    """
+    The last `days` of OHLC bars for `symbol`, from the first source whose
+    history spans the full lookback: imported bar store, Dukascopy CSVs,
+    then yfinance (cached on disk).
+    """
+    rule = DukascopyLoader.TIMEFRAME_RESAMPLE.get(timeframe, timeframe)
+    lookback = pd.Timedelta(days=days)
+
+    store = store if store is not None else imported_store()
+    if store is not None and store.has(symbol, rule):
+        info = store.info(symbol, rule)
+        first, last = pd.Timestamp(info["first"]), pd.Timestamp(info["last"])
+        if last - first >= lookback:
+            return store.read(symbol, rule, start=last - lookback)
+
+    loader = loader if loader is not None else DukascopyLoader()
+    if loader._find_folder(symbol) is not None:
+        df = loader.load(symbol, timeframe=rule)
+        if df is not None and not df.empty and df.index[-1] - df.index[0] >= lookback:
+            return df[df.index >= df.index[-1] - lookback]
+
+    return _cached_download(symbol, rule, days, cache if cache is not None else BarStore(RESEARCH_CACHE))
+
+
+def _cached_download(symbol: str, rule: str, days: int, cache: BarStore) -> Optional[pd.DataFrame]:
+    """yfinance bars through the research cache; only stale caches are refreshed."""
+    start = pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=days)
+    info = cache.info(symbol, rule)
+    fresh = (info and info.get("rows")
+             and pd.Timestamp(info["first"]) <= start + pd.Timedelta(days=1)
+             and pd.Timestamp.now(tz="UTC") - pd.Timestamp(info["last"]) < CACHE_MAX_AGE)
+    if not fresh:
+        import yfinance as yf
+        from data.fetcher import DataFetcher
+        interval = {"1h": "1h", "1D": "1d", "15min": "15m", "5min": "5m", "30min": "30m"}.get(rule, rule)
+        df = yf.download(symbol, period=f"{days}d", interval=interval, progress=False, auto_adjust=True)
+        if df is not None and not df.empty:
+            if isinstance(df.columns, pd.MultiIndex):
+                df.columns = df.columns.get_level_values(0)
+            df = df.rename(columns=str.lower)
+            df.index = pd.DatetimeIndex(df.index).tz_convert("UTC") if df.index.tz is not None \
+                else pd.DatetimeIndex(df.index).tz_localize("UTC")
+            if info and info.get("rows") and pd.Timestamp(info["first"]) > start + pd.Timedelta(days=1):
+                cache.clear(symbol, rule)   # cache too short for this lookback: rebuild
+            cache.append(symbol, rule, DataFetcher._drop_incomplete_bar(df, interval))
+    return cache.read(symbol, rule, start=start)
+
+
+def prepare(bars: pd.DataFrame) -> pd.DataFrame:
+    """OHLC + ATR (SMA of true range) and RSI (SMA gains/losses); warm-up rows dropped."""
+    df = bars[['open', 'high', 'low', 'close']].astype(np.float64)
+    prev_close = df['close'].shift()
+    tr = np.maximum(df['high'] - df['low'],
+                    np.maximum((df['high'] - prev_close).abs(), (df['low'] - prev_close).abs()))
+    df['atr'] = tr.rolling(ATR_PERIOD).mean()
+
+    delta = df['close'].diff()
+    gain = delta.clip(lower=0).rolling(14).mean()
+    loss = (-delta.clip(upper=0)).rolling(14).mean()
+    df['rsi'] = 100 - (100 / (1 + gain / loss.replace(0, np.nan)))
+    return df.dropna()
+
+
+# ── Simulation ────────────────────────────────────────────────────────────────
+
+def first_touch(high: np.ndarray, low: np.ndarray, close: np.ndarray, entries: np.ndarray,
+                direction: np.ndarray, sl_dist: np.ndarray, rr: float = RR, fwd: int = FWD_BARS) -> np.ndarray:
+    """
+    Resolves trades entered at the close of bar `entries` (direction +1 BUY,
+    -1 SELL, stop `sl_dist` away, target rr × sl_dist) over the next `fwd` bars.
+    Returns +1 (target first), -1 (stop first; also when both hit in one bar)
+    or 0 (unresolved). Entries must satisfy entries + fwd < len(close).
+    """
+    if len(entries) == 0:
+        return np.zeros(0, dtype=np.int8)
+    window = entries[:, None] + np.arange(1, fwd + 1)
+    highs, lows = high[window], low[window]
+    entry = close[entries][:, None]
+    d = direction[:, None]
+    sl = entry - d * sl_dist[:, None]
+    tp = entry + d * sl_dist[:, None] * rr
+
+    # Adverse/favourable extremes in the trade's direction
+    sl_hit = np.where(d > 0, lows <= sl, highs >= sl)
+    tp_hit = np.where(d > 0, highs >= tp, lows <= tp)
+    first_sl = np.where(sl_hit.any(axis=1), sl_hit.argmax(axis=1), fwd)
+    first_tp = np.where(tp_hit.any(axis=1), tp_hit.argmax(axis=1), fwd)
+
+    outcome = np.zeros(len(entries), dtype=np.int8)
+    outcome[first_tp < first_sl] = 1
+    outcome[(first_sl <= first_tp) & (first_sl < fwd)] = -1
+    return outcome
+
+
+def evaluate(bars: pd.DataFrame, buy: np.ndarray, sell: np.ndarray,
+             rr: float = RR, fwd: int = FWD_BARS) -> np.ndarray:
+    """Outcomes of a detector's entries on prepared bars (BUY wins ties with SELL)."""
+    buy = np.asarray(buy, dtype=bool)
+    sell = np.asarray(sell, dtype=bool) & ~buy
+    tradable = np.arange(len(bars)) + fwd < len(bars)
+    entries = np.flatnonzero((buy | sell) & tradable)
+    direction = np.where(buy[entries], 1.0, -1.0)
+    return first_touch(bars['high'].to_numpy(), bars['low'].to_numpy(), bars['close'].to_numpy(),
+                       entries, direction, bars['atr'].to_numpy()[entries], rr, fwd)
+
+
+def score(outcomes: np.ndarray, rr: float = RR) -> Tuple[float, float, float, int]:
+    """Returns (hit_rate, profit_factor, avg_r, n) over resolved trades."""
+    wins = int((outcomes > 0).sum())
+    losses = int((outcomes < 0).sum())
+    n = wins + losses
+    if n == 0:
+        return 0, 0, 0, 0
+    pf = (wins * rr) / losses if losses else float('inf')
+    return round(wins / n, 3), round(pf, 3), round((wins * rr - losses) / n, 3), n
+
+
+def scan(symbols: Iterable[str], patterns: Optional[Dict[str, Detector]] = None, timeframe: str = "1h",
+         days: int = 180, rr: float = RR, fwd: int = FWD_BARS,
+         bars: Optional[Dict[str, pd.DataFrame]] = None) -> pd.DataFrame:
+    """
+    Runs every pattern on every symbol. `bars` (symbol → OHLC frame) skips
+    loading. Returns one row per (symbol, pattern): N, HitRate, PF, AvgR.
+    """
+    patterns = patterns if patterns is not None else PATTERNS
+    rows = []
+    for symbol in symbols:
+        started = time.perf_counter()
+        # One symbol's bad data (or a failed download) must not abort the whole scan
+        try:
+            raw = bars[symbol] if bars is not None else load_bars(symbol, timeframe, days)
+            if raw is None or raw.empty:
+                print(f"    ⚠ {symbol}: no data")
+                continue
+            prepared = prepare(raw)
+        except Exception as e:
+            print(f"    ❌ {symbol}: {e}")
+            continue
+        for name, detector in patterns.items():
+            try:
+                buy, sell = detector(prepared)
+                hr, pf, avg_r, n = score(evaluate(prepared, buy, sell, rr, fwd), rr)
+            except Exception as e:
+                print(f"    ❌ {symbol} / {name}: {e}")
+                continue
+            rows.append({'Symbol': symbol, 'Pattern': name, 'N': n, 'HitRate': hr, 'PF': pf, 'AvgR': avg_r})
+        print(f"  {symbol:<10} {len(prepared):>6,} bars × {len(patterns)} patterns "
+              f"in {(time.perf_counter() - started) * 1000:.0f} ms")
+    return pd.DataFrame(rows, columns=['Symbol', 'Pattern', 'N', 'HitRate', 'PF', 'AvgR'])
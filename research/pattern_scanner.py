@@ -15,15 +15,18 @@ For each pattern, calculates:
   - Average R-Multiple
   - Profit Factor
   - Sample count (N)
+
+Detectors are registered with research.pattern_framework and resolved by its
+vectorized first-touch simulator over locally cached bars.
+
+Usage:
+    python -m research.pattern_scanner
 """
-import yfinance as yf
-import pandas as pd
-import numpy as np
 import warnings
-from datetime import time
 
-warnings.simplefilter(action='ignore', category=FutureWarning)
-warnings.filterwarnings("ignore", category=DeprecationWarning)
+import numpy as np
+
+from research.pattern_framework import PATTERNS, register_pattern, scan
 
 SYMBOLS = {
     "EURUSD=X": "EURUSD",
@@ -36,262 +39,99 @@ SYMBOLS = {
     "BTC-USD":  "BTC",
 }
 
-FWD_BARS   = 4    # bars to check for TP/SL hit (4h on 1h data)
-RR         = 2.0  # reward:risk ratio for all patterns
-ATR_PERIOD = 14
-
-
-# ── Helpers ───────────────────────────────────────────────────────────────────
-
-def calc_atr(df, n=ATR_PERIOD):
-    hl = df['High'] - df['Low']
-    hc = (df['High'] - df['Close'].shift()).abs()
-    lc = (df['Low']  - df['Close'].shift()).abs()
-    tr = pd.concat([hl, hc, lc], axis=1).max(axis=1)
-    return tr.rolling(n).mean()
-
-def calc_rsi(close, n=14):
-    delta = close.diff()
-    gain  = delta.clip(lower=0).rolling(n).mean()
-    loss  = (-delta.clip(upper=0)).rolling(n).mean()
-    rs    = gain / loss.replace(0, np.nan)
-    return 100 - (100 / (1 + rs))
-
-def simulate_trade(df, idx, direction, atr_val, rr=RR, fwd=FWD_BARS):
-    """Returns 'WIN', 'LOSS', or None (no resolution)."""
-    entry = df['Close'].iloc[idx]
-    sl_dist = atr_val * 1.0
-    tp_dist = sl_dist * rr
-
-    sl = entry - sl_dist if direction == 'BUY' else entry + sl_dist
-    tp = entry + tp_dist if direction == 'BUY' else entry - tp_dist
-
-    for j in range(idx + 1, min(idx + fwd + 1, len(df))):
-        h, l = df['High'].iloc[j], df['Low'].iloc[j]
-        if direction == 'BUY':
-            if l <= sl: return 'LOSS'
-            if h >= tp: return 'WIN'
-        else:
-            if h >= sl: return 'LOSS'
-            if l <= tp: return 'WIN'
-    return None
-
-def score(trades):
-    """Returns (hit_rate, profit_factor, avg_r, n)."""
-    if not trades: return 0, 0, 0, 0
-    wins   = trades.count('WIN')
-    losses = trades.count('LOSS')
-    n      = wins + losses
-    if n == 0: return 0, 0, 0, 0
-    hr  = wins / n
-    pf  = (wins * RR) / losses if losses else float('inf')
-    avg = (wins * RR - losses) / n
-    return round(hr, 3), round(pf, 3), round(avg, 3), n
+LOOKBACK_DAYS = 180
 
 
 # ── Pattern Detectors ─────────────────────────────────────────────────────────
+# Each returns (buy_mask, sell_mask) over the prepared bars (see pattern_framework)
+
+def _from_bar(n, first):
+    """Mask of bars with position >= first (detectors that need history)."""
+    return np.arange(n) >= first
 
+@register_pattern("London Open Breakout")
 def pattern_london_open_breakout(df):
     """Buy/Sell breakout of the 07:00 candle high/low at 08:00 UTC."""
-    trades = []
-    df = df.copy()
-    df.index = pd.to_datetime(df.index)
-    if df.index.tz is not None:
-        df.index = df.index.tz_convert('UTC')
-
-    for i in range(1, len(df) - FWD_BARS):
-        ts = df.index[i]
-        if ts.hour == 8 and ts.minute == 0:
-            prev = df.iloc[i - 1]
-            curr = df.iloc[i]
-            # Breakout above previous candle high → BUY
-            if curr['Close'] > prev['High']:
-                r = simulate_trade(df, i, 'BUY', df['atr'].iloc[i])
-                if r: trades.append(r)
-            # Breakout below previous candle low → SELL
-            elif curr['Close'] < prev['Low']:
-                r = simulate_trade(df, i, 'SELL', df['atr'].iloc[i])
-                if r: trades.append(r)
-    return trades
-
+    at_open = (df.index.hour == 8) & (df.index.minute == 0) & _from_bar(len(df), 1)
+    close = df['close'].to_numpy()
+    # Breakout above previous candle high → BUY, below previous low → SELL
+    buy = at_open & (close > df['high'].shift().to_numpy())
+    sell = at_open & ~buy & (close < df['low'].shift().to_numpy())
+    return buy, sell
+
+@register_pattern("NY Open Reversal")
 def pattern_ny_open_reversal(df):
     """Fade the first 30-min NY move: if 13:00 candle is bullish → SELL, bearish → BUY."""
-    trades = []
-    df = df.copy()
-    df.index = pd.to_datetime(df.index)
-    if df.index.tz is not None:
-        df.index = df.index.tz_convert('UTC')
-
-    for i in range(1, len(df) - FWD_BARS):
-        ts = df.index[i]
-        if ts.hour == 13 and ts.minute == 0:
-            candle = df.iloc[i]
-            body = candle['Close'] - candle['Open']
-            atr  = df['atr'].iloc[i]
-            # Only trade if candle body > 0.5 ATR (meaningful move)
-            if abs(body) > atr * 0.5:
-                direction = 'SELL' if body > 0 else 'BUY'
-                r = simulate_trade(df, i, direction, atr)
-                if r: trades.append(r)
-    return trades
+    body = (df['close'] - df['open']).to_numpy()
+    # Only trade if candle body > 0.5 ATR (meaningful move)
+    active = (df.index.hour == 13) & (df.index.minute == 0) & _from_bar(len(df), 1) \
+        & (np.abs(body) > df['atr'].to_numpy() * 0.5)
+    return active & (body <= 0), active & (body > 0)
 
+@register_pattern("Asian Sweep & Reverse")
 def pattern_asian_sweep_reverse(df):
     """Asian range (00:00–07:00) sweep then reverse: price sweeps range high/low then closes back inside."""
-    trades = []
-    df = df.copy()
-    df.index = pd.to_datetime(df.index)
-    if df.index.tz is not None:
-        df.index = df.index.tz_convert('UTC')
-
-    dates = df.index.normalize().unique()
-    for date in dates:
-        asian = df[(df.index.date == date.date()) & (df.index.hour < 7)]
-        if len(asian) < 3: continue
-        a_high = asian['High'].max()
-        a_low  = asian['Low'].min()
-
-        # Check 07:00–09:00 for sweep + reversal
-        post = df[(df.index.date == date.date()) & (df.index.hour.isin([7, 8]))]
-        for i in range(len(post)):
-            row = post.iloc[i]
-            idx = df.index.get_loc(post.index[i])
-            if idx + FWD_BARS >= len(df): continue
-            atr = df['atr'].iloc[idx]
-            # Sweep high then close back below → SELL
-            if row['High'] > a_high and row['Close'] < a_high:
-                r = simulate_trade(df, idx, 'SELL', atr)
-                if r: trades.append(r)
-            # Sweep low then close back above → BUY
-            elif row['Low'] < a_low and row['Close'] > a_low:
-                r = simulate_trade(df, idx, 'BUY', atr)
-                if r: trades.append(r)
-    return trades
-
+    day = df.index.normalize()
+    asian = df[df.index.hour < 7].groupby(day[df.index.hour < 7]).agg(
+        a_high=('high', 'max'), a_low=('low', 'min'), n=('high', 'size'))
+    asian = asian[asian['n'] >= 3].reindex(day)
+    a_high, a_low = asian['a_high'].to_numpy(), asian['a_low'].to_numpy()
+
+    # Check 07:00–09:00 for sweep + reversal
+    post = np.isin(df.index.hour, [7, 8]) & ~np.isnan(a_high)
+    high, low, close = df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy()
+    # Sweep high then close back below → SELL; sweep low then close back above → BUY
+    sell = post & (high > a_high) & (close < a_high)
+    buy = post & ~sell & (low < a_low) & (close > a_low)
+    return buy, sell
+
+@register_pattern("3-Bar Momentum")
 def pattern_3bar_momentum(df):
     """3 consecutive same-direction bars → trade continuation on 4th bar."""
-    trades = []
-    for i in range(3, len(df) - FWD_BARS):
-        c = df['Close']
-        # 3 bullish bars
-        if c.iloc[i-1] > c.iloc[i-2] > c.iloc[i-3]:
-            r = simulate_trade(df, i, 'BUY', df['atr'].iloc[i])
-            if r: trades.append(r)
-        # 3 bearish bars
-        elif c.iloc[i-1] < c.iloc[i-2] < c.iloc[i-3]:
-            r = simulate_trade(df, i, 'SELL', df['atr'].iloc[i])
-            if r: trades.append(r)
-    return trades
+    c1, c2, c3 = (df['close'].shift(k).to_numpy() for k in (1, 2, 3))
+    ready = _from_bar(len(df), 3)
+    buy = ready & (c1 > c2) & (c2 > c3)
+    sell = ready & ~buy & (c1 < c2) & (c2 < c3)
+    return buy, sell
 
+@register_pattern("RSI Exhaustion Reversal")
 def pattern_rsi_exhaustion(df):
     """RSI > 75 → SELL; RSI < 25 → BUY (mean reversion after exhaustion)."""
-    trades = []
-    for i in range(1, len(df) - FWD_BARS):
-        rsi = df['rsi'].iloc[i]
-        prev_rsi = df['rsi'].iloc[i - 1]
-        atr = df['atr'].iloc[i]
-        # RSI crosses back below 75 → SELL
-        if prev_rsi >= 75 and rsi < 75:
-            r = simulate_trade(df, i, 'SELL', atr)
-            if r: trades.append(r)
-        # RSI crosses back above 25 → BUY
-        elif prev_rsi <= 25 and rsi > 25:
-            r = simulate_trade(df, i, 'BUY', atr)
-            if r: trades.append(r)
-    return trades
-
+    rsi, prev_rsi = df['rsi'].to_numpy(), df['rsi'].shift().to_numpy()
+    ready = _from_bar(len(df), 1)
+    # RSI crosses back below 75 → SELL; back above 25 → BUY
+    sell = ready & (prev_rsi >= 75) & (rsi < 75)
+    buy = ready & ~sell & (prev_rsi <= 25) & (rsi > 25)
+    return buy, sell
+
+@register_pattern("ATR Squeeze Breakout")
 def pattern_atr_squeeze_breakout(df):
     """ATR drops below 20-period average (squeeze), then expands → trade the breakout."""
-    trades = []
-    atr_avg = df['atr'].rolling(20).mean()
-    for i in range(21, len(df) - FWD_BARS):
-        prev_ratio = df['atr'].iloc[i-1] / atr_avg.iloc[i-1]
-        curr_ratio = df['atr'].iloc[i]   / atr_avg.iloc[i]
-        # Was in squeeze (< 0.8), now expanding (> 1.0)
-        if prev_ratio < 0.8 and curr_ratio > 1.0:
-            # Trade in direction of the breakout candle
-            candle = df.iloc[i]
-            direction = 'BUY' if candle['Close'] > candle['Open'] else 'SELL'
-            r = simulate_trade(df, i, direction, df['atr'].iloc[i])
-            if r: trades.append(r)
-    return trades
-
+    ratio = (df['atr'] / df['atr'].rolling(20).mean()).to_numpy()
+    prev_ratio = np.concatenate(([np.nan], ratio[:-1]))
+    # Was in squeeze (< 0.8), now expanding (> 1.0); trade in direction of the breakout candle
+    active = _from_bar(len(df), 21) & (prev_ratio < 0.8) & (ratio > 1.0)
+    bullish = (df['close'] > df['open']).to_numpy()
+    return active & bullish, active & ~bullish
+
+@register_pattern("EOD Mean Reversion")
 def pattern_eod_mean_reversion(df):
     """End of day (20:00 UTC): if price is > 1 ATR from daily open → fade it."""
-    trades = []
-    df = df.copy()
-    df.index = pd.to_datetime(df.index)
-    if df.index.tz is not None:
-        df.index = df.index.tz_convert('UTC')
-
-    dates = df.index.normalize().unique()
-    for date in dates:
-        day_bars = df[df.index.date == date.date()]
-        if day_bars.empty: continue
-        day_open = day_bars['Open'].iloc[0]
-
-        eod = day_bars[day_bars.index.hour == 20]
-        for i in range(len(eod)):
-            idx = df.index.get_loc(eod.index[i])
-            if idx + FWD_BARS >= len(df): continue
-            price = eod.iloc[i]['Close']
-            atr   = df['atr'].iloc[idx]
-            dist  = price - day_open
-            if abs(dist) > atr:
-                direction = 'SELL' if dist > 0 else 'BUY'
-                r = simulate_trade(df, idx, direction, atr)
-                if r: trades.append(r)
-    return trades
+    day_open = df['open'].groupby(df.index.normalize()).transform('first').to_numpy()
+    dist = df['close'].to_numpy() - day_open
+    active = (df.index.hour == 20) & (np.abs(dist) > df['atr'].to_numpy())
+    return active & (dist <= 0), active & (dist > 0)
 
 
 # ── Main ──────────────────────────────────────────────────────────────────────
 
-PATTERNS = {
-    "London Open Breakout":    pattern_london_open_breakout,
-    "NY Open Reversal":        pattern_ny_open_reversal,
-    "Asian Sweep & Reverse":   pattern_asian_sweep_reverse,
-    "3-Bar Momentum":          pattern_3bar_momentum,
-    "RSI Exhaustion Reversal": pattern_rsi_exhaustion,
-    "ATR Squeeze Breakout":    pattern_atr_squeeze_breakout,
-    "EOD Mean Reversion":      pattern_eod_mean_reversion,
-}
-
 def run():
-    # Aggregate results: pattern → list of (hr, pf, avg_r, n) per symbol
-    agg = {p: [] for p in PATTERNS}
-    symbol_results = []
-
-    for ticker, label in SYMBOLS.items():
-        print(f"  Fetching {label}...")
-        try:
-            df = yf.download(ticker, period="180d", interval="1h",
-                             progress=False, auto_adjust=True)
-            if df.empty: continue
-            if isinstance(df.columns, pd.MultiIndex):
-                df.columns = df.columns.get_level_values(0)
-
-            df['atr'] = calc_atr(df)
-            df['rsi'] = calc_rsi(df['Close'])
-            df = df.dropna()
-
-            for pname, pfunc in PATTERNS.items():
-                try:
-                    trades = pfunc(df)
-                    hr, pf, avg_r, n = score(trades)
-                    agg[pname].append((hr, pf, avg_r, n))
-                    symbol_results.append({
-                        'Symbol': label, 'Pattern': pname,
-                        'N': n, 'HitRate': hr, 'PF': pf, 'AvgR': avg_r
-                    })
-                except Exception as e:
-                    pass
-        except Exception as e:
-            print(f"    ❌ {e}")
+    df_res = scan(SYMBOLS, PATTERNS, timeframe="1h", days=LOOKBACK_DAYS)
+    df_res['Symbol'] = df_res['Symbol'].map(SYMBOLS)
 
     # ── Print per-symbol table ────────────────────────────────────────────────
-    df_res = pd.DataFrame(symbol_results)
-
     print("\n" + "="*90)
-    print("  PATTERN SCANNER RESULTS  (180 days × 1h × 8 symbols)")
+    print(f"  PATTERN SCANNER RESULTS  ({LOOKBACK_DAYS} days × 1h × {len(SYMBOLS)} symbols)")
     print("  PF > 1.5 = Interesting  |  PF > 2.0 = Strong  |  N > 30 = Reliable")
     print("="*90)
 
@@ -328,6 +168,7 @@ def run():
 
 
 if __name__ == "__main__":
+    warnings.simplefilter(action='ignore', category=FutureWarning)
     print("🔍 Pattern Scanner — Finding Repeating Market Phenomena")
-    print("   180 days × 1h bars × 8 symbols × 7 patterns\n")
+    print(f"   {LOOKBACK_DAYS} days × 1h bars × {len(SYMBOLS)} symbols × {len(PATTERNS)} patterns\n")
     run()
@@ -1,7 +1,5 @@
-import json
-import os
-from datetime import datetime
 from mt5_bridge.signal_exporter import SignalExporter
+from mt5_bridge.signal_feed import SignalFeedReader
 
 def test_bridge_export():
     mock_signal = {
@@ -21,14 +19,15 @@ def test_bridge_export():
     print("🚀 Simulating signal export...")
     SignalExporter.export_signal(mock_signal)
     
-    # Verify file exists
-    if os.path.exists("mt5_bridge/signals_mt5.json"):
-        with open("mt5_bridge/signals_mt5.json", "r") as f:
-            data = json.load(f)
-            print(f"✅ Bridge file verified. Found {len(data)} signals.")
-            print(f"📡 Latest signal: {data[-1]['symbol']} {data[-1]['direction']} at {data[-1]['entry']}")
+    # Read it back the way the EA does: poll the feed by sequence number
+    records = SignalFeedReader(SignalExporter.FEED_DIR).poll()
+    if records:
+        latest = records[-1]
+        print(f"✅ Bridge feed verified. Found {len(records)} signals.")
+        print(f"📡 Latest signal #{latest['seq']}: {latest['signal']['symbol']} "
+              f"{latest['signal']['direction']} at {latest['signal']['entry']}")
     else:
-        print("❌ Bridge file NOT found!")
+        print("❌ Bridge feed is empty!")
 
 if __name__ == "__main__":
     test_bridge_export()
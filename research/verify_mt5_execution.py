@@ -1,17 +1,16 @@
 import time
-import json
 import os
+import shutil
 import subprocess
 import signal
+from datetime import datetime
+from mt5_bridge.signal_feed import SignalFeed
 
 def run_execution_audit():
-    BRIDGE_FILE = "mt5_bridge/signals_mt5.json"
+    FEED_DIR = "mt5_bridge/feed"
     
     # 1. Clean up bridge
-    if os.path.exists(BRIDGE_FILE):
-        os.remove(BRIDGE_FILE)
-    
-    os.makedirs(os.path.dirname(BRIDGE_FILE), exist_ok=True)
+    shutil.rmtree(FEED_DIR, ignore_errors=True)
     
     # 2. Start the handler in a background process
     print("🚀 Starting MT5 Execution Handler Audit...")
@@ -35,24 +34,22 @@ def run_execution_audit():
             "tp1": 1.2600,
             "lots": 0.1,
             "quality": "A",
-            "executed": False,
-            "exported_at": "2026-02-18T01:50:00"
+            "exported_at": datetime.now().isoformat()
         }
         
-        with open(BRIDGE_FILE, 'w') as f:
-            json.dump([mock_signal], f, indent=4)
+        seq = SignalFeed(FEED_DIR).append(mock_signal)
             
         # 4. Wait for processing
         print("⏳ Waiting for handler to process signal...")
         time.sleep(3)
         
-        # 5. Verify the signal was marked as executed
-        with open(BRIDGE_FILE, 'r') as f:
-            signals = json.load(f)
-            if signals[-1].get('executed'):
-                print("✅ SUCCESS: Signal detected and marked as executed.")
-            else:
-                print("❌ FAILURE: Signal was NOT marked as executed.")
+        # 5. Verify the handler acknowledged the signal's sequence number
+        cursor_path = os.path.join(FEED_DIR, "mt5_handler.seq")
+        acked = open(cursor_path).read().strip() if os.path.exists(cursor_path) else ""
+        if acked == str(seq):
+            print("✅ SUCCESS: Signal detected and acknowledged by the handler.")
+        else:
+            print("❌ FAILURE: Signal was NOT acknowledged.")
                 
     finally:
         # Terminate handler
@@ -2,6 +2,8 @@ import asyncio
 import argparse
 from datetime import datetime, timedelta
 from core.backtest_engine import BacktestEngine
+from data.dukascopy_import import imported_store
+from data.frame_cache import FrameCache
 from version import get_system_banner
 
 async def main():
@@ -14,6 +16,12 @@ async def main():
                        help="Custom start date (YYYY-MM-DD)")
     parser.add_argument("--end", type=str, default=None,
                        help="Custom end date (YYYY-MM-DD)")
+    parser.add_argument("--compact", action="store_true",
+                       help="Hold bar/indicator frames as float32 to cut memory on long ranges")
+    parser.add_argument("--bar-store", type=str, default="data/bar_store",
+                       help="Imported Dukascopy bars (python -m data.dukascopy_import); used when they cover the range")
+    parser.add_argument("--frame-cache", type=str, default="data/frame_cache",
+                       help="Cache of downloaded bars and indicator frames for repeat runs ('' disables)")
     args = parser.parse_args()
 
     if args.start and args.end:
@@ -35,7 +43,12 @@ async def main():
     print(f"⚙️  Alpha Core: {active_models}")
     print("=" * 50)
     
-    engine = BacktestEngine(start_date, end_date)
+    bar_store = imported_store(args.bar_store)
+    if bar_store is not None:
+        print(f"📂 Bar store: {args.bar_store} (imported Dukascopy history)")
+    frame_cache = FrameCache(args.frame_cache) if args.frame_cache else None
+    engine = BacktestEngine(start_date, end_date, compact_frames=args.compact, bar_store=bar_store,
+                            frame_cache=frame_cache)
     
     def progress_bar(p):
         cols = 40
@@ -8,9 +8,11 @@ Usage:
     python signal_service.py --test       # Test mode (one cycle)
 """
 import asyncio
+import gc
 import signal
 import sys
 import hashlib
+import logging
 import sqlite3
 from datetime import datetime, timedelta
 from typing import Set, Tuple
@@ -18,8 +20,11 @@ from typing import Set, Tuple
 from app.generate_signals import generate_signals
 from alerts.service import TelegramService
 from core.signal_formatter import SignalFormatter
-from core.market_regime import detect_regime, apply_regime_filter
 from core.db_utils import connect_sqlite
+from core.cycle_trace import CycleTrace, record_cycle, span, tracing
+from core.metrics import REGISTRY, MetricsPusher
+from core.memory import MemoryWatch
+from core import forensics
 from config.manager import config_manager
 
 # Configuration
@@ -28,6 +33,12 @@ DEDUP_WINDOW_HOURS = 0.75  # Don't resend same signal within 45 mins (User reque
 MAX_RETRIES = 3
 RETRY_DELAY = 30  # seconds
 
+CYCLE_SECONDS = REGISTRY.histogram("signal_cycle_seconds", "Signal service cycle duration",
+                                   buckets=(1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600))
+CYCLE_SIGNALS = REGISTRY.counter("signal_cycle_signals_total", "Signals generated and sent", ("outcome",))
+GATE_DECISIONS = REGISTRY.counter("gate_decisions_total", "Execution gate decisions", ("status", "reason"))
+CYCLE_ERRORS = REGISTRY.counter("signal_cycle_errors_total", "Cycles aborted by an exception")
+
 
 class SignalService:
     """Continuous signal generation and Telegram delivery service."""
@@ -39,6 +50,7 @@ class SignalService:
         self.is_paused = False
         self.cycle_count = 0
         self._schema_checked = False
+        self.memory = MemoryWatch("signal_service")
         
         # Set up signal handlers for graceful shutdown
         signal.signal(signal.SIGINT, self._shutdown)
@@ -198,36 +210,41 @@ class SignalService:
     
     async def run_cycle(self) -> Tuple[int, int]:
         """
-        Run one signal generation cycle.
+        Run one signal generation cycle, traced per stage (core.cycle_trace).
         Returns: (total_signals, sent_count)
         """
         self.cycle_count += 1
-        print(f"\n{'='*60}")
-        print(f"🔄 CYCLE #{self.cycle_count} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"{'='*60}")
+        trace = CycleTrace(self.cycle_count)
+        total, sent = 0, 0
+        try:
+            with tracing(trace):
+                total, sent = await self._run_cycle()
+        finally:
+            # The cycle's frames are garbage now; collect the young generations, where any reference
+            # cycles they sit in live (full collections, ~50ms, stay on the interpreter's schedule)
+            gc.collect(1)
+            self._record_cycle_metrics(trace, total, sent)
+        return total, sent
 
-        # V23.2: Dynamic Market Regime Detection (before config load)
+    def _record_cycle_metrics(self, trace: CycleTrace, total: int, sent: int):
+        memory = self.memory.sample()
+        CYCLE_SECONDS.observe(trace.finish())
+        CYCLE_SIGNALS.inc(total, outcome="generated")
+        CYCLE_SIGNALS.inc(sent, outcome="sent")
+        slowest = ", ".join(f"{name} {ms:.0f}ms" for name, ms in trace.slowest())
+        print(f"⏱️  Cycle #{self.cycle_count} took {trace.finish():.1f}s ({slowest}), RSS {memory['rss_mb']:.0f}MB")
         try:
-            from data.fetcher import DataFetcher
-            from indicators.calculations import IndicatorCalculator
-            import asyncio as _aio
-            fetcher = DataFetcher()
-            h1_map = {}
-            # Sample first 4 symbols for speed (representative)
-            settings = config_manager.snapshot()
-            for sym in list(settings.symbols)[:4]:
-                try:
-                    raw = await fetcher.fetch_data_async(sym, "1h", period="30d")
-                    if raw is not None and not raw.empty:
-                        h1_map[sym] = IndicatorCalculator.add_indicators(raw, "1h")
-                except Exception:
-                    pass
-            regime_result = detect_regime(h1_map)
-            apply_regime_filter(regime_result, settings.db_clients)
+            record_cycle(config_manager.get("db_signals"), trace, signals=total, sent=sent, rss_mb=memory["rss_mb"])
         except Exception as e:
-            print(f"⚠️  Regime detection skipped: {e}")
+            print(f"⚠️  Failed to record cycle metrics: {e}")
 
-        # V19.0: Dynamic Configuration Loading (after regime sets threshold)
+    async def _run_cycle(self) -> Tuple[int, int]:
+        print(f"\n{'='*60}")
+        print(f"🔄 CYCLE #{self.cycle_count} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"{'='*60}")
+
+        # V19.0: Dynamic Configuration Loading
+        # (the regime panel in generate_signals sets the quality threshold; the gate reads it live)
         self._load_dynamic_config()
         
         if self.is_paused:
@@ -239,7 +256,8 @@ class SignalService:
         
         # Generate signals
         try:
-            signals = await generate_signals()
+            with span("generate"):
+                signals = await generate_signals()
         except Exception as e:
             print(f"❌ Error generating signals: {e}")
             return 0, 0
@@ -277,15 +295,19 @@ class SignalService:
                     skipped += 1
                     print(f"⏭️  Skipped persisted duplicate: {signal_data.get('symbol')} {signal_data.get('direction')}")
                     continue
-                gate_result = ExecutionGate.validate_and_reserve(signal_data, DB_SIGNALS, DB_CLIENTS)
+                with span("gate", signal_data.get('symbol')):
+                    gate_result = ExecutionGate.validate_and_reserve(signal_data, DB_SIGNALS, DB_CLIENTS)
                 signal_data['gate_status'] = gate_result['status']
                 signal_data['gate_reason'] = gate_result['reason']
+                GATE_DECISIONS.inc(status=gate_result['status'],
+                                   reason=ExecutionGate.reason_code(gate_result['reason']))
                 
                 gate_tag = "🟢 PASSED" if gate_result['status'] == 'PASSED' else f"🔴 BLOCKED ({gate_result['reason']})"
                 print(f"  ⛩️  Gate: {signal_data.get('symbol')} → {gate_tag}")
 
                 # V17.2: Log to database FIRST for dashboard reliability
-                signal_id = self._log_to_database(signal_data)
+                with span("db_log", signal_data.get('symbol')):
+                    signal_id = self._log_to_database(signal_data)
                 if signal_id:
                     signal_data["id"] = signal_id
                 self._mark_sent(signal_data)
@@ -297,7 +319,8 @@ class SignalService:
                     continue
 
                 # Broadcast only executable, gate-passed signals after logging.
-                await self.telegram.broadcast_personalized_signal(signal_data)
+                with span("broadcast", signal_data.get('symbol')):
+                    await self.telegram.broadcast_personalized_signal(signal_data)
                 self._mark_signal_delivered(signal_data)
 
                 # V31.0: Only execute trades that PASS the gate
@@ -305,7 +328,8 @@ class SignalService:
                     try:
                         from core.trade_executor import get_executor
                         executor = get_executor()
-                        trade_result = await executor.execute_trade(signal_data)
+                        with span("execution", signal_data.get('symbol')):
+                            trade_result = await executor.execute_trade(signal_data)
                         mode_tag = "📝 PAPER" if trade_result.get("status") == "paper" else "✅ LIVE"
                         print(f"  {mode_tag} Trade: {signal_data.get('direction')} {signal_data.get('symbol')} → {trade_result.get('status')}")
                         if trade_result.get("status") == "error":
@@ -328,7 +352,7 @@ class SignalService:
 
                 
                 # Small delay to avoid API flood
-                await asyncio.sleep(1)
+                await self._wait(1)
                 
             except Exception as e:
                 print(f"❌ Error during signal processing/delivery: {e}")
@@ -338,10 +362,6 @@ class SignalService:
     
     def _log_to_database(self, signal_data: dict):
         """Log signal to database for dashboard display."""
-        import sqlite3
-        import os
-        from datetime import datetime
-        
         db_path = config_manager.get("db_signals")
         
         # V18.1: Self-Healing Schema - Ensure all columns exist before insert
@@ -423,16 +443,16 @@ class SignalService:
             signal_ts = signal_data.get('timestamp') or datetime.now().isoformat()
             signal_data['timestamp'] = signal_ts
             
-            conn.execute("""
+            cursor = conn.execute("""
                 INSERT INTO signals (
                     timestamp, symbol, direction, entry_price, 
                     sl, tp0, tp1, tp2, reasoning, timeframe, confidence,
                     trade_type, quality_score, regime, expected_hold, risk_details, score_details,
-                    forensic_candles, forensic_events, gate_status, gate_reason,
+                    gate_status, gate_reason,
                     signal_uid, execution_status, requested_price, requested_lot_size,
                     data_timestamp, bar_closed, idempotency_key, strategy
                 )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ON CONFLICT(idempotency_key) DO NOTHING
             """, (
                 signal_ts,
@@ -452,8 +472,6 @@ class SignalService:
                 signal_data.get('expected_hold', 'UNKNOWN'),
                 risk_json,
                 score_json,
-                json.dumps(sanitize_for_json(signal_data.get('forensic_candles', []))),
-                json.dumps(sanitize_for_json(signal_data.get('forensic_events', []))),
                 signal_data.get('gate_status', 'UNKNOWN'),
                 signal_data.get('gate_reason', 'UNKNOWN'),
                 signal_data.get('signal_uid'),
@@ -465,8 +483,14 @@ class SignalService:
                 signal_data.get('idempotency_key') or self._signal_hash(signal_data),
                 signal_data.get('strategy') or signal_data.get('strategy_name')
             ))
+            signal_id = cursor.lastrowid
+            # Forensic candles/events go to the compressed side table (core.forensics)
+            if cursor.rowcount:
+                forensics.store(conn, signal_id,
+                                sanitize_for_json(signal_data.get('forensic_candles', [])),
+                                sanitize_for_json(signal_data.get('forensic_events', [])))
             conn.commit()
-            return conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            return signal_id
         except Exception as e:
             print(f"⚠️  Failed to log signal to database: {e}")
             return None
@@ -475,6 +499,16 @@ class SignalService:
                 conn.close()
 
     
+    async def _wait(self, seconds: float):
+        """
+        Sleeps in 1s steps so a shutdown signal ends the wait early.
+        core.replay overrides this to advance its simulated clock instead.
+        """
+        for _ in range(int(seconds)):
+            if not self.running:
+                break
+            await asyncio.sleep(1)
+
     async def run(self, test_mode: bool = False):
         """
         Main service loop. Runs continuously until shutdown.
@@ -492,7 +526,11 @@ class SignalService:
         
         if not self.telegram.bot:
             print("⚠️  FATAL: Telegram not configured. Signals will be generated but not broadcast.")
-        
+
+        # Metrics snapshot + heartbeat for /metrics and the watchdog
+        pusher = MetricsPusher("signal_service", memory=self.memory)
+        pusher.start()
+
         while self.running:
             try:
                 # Run signal cycle
@@ -512,24 +550,24 @@ class SignalService:
                 
                 print(f"\n⏳ Next cycle at {next_run.strftime('%H:%M:%S')} (waiting {int(wait_seconds)}s)")
                 
-                # Wait with graceful shutdown check
-                for _ in range(int(wait_seconds)):
-                    if not self.running:
-                        break
-                    await asyncio.sleep(1)
+                await self._wait(wait_seconds)
                     
             except Exception as e:
+                CYCLE_ERRORS.inc()
                 print(f"❌ Cycle error: {e}")
                 if not test_mode:
                     print(f"⏳ Retrying in {RETRY_DELAY} seconds...")
                     await asyncio.sleep(RETRY_DELAY)
                 else:
                     break
-        
+
+        await pusher.stop()
         print("\n👋 Signal service stopped gracefully.")
 
 
 async def main():
+    # Library loggers (DirectMT5 order/connection lines via trade_executor) only reach the console from here
+    logging.basicConfig(format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO)
     test_mode = '--test' in sys.argv
     service = SignalService()
     await service.run(test_mode=test_mode)
@@ -5,35 +5,61 @@ Watches open signals and updates their result (TP/SL) based on real-time price d
 """
 import asyncio
 import sqlite3
-import yfinance as yf
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, timezone
 import os
 import signal
 import sys
+import time
 import logging
 
+from core.metrics import REGISTRY, MetricsPusher
+
 # Suppress noisy yfinance warnings
 logging.getLogger('yfinance').setLevel(logging.CRITICAL)
 
 DB_PATH = "database/signals.db"
 TRACKING_INTERVAL = 120  # Check every 2 minutes
+# What settlement reads from an open signal (not the JSON/forensic blobs)
+TRACKED_COLUMNS = ("id", "symbol", "direction", "entry_price", "sl", "tp0", "tp1", "tp2",
+                   "max_tp_reached", "gate_status", "risk_details")
+
+TRACK_SECONDS = REGISTRY.histogram("tracker_cycle_seconds", "Signal tracker cycle duration")
+OPEN_SIGNALS = REGISTRY.gauge("tracker_open_signals", "Open signals watched by the tracker")
+PRICE_FAILURES = REGISTRY.counter("tracker_price_failures_total", "Latest-price fetches returning nothing", ("symbol",))
+SETTLEMENTS = REGISTRY.counter("tracker_settlements_total", "Signals closed by the tracker", ("outcome",))
+# Age of the 1m bar that settled a signal: how late TP/SL hits are booked
+SETTLEMENT_LAG_SECONDS = REGISTRY.histogram("tracker_settlement_lag_seconds", "Price bar age at settlement",
+                                            buckets=(30, 60, 120, 180, 300, 600, 1800, 3600, 14400))
 
 def _get_session():
-    """Get a robust session for yfinance, matching data/fetcher.py approach."""
+    """Get a robust session for yfinance, matching data/fetcher.py approach (recycled after SESSION_MAX_AGE)."""
+    global _session, _session_born
+    if _session is not None and time.monotonic() - _session_born > SESSION_MAX_AGE:
+        try:
+            _session.close()
+        except Exception:
+            pass
+        _session = None
+    if _session is not None:
+        return _session
+    _session_born = time.monotonic()
     try:
         from curl_cffi import requests as curl_requests
-        return curl_requests.Session(impersonate="chrome")
+        _session = curl_requests.Session(impersonate="chrome")
     except ImportError:
         import requests
-        session = requests.Session()
-        session.headers.update({
+        _session = requests.Session()
+        _session.headers.update({
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
         })
-        return session
+    return _session
 
-# Reuse a single session across cycles
-_session = _get_session()
+# Reused across cycles; created (with the yfinance import) on the first price fetch
+_session = None
+_session_born = 0.0
+# Same as data.fetcher.SESSION_MAX_AGE: long-lived sessions accumulate cookies and pooled connections
+SESSION_MAX_AGE = 6 * 3600
 
 def calculate_pips(symbol, entry, exit, direction):
     """V31.0: Precise institutional pip calculation."""
@@ -52,6 +78,7 @@ def calculate_pips(symbol, entry, exit, direction):
 class SignalTracker:
     def __init__(self):
         self.running = True
+        self.price_times = {}  # symbol -> timestamp of the bar behind the latest price
         signal.signal(signal.SIGINT, self._shutdown)
         signal.signal(signal.SIGTERM, self._shutdown)
 
@@ -68,11 +95,12 @@ class SignalTracker:
     def _fetch_latest_price(self, symbol: str):
         """Fetch latest price using yf.download() with session (avoids cookie bug)."""
         try:
+            import yfinance as yf
             df = yf.download(
                 tickers=symbol,
                 period="1d",
                 interval="1m",
-                session=_session,
+                session=_get_session(),
                 progress=False,
                 auto_adjust=True,
                 threads=False,
@@ -82,6 +110,7 @@ class SignalTracker:
             # Flatten MultiIndex columns if necessary
             if isinstance(df.columns, pd.MultiIndex):
                 df.columns = df.columns.get_level_values(0)
+            self.price_times[symbol] = df.index[-1]
             return float(df['Close'].iloc[-1])
         except Exception as e:
             print(f"⚠️ Error fetching price for {symbol}: {e}")
@@ -89,16 +118,30 @@ class SignalTracker:
 
     async def track_once(self):
         """Perform one tracking cycle for all open signals."""
+        with TRACK_SECONDS.time():
+            await self._track_once()
+
+    def _settlement_lag(self, symbol: str):
+        bar_time = self.price_times.get(symbol)
+        if bar_time is None:
+            return None
+        bar_time = pd.Timestamp(bar_time)
+        if bar_time.tzinfo is None:
+            bar_time = bar_time.tz_localize("UTC")
+        return max(0.0, (pd.Timestamp(datetime.now(timezone.utc)) - bar_time).total_seconds())
+
+    async def _track_once(self):
         conn = None
         try:
             conn = self.get_db_connection()
             # Find all open signals (exclude BLOCKED signals that were never executed)
-            open_signals = conn.execute("""
-                SELECT * FROM signals 
+            open_signals = conn.execute(f"""
+                SELECT {', '.join(TRACKED_COLUMNS)} FROM signals
                 WHERE result = 'OPEN' 
                   AND COALESCE(gate_status, 'PASSED') != 'BLOCKED'
             """).fetchall()
-            
+            OPEN_SIGNALS.set(len(open_signals))
+
             if not open_signals:
                 return
 
@@ -111,6 +154,8 @@ class SignalTracker:
                 price = self._fetch_latest_price(symbol)
                 if price is not None:
                     prices[symbol] = price
+                else:
+                    PRICE_FAILURES.inc(symbol=symbol)
 
             for sig in open_signals:
                 symbol = sig['symbol']
@@ -186,6 +231,10 @@ class SignalTracker:
                     outcome = None
                     if new_result != 'OPEN':
                         outcome = 'WIN' if new_result.startswith('TP') else 'LOSS'
+                        SETTLEMENTS.inc(outcome=outcome)
+                        lag = self._settlement_lag(symbol)
+                        if lag is not None:
+                            SETTLEMENT_LAG_SECONDS.observe(lag)
 
                     conn.execute("""
                         UPDATE signals 
@@ -229,7 +278,9 @@ class SignalTracker:
         print(f"📡 Interval: {TRACKING_INTERVAL} seconds")
         print(f"🗄️ Database: {DB_PATH}")
         print("="*60)
-        
+
+        pusher = MetricsPusher("signal_tracker")
+        pusher.start()
         while self.running:
             start_time = datetime.now()
             await self.track_once()
@@ -238,6 +289,7 @@ class SignalTracker:
             elapsed = (datetime.now() - start_time).total_seconds()
             sleep_time = max(1, TRACKING_INTERVAL - elapsed)
             await asyncio.sleep(sleep_time)
+        await pusher.stop()
 
 if __name__ == "__main__":
     tracker = SignalTracker()
@@ -1,88 +1,195 @@
+import argparse
+import os
+import time
+
 import pandas as pd
 import numpy as np
-import random
-import os
 
 # --- CONFIGURATION ---
 START_BALANCE = 50.0
 MIN_LOT = 0.01
 LOT_VALUE_PER_PIP = 0.10  # 0.01 lot = $0.10 per pip
 SPREAD_COST_USD = 0.30    # Fixed cost per trade (approx 3 pips)
-RISK_PERCENT = 0.02       # 2% Risk 
+RISK_PERCENT = 0.02       # 2% Risk
+MAX_RISK_FRACTION = 0.02  # RiskManager's hard cap (MAX_RISK_PERCENT)
 TARGET_BALANCE = 100.0    # Double the account
 BANKRUPT_BALANCE = 10.0   # Critical level
 ITERATIONS = 1000         # Monte Carlo runs
+TRADES_PER_PATH = 100     # Trades drawn per run (capped at the log length)
+AVG_SL_PIPS = 20          # Average stop distance used for the min-lot floor
+CHUNK_PATHS = 50_000      # Paths simulated per chunk (~80 MB at 100 trades)
 
 DATA_PATH = "research/backtest_trade_logs.csv"
+SIGNALS_DB = "database/signals.db"
+
+# Smallest risk the broker allows: 0.01 lot over the average stop = $2.00
+MIN_LOT_RISK_USD = (MIN_LOT / 0.01) * LOT_VALUE_PER_PIP * AVG_SL_PIPS
+
+SIZING_RULES = ("fixed", "min_lot", "kelly")
+
+
+def sizing_rule(name: str, db_path: str = SIGNALS_DB) -> dict:
+    """
+    Risk per trade as {fraction of balance, USD floor}.
+      fixed   : RISK_PERCENT of balance
+      min_lot : RISK_PERCENT of balance, never below one min-lot stop (original model)
+      kelly   : RISK_PERCENT scaled by RiskManager's fractional Kelly from resolved
+                signals (at most 2x, within the 2% hard cap), min-lot floor; plain
+                RISK_PERCENT without enough history — RiskManager.calculate_lot_size's rule
+    """
+    if name == "fixed":
+        return {"fraction": RISK_PERCENT, "floor_usd": 0.0}
+    if name == "min_lot":
+        return {"fraction": RISK_PERCENT, "floor_usd": MIN_LOT_RISK_USD}
+    if name == "kelly":
+        from core.filters.risk_manager import RiskManager
+        kelly = RiskManager._calculate_kelly_fraction(db_path) if os.path.exists(db_path) else 0.0
+        fraction = min(RISK_PERCENT * kelly, 2 * RISK_PERCENT) if kelly > 0 else RISK_PERCENT
+        return {"fraction": min(fraction, MAX_RISK_FRACTION), "floor_usd": MIN_LOT_RISK_USD}
+    raise ValueError(f"Unknown sizing rule '{name}' (expected one of {SIZING_RULES})")
+
+
+def sample_r_matrix(trades_r: np.ndarray, paths: int, trades: int, rng: np.random.Generator,
+                    block: int = 1) -> np.ndarray:
+    """
+    (paths × trades) R-multiples drawn with replacement in one call.
+    block > 1 draws circular blocks of consecutive historical trades, so win/loss
+    streaks (and the drawdowns they cause) survive the resampling.
+    """
+    n = len(trades_r)
+    if block <= 1:
+        return trades_r[rng.integers(0, n, size=(paths, trades))]
+    blocks = -(-trades // block)
+    starts = rng.integers(0, n, size=(paths, blocks, 1))
+    idx = ((starts + np.arange(block)) % n).reshape(paths, blocks * block)[:, :trades]
+    return trades_r[idx]
+
+
+def simulate_paths(r_matrix: np.ndarray, rule: dict, start_balance: float = START_BALANCE) -> dict:
+    """
+    Vectorized account paths for one R matrix.
+
+    Balances step trade-by-trade across all paths at once (the min-lot floor
+    makes each step depend on the last balance); peaks, drawdown and
+    ruin/target times then come from cumulative ops over the balance matrix.
+    A path that drops below BANKRUPT_BALANCE stops trading (balance frozen).
+
+    Returns per-path arrays: final, max_dd (%), ruin_at, target_at
+    (trade number of the first hit, -1 if never).
+    """
+    paths, trades = r_matrix.shape
+    # Trade-major layout: each step reads/writes one contiguous row
+    r_steps = np.ascontiguousarray(r_matrix.T)
+    balances = np.empty((trades + 1, paths))
+    balances[0] = start_balance
+    alive = np.ones(paths, dtype=bool)
+    risk_usd = np.empty(paths)
 
-def run_simulation():
+    for t in range(trades):
+        balance = balances[t]
+        np.maximum(balance * rule["fraction"], rule["floor_usd"], out=risk_usd)
+        step = balances[t + 1]
+        np.multiply(r_steps[t], risk_usd, out=step)
+        step -= SPREAD_COST_USD
+        step *= alive
+        step += balance
+        alive &= step >= BANKRUPT_BALANCE
+
+    peaks = np.maximum.accumulate(balances, axis=0)
+    max_dd = ((peaks - balances) / peaks).max(axis=0) * 100
+
+    ruined = balances < BANKRUPT_BALANCE
+    reached = balances >= TARGET_BALANCE
+    return {
+        "final": balances[-1].copy(),
+        "max_dd": max_dd,
+        "ruin_at": np.where(ruined.any(axis=0), ruined.argmax(axis=0), -1),
+        "target_at": np.where(reached.any(axis=0), reached.argmax(axis=0), -1),
+    }
+
+
+def monte_carlo(trades_r, paths: int = ITERATIONS, trades: int = TRADES_PER_PATH, sizing: str = "min_lot",
+                block: int = 1, seed: int = None, chunk_paths: int = CHUNK_PATHS,
+                db_path: str = SIGNALS_DB) -> dict:
+    """
+    Runs `paths` Monte Carlo accounts in chunks of `chunk_paths` (memory stays at
+    one chunk's R and balance matrices) and summarizes them.
+    """
+    trades_r = np.asarray(trades_r, dtype=np.float64)
+    trades = min(len(trades_r), trades)
+    rule = sizing_rule(sizing, db_path)
+    rng = np.random.default_rng(seed)
+
+    parts = []
+    for offset in range(0, paths, chunk_paths):
+        n = min(chunk_paths, paths - offset)
+        parts.append(simulate_paths(sample_r_matrix(trades_r, n, trades, rng, block), rule))
+    res = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+
+    target_times = res["target_at"][res["target_at"] >= 0]
+    ruin_times = res["ruin_at"][res["ruin_at"] >= 0]
+    return {
+        "paths": paths,
+        "trades": trades,
+        "sizing": sizing,
+        "risk_fraction": rule["fraction"],
+        "block": block,
+        "win_rate": float((res["final"] >= TARGET_BALANCE).mean() * 100),
+        "blow_rate": float((res["final"] <= BANKRUPT_BALANCE).mean() * 100),
+        "touch_target_rate": float((res["target_at"] >= 0).mean() * 100),
+        "avg_final": float(res["final"].mean()),
+        "p5_final": float(np.percentile(res["final"], 5)),
+        "p95_final": float(np.percentile(res["final"], 95)),
+        "median_dd": float(np.median(res["max_dd"])),
+        "p95_dd": float(np.percentile(res["max_dd"], 95)),
+        "median_trades_to_target": float(np.median(target_times)) if len(target_times) else None,
+        "median_trades_to_ruin": float(np.median(ruin_times)) if len(ruin_times) else None,
+    }
+
+
+def run_simulation(paths: int = ITERATIONS, sizing: str = "min_lot", block: int = 1, seed: int = None,
+                   chunk_paths: int = CHUNK_PATHS):
     print(f"📈 STARTING $50 ACCOUNT SIMULATION (V23.1.3)")
     print("-" * 50)
-    
+
     if not os.path.exists(DATA_PATH):
         print(f"❌ Error: {DATA_PATH} not found.")
         return
 
     df = pd.read_csv(DATA_PATH)
-    trades_r = df['r'].tolist() # R-multiples from historical data
-    
-    results = []
-    
-    for i in range(ITERATIONS):
-        balance = START_BALANCE
-        # Shuffle trades for Monte Carlo
-        current_trades = random.choices(trades_r, k=min(len(trades_r), 100))
-        
-        peak_balance = balance
-        max_drawdown = 0.0
-        
-        for r in current_trades:
-            # Calculate Risk Amount ($)
-            # We risk 2% of balance, but minimum lot is 0.01
-            # For simplicity, assume average SL is 20 pips ($2.00 risk @ 0.01 lot)
-            risk_usd = max(2.0, balance * RISK_PERCENT)
-            
-            # PnL = (R-Multiple * Risk) - Spread
-            pnl = (r * risk_usd) - SPREAD_COST_USD
-            balance += pnl
-            
-            # Track Stats
-            if balance > peak_balance:
-                peak_balance = balance
-            
-            dd = (peak_balance - balance) / peak_balance * 100
-            if dd > max_drawdown:
-                max_drawdown = dd
-                
-            if balance < BANKRUPT_BALANCE:
-                break
-        
-        results.append({
-            'final': balance,
-            'max_dd': max_drawdown,
-            'success': balance >= TARGET_BALANCE,
-            'blown': balance <= BANKRUPT_BALANCE
-        })
-
-    res_df = pd.DataFrame(results)
-    
-    win_rate = res_df['success'].mean() * 100
-    blow_rate = res_df['blown'].mean() * 100
-    avg_final = res_df['final'].mean()
-    median_dd = res_df['max_dd'].median()
-    
-    print(f"✅ SIMULATION COMPLETE ({ITERATIONS} Runs)")
+    trades_r = df['r'].to_numpy(dtype=np.float64) # R-multiples from historical data
+
+    start = time.perf_counter()
+    res = monte_carlo(trades_r, paths=paths, sizing=sizing, block=block, seed=seed, chunk_paths=chunk_paths)
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ SIMULATION COMPLETE ({paths:,} Runs in {elapsed:.1f}s)")
+    print(f"⚙️  Sizing: {sizing} ({res['risk_fraction'] * 100:.2f}% of balance)"
+          f"{f' | block bootstrap ({block} trades)' if block > 1 else ''}")
     print(f"📍 Starting Balance: ${START_BALANCE}")
-    print(f"🎯 Target ($100):     {win_rate:.1f}% Chance")
-    print(f"💀 Risk of Ruin:      {blow_rate:.1f}%")
-    print(f"📊 Avg Final Balance: ${avg_final:.2f}")
-    print(f"📉 Median Max DD:     {median_dd:.1f}%")
+    print(f"🎯 Target ($100):     {res['win_rate']:.1f}% Chance "
+          f"(touched on {res['touch_target_rate']:.1f}% of paths)")
+    print(f"💀 Risk of Ruin:      {res['blow_rate']:.1f}%")
+    print(f"📊 Avg Final Balance: ${res['avg_final']:.2f} (P5 ${res['p5_final']:.2f} / P95 ${res['p95_final']:.2f})")
+    print(f"📉 Median Max DD:     {res['median_dd']:.1f}% (P95 {res['p95_dd']:.1f}%)")
+    if res['median_trades_to_target'] is not None:
+        print(f"⏱️  Median trades to target: {res['median_trades_to_target']:.0f}")
+    if res['median_trades_to_ruin'] is not None:
+        print(f"⏱️  Median trades to ruin:   {res['median_trades_to_ruin']:.0f}")
     print("-" * 50)
-    
-    if win_rate > 50:
+
+    if res['win_rate'] > 50:
         print("💡 VERDICT: The system is HIGHLY FEASIBLE for a $50 account.")
     else:
         print("💡 VERDICT: Recommended starting balance is $100+ for safer buffers.")
+    return res
 
 if __name__ == "__main__":
-    run_simulation()
+    parser = argparse.ArgumentParser(description="Small account Monte Carlo")
+    parser.add_argument("--paths", type=int, default=ITERATIONS, help="Monte Carlo paths (1M runs in seconds)")
+    parser.add_argument("--sizing", choices=SIZING_RULES, default="min_lot")
+    parser.add_argument("--block", type=int, default=1, help="Block bootstrap length (1 = i.i.d. trades)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--chunk", type=int, default=CHUNK_PATHS, help="Paths per chunk (memory bound)")
+    args = parser.parse_args()
+    run_simulation(args.paths, args.sizing, args.block, args.seed, args.chunk)
@@ -5,6 +5,7 @@ import seaborn as sns
 import matplotlib.pyplot as plt
 from scipy.stats import spearmanr
 import warnings
+from core.alpha_factors import AlphaFactors
 
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
@@ -59,13 +60,7 @@ def run_standalone_alpha():
             
             # --- ALPHA FACTORS ---
             # 1. Velocity (Linear Regression Slope normalized by ATR)
-            def get_slope(series):
-                y = series.values
-                x = np.arange(len(y))
-                if len(y) < 2: return 0
-                return np.polyfit(x, y, 1)[0]
-            
-            df['slope'] = df['Close'].rolling(20).apply(get_slope, raw=False)
+            df['slope'] = AlphaFactors.rolling_slope(df['Close'], 20)
             df['alpha_velocity'] = df['slope'] / df['atr']
             
             # 2. Z-Score (Mean Reversion)
@@ -10,6 +10,10 @@ import pandas as pd
 import numpy as np
 import pytz
 from core.filters.risk_manager import RiskManager
+from core.memory import BoundedDict
+
+# Dedup keys kept for the session check: a few weeks of days for every symbol
+FIRED_TODAY_MAX = 1024
 
 # ── DOW-Specific Hourly Signals ───────────────────────────────────────────
 # Format: { (dow, hour, symbol): (direction, quality_score, expected_hold) }
@@ -28,7 +32,8 @@ class AdvancedPatternStrategy(BaseStrategy):
     Advanced strategy targeting specific Day-of-Week nuances and Pin-Bar stop hunts.
     V35.1r: Session dedup to prevent multiple fires per symbol per day.
     """
-    _fired_today: dict = {}  # {(symbol, date_str): True}
+    _fired_today: dict = BoundedDict(maxsize=FIRED_TODAY_MAX)  # {(symbol, date_str): True}, oldest dropped
+    REQUIRED_INDICATORS = {"h1": ("atr",), "m5": ("atr",)}
 
     def get_id(self) -> str:
         return "advanced_patterns_v23"
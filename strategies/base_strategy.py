@@ -1,8 +1,27 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 import pandas as pd
 
 class BaseStrategy(ABC):
+    # Indicator columns read from each timeframe frame, e.g. {"h1": ("atr", "ema_200")}.
+    # IndicatorCalculator computes only the union of these; None means "everything".
+    REQUIRED_INDICATORS: Optional[Dict[str, Tuple[str, ...]]] = None
+
+    # Class-level knobs a research run (e.g. walk-forward) may override per instance.
+    TUNABLE_PARAMS: Tuple[str, ...] = ()
+
+    def with_params(self, **params) -> "BaseStrategy":
+        """
+        Overrides tunable parameters on this instance only; class defaults (and
+        therefore live trading) are untouched. Unknown names raise ValueError.
+        """
+        unknown = set(params) - set(self.TUNABLE_PARAMS)
+        if unknown:
+            raise ValueError(f"{type(self).__name__} has no tunable parameter(s): {sorted(unknown)}")
+        for name, value in params.items():
+            setattr(self, name, value)
+        return self
+
     @abstractmethod
     def analyze(self, symbol: str, data: Dict[str, pd.DataFrame], news_events: list, market_context: dict) -> Optional[dict]:
         """
@@ -9,6 +9,7 @@ from indicators.calculations import IndicatorCalculator
 import config.config as cfg
 from core.alpha_factors import AlphaFactors
 from core.alpha_combiner import AlphaCombiner
+from core.market_regime import PANEL_CONTEXT_KEY, REQUIRED_INDICATORS as REGIME_INDICATORS
 
 
 class CRTStrategy(BaseStrategy):
@@ -24,10 +25,33 @@ class CRTStrategy(BaseStrategy):
     def get_name(self) -> str:
         return "Candle Range Theory (H1)"
 
+    # H1: range/ATR filter, EMA200 trend filter, alpha factors (ema_100 z-score) and regime
+    REQUIRED_INDICATORS = {
+        "h1":  REGIME_INDICATORS + ("ema_100",),
+        "d1":  ("ema_200",),
+        "m5":  (),
+        "m15": (),
+    }
+
     # Forensic Audit (Run 22/24) - Toxic Filters
     TOXIC_SYMBOLS = {"BTC-USD", "CL=F"}
     TOXIC_HOURS = {21, 22, 11} # 11:00 is the inter-session Dead Zone
 
+    # V34.2 reference-range bounds, in multiples of H1 ATR
+    RANGE_ATR_MIN = 0.4
+    RANGE_ATR_MAX = 2.5
+    # Target expansion by regime (1.0 elsewhere)
+    TARGET_BOOST_LOW_VOL = 1.8
+    TARGET_BOOST_TRENDING = 1.4
+    # None → config MIN_QUALITY_SCORE (live behaviour)
+    MIN_QUALITY_SCORE: Optional[float] = None
+
+    # Walk-forward tunables (core.walk_forward)
+    TUNABLE_PARAMS = (
+        "TOXIC_HOURS", "RANGE_ATR_MIN", "RANGE_ATR_MAX",
+        "TARGET_BOOST_LOW_VOL", "TARGET_BOOST_TRENDING", "MIN_QUALITY_SCORE",
+    )
+
     async def analyze(
         self,
         symbol: str,
@@ -91,8 +115,9 @@ class CRTStrategy(BaseStrategy):
             atr_h1 = ref_h1.get("atr") or 0.0010
             if atr_h1 > 0:
                 ratio = range_size / atr_h1
-                if not (0.4 <= ratio <= 2.5):
-                    log_event("FILTER_BLOCKED", f"H1 Range {round(ratio, 2)}x ATR outside bounds (0.4-2.5)")
+                if not (self.RANGE_ATR_MIN <= ratio <= self.RANGE_ATR_MAX):
+                    log_event("FILTER_BLOCKED", f"H1 Range {round(ratio, 2)}x ATR outside bounds "
+                                                f"({self.RANGE_ATR_MIN}-{self.RANGE_ATR_MAX})")
                     return None
             
             # ─── 3. ICT Killzone Filter ─────────────────────────────────────────
@@ -148,9 +173,10 @@ class CRTStrategy(BaseStrategy):
                 return None
 
             # ─── 5. SL & TP Placement (Regime Optimized) ────────────────────────
-            reg = AlphaCombiner.detect_regime(df_h1)
+            # One regime per analysis: the cycle's panel when present, else this H1 frame
+            detected_regime = AlphaCombiner.detect_regime(df_h1, (market_context or {}).get(PANEL_CONTEXT_KEY), symbol)
             # Boost targets in Low Vol or Trending markets to capture expansion
-            target_boost = 1.8 if reg == "LOW_VOL_RANGE" else (1.4 if "TRENDING" in reg else 1.0)
+            target_boost = self.TARGET_BOOST_LOW_VOL if detected_regime == "LOW_VOL_RANGE" else (self.TARGET_BOOST_TRENDING if "TRENDING" in detected_regime else 1.0)
             
             if direction == "BUY":
                 sl = sweep_extreme - (range_size * 0.05)
@@ -201,7 +227,6 @@ class CRTStrategy(BaseStrategy):
                 return None
 
             # ─── 7. Alpha Combiner & Scoring ────────────────────────────────────
-            detected_regime = AlphaCombiner.detect_regime(df_h1)
             factors = {
                 "velocity": AlphaFactors.velocity_alpha(df_h1),
                 "zscore": AlphaFactors.mean_reversion_zscore(df_h1),
@@ -219,8 +244,9 @@ class CRTStrategy(BaseStrategy):
 
             quality_score = AlphaCombiner.calculate_quality_score(factors, signal_value, base_boost=base_boost)
 
-            if quality_score < cfg.MIN_QUALITY_SCORE:
-                log_event("FILTER_BLOCKED", f"Quality Score {quality_score} < {cfg.MIN_QUALITY_SCORE}")
+            min_quality = self.MIN_QUALITY_SCORE if self.MIN_QUALITY_SCORE is not None else cfg.MIN_QUALITY_SCORE
+            if quality_score < min_quality:
+                log_event("FILTER_BLOCKED", f"Quality Score {quality_score} < {min_quality}")
                 return None
 
             # ─── 8. Risk & Results ──────────────────────────────────────────────
@@ -281,3 +281,77 @@ async def test_ensure_db_schema_success(tmp_path):
         cols = [row[1] for row in cursor.fetchall()]
         assert 'trade_type' in cols
         conn.close()
+
+def test_signals_keyset_pages_filters_and_fields(client, tmp_path, auth_headers):
+    signals_db = str(tmp_path / "signals_pages.db")
+    conn = sqlite3.connect(signals_db)
+    conn.execute("CREATE TABLE signals (id INTEGER PRIMARY KEY, timestamp TEXT, symbol TEXT, direction TEXT, "
+                 "strategy TEXT, gate_status TEXT, reasoning TEXT, forensic_candles TEXT)")
+    for i in range(7):
+        conn.execute("INSERT INTO signals (timestamp, symbol, direction, strategy, gate_status, reasoning, forensic_candles) "
+                     "VALUES (?, ?, 'BUY', 'crt', ?, 'long text', '[1,2,3]')",
+                     (f"2024-01-0{1 + i // 2}T10:00:00", "EURUSD" if i % 2 else "GBPUSD",
+                      "BLOCKED" if i == 6 else "PASSED"))
+    conn.commit()
+    conn.close()
+
+    with patch('admin_server.DB_SIGNALS', signals_db):
+        pages, cursor = [], None
+        while True:
+            url = "/api/signals?limit=3&fields=symbol,gate_status" + (f"&before={cursor}" if cursor else "")
+            response = client.get(url, headers=auth_headers)
+            pages.append(response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        ids = [row["id"] for page in pages for row in page]
+        # Newest first, ties on timestamp broken by id, no duplicates across pages
+        assert ids == [7, 6, 5, 4, 3, 2, 1] and [len(p) for p in pages] == [3, 3, 1]
+        assert set(pages[0][0]) == {"id", "timestamp", "symbol", "gate_status"}
+
+        eur = client.get("/api/signals?symbol=EURUSD&start=2024-01-02&end=2024-01-04&fields=symbol", headers=auth_headers).json()
+        assert [row["id"] for row in eur] == [6, 4]
+        assert [r["id"] for r in client.get("/api/signals?gate_status=BLOCKED&strategy=crt&fields=symbol",
+                                            headers=auth_headers).json()] == [7]
+        assert client.get("/api/signals?fields=password", headers=auth_headers).status_code == 400
+        assert client.get("/api/signals?before=%%%", headers=auth_headers).status_code == 400
+        # Decodable but malformed cursors: not a list, wrong length, wrong types
+        for bad in ({"timestamp": "x"}, ["2024-01-01"], ["2024-01-01", "7"], [None, 7], "2024"):
+            assert client.get(f"/api/signals?before={_cursor(bad)}", headers=auth_headers).status_code == 400
+
+def _cursor(value) -> str:
+    import base64
+    import json
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+
+def test_backtest_results_pages_and_ndjson_stream(client, tmp_path, auth_headers):
+    import json
+    import admin_server
+    from core.backtest_engine import BacktestEngine
+    results_db = str(tmp_path / "results.db")
+    BacktestEngine("2024-01-01", "2024-01-02", symbols=[], results_db=results_db)
+    conn = sqlite3.connect(results_db)
+    run_id = conn.execute("INSERT INTO backtest_runs (run_name) VALUES ('t')").lastrowid
+    conn.executemany("INSERT INTO backtest_signals (run_id, symbol, result_pips, timestamp) VALUES (?, 'EURUSD', ?, ?)",
+                     [(run_id, float(i % 5 - 2), f"2024-01-01T{i // 60:02d}:{i % 60:02d}:00") for i in range(250)])
+    conn.commit()
+    conn.close()
+
+    with patch.object(admin_server.backtest_jobs(), "db_path", results_db), \
+         patch('admin_server.BACKTEST_STREAM_CHUNK', 100):
+        first = client.get(f"/api/backtest/results/{run_id}?limit=200&fields=symbol", headers=auth_headers).json()
+        rest = client.get(f"/api/backtest/results/{run_id}?limit=200&after={first['next_cursor']}",
+                          headers=auth_headers).json()
+        assert len(first["trades"]) == 200 and len(rest["trades"]) == 50 and rest["next_cursor"] is None
+        assert set(first["trades"][0]) == {"id", "timestamp", "result_pips", "symbol"}
+        for bad in (["2024-01-01T00:00:00", 3], ["2024-01-01T00:00:00", 3, "100"], [1, 2, 3]):
+            assert client.get(f"/api/backtest/results/{run_id}?after={_cursor(bad)}",
+                              headers=auth_headers).status_code == 400
+        curve = first["equity_curve"] + rest["equity_curve"]
+
+        response = client.get(f"/api/backtest/results/{run_id}?format=ndjson", headers=auth_headers)
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines[0]["run"]["id"] == run_id
+        assert [t["balance"] for t in lines[1:]] == [p["balance"] for p in curve]
+        assert len(lines) == 251 and curve[-1]["balance"] == 100000.0 + sum(i % 5 - 2 for i in range(250))
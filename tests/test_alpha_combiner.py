@@ -91,3 +91,13 @@ class TestAlphaCombiner:
         signal = AlphaCombiner.combine(factors)
         # Check it's rounded to 4 decimal places
         assert len(str(signal).split('.')[-1]) <= 4
+
+    def test_wilson_bounds_vectorized(self):
+        """Array Wilson bounds agree with the scalar interval"""
+        lower, upper = AlphaCombiner.wilson_bounds([0.55, 1.0, 0.0], [40, 3, 0])
+
+        scalar = AlphaCombiner.calculate_wilson_interval(0.55, 40)
+        assert round(lower[0] * 100, 1) == scalar['lower']
+        assert round(upper[0] * 100, 1) == scalar['upper']
+        assert upper[1] == 1.0
+        assert lower[2] == 0.0 and upper[2] == 0.0
@@ -125,3 +125,41 @@ class TestAlphaFactors:
         assert isinstance(regime, (float, np.floating))
         assert -1.0 <= regime <= 1.0
         assert not np.isnan(regime)
+
+    def test_rolling_slope_matches_polyfit(self, sample_df):
+        """Closed-form rolling slope agrees with np.polyfit per window"""
+        slopes = AlphaFactors.rolling_slope(sample_df['close'], 20)
+
+        assert slopes.iloc[:19].isna().all()
+        for end in (19, 120, 249):
+            window = sample_df['close'].iloc[end - 19:end + 1].values
+            expected = np.polyfit(np.arange(20), window, 1)[0]
+            assert slopes.iloc[end] == pytest.approx(expected, rel=1e-9, abs=1e-12)
+
+    def test_rolling_slope_nan_window(self, sample_df):
+        """Windows touching a NaN are undefined, later windows recover"""
+        close = sample_df['close'].copy()
+        close.iloc[50] = np.nan
+        slopes = AlphaFactors.rolling_slope(close, 20)
+
+        assert slopes.iloc[50:70].isna().all()
+        assert not np.isnan(slopes.iloc[70])
+
+    def test_factor_frame_matches_per_bar(self, sample_df):
+        """Batch factors equal the live per-bar values at the last bar"""
+        frame = AlphaFactors.factor_frame(sample_df)
+        last = frame.iloc[-1]
+
+        assert list(frame.columns) == ['velocity', 'zscore', 'momentum', 'volatility']
+        assert len(frame) == len(sample_df)
+        assert last['velocity'] == pytest.approx(AlphaFactors.velocity_alpha(sample_df))
+        assert last['zscore'] == pytest.approx(AlphaFactors.mean_reversion_zscore(sample_df))
+        assert last['momentum'] == pytest.approx(AlphaFactors.momentum_alpha(sample_df))
+        assert last['volatility'] == pytest.approx(AlphaFactors.volatility_regime_alpha(sample_df))
+
+    def test_zscore_series_without_ema_column(self, sample_df):
+        """Raw research frames fall back to an EWM EMA"""
+        zscores = AlphaFactors.zscore_series(sample_df[['close']], period=100)
+
+        assert zscores.iloc[:99].isna().all()
+        assert np.isfinite(zscores.iloc[-1])
@@ -5,6 +5,12 @@ from app.diagnose_alpha import diagnose_alpha_levels
 from unittest.mock import patch, MagicMock
 import pandas as pd
 
+@pytest.fixture(autouse=True)
+def isolated_market_context(tmp_path, monkeypatch):
+    # Each test starts without a cached macro context or calendar, so its fetch mocks are used
+    monkeypatch.setattr("core.market_context.CONTEXT_DIR", str(tmp_path / "market_context"))
+    monkeypatch.setattr("data.news_fetcher.CALENDAR_DIR", str(tmp_path / "calendar"))
+
 @pytest.mark.asyncio
 async def test_generate_signals_integration():
     # Mock the fetcher to avoid network calls
@@ -0,0 +1,190 @@
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.backtest_engine import BacktestEngine
+from core.backtest_jobs import BacktestJobManager, run_job
+from strategies.advanced_pattern_strategy import AdvancedPatternStrategy
+from strategies.crt_strategy import CRTStrategy
+
+
+@pytest.fixture
+def synthetic_market(monkeypatch):
+    """4 days of M5 bars for one symbol; CRT fires on every 40th bar, patterns stay quiet."""
+    idx = pd.date_range("2024-01-01", periods=4 * 288, freq="5min", tz="UTC")
+    rng = np.random.default_rng(11)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.0004, len(idx)))
+    m5 = pd.DataFrame({'open': close, 'high': close + 0.0006, 'low': close - 0.0006, 'close': close,
+                       'atr': 0.001, 'atr_avg': 0.001}, index=idx)
+    data = {"EURUSD=X": {'entry': m5, 'h1': m5.resample("1h").last(), 'd1': m5.resample("1D").last()}}
+
+    async def fetch(self, strategies=None):
+        return data
+
+    async def crt(self, symbol, bundle, news, ctx):
+        entry = bundle['entry']
+        if len(entry) % 40:
+            return None
+        price = float(entry['close'].iloc[-1])
+        direction = "BUY" if len(entry) % 80 else "SELL"
+        step = 0.001 if direction == "BUY" else -0.001
+        return {'symbol': symbol, 'direction': direction, 'entry_price': price, 'sl': price - step,
+                'tp1': price + 2 * step, 'quality_score': 8.0, 'trade_type': 'CRT'}
+
+    async def quiet(self, symbol, bundle, news, ctx):
+        return None
+
+    monkeypatch.setattr(BacktestEngine, "_fetch_all_symbol_data", fetch)
+    monkeypatch.setattr(CRTStrategy, "analyze", crt)
+    monkeypatch.setattr(AdvancedPatternStrategy, "analyze", quiet)
+    return data
+
+
+def _signals(db, run_id):
+    with sqlite3.connect(db) as conn:
+        return conn.execute("SELECT symbol, direction, entry_price, result, result_pips, gate_status, timestamp "
+                            "FROM backtest_signals WHERE run_id = ? ORDER BY timestamp", (run_id,)).fetchall()
+
+
+async def test_interrupted_run_resumes_from_checkpoint(tmp_path, synthetic_market):
+    db = str(tmp_path / "results.db")
+    fresh = await BacktestEngine("2024-01-01", "2024-01-04", symbols=["EURUSD=X"], results_db=db).run()
+    expected = _signals(db, fresh["run_id"])
+    assert len(expected) > 10
+
+    checkpoints = []
+
+    def crash(p):
+        if p > 0.6:
+            raise RuntimeError("worker killed")
+
+    engine = BacktestEngine("2024-01-01", "2024-01-04", symbols=["EURUSD=X"], results_db=db, close_stale_runs=False)
+    with pytest.raises(RuntimeError):
+        await engine.run(progress_callback=crash, checkpoint_callback=lambda r, c: checkpoints.append((r, c)))
+    run_id, checkpoint = checkpoints[-1]
+    assert checkpoint.startswith("2024-01-02T23:55")
+    # The crash left signals beyond the checkpoint behind
+    assert _signals(db, run_id)[-1][-1] > checkpoint
+
+    resumed = await BacktestEngine("2024-01-01", "2024-01-04", symbols=["EURUSD=X"], results_db=db,
+                                   close_stale_runs=False).run(run_id=run_id, checkpoint=checkpoint)
+    assert resumed["run_id"] == run_id
+    assert _signals(db, run_id) == expected
+    assert resumed["net_pips"] == pytest.approx(fresh["net_pips"])
+    assert resumed["total_trades"] == fresh["total_trades"]
+
+
+def test_job_queue_lifecycle(tmp_path):
+    jobs = BacktestJobManager(str(tmp_path / "results.db"))
+    first = jobs.enqueue("2024-01-01", "2024-01-31")
+    second = jobs.enqueue("2024-02-01", "2024-02-28", symbols=["EURUSD=X"])
+
+    assert jobs.get(first)["status"] == "queued"
+    assert jobs.get(second)["params"]["symbols"] == ["EURUSD=X"]
+    assert jobs.latest_active()["id"] == second
+
+    assert jobs.claim() == first
+    assert jobs.get(first)["status"] == "running" and jobs.get(first)["attempts"] == 1
+    assert jobs.cancel(second) and jobs.get(second)["status"] == "cancelled"
+    assert jobs.claim() is None
+    assert not jobs.cancel("missing")
+
+
+def test_recover_requeues_jobs_of_dead_workers(tmp_path):
+    db = str(tmp_path / "results.db")
+    jobs = BacktestJobManager(db)
+    dead, alive = jobs.enqueue("2024-01-01", "2024-01-31"), jobs.enqueue("2024-02-01", "2024-02-28")
+    jobs.claim(), jobs.claim()
+    with sqlite3.connect(db) as conn:
+        conn.execute("UPDATE backtest_jobs SET worker_pid = ?, checkpoint = '2024-01-10T23:55:00+00:00' WHERE id = ?",
+                     (2 ** 22 + 12345, dead))
+        conn.execute("UPDATE backtest_jobs SET worker_pid = ? WHERE id = ?", (os.getpid(), alive))
+
+    assert jobs.recover() == 1
+    assert jobs.get(dead)["status"] == "queued"
+    assert jobs.get(dead)["checkpoint"] == "2024-01-10T23:55:00+00:00"
+    assert jobs.get(alive)["status"] == "running"
+    assert jobs.claim() == dead and jobs.get(dead)["attempts"] == 2
+
+
+def test_run_job_streams_results_and_checkpoints(tmp_path, synthetic_market):
+    db = str(tmp_path / "results.db")
+    jobs = BacktestJobManager(db)
+    job_id = jobs.enqueue("2024-01-01", "2024-01-04", symbols=["EURUSD=X"])
+    jobs.claim()
+
+    assert run_job(db, job_id) == "done"
+    job = jobs.get(job_id)
+    assert job["progress"] == 100.0 and job["result"]["run_id"] == job["run_id"]
+    assert job["checkpoint"] == "2024-01-04T00:00:00+00:00"   # timeline ends at end_date 00:00
+    assert len(_signals(db, job["run_id"])) == job["result"]["total_trades"]
+
+
+def test_late_cancel_is_not_overwritten(tmp_path, synthetic_market, monkeypatch):
+    db = str(tmp_path / "results.db")
+    jobs = BacktestJobManager(db)
+    run = BacktestEngine.run
+
+    async def cancelled_after_last_tick(self, *args, **kwargs):
+        result = await run(self, *args, **kwargs)
+        jobs.cancel(job_id)
+        return result
+    monkeypatch.setattr(BacktestEngine, "run", cancelled_after_last_tick)
+    job_id = jobs.enqueue("2024-01-01", "2024-01-04", symbols=["EURUSD=X"])
+    jobs.claim()
+    assert run_job(db, job_id) == "cancelled"
+    assert jobs.get(job_id)["status"] == "cancelled" and jobs.get(job_id)["result"] is None
+
+    async def cancelled_then_crashed(self, *args, **kwargs):
+        jobs.cancel(job_id)
+        raise RuntimeError("boom")
+    monkeypatch.setattr(BacktestEngine, "run", cancelled_then_crashed)
+    job_id = jobs.enqueue("2024-01-01", "2024-01-04", symbols=["EURUSD=X"])
+    jobs.claim()
+    assert run_job(db, job_id) == "cancelled" and jobs.get(job_id)["error"] is None
+
+
+def test_claim_owns_job_and_cleanup_spares_live_runs(tmp_path):
+    db = str(tmp_path / "results.db")
+    jobs = BacktestJobManager(db)
+    job_id = jobs.enqueue("2024-01-01", "2024-01-31")
+    jobs.claim()
+    # Claimed but not yet picked up by a worker: not an orphan
+    assert jobs.get(job_id)["worker_pid"] == os.getpid() and jobs.recover() == 0
+
+    BacktestEngine("2024-01-01", "2024-01-02", symbols=[], results_db=db)
+    with sqlite3.connect(db) as conn:
+        conn.execute("UPDATE backtest_jobs SET run_id = 7 WHERE id = ?", (job_id,))
+        conn.executemany("INSERT INTO backtest_signals (run_id, result, timestamp) VALUES (?, 'OPEN', '2024-01-01')",
+                         [(7,), (3,)])
+        conn.execute("INSERT INTO trade_reservations (symbol, status) VALUES ('EURUSD=X', 'ACTIVE')")
+    BacktestEngine("2024-01-01", "2024-01-02", symbols=[], results_db=db)      # a CLI run starting meanwhile
+    with sqlite3.connect(db) as conn:
+        assert conn.execute("SELECT run_id, result FROM backtest_signals ORDER BY run_id").fetchall() == \
+            [(3, "CLOSED"), (7, "OPEN")]
+        assert conn.execute("SELECT COUNT(*) FROM trade_reservations").fetchone()[0] == 1
+
+
+async def test_supervisor_fails_jobs_whose_future_raises(tmp_path, monkeypatch):
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+    import core.backtest_jobs as backtest_jobs
+
+    def explode(db_path, job_id):
+        raise ValueError("result not picklable")
+
+    jobs = BacktestJobManager(str(tmp_path / "results.db"))
+    job_id = jobs.enqueue("2024-01-01", "2024-01-31")
+    monkeypatch.setattr(backtest_jobs, "run_job", explode)
+    monkeypatch.setattr(jobs, "_new_pool", lambda: ThreadPoolExecutor(1))
+    monkeypatch.setattr(jobs, "POLL_INTERVAL", 0.01)
+    jobs.start()
+    for _ in range(200):
+        await asyncio.sleep(0.01)
+        if jobs.get(job_id)["status"] != "running":
+            break
+    await jobs.stop()
+    assert jobs.get(job_id)["status"] == "error" and "result not picklable" in jobs.get(job_id)["error"]
@@ -0,0 +1,79 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.bar_store import BarStore
+
+
+@pytest.fixture
+def bars():
+    index = pd.date_range("2024-01-01", periods=600, freq="5min", tz="UTC")
+    close = (1.1 + np.arange(600) * 1e-5).round(5)      # quoted to 5 decimals, like Dukascopy/MT5
+    return pd.DataFrame({"open": close, "high": close + 1e-4, "low": close - 1e-4,
+                         "close": close, "volume": np.arange(600, dtype=float)}, index=index)
+
+
+def test_append_and_read_range(tmp_path, bars):
+    store = BarStore(str(tmp_path))
+    assert store.append("EURUSD=X", "5min", bars.iloc[:400]) == 400
+    # Overlapping append only writes the new tail
+    assert store.append("EURUSD=X", "5min", bars.iloc[300:]) == 200
+
+    expected = bars.copy()
+    expected.index = bars.index.as_unit("us").rename("datetime")
+    pd.testing.assert_frame_equal(store.read("EURUSD=X", "5min"), expected, check_freq=False)
+
+    day = store.read("EURUSD=X", "5min", start="2024-01-02", end="2024-01-02")
+    assert len(day) == 288
+    assert day.index[0] == pd.Timestamp("2024-01-02", tz="UTC")
+    assert store.info("EURUSD=X", "5min")["rows"] == 600
+    assert store.timeframes("EURUSD=X") == ["5min"]
+
+
+def test_missing_series(tmp_path):
+    store = BarStore(str(tmp_path))
+    assert store.read("GBPUSD=X", "1h") is None
+    assert not store.has("GBPUSD=X", "1h")
+
+
+def test_uncommitted_bytes_are_ignored_and_truncated(tmp_path, bars):
+    store = BarStore(str(tmp_path))
+    store.append("EURUSD=X", "5min", bars.iloc[:100])
+    folder = os.path.join(str(tmp_path), "EURUSD=X", "5min")
+    # Simulate a crash after column bytes were written but before meta.json
+    with open(os.path.join(folder, "close.f8"), "ab") as f:
+        np.zeros(7).tofile(f)
+
+    assert len(store.read("EURUSD=X", "5min")) == 100
+    store.append("EURUSD=X", "5min", bars.iloc[100:])
+    assert store.read("EURUSD=X", "5min")["close"].iloc[100] == bars["close"].iloc[100]
+    assert os.path.getsize(os.path.join(folder, "close.f8")) == 600 * 8
+
+
+def test_compact_store(tmp_path, bars):
+    store = BarStore(str(tmp_path), compact=True)
+    store.append("EURUSD=X", "5min", bars)
+    df = store.read("EURUSD=X", "5min")
+
+    assert df["close"].dtype == np.float32
+    assert df.attrs["compact"] is True
+    with open(os.path.join(str(tmp_path), "EURUSD=X", "5min", "meta.json")) as f:
+        assert json.load(f)["dtypes"]["close"] == "<f4"
+
+
+def test_compact_store_widens_quotes_float32_cannot_hold(tmp_path, bars):
+    store = BarStore(str(tmp_path), compact=True)
+    btc = (bars * 90_000).round(2)
+    store.append("BTC-USD", "5min", btc.iloc[:300])
+    assert store.info("BTC-USD", "5min")["dtypes"]["close"] == "<f4"      # 99k.xx: 7 significant digits
+
+    above = (btc.iloc[300:] + 20_000.01).round(2)                        # 119k.xx: 8 significant digits
+    store.append("BTC-USD", "5min", above)
+    dtypes = store.info("BTC-USD", "5min")["dtypes"]
+    assert dtypes["close"] == "<f8" and dtypes["volume"] == "<f4"
+    assert not os.path.exists(os.path.join(str(tmp_path), "BTC-USD", "5min", "close.f4"))
+    df = store.read("BTC-USD", "5min")
+    np.testing.assert_array_equal(df["close"].to_numpy(), pd.concat([btc.iloc[:300], above])["close"].to_numpy())
@@ -0,0 +1,59 @@
+import json
+
+from benchmarks import suite
+
+
+def test_quick_cases_run_offline_and_record(tmp_path):
+    history = str(tmp_path / "history.json")
+    run = suite.run_suite(only=["gate", "formatter", "regime"], repeat=2, history_path=history)
+
+    assert set(run["results"]) == {"gate.validate", "formatter.personalized", "regime.detect_regime"}
+    assert all(r["runs"] == 2 and r["median_ms"] > 0 for r in run["results"].values())
+    assert all(c["baseline_ms"] is None and not c["regressed"] for c in run["comparison"].values())
+
+    second = suite.run_suite(only=["gate"], repeat=2, history_path=history)
+    assert second["comparison"]["gate.validate"]["baseline_ms"] == run["results"]["gate.validate"]["median_ms"]
+    with open(history) as f:
+        assert len(json.load(f)) == 2
+
+
+def test_regression_compares_with_rolling_median_on_same_host():
+    history = [
+        {"host": "box", "results": {"gate.validate": {"median_ms": 1.0}, "db.log_signal": {"median_ms": 2.0}}},
+        {"host": "other", "results": {"gate.validate": {"median_ms": 0.1}}},
+        {"host": "box", "results": {"indicators.add_indicators": {"median_ms": 30.0}}},
+    ]
+    report = suite.compare({
+        "gate.validate": {"median_ms": 1.6},            # +60% > 50% threshold
+        "db.log_signal": {"median_ms": 2.8},            # +40% within its 50%
+        "indicators.add_indicators": {"median_ms": 40.0},
+        "frames.compact": {"median_ms": 5.0},
+    }, history, "box")
+
+    assert report["gate.validate"]["regressed"] and report["gate.validate"]["baseline_ms"] == 1.0
+    assert not report["db.log_signal"]["regressed"]
+    assert report["indicators.add_indicators"]["regressed"]
+    assert report["frames.compact"]["baseline_ms"] is None
+
+    # A recorded regression does not become the baseline for the next run
+    slow = [{"host": "box", "results": {"gate.validate": {"median_ms": ms}}} for ms in (1.0, 1.1, 0.9, 1.0, 2.0)]
+    report = suite.compare({"gate.validate": {"median_ms": 1.6}}, slow, "box")
+    assert report["gate.validate"]["baseline_ms"] == 1.0 and report["gate.validate"]["regressed"]
+
+    tiny = suite.compare({"strategy.crt_analyze": {"median_ms": 0.02}},
+                         [{"host": "box", "results": {"strategy.crt_analyze": {"median_ms": 0.01}}}], "box")
+    assert not tiny["strategy.crt_analyze"]["regressed"]   # below MIN_DELTA_MS
+
+
+def test_strategy_case_reaches_scoring(tmp_path):
+    # Setup raises if CRT returns before AlphaCombiner scoring (e.g. bars outside the killzone)
+    run = suite.run_suite(only=["strategy.crt_analyze"], repeat=1, history_path=str(tmp_path / "h.json"))
+    assert run["results"]["strategy.crt_analyze"]["median_ms"] > 0
+
+
+def test_services_import_without_heavy_optional_stacks():
+    from benchmarks.import_time import LAZY_MODULES, import_profile
+    for service, lazy in LAZY_MODULES.items():
+        loaded = {row["name"] for row in import_profile(service)}
+        assert service in loaded
+        assert not loaded & set(lazy), f"{service} imports {sorted(loaded & set(lazy))} eagerly"
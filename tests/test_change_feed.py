@@ -0,0 +1,118 @@
+import sqlite3
+
+import pytest
+
+from core.backtest_jobs import BacktestJobManager
+from core.change_feed import (EventBroadcaster, format_cursor, install_change_feed, parse_cursor,
+                              prune_events, read_events)
+
+
+@pytest.fixture
+def signals_db(tmp_path):
+    db = str(tmp_path / "signals.db")
+    with sqlite3.connect(db) as conn:
+        conn.execute("""
+            CREATE TABLE signals (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, symbol TEXT, direction TEXT,
+                entry_price REAL, sl REAL, tp1 REAL, gate_status TEXT, gate_reason TEXT,
+                status TEXT DEFAULT 'OPEN', result TEXT, result_pips REAL, closed_at TEXT
+            )
+        """)
+        install_change_feed(conn, "signals")
+    return db
+
+
+def _insert_signal(db, symbol="EURUSD=X"):
+    with sqlite3.connect(db) as conn:
+        return conn.execute("INSERT INTO signals (timestamp, symbol, direction, entry_price, gate_status) "
+                            "VALUES ('2024-01-01T10:00:00', ?, 'BUY', 1.1, 'PASSED')", (symbol,)).lastrowid
+
+
+def test_triggers_publish_inserts_and_real_changes_only(signals_db):
+    signal_id = _insert_signal(signals_db)
+    with sqlite3.connect(signals_db) as conn:
+        # Tracker rewrites the same values every cycle: no event
+        conn.execute("UPDATE signals SET result = NULL, result_pips = 3.0 WHERE id = ?", (signal_id,))
+        conn.execute("UPDATE signals SET result = 'TP1', status = 'CLOSED' WHERE id = ?", (signal_id,))
+        conn.execute("UPDATE signals SET gate_status = 'BLOCKED', gate_reason = 'news' WHERE id = ?", (signal_id,))
+
+    events = read_events(signals_db)
+    assert [e["topic"] for e in events] == ["signal", "settlement", "gate"]
+    assert events[0]["payload"]["symbol"] == "EURUSD=X" and events[0]["payload"]["gate_status"] == "PASSED"
+    assert events[1]["payload"]["result"] == "TP1" and events[1]["row_id"] == str(signal_id)
+    # Columns this schema lacks are simply left out of the payload
+    assert "outcome" not in events[0]["payload"]
+
+    install_change_feed(sqlite3.connect(signals_db), "signals")   # idempotent
+    _insert_signal(signals_db)
+    assert len(read_events(signals_db)) == 4
+
+
+def test_backtest_jobs_publish_progress(tmp_path):
+    db = str(tmp_path / "results.db")
+    jobs = BacktestJobManager(db)
+    job_id = jobs.enqueue("2024-01-01", "2024-01-31")
+    jobs.claim()
+    with sqlite3.connect(db) as conn:
+        conn.execute("UPDATE backtest_jobs SET progress = 42.0 WHERE id = ?", (job_id,))
+
+    events = read_events(db)
+    assert [e["topic"] for e in events] == ["backtest", "backtest", "backtest"]
+    assert events[-1]["payload"]["progress"] == 42.0 and events[-1]["payload"]["status"] == "running"
+
+
+async def test_broadcaster_fans_out_and_replays_from_cursor(signals_db, tmp_path):
+    feed = EventBroadcaster({"signals": signals_db, "backtest": str(tmp_path / "none.db")})
+    first = _insert_signal(signals_db)
+    live_a, replay = await feed.subscribe()
+    live_b, _ = await feed.subscribe(topics={"settlement"})
+    assert replay == []   # history before subscribing is only sent on request
+
+    second = _insert_signal(signals_db, "GBPUSD=X")
+    with sqlite3.connect(signals_db) as conn:
+        conn.execute("UPDATE signals SET result = 'SL' WHERE id = ?", (first,))
+    assert await feed.poll() == 2
+    received = [live_a.get_nowait(), live_a.get_nowait()]
+    assert [e["payload"]["id"] for e in received] == [second, first]
+    assert live_b.get_nowait()["topic"] == "settlement" and live_b.empty()
+
+    # A reconnecting client resumes after its last event id
+    _, missed = await feed.subscribe(parse_cursor(received[0]["cursor"]))
+    assert [(e["topic"], e["payload"]["id"]) for e in missed] == [("settlement", first)]
+    assert missed[-1]["cursor"] == format_cursor(feed.cursor)
+    await feed.stop()
+    assert live_a.get_nowait() is None
+
+
+async def test_slow_subscriber_is_dropped(signals_db, monkeypatch):
+    monkeypatch.setattr("core.change_feed.SUBSCRIBER_QUEUE_SIZE", 2)
+    feed = EventBroadcaster({"signals": signals_db})
+    queue, _ = await feed.subscribe()
+    for _ in range(3):
+        _insert_signal(signals_db)
+    await feed.poll()
+    assert queue.get_nowait() is None and queue not in feed.subscribers
+    await feed.stop()
+
+
+def test_prune_keeps_recent_events(signals_db):
+    for _ in range(5):
+        _insert_signal(signals_db)
+    assert prune_events(signals_db, keep=2) == 3
+    assert [e["id"] for e in read_events(signals_db)] == [4, 5]
+    assert parse_cursor("garbage") is None
+
+
+def test_events_are_pruned_on_insert(signals_db):
+    with sqlite3.connect(signals_db) as conn:
+        install_change_feed(conn, "signals", keep=3, prune_every=4)
+    for _ in range(9):
+        _insert_signal(signals_db)
+    # Trimmed at ids 4 and 8; id 9 waits for the next batch
+    assert [e["id"] for e in read_events(signals_db)] == [6, 7, 8, 9]
+
+
+def test_event_stream_requires_token():
+    from fastapi.testclient import TestClient
+    from admin_server import app
+    assert TestClient(app).get("/api/events").status_code == 401
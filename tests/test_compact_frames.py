@@ -0,0 +1,84 @@
+"""
+Unit tests for compact (float32/categorical) bar frames
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.compact_frames import (compact_frame, fits_float32, frame_nbytes, is_compact, precision_deltas,
+                                 upcast_quotes)
+from indicators.calculations import IndicatorCalculator
+
+
+@pytest.fixture
+def bars():
+    rng = np.random.default_rng(11)
+    close = (1.0850 + np.cumsum(rng.normal(0, 0.0001, 600))).round(5)
+    return pd.DataFrame({
+        'open': close,
+        'high': (close + 0.0002).round(5),
+        'low': (close - 0.0002).round(5),
+        'close': close,
+        'volume': rng.integers(100, 1000, 600).astype(float),
+    }, index=pd.date_range('2024-01-01', periods=600, freq='5min', tz='UTC'))
+
+
+def test_compact_frame_dtypes(bars):
+    df = IndicatorCalculator.add_indicators(bars, "5m")
+    df = IndicatorCalculator.get_market_structure(df)
+    compact = compact_frame(df)
+
+    assert compact['close'].dtype == np.float32
+    assert compact['atr'].dtype == np.float32
+    assert isinstance(compact['regime'].dtype, pd.CategoricalDtype)
+    assert compact['bos_buy'].dtype == np.uint8
+    assert list(compact.columns) == list(df.columns)
+    assert compact.index.equals(df.index)
+    assert is_compact(compact) and not is_compact(df)
+    assert frame_nbytes(compact) < frame_nbytes(df) * 0.6
+
+
+def test_compact_frame_keeps_requested_float64(bars):
+    compact = compact_frame(bars, keep_float64=['close'])
+    assert compact['close'].dtype == np.float64
+    assert compact['open'].dtype == np.float32
+
+
+def test_compact_frame_empty():
+    assert compact_frame(None) is None
+    assert compact_frame(pd.DataFrame()).empty
+
+
+def test_upcast_quotes_restores_original(bars):
+    restored = upcast_quotes(bars['close'].astype(np.float32))
+    pd.testing.assert_series_equal(restored, bars['close'])
+
+
+def test_quotes_beyond_float32_precision_stay_float64(bars):
+    btc = (bars * 95_000).round(2)              # 103k.xx: 8 significant digits
+    jpy = (bars * 140).round(3)                 # 151.xxx: 6
+    assert not fits_float32(btc['close']) and fits_float32(jpy['close'])
+    compact = compact_frame(btc)
+    assert compact['close'].dtype == np.float64 and compact['volume'].dtype == np.float32
+    assert compact_frame(jpy)['close'].dtype == np.float32
+    pd.testing.assert_series_equal(compact['close'], btc['close'])
+
+
+def test_indicators_on_compact_bars_match_float64(bars):
+    """Indicators computed from compact bars equal the float64 computation"""
+    reference = IndicatorCalculator.add_indicators(bars.copy(), "5m")
+    compact = compact_frame(bars)
+    from_compact = IndicatorCalculator.add_indicators(compact, "5m")
+    # The caller's compact frame is neither upcast nor extended
+    assert compact['close'].dtype == np.float32 and list(compact.columns) == list(bars.columns)
+    assert from_compact['close'].dtype == np.float64 and not is_compact(from_compact)
+
+    deltas = precision_deltas(reference, from_compact)
+    for col in ['atr', 'adx', 'rsi', 'ema_200', 'zscore_20']:
+        assert deltas[col]['max_abs'] == 0.0
+
+
+def test_precision_deltas_storage(bars):
+    deltas = precision_deltas(bars, compact_frame(bars))
+    assert deltas['close']['max_abs'] < 1e-6
+    assert deltas['close']['max_rel'] < 1e-6
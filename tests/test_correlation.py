@@ -0,0 +1,130 @@
+import sqlite3
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.fixtures import canned_signal, scratch_databases
+from core.correlation import RollingCorrelation
+from core.execution_gate import ExecutionGate
+
+SYMBOLS = ["EURGBP=X", "AUDJPY=X", "NZDCAD=X", "EURUSD=X", "GBPUSD=X"]
+
+
+@pytest.fixture(scope="module")
+def closes():
+    rng = np.random.default_rng(11)
+    bars = 900
+    common = rng.normal(size=bars)
+    returns = np.column_stack([
+        common + 0.3 * rng.normal(size=bars),      # EURGBP, AUDJPY, NZDCAD move together
+        common + 0.3 * rng.normal(size=bars),
+        common + 0.3 * rng.normal(size=bars),
+        rng.normal(size=bars),                     # EURUSD / GBPUSD independent despite sharing USD
+        rng.normal(size=bars),
+    ]) * 0.001
+    frame = pd.DataFrame(np.exp(np.cumsum(returns, axis=0)), columns=SYMBOLS,
+                         index=pd.date_range("2024-01-01", periods=bars, freq="h"))
+    frame.iloc[200:260, 2] = np.nan                # NZDCAD feed gap
+    return frame
+
+
+def test_incremental_matches_window_correlation(closes):
+    engine = RollingCorrelation(window=300)
+    assert engine.update(closes.iloc[:500]) == 499          # the last bar may still be forming
+    assert engine.update(closes.iloc[:500]) == 0
+    assert engine.update(closes, until=closes.index[700]) == 201
+    assert engine.last_ts == closes.index[699]
+
+    # Point-in-time: same answer as pandas on the 300 returns up to the last fed bar
+    returns = np.log(closes.iloc[:700].ffill()).diff().where(closes.iloc[:700].notna())
+    expected = returns.iloc[-300:].corr(min_periods=100)
+    assert np.allclose(engine.matrix().to_numpy(), expected.to_numpy(), atol=1e-9)
+    assert engine.corr("EURGBP=X", "AUDJPY=X") > 0.8 and abs(engine.corr("EURUSD=X", "GBPUSD=X")) < 0.2
+    assert RollingCorrelation(window=300).corr("EURGBP=X", "AUDJPY=X") is None
+
+    engine.update(closes)                                   # well past several window rebuilds
+    returns = np.log(closes.iloc[:-1]).diff()
+    assert engine.corr("EURGBP=X", "NZDCAD=X") == pytest.approx(
+        returns.iloc[-300:]["EURGBP=X"].corr(returns.iloc[-300:]["NZDCAD=X"]), abs=1e-9)
+
+
+def test_state_persists_in_the_signals_db(closes, tmp_path):
+    db = str(tmp_path / "signals.db")
+    assert RollingCorrelation.load(db) is None
+    engine = RollingCorrelation.for_db(db)
+    assert RollingCorrelation.for_db(db) is engine
+    engine.update(closes.iloc[:400])
+    engine.save(db)
+
+    loaded = RollingCorrelation.load(db)
+    assert loaded.last_ts == engine.last_ts and loaded.symbols == engine.symbols
+    assert np.allclose(loaded.matrix().to_numpy(), engine.matrix().to_numpy(), equal_nan=True)
+    assert loaded.update(closes) == engine.update(closes) == len(closes) - 400
+    with closing(sqlite3.connect(db)) as conn:
+        assert conn.execute("SELECT bars FROM correlation_state").fetchone()[0] == 398   # the first bar has no return
+
+
+def test_gate_counts_measured_co_movement(closes, tmp_path):
+    signals_db, clients_db = scratch_databases(str(tmp_path / "db"), history=0)
+    with closing(sqlite3.connect(signals_db)) as conn:
+        conn.executemany("INSERT INTO signals (symbol, direction, strategy, result) VALUES (?, ?, 'OTHER', 'OPEN')",
+                         [("AUDJPY=X", "BUY"), ("NZDCAD=X", "BUY"), ("GBPUSD=X", "BUY"), ("USDCHF=X", "BUY")])
+        conn.commit()
+    engine = RollingCorrelation()
+    engine.update(closes)
+
+    def gate(symbol, direction, correlations=engine):
+        signal = dict(canned_signal(symbol=symbol), direction=direction)
+        return ExecutionGate.validate(signal, signals_db, clients_db, correlations=correlations)["reason"]
+
+    # No shared currency, but moves with both open crosses
+    assert gate("EURGBP=X", "BUY") == "CORRELATED_EXPOSURE_LIMIT (AUDJPY=X,NZDCAD=X)"
+    assert not gate("EURGBP=X", "SELL").startswith("CORRELATED_EXPOSURE_LIMIT")      # a hedge
+    # Shares USD with GBPUSD and USDCHF: measured as independent of GBPUSD, no data for USDCHF
+    assert not gate("EURUSD=X", "BUY").startswith("CORRELATED_EXPOSURE_LIMIT")
+    # Without enough history the currency groups still apply
+    assert gate("EURUSD=X", "BUY", RollingCorrelation()) == "CORRELATED_EXPOSURE_LIMIT (GBPUSD=X,USDCHF=X)"
+
+
+async def test_backtest_feeds_only_closed_h1_bars(tmp_path, monkeypatch):
+    from core.backtest_engine import BacktestEngine
+    from strategies.advanced_pattern_strategy import AdvancedPatternStrategy
+    from strategies.crt_strategy import CRTStrategy
+
+    idx = pd.date_range("2024-01-01", periods=3 * 288, freq="5min", tz="UTC")
+    close = 1.1 + np.cumsum(np.random.default_rng(5).normal(0, 0.0004, len(idx)))
+    m5 = pd.DataFrame({'open': close, 'high': close + 0.0006, 'low': close - 0.0006, 'close': close}, index=idx)
+    data = {"EURUSD=X": {'entry': m5, 'h1': m5.resample("1h").last(), 'd1': m5.resample("1D").last()}}
+
+    async def fetch(self, strategies=None):
+        return data
+
+    async def every_25th(self, symbol, bundle, news, ctx):
+        price = float(bundle['entry']['close'].iloc[-1])
+        if len(bundle['entry']) % 25:
+            return None
+        return {'symbol': symbol, 'direction': "BUY", 'entry_price': price, 'sl': price - 0.001,
+                'tp1': price + 0.002, 'quality_score': 8.0}
+
+    async def quiet(self, symbol, bundle, news, ctx):
+        return None
+
+    seen = []
+    validate = ExecutionGate.validate
+
+    def spy(signal, *args, current_ts=None, correlations=None, **kwargs):
+        seen.append((current_ts, correlations.last_ts))
+        return validate(signal, *args, current_ts=current_ts, correlations=correlations, **kwargs)
+
+    monkeypatch.setattr(BacktestEngine, "_fetch_all_symbol_data", fetch)
+    monkeypatch.setattr(CRTStrategy, "analyze", every_25th)
+    monkeypatch.setattr(AdvancedPatternStrategy, "analyze", quiet)
+    monkeypatch.setattr(ExecutionGate, "validate", staticmethod(spy))
+    await BacktestEngine("2024-01-01", "2024-01-03", symbols=["EURUSD=X"],
+                         results_db=str(tmp_path / "results.db")).run()
+    fed = [(ts, last) for ts, last in seen if last is not None]
+    assert len(fed) > 10
+    # The newest bar fed has closed (its hour has ended) by the time the gate runs
+    assert all(last + pd.Timedelta(hours=1) <= ts for ts, last in fed)
@@ -0,0 +1,123 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from config.manager import config_manager
+from core.cycle_trace import CycleTrace, cycle_rollup, recent_cycles, record_cycle, span, tracing
+from monitoring.health_monitor import HealthMonitor
+
+
+@pytest.fixture(autouse=True)
+def reset_config_overrides():
+    config_manager.clear_runtime_overrides()
+    yield
+    config_manager.clear_runtime_overrides()
+
+
+async def test_spans_aggregate_across_tasks():
+    with span("untraced"):
+        pass   # no active cycle: a no-op
+
+    async def fetch(symbol, seconds):
+        with span("fetch.5m", symbol):
+            await asyncio.sleep(seconds)
+
+    trace = CycleTrace(1)
+    with tracing(trace):
+        with span("fetch"):
+            await asyncio.gather(fetch("EURUSD=X", 0.01), fetch("GBPUSD=X", 0.03))
+        with span("gate", "EURUSD=X"):
+            pass
+
+    stages = trace.summary()
+    assert set(stages) == {"fetch", "fetch.5m", "gate"}
+    assert stages["fetch.5m"]["count"] == 2 and stages["fetch.5m"]["max_label"] == "GBPUSD=X"
+    assert stages["fetch.5m"]["max_ms"] >= 25 and trace.total >= 0.03
+    assert trace.slowest(1)[0][0] in ("fetch", "fetch.5m")
+
+
+def test_rollup_percentiles_and_retention(tmp_path):
+    db = str(tmp_path / "signals.db")
+    for i in range(20):
+        trace = CycleTrace(i)
+        trace.add("fetch", 0.1 * (i + 1))
+        if i % 2:
+            trace.add("broadcast", 0.5)
+        trace.total = 1.0 + i
+        record_cycle(db, trace, signals=i, sent=i // 2)
+
+    rollup = cycle_rollup(db, hours=1)
+    assert rollup["cycles"] == 20
+    assert rollup["total_ms"]["p50"] == pytest.approx(10500.0)
+    assert rollup["stages"]["fetch"]["p95"] == pytest.approx(1905.0)
+    assert rollup["stages"]["broadcast"]["p50"] == pytest.approx(250.0)   # absent in half the cycles
+    assert recent_cycles(db, limit=1)[0]["cycle"] == 19
+
+    old = CycleTrace(99)
+    old.started_at = datetime.now() - timedelta(days=30)
+    record_cycle(db, old)
+    assert all(c["cycle"] != 99 for c in recent_cycles(db, limit=100))
+    assert cycle_rollup(str(tmp_path / "missing.db"))["cycles"] == 0
+    assert HealthMonitor(db).get_cycle_latency()["cycles"] == 20
+
+
+def test_span_overhead_is_negligible():
+    trace = CycleTrace()
+    with tracing(trace):
+        start = time.perf_counter()
+        for i in range(10_000):
+            with span("strategy.CRT", "EURUSD=X"):
+                pass
+        elapsed = time.perf_counter() - start
+    # A 9-symbol cycle opens ~100 spans and takes seconds; 10k spans stay far below 1% of that
+    assert elapsed < 0.2
+    assert trace.stages["strategy.CRT"][0] == 10_000
+
+
+async def test_service_cycle_records_stage_timings(tmp_path):
+    from signal_service import SignalService
+    db = str(tmp_path / "signals.db")
+    config_manager.set_runtime_override("db_signals", db)
+
+    async def generate():
+        with span("strategy.CRT", "EURUSD=X"):
+            pass
+        return [('CRT', {'symbol': 'EURUSD=X', 'direction': 'BUY', 'entry_price': 1.1, 'sl': 1.09, 'tp1': 1.12})]
+
+    telegram = MagicMock(broadcast_personalized_signal=AsyncMock(), bot=MagicMock())
+    with patch('signal_service.generate_signals', new=generate), \
+         patch('signal_service.TelegramService', return_value=telegram), \
+         patch('signal_service.SignalService._load_dynamic_config'), \
+         patch('signal_service.SignalService._is_duplicate', return_value=False), \
+         patch('signal_service.SignalService._reserve_signal_delivery', return_value=True), \
+         patch('signal_service.SignalService._log_to_database', return_value=1), \
+         patch('core.execution_gate.ExecutionGate.validate_and_reserve',
+               return_value={'status': 'PASSED', 'reason': 'ok'}), \
+         patch('asyncio.sleep', new=AsyncMock()), \
+         patch('builtins.print'):
+        service = SignalService()
+        assert await service.run_cycle() == (1, 1)
+
+    cycle = recent_cycles(db)[0]
+    assert cycle["cycle"] == 1 and cycle["sent"] == 1
+    assert {"generate", "strategy.CRT", "gate", "db_log", "broadcast"} <= set(cycle["stages"])
+
+
+def test_cycle_metrics_endpoint(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    import admin_server
+    db = str(tmp_path / "signals.db")
+    trace = CycleTrace(7)
+    trace.add("generate", 2.0)
+    record_cycle(db, trace)
+    monkeypatch.setattr(admin_server, "DB_SIGNALS", db)
+    admin_server.app.dependency_overrides[admin_server.get_current_user] = lambda: admin_server.User(username="admin")
+    try:
+        body = TestClient(admin_server.app).get("/api/metrics/cycles?hours=1").json()
+    finally:
+        admin_server.app.dependency_overrides.clear()
+    assert body["rollup"]["cycles"] == 1 and body["rollup"]["stages"]["generate"]["p50"] == 2000.0
+    assert body["recent"][0]["cycle"] == 7
@@ -0,0 +1,100 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.backtest_engine import BacktestEngine
+from data.dukascopy_import import import_dukascopy, imported_store
+from data.dukascopy_loader import DukascopyLoader
+
+
+def _m1_frame(periods=6000, start="2023-12-30 21:03"):
+    index = pd.date_range(start, periods=periods, freq="1min", tz="UTC")
+    rng = np.random.default_rng(11)
+    close = (1.1 + np.cumsum(rng.normal(0, 1e-4, periods))).round(5)
+    return pd.DataFrame({
+        "Gmt time": index.strftime("%d.%m.%Y %H:%M:%S.000"),
+        "Open": close, "High": close + 0.0001, "Low": close - 0.0001, "Close": close,
+        "Volume": rng.gamma(2.0, 3.0, periods).round(2),
+    })
+
+
+@pytest.fixture
+def duka_dir(tmp_path):
+    rows = _m1_frame()
+    eurusd = tmp_path / "EURUSD"
+    eurusd.mkdir()
+    # Year-style files that split mid-bucket (seams at 2,013 and 4,502 minutes)
+    rows.iloc[:2013].to_csv(eurusd / "EURUSD_01.07.2023.csv", index=False)
+    rows.iloc[2013:4502].to_csv(eurusd / "EURUSD_01.01.2024.csv", index=False)
+    rows.iloc[4502:].to_csv(eurusd / "EURUSD_01.02.2024.csv", index=False)
+    gbpusd = tmp_path / "GBPUSD"
+    gbpusd.mkdir()
+    rows.iloc[:3500].to_csv(gbpusd / "a.csv", index=False)
+    rows.iloc[3000:].to_csv(gbpusd / "b.csv", index=False)
+    return tmp_path
+
+
+def test_import_pyramid_matches_csv_resample(duka_dir):
+    root = str(duka_dir / "store")
+    manifest = import_dukascopy(str(duka_dir), root, workers=2, chunk_rows=997)
+
+    plain = DukascopyLoader(base_dir=str(duka_dir))
+    imported = DukascopyLoader(base_dir=str(duka_dir), store=imported_store(root))
+    for symbol in ("EURUSD=X", "GBPUSD=X"):     # GBPUSD files overlap → serial fallback
+        for tf in ("1min", "5min", "15min", "1h", "4h", "1d"):
+            pd.testing.assert_frame_equal(imported.load(symbol, tf), plain.load(symbol, tf), check_freq=False)
+
+    entry = manifest["symbols"]["EURUSD=X"]
+    assert entry["timeframes"]["1min"]["rows"] == 6000
+    assert entry["timeframes"]["1D"]["first"].startswith("2023-12-30")
+    assert sum(f["rows"] for f in entry["files"].values()) == 6000
+    assert not os.path.exists(os.path.join(root, ".staging"))
+
+
+def test_import_skips_unchanged_symbols(duka_dir):
+    root = str(duka_dir / "store")
+    first = import_dukascopy(str(duka_dir), root, symbols=["EURUSD"], workers=1)
+    stamp = first["symbols"]["EURUSD=X"]["imported_at"]
+    again = import_dukascopy(str(duka_dir), root, symbols=["EURUSD=X"], workers=1)
+
+    assert again["symbols"]["EURUSD=X"]["imported_at"] == stamp
+    assert "GBPUSD=X" not in again["symbols"]
+    with open(os.path.join(root, "manifest.json")) as f:
+        assert set(json.load(f)["symbols"]) == {"EURUSD=X"}
+
+
+def test_failed_merge_keeps_the_live_series(duka_dir, monkeypatch):
+    from data import dukascopy_import
+    root = str(duka_dir / "store")
+    import_dukascopy(str(duka_dir), root, symbols=["EURUSD"], workers=1)
+    before = {tf: imported_store(root).read("EURUSD=X", tf) for tf in ("1min", "1h")}
+
+    merge = dukascopy_import._merge_pieces
+    def dies_midway(store, staging, symbol, rule, keys):
+        merge(store, staging, symbol, rule, keys[:1])
+        raise OSError("killed mid-merge")
+    monkeypatch.setattr(dukascopy_import, "_merge_pieces", dies_midway)
+    with pytest.raises(OSError):
+        import_dukascopy(str(duka_dir), root, symbols=["EURUSD"], workers=1, force=True)
+
+    store = imported_store(root)
+    for tf, bars in before.items():
+        pd.testing.assert_frame_equal(store.read("EURUSD=X", tf), bars)
+    assert store.symbols() == ["EURUSD=X"]
+
+
+def test_backtest_engine_reads_covering_store(duka_dir):
+    root = str(duka_dir / "store")
+    import_dukascopy(str(duka_dir), root, symbols=["EURUSD"], workers=1)
+
+    engine = BacktestEngine("2024-01-01", "2024-01-03", symbols=["EURUSD=X"], bar_store=imported_store(root))
+    h1 = engine._stored_bars("EURUSD=X", "1h", "2024-01-01", "2024-01-02")
+    assert h1.index[0] == pd.Timestamp("2024-01-01", tz="UTC")
+    assert h1.index[-1] == pd.Timestamp("2024-01-02 23:00", tz="UTC")
+
+    # Range not covered by the import → network fallback
+    engine.end_date = "2024-06-01"
+    assert engine._stored_bars("EURUSD=X", "1h", "2024-01-01", "2024-06-01") is None
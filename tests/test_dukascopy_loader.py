@@ -1,6 +1,8 @@
 import pytest
+import numpy as np
 import pandas as pd
 import os
+from data.bar_store import BarStore
 from data.dukascopy_loader import DukascopyLoader
 
 @pytest.fixture
@@ -99,3 +101,91 @@ def test_dukascopy_loader_malformed_csv(tmp_path):
     (bad_dir / "bad.csv").write_text("not,a,csv\nline1,line2")
     loader = DukascopyLoader(base_dir=str(tmp_path))
     assert loader.load("BAD") is None
+
+def test_dukascopy_loader_compact(temp_duka_dir):
+    loader = DukascopyLoader(base_dir=temp_duka_dir, compact=True)
+    df = loader.load("EURUSD=X", timeframe="5min")
+    assert df['close'].dtype == 'float32'
+    assert df.iloc[0]['high'] == pytest.approx(1.1015)
+
+def _write_m1(folder, name, index, seed=3):
+    rng = np.random.default_rng(seed)
+    close = (1.1 + np.cumsum(rng.normal(0, 1e-4, len(index)))).round(5)
+    pd.DataFrame({
+        "Gmt time": index.strftime("%d.%m.%Y %H:%M:%S.000"),
+        "Open": close, "High": close + 0.0001, "Low": close - 0.0001, "Close": close,
+        "Volume": rng.gamma(2.0, 3.0, len(index)).round(2),
+    }).to_csv(folder / name, index=False)
+
+def test_dukascopy_loader_parse_timestamps_fast_path():
+    stamps = pd.Series(["29.02.2024 23:59:59.123", "01.01.1999 00:00:00.000"])
+    parsed = DukascopyLoader._parse_timestamps(stamps)
+    expected = pd.to_datetime(stamps, format="%d.%m.%Y %H:%M:%S.%f", utc=True)
+    assert (parsed == pd.DatetimeIndex(expected)).all()
+
+    # Off-layout rows fall back to pandas instead of producing garbage
+    mixed = DukascopyLoader._parse_timestamps(pd.Series(["2024-01-01 00:05:00", "2024-01-01 00:06:00"]))
+    assert mixed[0] == pd.Timestamp("2024-01-01 00:05", tz="UTC")
+
+def test_dukascopy_loader_ingest_matches_load(tmp_path):
+    folder = tmp_path / "EURUSD"
+    folder.mkdir()
+    index = pd.date_range("2023-12-30 21:00", periods=6000, freq="1min", tz="UTC")
+    # Name order is not chronological and the files overlap by 500 rows
+    _write_m1(folder, "EURUSD_01.07.2023.csv", index[:3500])
+    _write_m1(folder, "EURUSD_01.01.2024.csv", index[3000:])
+    # Overlap rows must hold identical quotes for keep='first' to be unambiguous
+    first = pd.read_csv(folder / "EURUSD_01.07.2023.csv")
+    second = pd.read_csv(folder / "EURUSD_01.01.2024.csv")
+    second.iloc[:500] = first.iloc[3000:].values
+    second.to_csv(folder / "EURUSD_01.01.2024.csv", index=False)
+
+    plain = DukascopyLoader(base_dir=str(tmp_path))
+    streamed = DukascopyLoader(base_dir=str(tmp_path), store=BarStore(str(tmp_path / "store")))
+    written = streamed.ingest("EURUSD=X", chunk_rows=701)
+
+    assert written["1min"] == 6000
+    for tf in ("1min", "15min", "4h", "1d"):
+        pd.testing.assert_frame_equal(streamed.load("EURUSD=X", tf), plain.load("EURUSD=X", tf), check_freq=False)
+    window = streamed.load("EURUSD=X", "1h", start_date="2023-12-31", end_date="2024-01-01")
+    pd.testing.assert_frame_equal(window, plain.load("EURUSD=X", "1h", "2023-12-31", "2024-01-01"), check_freq=False)
+
+def test_dukascopy_loader_ingest_requires_store(temp_duka_dir):
+    loader = DukascopyLoader(base_dir=temp_duka_dir)
+    with pytest.raises(ValueError):
+        loader.ingest("EURUSD=X")
+    with pytest.raises(ValueError):
+        DukascopyLoader(base_dir=temp_duka_dir, store=BarStore(temp_duka_dir)).ingest("EURUSD=X", timeframes=("1W",))
+
+def test_dukascopy_loader_failed_ingest_keeps_previous_series(tmp_path, monkeypatch):
+    folder = tmp_path / "EURUSD"
+    folder.mkdir()
+    _write_m1(folder, "EURUSD_M1.csv", pd.date_range("2024-01-01", periods=3000, freq="1min", tz="UTC"))
+    loader = DukascopyLoader(base_dir=str(tmp_path), store=BarStore(str(tmp_path / "store")))
+    loader.ingest("EURUSD=X", chunk_rows=500)
+    before = loader.store.read("EURUSD=X", "1min")
+
+    parse = DukascopyLoader._iter_csv
+    def broken(self, path, chunk_rows=None):
+        for i, chunk in enumerate(parse(self, path, chunk_rows)):
+            if i == 3:
+                raise OSError("connection reset")
+            yield chunk
+    monkeypatch.setattr(DukascopyLoader, "_iter_csv", broken)
+    with pytest.raises(OSError):
+        loader.ingest("EURUSD=X", chunk_rows=500)
+
+    pd.testing.assert_frame_equal(loader.store.read("EURUSD=X", "1min"), before)
+    assert loader.store.symbols() == ["EURUSD=X"]
+
+def test_dukascopy_loader_lenient_reread_does_not_replay_rows(tmp_path):
+    index = pd.date_range("2024-01-01", periods=1000, freq="1min", tz="UTC")
+    _write_m1(tmp_path, "EURUSD_M1.csv", index)
+    raw = pd.read_csv(tmp_path / "EURUSD_M1.csv")
+    raw["Close"] = raw["Close"].astype(object)
+    raw.loc[800, "Close"] = "n/a"
+    raw.to_csv(tmp_path / "EURUSD_M1.csv", index=False)
+
+    chunks = list(DukascopyLoader(base_dir=str(tmp_path))._iter_csv(str(tmp_path / "EURUSD_M1.csv"), chunk_rows=100))
+    stamps = pd.DatetimeIndex(np.concatenate([c.index for c in chunks]))
+    assert stamps.is_unique and len(stamps) == 999
@@ -0,0 +1,97 @@
+import json
+import sqlite3
+from contextlib import closing
+from unittest.mock import patch
+
+from benchmarks.fixtures import canned_signal, scratch_databases
+from config.manager import config_manager
+from core import forensics
+
+CANDLES = [{"time": "2024-01-01T00:00:00", "open": 1.1, "high": 1.2, "low": 1.0, "close": 1.15, "volume": 120},
+           {"time": "2024-01-01T00:05:00", "open": 1.15, "high": 1.25, "low": 1.1, "close": 1.2, "volume": 80}]
+EVENTS = [{"type": "SWEEP", "price": 1.0}, {"type": "BOS", "price": 1.2}, {"type": "SWEEP", "price": 1.05}]
+
+
+def test_round_trip_is_lossless_and_smaller():
+    blob = forensics.encode_candles(CANDLES)
+    assert forensics.decode_candles(blob) == CANDLES
+    assert isinstance(forensics.decode_candles(blob)[0]["volume"], int)
+    assert forensics.decode_candles(forensics.encode_candles([[1, 2], [3, 4]])) == [[1, 2], [3, 4]]
+    assert forensics.decode_events(forensics.encode_events(EVENTS)) == EVENTS
+    assert forensics.encode_candles([]) is None and forensics.decode_candles(None) == []
+    assert forensics.event_tags(EVENTS) == "BOS + SWEEP"
+
+    many = [dict(c, close=1.1 + i * 1e-4) for i in range(200) for c in CANDLES[:1]]
+    assert len(forensics.encode_candles(many)) < len(json.dumps(many)) / 2
+
+
+def test_service_writes_the_side_table(tmp_path):
+    from signal_service import SignalService
+    signals_db, _ = scratch_databases(str(tmp_path / "db"), history=0)
+    config_manager.set_runtime_override("db_signals", signals_db)
+    try:
+        with patch("builtins.print"):
+            signal_id = SignalService._log_to_database(
+                SignalService.__new__(SignalService),
+                dict(canned_signal(), forensic_candles=CANDLES, forensic_events=EVENTS))
+    finally:
+        config_manager.clear_runtime_overrides()
+
+    with closing(sqlite3.connect(signals_db)) as conn:
+        assert signal_id == conn.execute("SELECT MAX(id) FROM signals").fetchone()[0]
+        assert conn.execute("SELECT forensic_candles, forensic_events FROM signals WHERE id = ?",
+                            (signal_id,)).fetchone() == ("[]", "[]")
+        assert conn.execute("SELECT event_tags FROM signal_forensics").fetchall() == [("BOS + SWEEP",)]
+        assert forensics.load(conn, signal_id) == {"forensic_candles": CANDLES, "forensic_events": EVENTS}
+
+
+def test_inline_rows_migrate_and_endpoints_load_lazily(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    import admin_server
+    signals_db, _ = scratch_databases(str(tmp_path / "db"), history=3)
+    with closing(sqlite3.connect(signals_db)) as conn:
+        conn.execute("ALTER TABLE signals ADD COLUMN max_tp_reached INTEGER DEFAULT 0")      # added by the tracker
+        conn.execute("UPDATE signals SET forensic_candles = ?, forensic_events = ?, result = 'TP1' WHERE id = 2",
+                     (json.dumps(CANDLES), json.dumps(EVENTS)))
+        conn.execute("UPDATE signals SET forensic_events = 'not json' WHERE id = 3")
+        conn.commit()
+        assert forensics.migrate_inline(conn, batch=1) == 1
+        assert forensics.migrate_inline(conn) == 0
+        assert conn.execute("SELECT forensic_events FROM signals WHERE id = 3").fetchone() == ("not json",)
+
+    monkeypatch.setattr(admin_server, "DB_SIGNALS", signals_db)
+    admin_server.app.dependency_overrides[admin_server.get_current_user] = lambda: admin_server.User(username="admin")
+    client = TestClient(admin_server.app)
+    try:
+        page = client.get("/api/signals").json()
+        assert len(page) == 3 and not any("forensic_events" in row for row in page)
+        page = {row["id"]: row for row in client.get("/api/signals?fields=id,timestamp,forensic_events").json()}
+        assert page[2]["forensic_events"] == EVENTS and page[1]["forensic_events"] == []
+
+        detail = client.get("/api/signals/2").json()
+        assert detail["forensic_candles"] == CANDLES and detail["forensic_events"] == EVENTS
+        assert client.get("/api/signals/1").json()["forensic_candles"] == []
+
+        audit = client.get("/api/analytics/forensic_audit").json()
+        assert [(row["combination"], row["sample_size"]) for row in audit] == [("BOS + SWEEP", 1)]
+    finally:
+        admin_server.app.dependency_overrides.clear()
+
+
+def test_multiplier_matches_the_exact_combination(tmp_path, monkeypatch):
+    from core.alpha_combiner import AlphaCombiner
+    signals_db, _ = scratch_databases(str(tmp_path / "db"), history=0)
+    monkeypatch.setattr("config.config.DB_SIGNALS", signals_db)
+    monkeypatch.setattr("config.config.DB_CLIENTS", str(tmp_path / "missing.db"))
+    assert AlphaCombiner.get_forensic_multiplier([{"type": "BOS"}]) == 1.0          # no side table yet
+
+    with closing(sqlite3.connect(signals_db)) as conn:
+        for i in range(60):
+            events = [{"type": "BOS"}, {"type": "SWEEP"}] if i % 2 else [{"type": "BOS"}]
+            signal_id = conn.execute("INSERT INTO signals (symbol, result_pips) VALUES ('EURUSD=X', ?)",
+                                     (10.0 if i % 2 else -10.0,)).lastrowid
+            forensics.store(conn, signal_id, [], events)
+        conn.commit()
+    # "BOS" alone loses; the BOS + SWEEP winners must not be counted with it
+    assert AlphaCombiner.get_forensic_multiplier([{"type": "BOS"}]) == 0.6
+    assert AlphaCombiner.get_forensic_multiplier([{"type": "SWEEP"}, {"type": "BOS"}]) == 1.5
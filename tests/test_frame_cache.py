@@ -0,0 +1,118 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+
+import indicators.calculations as calculations
+from core.backtest_engine import BacktestEngine
+from data.fetcher import DataFetcher
+from data.frame_cache import FrameCache
+from indicators.calculations import IndicatorCalculator
+
+
+def _bars(start, end, freq="1h"):
+    idx = pd.date_range(start, end, freq=freq, tz="UTC", inclusive="left")
+    # A pure function of time, so bars downloaded in pieces match one download
+    hours = idx.asi8 / 3.6e12
+    close = 1.1 + 0.01 * np.sin(hours / 7) + 0.003 * np.sin(hours * 1.3)
+    return pd.DataFrame({'open': close, 'high': close + 0.0004, 'low': close - 0.0004,
+                         'close': close, 'volume': 1.0}, index=idx)
+
+
+def test_round_trip_preserves_frame(tmp_path):
+    cache = FrameCache(str(tmp_path))
+    df = IndicatorCalculator.add_indicators(_bars("2024-01-01", "2024-01-20"), "1h")
+    df['quiet'] = df['rsi'] > 50
+    cache.put("k", df)
+
+    loaded = cache.get("k")
+    pdt.assert_frame_equal(loaded, df, check_freq=False)
+    assert loaded.attrs['indicators'] == df.attrs['indicators']
+    assert set(loaded['regime'].dropna()) <= {"RANGING", "TRENDING", "CHOPPY"}
+    assert cache.get("missing") is None
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path):
+    df = _bars("2024-01-01", "2024-01-05")
+    cache = FrameCache(str(tmp_path), max_bytes=10 ** 9)
+    for key in ("a", "b", "c"):
+        cache.put(key, df)
+    entry_bytes = cache.size() // 3
+
+    past = time.time() - 100
+    for i, key in enumerate(("a", "b", "c")):
+        os.utime(os.path.join(str(tmp_path), key, "meta.json"), (past + i, past + i))
+    cache.get("a")   # touch: "b" is now least recently used
+
+    cache.max_bytes = 2 * entry_bytes
+    cache.evict()
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_open_range_entries_expire(tmp_path, monkeypatch):
+    cache = FrameCache(str(tmp_path))
+    df = _bars("2024-01-01", "2024-01-03")
+    cache.put("closed", df, end="2024-01-03")
+    cache.put("open", df, end=(pd.Timestamp.now(tz="UTC") + pd.Timedelta(days=2)).strftime('%Y-%m-%d'))
+    monkeypatch.setattr("data.frame_cache.OPEN_RANGE_TTL", pd.Timedelta(seconds=-1))
+    assert cache.get("closed") is not None
+    assert cache.get("open") is None
+
+
+def test_raw_bars_fetch_only_missing_ranges(tmp_path):
+    cache = FrameCache(str(tmp_path))
+    assert cache.missing_ranges("X", "1h", "yf", "2024-01-10", "2024-01-20") == [("2024-01-10", "2024-01-20")]
+    cache.add_bars("X", "1h", "yf", _bars("2024-01-10", "2024-01-20"), "2024-01-10", "2024-01-20")
+
+    assert cache.missing_ranges("X", "1h", "yf", "2024-01-12", "2024-01-18") == []
+    assert cache.missing_ranges("X", "1h", "yf", "2024-01-05", "2024-01-25") == [
+        ("2024-01-05", "2024-01-10"), ("2024-01-20", "2024-01-25")]
+
+    cache.add_bars("X", "1h", "yf", _bars("2024-01-05", "2024-01-10"), "2024-01-05", "2024-01-10")
+    bars = cache.read_bars("X", "1h", "yf", "2024-01-05", "2024-01-20")
+    assert bars.index[0] == pd.Timestamp("2024-01-05", tz="UTC")
+    assert len(bars) == 15 * 24 and bars.index.is_unique
+
+
+def test_fingerprint_tracks_indicator_config(monkeypatch):
+    before = IndicatorCalculator.fingerprint()
+    monkeypatch.setattr(calculations, "RSI_PERIOD", calculations.RSI_PERIOD + 1)
+    assert IndicatorCalculator.fingerprint() != before
+
+
+async def test_engine_reuses_cached_frames(tmp_path, monkeypatch):
+    calls = []
+
+    async def fetch(symbol, timeframe, start, end):
+        calls.append((timeframe, start, end))
+        freq = {"5m": "5min", "15m": "15min", "1h": "1h", "1d": "1D"}[timeframe]
+        return _bars(start, end, freq)
+
+    monkeypatch.setattr(DataFetcher, "fetch_range_async", staticmethod(fetch))
+    # Keep the M5 range on DataFetcher (not the deep-history fetcher)
+    start = (pd.Timestamp.now() - pd.Timedelta(days=20)).strftime('%Y-%m-%d')
+    end = (pd.Timestamp.now() - pd.Timedelta(days=10)).strftime('%Y-%m-%d')
+    cache = FrameCache(str(tmp_path / "cache"))
+    db = str(tmp_path / "results.db")
+
+    first = await BacktestEngine(start, end, symbols=["EURUSD=X"], results_db=db,
+                                 frame_cache=cache)._fetch_all_symbol_data()
+    assert len(calls) == 4
+    again = await BacktestEngine(start, end, symbols=["EURUSD=X"], results_db=db,
+                                 frame_cache=cache)._fetch_all_symbol_data()
+    assert len(calls) == 4
+    for tf in ('entry', 'm15', 'h1', 'd1'):
+        pdt.assert_frame_equal(again["EURUSD=X"][tf], first["EURUSD=X"][tf], check_freq=False)
+
+    # A range extended by two days downloads only the new tail, and matches a cold run
+    later = (pd.Timestamp(end) + pd.Timedelta(days=2)).strftime('%Y-%m-%d')
+    extended = await BacktestEngine(start, later, symbols=["EURUSD=X"], results_db=db,
+                                    frame_cache=cache)._fetch_all_symbol_data()
+    tails = calls[4:]
+    assert len(tails) == 4 and all(s == (pd.Timestamp(end) + pd.Timedelta(days=2)).strftime('%Y-%m-%d')
+                                   for _, s, _ in tails)
+    cold = await BacktestEngine(start, later, symbols=["EURUSD=X"], results_db=db)._fetch_all_symbol_data()
+    pdt.assert_frame_equal(extended["EURUSD=X"]['h1'], cold["EURUSD=X"]['h1'], check_freq=False)
@@ -0,0 +1,76 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from research.edge_finder import build_dimensions
+from research.grid_search import _benjamini_hochberg, grid_search
+
+
+@pytest.fixture
+def signals():
+    rng = np.random.default_rng(8)
+    n = 3000
+    df = pd.DataFrame({
+        'quality_score': rng.uniform(5, 9, n).round(1),
+        'regime': rng.choice(['CHOPPY', 'UNKNOWN', 'RANGING', 'TRENDING'], n),
+        'symbol': rng.choice(['EURUSD=X', 'GBPUSD=X', 'NZDUSD=X', 'BTC-USD'], n),
+        'trade_type': rng.choice(['CRT', 'ADVANCED_PATTERN', 'OTHER'], n),
+    })
+    df['is_win'] = (rng.random(n) < 0.30 + 0.03 * (df['quality_score'] - 5)).astype(int)
+    df['sl_dist'] = rng.uniform(0.001, 0.002, n)
+    df['tp1_dist'] = df['sl_dist'] * rng.uniform(1.2, 2.5, n)
+    return df
+
+
+@pytest.fixture
+def dimensions(signals):
+    return build_dimensions(
+        signals,
+        qualities=[6.0, 7.0, 8.0],
+        regime_blocks=[[], ['CHOPPY'], ['CHOPPY', 'UNKNOWN']],
+        toxic_bans=[[], ['GBPUSD=X'], ['GBPUSD=X', 'NZDUSD=X']],
+        type_filters=[None, ['CRT'], ['CRT', 'ADVANCED_PATTERN']],
+    )
+
+
+@pytest.mark.parametrize("missing", [0.0, 0.05])
+def test_grid_matches_per_combination_filtering(signals, dimensions, missing):
+    rng = np.random.default_rng(2)
+    signals.loc[rng.random(len(signals)) < missing, 'tp1_dist'] = np.nan
+    signals.loc[rng.random(len(signals)) < missing, 'sl_dist'] = np.nan
+    results = grid_search(signals, dimensions, min_trades=20, workers=1)
+    indexed = results.set_index(['q', 'blocked_regimes', 'banned_symbols', 'trade_types'])
+
+    checked = 0
+    for choice in itertools.product(*[options for _, options in dimensions]):
+        d = signals[np.logical_and.reduce([mask for _, mask in choice])]
+        key = tuple(label for label, _ in choice)
+        if len(d) < 20:
+            assert key not in indexed.index
+            continue
+        row = indexed.loc[key]
+        wr = d['is_win'].mean()
+        rr = d['tp1_dist'].mean() / d['sl_dist'].mean()
+        assert row['trades'] == len(d)
+        assert row['wr'] == round(wr * 100, 1)
+        assert row['exp'] == pytest.approx(round(wr * rr - (1 - wr), 3), abs=1e-3)
+        checked += 1
+    assert checked > 50
+
+
+def test_grid_sharding_is_deterministic(signals, dimensions, monkeypatch):
+    import research.grid_search as gs
+    monkeypatch.setattr(gs, 'BLOCK_CELLS', 500)   # force many blocks
+    sharded = grid_search(signals, dimensions, min_trades=20, workers=2)
+    single = grid_search(signals, dimensions, min_trades=20, workers=1)
+    pd.testing.assert_frame_equal(sharded, single)
+
+
+def test_benjamini_hochberg_counts_all_tested_combinations():
+    p = np.array([0.01, 0.04, 0.03, 0.20])
+    q = _benjamini_hochberg(p, tested=4)
+    assert q == pytest.approx([0.04, 0.0533333, 0.0533333, 0.20], rel=1e-5)
+    # Dropped combinations still count towards m
+    assert (_benjamini_hochberg(p, tested=40) >= q).all()
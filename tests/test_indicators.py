@@ -127,3 +127,49 @@ class TestIndicators:
         df_chop['ema_50'] = 100 # Flat
         regime = IndicatorCalculator.get_market_regime(df_chop)
         assert regime in ["VOLATILE_RANGE", "LOW_VOL_RANGE"]  # Low vol ratio maps to LOW_VOL_RANGE in 4-cluster model
+
+    def test_add_indicators_selected_columns(self, sample_df):
+        """Only requested columns (plus dependencies) are computed"""
+        df = IndicatorCalculator.add_indicators(sample_df, timeframe="1h", columns=["regime"])
+
+        for col in ['atr', 'vol_ratio', 'ema_slope', 'regime']:
+            assert col in df.columns
+        for col in ['rsi', 'adx', 'zscore_20', 'ema_50']:
+            assert col not in df.columns
+
+    def test_add_indicators_selected_matches_full(self, sample_df):
+        """Selective computation yields the same values as the full set"""
+        full = IndicatorCalculator.add_indicators(sample_df.copy(), timeframe="1h")
+        subset = IndicatorCalculator.add_indicators(sample_df.copy(), timeframe="1h", columns=["atr", "ema_200"])
+
+        pd.testing.assert_series_equal(full['atr'], subset['atr'])
+        pd.testing.assert_series_equal(full['ema_200'], subset['ema_200'])
+
+    def test_add_indicators_memoized(self, sample_df):
+        """Columns already computed on the frame are not recomputed"""
+        df = IndicatorCalculator.add_indicators(sample_df, timeframe="1h", columns=["atr"])
+        with patch('indicators.calculations.ta.atr') as mock_atr, \
+             patch('indicators.calculations.ta.ema', wraps=__import__('pandas_ta_classic').ema) as mock_ema:
+            df = IndicatorCalculator.add_indicators(df, timeframe="1h", columns=["atr", "ema_20"])
+            mock_atr.assert_not_called()
+            assert mock_ema.call_count == 1
+        assert {'atr', 'ema_20'} <= df.attrs['indicators']
+
+    def test_add_indicators_unknown_column(self, sample_df):
+        with pytest.raises(ValueError):
+            IndicatorCalculator.add_indicators(sample_df, timeframe="1h", columns=["not_an_indicator"])
+
+    def test_merge_requirements(self):
+        """Strategy declarations are unioned per timeframe; undeclared means full set"""
+        from strategies.crt_strategy import CRTStrategy
+        from strategies.advanced_pattern_strategy import AdvancedPatternStrategy
+
+        merged = IndicatorCalculator.merge_requirements(
+            CRTStrategy.REQUIRED_INDICATORS, AdvancedPatternStrategy.REQUIRED_INDICATORS
+        )
+        assert {'atr', 'ema_20', 'ema_100', 'ema_200'} == merged['h1']
+        assert IndicatorCalculator.columns_for(merged, 'm5') == {'atr'}
+        assert IndicatorCalculator.columns_for(merged, 'h4') == set()
+
+        assert IndicatorCalculator.merge_requirements(CRTStrategy.REQUIRED_INDICATORS, None) is None
+        assert IndicatorCalculator.columns_for(None, 'h1') is None
@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import admin_server
+from core.market_context import DEFAULT_CONTEXT, MarketContext
+from data.fetcher import DataFetcher
+from data.news_fetcher import NewsFetcher
+
+EVENTS = [{"title": "NFP", "country": "USD", "impact": "High", "date": "2024-01-05T08:30:00-05:00"},
+          {"title": "CPI", "country": "JPY", "impact": "High", "date": "2024-01-05T08:30:00-05:00"}]
+
+
+@pytest.fixture
+def network(monkeypatch):
+    calls = []
+
+    async def fetch(symbol, timeframe, period="5d"):
+        calls.append(symbol)
+        idx = pd.date_range("2024-01-01", periods=300, freq="1h", tz="UTC")
+        close = 100 + np.cumsum(np.full(300, 0.05))
+        return pd.DataFrame({'open': close, 'high': close + 0.1, 'low': close - 0.1,
+                             'close': close, 'volume': 1.0}, index=idx)
+
+    monkeypatch.setattr(DataFetcher, "fetch_data_async", staticmethod(fetch))
+    monkeypatch.setattr(NewsFetcher, "fetch_news", staticmethod(lambda: calls.append("news") or EVENTS))
+    return calls
+
+
+async def test_bundle_serves_cache_until_stale(tmp_path, network):
+    context = MarketContext(str(tmp_path), ttl=60)
+    frames, news = await context.bundle("DX-Y.NYB", "^TNX", ["EURUSD=X"])
+    assert network == ["DX-Y.NYB", "^TNX", "news"]
+    assert set(frames) == {"DXY", "^TNX"} and "ema_20" in frames["DXY"]
+    assert news == EVENTS
+    assert context.context()["NEWS"] == "1 HIGH IMPACT EVENTS"   # JPY is not traded
+
+    # Another process (admin_server) reads the same cache without fetching
+    frames_again, _ = await MarketContext(str(tmp_path), ttl=60).bundle("DX-Y.NYB", "^TNX", ["EURUSD=X"])
+    assert len(network) == 3
+    pd.testing.assert_frame_equal(frames_again["DXY"], frames["DXY"], check_freq=False)
+
+    context.ttl = 0
+    await context.bundle("DX-Y.NYB", "^TNX", ["EURUSD=X"])
+    assert len(network) == 6
+
+
+async def test_failed_refresh_keeps_previous_context(tmp_path, network, monkeypatch):
+    context = MarketContext(str(tmp_path), ttl=0)
+    await context.refresh("DX-Y.NYB", "^TNX", ["EURUSD=X"])
+    refreshed_at = context.summary()["refreshed_at"]
+
+    async def down(symbol, timeframe, period="5d"):
+        return None
+
+    monkeypatch.setattr(DataFetcher, "fetch_data_async", staticmethod(down))
+    frames, news = await context.bundle("DX-Y.NYB", "^TNX", ["EURUSD=X"])
+    assert set(frames) == {"DXY", "^TNX"} and news == EVENTS
+    assert context.summary()["refreshed_at"] == refreshed_at
+
+
+async def test_stats_context_never_fetches(tmp_path, network, monkeypatch):
+    context = MarketContext(str(tmp_path))
+    monkeypatch.setattr(admin_server, "MARKET_CONTEXT", context)
+    assert await admin_server.get_market_context() == DEFAULT_CONTEXT
+    assert network == []
+
+    # The background refresher fills the cache; requests only read it
+    context.start("DX-Y.NYB", "^TNX", ["EURUSD=X"])
+    deadline = time.time() + 10
+    while context.summary() is None and time.time() < deadline:
+        await asyncio.sleep(0.05)
+    await context.stop()
+    ctx = await admin_server.get_market_context()
+    assert ctx["NEWS"] == "1 HIGH IMPACT EVENTS" and ctx["refreshed_at"] <= time.time()
+    calls = len(network)
+    await admin_server.get_market_context()
+    assert len(network) == calls
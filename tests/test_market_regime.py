@@ -0,0 +1,64 @@
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from benchmarks.fixtures import canned_signal, scratch_databases, synthetic_ohlcv
+from core.alpha_combiner import AlphaCombiner
+from core.execution_gate import ExecutionGate
+from core.market_regime import (QUALITY_MIXED, QUALITY_RANGING, REQUIRED_INDICATORS, RegimePanel, _calc_adx,
+                                detect_regime)
+from indicators.calculations import IndicatorCalculator
+
+
+def _h1(bars: int, seed: int):
+    return IndicatorCalculator.add_indicators(synthetic_ohlcv(bars, "1h", seed=seed), "1h", REQUIRED_INDICATORS)
+
+
+@pytest.fixture(scope="module")
+def universe():
+    # Different lengths: the panel right-aligns them on the latest bar
+    return {"EURUSD=X": _h1(720, 1), "GBPUSD=X": _h1(300, 2), "USDJPY=X": _h1(1000, 3), "GC=F": _h1(60, 4),
+            "BTC-USD": _h1(20, 5)}
+
+
+def test_panel_matches_single_frame_detector(universe):
+    panel = RegimePanel.build(universe)
+    for symbol, df in universe.items():
+        single = detect_regime(df)
+        assert panel.get(symbol) == single
+        if len(df) >= 50:
+            assert single["adx"] == _calc_adx(df)
+    assert panel.get("BTC-USD")["detail"] == "Insufficient data for regime calculation"
+    assert panel.get("AUDUSD=X") is None and "AUDUSD=X" not in panel
+
+
+def test_aggregate_covers_the_whole_universe(universe):
+    panel = RegimePanel.build(universe)
+    aggregate = detect_regime(universe)
+    assert aggregate == panel.aggregate and aggregate["symbols"] == 5
+    assert sum(aggregate["breadth"].values()) == 4            # BTC-USD is too short to count
+    assert aggregate["breadth"][aggregate["regime"]] == max(aggregate["breadth"].values())
+    assert aggregate["adx"] == round(float(np.median(panel.adx[panel.enough])), 2)
+
+    # Tie → the stricter threshold wins
+    tied = RegimePanel(["A", "B"], adx=[30, 10], vol_ratio=[1.0, 1.0], spread=[0.01, 0.0], enough=[True, True])
+    assert list(tied.regimes) == ["TRENDING_BULL", "LOW_VOL_RANGE"]
+    assert tied.aggregate["quality_threshold"] == QUALITY_RANGING
+    assert detect_regime({})["quality_threshold"] == 5.0
+    assert RegimePanel.build({"A": universe["BTC-USD"]}).aggregate["quality_threshold"] == QUALITY_MIXED
+
+
+def test_strategies_and_gate_read_the_panel(universe, tmp_path):
+    panel = RegimePanel.build(universe)
+    with patch("core.market_regime.detect_regime") as detect:
+        assert AlphaCombiner.detect_regime(universe["EURUSD=X"], panel, "EURUSD=X") == panel.get("EURUSD=X")["regime"]
+    detect.assert_not_called()
+    assert AlphaCombiner.detect_regime(universe["GC=F"], None, "GC=F") == detect_regime(universe["GC=F"])["regime"]
+
+    signals_db, clients_db = scratch_databases(str(tmp_path / "db"))
+    signal = canned_signal(3)
+    assert ExecutionGate.validate(dict(signal, quality_score=8.2, regime_threshold=8.5),
+                                  signals_db, clients_db)["reason"] == "INSUFFICIENT_QUALITY (8.20)"
+    passed = ExecutionGate.validate(dict(signal, quality_score=8.2, regime_threshold=5.0), signals_db, clients_db)
+    assert not passed["reason"].startswith("INSUFFICIENT_QUALITY")
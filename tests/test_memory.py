@@ -0,0 +1,114 @@
+import sqlite3
+import time
+from contextlib import closing
+from unittest.mock import patch
+
+import pytest
+
+from core.cycle_trace import CycleTrace, cycle_rollup, record_cycle, recent_cycles
+from core.memory import RSS_BYTES, BoundedDict, MemoryWatch, read_published
+from strategies.advanced_pattern_strategy import FIRED_TODAY_MAX, AdvancedPatternStrategy
+
+
+@pytest.fixture
+def metrics_db(tmp_path, monkeypatch):
+    db = str(tmp_path / "metrics.db")
+    monkeypatch.setattr("core.metrics.METRICS_DB", db)
+    return db
+
+
+def test_bounded_dict_drops_oldest_entries():
+    cache = BoundedDict(maxsize=3)
+    for key in "abcd":
+        cache[key] = True
+    assert list(cache) == ["b", "c", "d"]
+    cache["b"] = False          # renewed, so "c" is now the oldest
+    cache["e"] = True
+    assert list(cache) == ["d", "b", "e"]
+    assert cache.copy().maxsize == 3 and cache.copy() == cache
+
+    fired = AdvancedPatternStrategy._fired_today
+    assert isinstance(fired, BoundedDict) and fired.maxsize == FIRED_TODAY_MAX
+    with patch.dict(fired, clear=True):
+        for day in range(FIRED_TODAY_MAX + 50):
+            fired[("EURUSD=X", f"day-{day}")] = True
+        assert len(fired) == FIRED_TODAY_MAX and ("EURUSD=X", "day-0") not in fired
+
+
+def test_watch_samples_rss_against_budget_and_publishes(metrics_db):
+    watch = MemoryWatch("signal_service", budget_mb=1)
+    sample = watch.sample()
+    assert sample["over_budget"] and sample["rss_mb"] > 1
+    assert RSS_BYTES.value() > 1024 ** 2
+
+    MemoryWatch("signal_tracker", budget_mb=100_000).publish()
+    watch.publish()
+    published = read_published()
+    assert published["signal_service"]["over_budget"] and not published["signal_tracker"]["over_budget"]
+    assert published["signal_service"]["growth"] is None
+    assert read_published(metrics_db + ".missing") == {}
+
+
+def test_tracemalloc_diff_points_at_the_growing_line():
+    watch = MemoryWatch("test")
+    watch.start_tracing()
+    try:
+        leak = [bytes(1024) for _ in range(2000)]
+        rows = watch.diff(top=5, reset=True)
+        assert rows and "test_memory.py:" in rows[0]["where"]
+        assert rows[0]["size_diff_kb"] >= 2000
+        assert all(row["size_diff_kb"] < 100 for row in watch.diff(top=5))   # re-baselined
+    finally:
+        watch.stop_tracing()
+    assert watch.diff() == [] and len(leak) == 2000
+
+
+def test_cycle_rss_is_recorded_and_old_tables_still_read(tmp_path):
+    db = str(tmp_path / "signals.db")
+    with closing(sqlite3.connect(db)) as conn:
+        conn.execute("CREATE TABLE cycle_metrics (id INTEGER PRIMARY KEY AUTOINCREMENT, cycle INTEGER, "
+                     "started_at TEXT NOT NULL, total_ms REAL NOT NULL, signals INTEGER DEFAULT 0, "
+                     "sent INTEGER DEFAULT 0, stages TEXT)")
+        conn.execute("INSERT INTO cycle_metrics (cycle, started_at, total_ms, stages) VALUES (1, ?, 10.0, '{}')",
+                     (CycleTrace().started_at.isoformat(),))
+        conn.commit()
+    assert recent_cycles(db)[0]["rss_mb"] is None
+
+    for cycle, rss in ((2, 150.0), (3, 152.5)):
+        record_cycle(db, CycleTrace(cycle), rss_mb=rss)
+    assert [c["rss_mb"] for c in recent_cycles(db)] == [152.5, 150.0, None]
+    assert cycle_rollup(db, hours=1)["rss_mb"] == {"first": 150.0, "last": 152.5, "max": 152.5}
+
+
+def test_memory_debug_endpoint(metrics_db):
+    from fastapi.testclient import TestClient
+    import admin_server
+    MemoryWatch("signal_service").publish()
+    admin_server.app.dependency_overrides[admin_server.get_current_user] = lambda: admin_server.User(username="admin")
+    client = TestClient(admin_server.app)
+    try:
+        body = client.get("/api/debug/memory").json()
+        assert set(body["services"]) == {"signal_service", "admin_server"}
+        assert body["services"]["admin_server"]["growth"] is None
+
+        assert client.post("/api/debug/memory/trace", json={"enabled": True}).json() == {"tracing": True}
+        assert isinstance(client.get("/api/debug/memory?top=3").json()["services"]["admin_server"]["growth"], list)
+        assert client.post("/api/debug/memory/trace", json={"enabled": False}).json() == {"tracing": False}
+    finally:
+        admin_server.METRICS_PUSHER.memory.stop_tracing()
+        admin_server.app.dependency_overrides.clear()
+
+
+def test_guard_restarts_only_services_over_budget(metrics_db):
+    pytest.importorskip("psutil")
+    import memory_guard
+    MemoryWatch("signal_service", budget_mb=1).publish()
+    MemoryWatch("signal_tracker", budget_mb=100_000).publish()
+    MemoryWatch("admin_server", budget_mb=1).publish()
+    with closing(sqlite3.connect(metrics_db)) as conn:
+        conn.execute("UPDATE service_memory SET taken_at = ? WHERE service = 'admin_server'",
+                     (time.time() - memory_guard.STALE_AFTER - 1,))
+        conn.commit()
+    with patch("memory_guard.subprocess.run") as run:
+        assert memory_guard.restart_over_budget() == ["signal_service"]
+    run.assert_called_once_with(["sudo", "systemctl", "restart", "smc-signal-service.service"])
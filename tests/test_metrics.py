@@ -0,0 +1,130 @@
+import json
+import sqlite3
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from core.execution_gate import ExecutionGate
+from core.metrics import REGISTRY, MetricsRegistry, histogram_quantile, read_pushed, render_all
+from monitoring.alert_service import AlertService
+from monitoring.health_monitor import HEARTBEAT_STALE_SECONDS, HealthMonitor
+
+
+@pytest.fixture
+def metrics_db(tmp_path, monkeypatch):
+    db = str(tmp_path / "metrics.db")
+    monkeypatch.setattr("core.metrics.METRICS_DB", db)
+    monkeypatch.setattr("monitoring.health_monitor.METRICS_DB", db)
+    return db
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    fetches = registry.histogram("fetch_seconds", "Fetch latency", ("timeframe",), buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.5, 0.7, 3.0):
+        fetches.observe(seconds, timeframe="5m")
+    registry.counter("failures_total", "Failures", ("reason",)).inc(reason='quote "x"')
+    registry.gauge("open_signals", "Open").set(4)
+
+    assert registry.histogram("fetch_seconds", "again", ("timeframe",)) is fetches
+    with pytest.raises(ValueError):
+        registry.counter("fetch_seconds", "clash")
+
+    text = registry.render({"service": "svc"})
+    assert "# TYPE fetch_seconds histogram" in text
+    assert 'fetch_seconds_bucket{service="svc",timeframe="5m",le="0.1"} 1' in text
+    assert 'fetch_seconds_bucket{service="svc",timeframe="5m",le="1"} 3' in text
+    assert 'fetch_seconds_bucket{service="svc",timeframe="5m",le="+Inf"} 4' in text
+    assert 'fetch_seconds_count{service="svc",timeframe="5m"} 4' in text
+    assert 'failures_total{service="svc",reason="quote \\"x\\""} 1' in text
+    assert 'open_signals{service="svc"} 4' in text
+    assert histogram_quantile(registry.snapshot()["fetch_seconds"], 0.5) == 1.0
+    assert histogram_quantile(registry.snapshot()["fetch_seconds"], 0.99) == float("inf")
+
+
+def test_pushed_snapshots_merge_per_service(metrics_db):
+    REGISTRY.push("signal_service")
+    REGISTRY.push("signal_tracker")
+    pushed = read_pushed()
+    assert set(pushed) == {"signal_service", "signal_tracker"} and pushed["signal_tracker"]["age_seconds"] < 5
+
+    text = render_all("admin_server")
+    assert text.count("# TYPE process_start_time_seconds gauge") == 1
+    for service in ("signal_service", "signal_tracker", "admin_server"):
+        assert f'process_start_time_seconds{{service="{service}"}}' in text
+    assert 'service_last_push_seconds{service="signal_tracker"}' in text
+    assert read_pushed(str(metrics_db) + ".missing") == {}
+
+
+async def test_fetch_latency_and_failures_are_recorded():
+    from data.fetcher import FETCH_FAILURES, FETCH_SECONDS, DataFetcher
+    before = (FETCH_SECONDS.value(timeframe="4h") or {}).get("count", 0)
+    failures = FETCH_FAILURES.value(timeframe="4h") or 0
+    with patch.object(DataFetcher, "_fetch_data_async", new=AsyncMock(return_value=None)):
+        assert await DataFetcher.fetch_data_async("EURUSD=X", "4h") is None
+    assert FETCH_SECONDS.value(timeframe="4h")["count"] == before + 1
+    assert FETCH_FAILURES.value(timeframe="4h") == failures + 1
+
+
+def test_gate_reason_codes_are_bounded():
+    assert ExecutionGate.reason_code("EXISTING_POSITION_IN_EURUSD=X") == "EXISTING_POSITION"
+    assert ExecutionGate.reason_code("ACTIVE_RESERVATION_IN_GBPUSD=X") == "ACTIVE_RESERVATION"
+    assert ExecutionGate.reason_code("INSUFFICIENT_QUALITY (0.42)") == "INSUFFICIENT_QUALITY"
+    assert ExecutionGate.reason_code("") == "UNKNOWN"
+
+
+def _age_push(db, service, seconds):
+    with sqlite3.connect(db) as conn:
+        conn.execute("UPDATE service_metrics SET pushed_at = ? WHERE service = ?", (time.time() - seconds, service))
+
+
+async def test_watchdog_reads_heartbeats_instead_of_processes(metrics_db, tmp_path):
+    from monitoring.health_check import check_heartbeat
+    monitor = HealthMonitor(str(tmp_path / "signals.db"))
+    snapshot = {
+        "data_fetch_seconds": {"type": "histogram", "help": "", "labels": ["timeframe"], "buckets": [1.0],
+                               "series": [[["5m"], {"counts": [10], "sum": 2.0, "count": 10}]]},
+        "data_fetch_failures_total": {"type": "counter", "help": "", "labels": ["timeframe"],
+                                      "series": [[["5m"], 8.0]]},
+    }
+    REGISTRY.push("signal_service")
+    REGISTRY.push("signal_tracker")
+    with sqlite3.connect(metrics_db) as conn:
+        conn.execute("UPDATE service_metrics SET snapshot = ? WHERE service = 'signal_service'", (json.dumps(snapshot),))
+    _age_push(metrics_db, "signal_tracker", HEARTBEAT_STALE_SECONDS + 60)
+
+    with patch("monitoring.health_monitor.subprocess.run", side_effect=AssertionError("systemctl polled")):
+        assert monitor.check_service_status()["is_running"] is True
+        heartbeats = monitor.get_service_heartbeats()
+    assert heartbeats["signal_tracker"]["is_running"] is False
+    assert monitor.get_fetch_failure_rate() == pytest.approx(0.8)
+    assert check_heartbeat("signal_service") and not check_heartbeat("signal_tracker")
+    assert not check_heartbeat("admin_server")
+
+    service = AlertService()
+    service.monitor = monitor
+    with patch.object(service, "send_alert", new=AsyncMock()) as send:
+        await service.check_stale_services()
+        await service.check_fetch_failures()
+    alert_types = [call.kwargs["alert_type"] for call in send.await_args_list]
+    assert alert_types == ["service_down_signal_tracker", "fetch_failures"]
+
+
+def test_metrics_endpoint_requires_token(metrics_db, monkeypatch):
+    from fastapi.testclient import TestClient
+    import admin_server
+    REGISTRY.push("signal_service")
+    monkeypatch.delenv("METRICS_TOKEN", raising=False)
+    assert TestClient(admin_server.app, client=("203.0.113.7", 50000)).get("/metrics").status_code == 403
+    client = TestClient(admin_server.app, client=("127.0.0.1", 50000))
+
+    body = client.get("/metrics").text   # loopback without METRICS_TOKEN
+    assert "# TYPE http_request_seconds histogram" in body
+    assert 'process_start_time_seconds{service="signal_service"}' in body
+
+    monkeypatch.setenv("METRICS_TOKEN", "scrape-secret")
+    assert client.get("/metrics").status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200 and response.headers["content-type"].startswith("text/plain")
+    assert 'http_request_seconds_count{service="admin_server",method="GET",route="/metrics",status="4xx"}' in response.text
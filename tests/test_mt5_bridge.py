@@ -0,0 +1,106 @@
+import os
+from datetime import datetime, timedelta
+
+from mt5_bridge.signal_exporter import SignalExporter
+from mt5_bridge.signal_feed import SignalFeed, SignalFeedReader, decode_record, encode_record, list_segments
+
+
+def _signal(n, **extra):
+    return {"symbol": "EURUSD=X", "direction": "BUY", "entry": 1.085 + n / 1e4, "n": n, **extra}
+
+
+def test_reader_polls_by_sequence_and_resumes(tmp_path):
+    feed = SignalFeed(str(tmp_path))
+    reader = SignalFeedReader(str(tmp_path), consumer="ea")
+    assert reader.poll() == []
+
+    assert [feed.append(_signal(n)) for n in range(3)] == [1, 2, 3]
+    records = reader.poll()
+    assert [r["seq"] for r in records] == [1, 2, 3] and records[2]["signal"]["n"] == 2
+    assert reader.poll() == []
+    reader.ack(2)
+
+    feed.append(_signal(3))
+    # A restarted consumer continues after its acknowledged sequence number
+    assert [r["seq"] for r in SignalFeedReader(str(tmp_path), consumer="ea").poll()] == [3, 4]
+    # A restarted writer continues the numbering
+    feed.close()
+    assert SignalFeed(str(tmp_path)).append(_signal(4)) == 5
+
+
+def test_rewound_records_are_redelivered(tmp_path):
+    feed = SignalFeed(str(tmp_path), segment_bytes=200)
+    for n in range(6):
+        feed.append(_signal(n))
+    reader = SignalFeedReader(str(tmp_path))
+    assert [r["seq"] for r in reader.poll()] == [1, 2, 3, 4, 5, 6]
+    # Execution of seq 2 failed: it and everything after it come back
+    reader.rewind(2)
+    assert [r["seq"] for r in reader.poll()] == [2, 3, 4, 5, 6]
+    reader.rewind(9)
+    assert reader.poll() == []
+
+
+def test_torn_and_corrupt_lines_are_never_delivered(tmp_path):
+    feed = SignalFeed(str(tmp_path))
+    feed.append(_signal(0))
+    path = list_segments(str(tmp_path))[-1][1]
+    reader = SignalFeedReader(str(tmp_path))
+    assert len(reader.poll()) == 1
+
+    # Half-written record: invisible until its newline lands
+    line = encode_record(2, _signal(1))
+    with open(path, "ab") as f:
+        f.write(line[:20])
+    assert reader.poll() == []
+    with open(path, "ab") as f:
+        f.write(line[20:])
+    assert [r["seq"] for r in reader.poll()] == [2]
+
+    # Flipped byte: checksum rejects it
+    bad = bytearray(encode_record(3, _signal(2)))
+    bad[-5] ^= 0x01
+    with open(path, "ab") as f:
+        f.write(bytes(bad))
+    assert reader.poll() == [] and reader.corrupt == 1
+    assert decode_record(b"garbage\n") is None
+
+
+def test_writer_recovers_after_crash_mid_record(tmp_path):
+    feed = SignalFeed(str(tmp_path))
+    feed.append(_signal(0))
+    feed.close()
+    with open(list_segments(str(tmp_path))[-1][1], "ab") as f:
+        f.write(encode_record(2, _signal(1))[:15])
+
+    assert SignalFeed(str(tmp_path)).append(_signal(1)) == 2
+    assert [r["signal"]["n"] for r in SignalFeedReader(str(tmp_path)).poll()] == [0, 1]
+
+
+def test_segments_roll_and_expire(tmp_path):
+    feed = SignalFeed(str(tmp_path), segment_bytes=300, max_segments=3)
+    reader = SignalFeedReader(str(tmp_path))
+    seen = []
+    for n in range(40):
+        feed.append(_signal(n))
+        if n % 7 == 0:
+            seen += [r["seq"] for r in reader.poll()]
+    seen += [r["seq"] for r in reader.poll()]
+    assert seen == list(range(1, 41))   # followed every roll without gaps
+
+    segments = list_segments(str(tmp_path))
+    assert len(segments) == 3
+    # A consumer behind retention starts at the oldest record still on disk
+    late = SignalFeedReader(str(tmp_path)).poll()
+    assert late[0]["seq"] == segments[0][0] and late[-1]["seq"] == 40
+
+
+def test_exporter_appends_and_readers_skip_stale(tmp_path, monkeypatch):
+    monkeypatch.setattr(SignalExporter, "FEED_DIR", str(tmp_path))
+    assert SignalExporter.export_signal(_signal(0)) == 1
+    stale = _signal(1, exported_at=(datetime.now() - timedelta(minutes=90)).isoformat())
+    SignalExporter.feed().append(stale)
+
+    records = SignalFeedReader(str(tmp_path)).poll(max_age_minutes=60)
+    assert [r["seq"] for r in records] == [1]
+    assert os.listdir(str(tmp_path)) == ["000000000001.log"]
@@ -3,6 +3,13 @@ from datetime import datetime, timezone, timedelta
 from unittest.mock import patch, MagicMock
 from data.news_fetcher import NewsFetcher
 import pytz
+from data.economic_calendar import CalendarIndex
+from core.filters.news_filter import NewsFilter
+from config.config import NEWS_WASH_ZONE
+
+@pytest.fixture(autouse=True)
+def calendar_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr("data.news_fetcher.CALENDAR_DIR", str(tmp_path / "calendar"))
 
 @pytest.fixture
 def sample_events():
@@ -135,3 +142,62 @@ def test_fetch_news_failure():
     with patch('requests.get', side_effect=Exception("Timeout")):
         res = NewsFetcher.fetch_news()
         assert res == []
+
+def _response(status, events=None, headers=None):
+    resp = MagicMock()
+    resp.status_code = status
+    resp.json.return_value = events
+    resp.headers = headers or {}
+    return resp
+
+def test_fetch_news_conditional_and_outage_fallback(monkeypatch):
+    events = [{"title": "NFP", "country": "USD"}]
+    with patch('requests.get', return_value=_response(200, events, {"ETag": '"v1"'})) as mock_get:
+        assert NewsFetcher.fetch_news() == events
+        # Fresh copy on disk: no request at all
+        assert NewsFetcher.fetch_news() == events
+        assert mock_get.call_count == 1
+
+    monkeypatch.setattr("data.news_fetcher.CALENDAR_TTL", -1)
+    with patch('requests.get', return_value=_response(304)) as mock_get:
+        assert NewsFetcher.fetch_news() == events
+        assert mock_get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+
+    with patch('requests.get', side_effect=Exception("Timeout")):
+        assert NewsFetcher.fetch_news() == events
+
+def test_calendar_index_window_queries():
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    events = [
+        {"title": f"USD {i}", "country": "USD", "impact": "High",
+         "date": (now + timedelta(minutes=10 * i)).isoformat()} for i in range(-50, 50)
+    ] + [
+        {"title": "ECB", "country": "EUR", "impact": "Medium", "date": (now + timedelta(minutes=5)).isoformat()},
+        {"title": "BoJ", "country": "JPY", "impact": "High", "date": (now - timedelta(hours=3)).isoformat()},
+        {"title": "Holiday", "country": "GBP", "impact": "High", "date": "not a date"},
+    ]
+    index = CalendarIndex.for_events(events)
+    assert CalendarIndex.for_events(events) is index
+
+    near = index.events_near({"EUR", "USD"}, now, 20, ("High", "Medium"))
+    assert [e["title"] for _, e in near] == ["USD -2", "USD -1", "USD 0", "ECB", "USD 1", "USD 2"]
+    assert index.has_event_near({"JPY"}, now - timedelta(hours=3, minutes=25), 30, ("High",))
+    assert not index.has_event_near({"JPY"}, now, 30, ("High",))
+    assert not index.has_event_near({"GBP"}, now, 10 ** 6, ("High",))
+
+    # NewsFilter answers from the same index
+    assert NewsFilter.is_news_safe(events, "EURUSD=X") is False
+    assert NewsFilter.is_news_safe(events, "GBPJPY=X") is True
+    upcoming = NewsFilter.get_upcoming_events(events, "USDJPY=X")
+    assert "USD 0" in [e["title"] for e in upcoming]
+    assert all(abs(e["minutes_away"]) <= NEWS_WASH_ZONE for e in upcoming)
+
+def test_concurrent_cache_writes_leave_a_whole_file(tmp_path):
+    import os
+    from concurrent.futures import ThreadPoolExecutor
+    payloads = [[{"title": f"event {i}", "n": list(range(2000))}] for i in range(8)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda events: NewsFetcher._store_cached(events, {"source": "test"}), payloads))
+    events, meta = NewsFetcher._load_cached()
+    assert events in payloads and meta == {"source": "test"}
+    assert sorted(os.listdir(tmp_path / "calendar")) == ["calendar.json", "meta.json"]
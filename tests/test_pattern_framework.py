@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.bar_store import BarStore
+from data.dukascopy_loader import DukascopyLoader
+from research.pattern_framework import (PATTERNS, evaluate, first_touch, load_bars, prepare,
+                                        register_pattern, scan, score)
+from research.pattern_scanner import pattern_london_open_breakout
+
+
+def _bars(days=60, seed=0, end=None):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range(end=end or "2024-06-30 23:00", periods=days * 24, freq="1h", tz="UTC")
+    close = 1.0 + np.cumsum(rng.normal(0, 0.002, len(idx)))
+    open_ = np.r_[1.0, close[:-1]]
+    return pd.DataFrame({
+        'open': open_, 'close': close,
+        'high': np.maximum(open_, close) + rng.random(len(idx)) * 0.002,
+        'low': np.minimum(open_, close) - rng.random(len(idx)) * 0.002,
+        'volume': 1.0,
+    }, index=idx)
+
+
+def _scalar_touch(df, idx, direction, atr, rr=2.0, fwd=4):
+    entry = df['close'].iloc[idx]
+    sl = entry - atr if direction > 0 else entry + atr
+    tp = entry + atr * rr if direction > 0 else entry - atr * rr
+    for j in range(idx + 1, min(idx + fwd + 1, len(df))):
+        h, l = df['high'].iloc[j], df['low'].iloc[j]
+        if direction > 0:
+            if l <= sl: return -1
+            if h >= tp: return 1
+        else:
+            if h >= sl: return -1
+            if l <= tp: return 1
+    return 0
+
+
+def test_first_touch_matches_bar_by_bar_walk():
+    df = prepare(_bars())
+    rng = np.random.default_rng(3)
+    entries = np.sort(rng.choice(len(df) - 4, 300, replace=False))
+    direction = rng.choice([-1.0, 1.0], len(entries))
+    atr = df['atr'].to_numpy()[entries]
+
+    fast = first_touch(df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy(),
+                       entries, direction, atr)
+    slow = [_scalar_touch(df, i, d, a) for i, d, a in zip(entries, direction, atr)]
+    assert fast.tolist() == slow
+    assert set(fast.tolist()) == {-1, 0, 1}
+
+
+def test_london_breakout_matches_row_loop():
+    df = prepare(_bars(seed=5))
+    buy, sell = pattern_london_open_breakout(df)
+    expected = []
+    for i in range(1, len(df) - 4):
+        if df.index[i].hour == 8:
+            if df['close'].iloc[i] > df['high'].iloc[i - 1]:
+                expected.append(_scalar_touch(df, i, 1, df['atr'].iloc[i]))
+            elif df['close'].iloc[i] < df['low'].iloc[i - 1]:
+                expected.append(_scalar_touch(df, i, -1, df['atr'].iloc[i]))
+    assert sorted(evaluate(df, buy, sell).tolist()) == sorted(expected)
+
+
+def test_registered_pattern_joins_scan():
+    @register_pattern("Always Long")
+    def always_long(bars):
+        return np.ones(len(bars), dtype=bool), np.zeros(len(bars), dtype=bool)
+
+    try:
+        results = scan(["EURUSD=X"], bars={"EURUSD=X": _bars()})
+        row = results.set_index('Pattern').loc["Always Long"]
+        outcomes = evaluate(prepare(_bars()), *always_long(prepare(_bars())))
+        assert (row['N'], row['HitRate']) == (score(outcomes)[3], score(outcomes)[0])
+        assert set(results['Pattern']) == set(PATTERNS)
+    finally:
+        PATTERNS.pop("Always Long")
+
+
+def test_scan_skips_failing_symbols_and_patterns(capsys):
+    broken = _bars().drop(columns=['high'])
+
+    @register_pattern("Explodes")
+    def explodes(bars):
+        raise ValueError("bad detector")
+
+    try:
+        results = scan(["BROKEN", "EURUSD=X"], bars={"BROKEN": broken, "EURUSD=X": _bars()})
+    finally:
+        PATTERNS.pop("Explodes")
+    assert set(results['Symbol']) == {"EURUSD=X"}
+    assert "Explodes" not in set(results['Pattern']) and len(results) == len(PATTERNS)
+    out = capsys.readouterr().out
+    assert "❌ BROKEN" in out and "❌ EURUSD=X / Explodes: bad detector" in out
+
+
+def test_load_bars_prefers_store_covering_lookback(tmp_path):
+    store = BarStore(str(tmp_path / "store"))
+    store.append("EURUSD=X", "1h", _bars(days=60))
+    no_csv = DukascopyLoader(base_dir=str(tmp_path / "none"))
+
+    bars = load_bars("EURUSD=X", "1h", days=30, store=store, loader=no_csv)
+    assert bars.index[-1] == pd.Timestamp("2024-06-30 23:00", tz="UTC")
+    assert bars.index[-1] - bars.index[0] == pd.Timedelta(days=30)
+
+    # Too short a history falls through to the (fresh) research cache: no download
+    cache = BarStore(str(tmp_path / "cache"))
+    recent = _bars(days=75, end=pd.Timestamp.now(tz="UTC").floor("h") - pd.Timedelta(hours=1))
+    cache.append("EURUSD=X", "1h", recent)
+    cached = load_bars("EURUSD=X", "1h", days=70, store=store, loader=no_csv, cache=cache)
+    assert cached.index[-1] == recent.index[-1]
+    assert len(cached) == pytest.approx(70 * 24, abs=1)
@@ -0,0 +1,68 @@
+import sqlite3
+from contextlib import closing
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from benchmarks.fixtures import synthetic_ohlcv, write_dukascopy_csv
+from config.manager import config_manager
+from core.replay import ReplayFeed, SimulatedClock, replay
+from data.bar_store import BarStore
+from data.dukascopy_loader import DukascopyLoader
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    root = tmp_path_factory.mktemp("replay")
+    write_dukascopy_csv(synthetic_ohlcv(45 * 1440, "1min", seed=0), str(root / "duka" / "EURUSD" / "EURUSD_M1.csv"))
+    bar_store = BarStore(str(root / "store"))
+    DukascopyLoader(base_dir=str(root / "duka"), store=bar_store).ingest("EURUSD=X")
+    return bar_store
+
+
+def test_feed_serves_only_bars_closed_at_the_clock(store):
+    clock = SimulatedClock("2024-01-10 12:03")
+    feed = ReplayFeed(store, clock)
+
+    m5 = feed.bars("EURUSD=X", "5m", "5d")
+    assert m5.index[-1] == pd.Timestamp("2024-01-10 11:55", tz="UTC")
+    assert m5.index[0] >= pd.Timestamp("2024-01-05 12:03", tz="UTC")
+    assert feed.bars("EURUSD=X", "1h", "30d").index[-1] == pd.Timestamp("2024-01-10 11:00", tz="UTC")
+    assert feed.bars("EURUSD=X", "1d", "3mo").index[-1] == pd.Timestamp("2024-01-09", tz="UTC")
+    assert feed.latest("EURUSD=X")[0] == pd.Timestamp("2024-01-10 12:02", tz="UTC")
+    assert feed.bars("GBPUSD=X", "5m", "5d") is None
+
+    clock.advance(3600)
+    assert feed.bars("EURUSD=X", "5m", "5d").index[-1] == pd.Timestamp("2024-01-10 12:55", tz="UTC")
+    assert clock.datetime_class().utcnow() == pd.Timestamp("2024-01-10 13:03").to_pydatetime()
+
+
+async def test_replay_drives_the_live_service_offline(store, tmp_path):
+    live_signals_db = config_manager.get("db_signals")
+    with patch("yfinance.download", side_effect=AssertionError("network fetch during replay")):
+        report = await replay("2024-02-12 07:00", "2024-02-12 13:00", ["EURUSD=X"], store, str(tmp_path),
+                              clients=4)
+
+    # 6 simulated hours of 5-minute cycles; the signals DB is a scratch copy
+    assert report["cycles"] == 72 and report["cycles_per_second"] > 0
+    assert config_manager.get("db_signals") == live_signals_db != report["signals_db"]
+    # The seeded walk yields a gate-passed signal that the tracker settles within the window
+    assert report["signals_sent"] >= 1 and sum(report["outcomes"].values()) >= 1
+    assert report["telegram_messages"] == report["signals_sent"] * 4
+    assert report["trades"] == report["signals_sent"]
+    assert {"generate", "fetch", "correlation.update", "regime.panel", "regime.apply"} <= set(report["stages"])
+    assert len(report["rss_mb"]) == 72 and report["memory"]["peak_mb"] >= report["memory"]["start_mb"] > 0
+    with closing(sqlite3.connect(report["signals_db"])) as conn:
+        stamps = [row[0] for row in conn.execute("SELECT timestamp FROM signals")]
+    assert sum(report["gate"].values()) == len(stamps)
+    assert all("2024-02-12T07:00" <= ts < "2024-02-12T13:00" for ts in stamps)
+
+
+async def test_soak_memory_stays_flat(store, tmp_path):
+    from benchmarks.soak import MAX_GROWTH_MB, soak
+    # CI-sized soak; python -m benchmarks.soak runs the full 10k cycles
+    report = await soak(store, "2024-02-05", ["EURUSD=X"], str(tmp_path), cycles=150, warmup=30)
+
+    assert report["warmup_cycles"] == 30 and report["cycles"] == 150
+    assert report["flat"], f"RSS grew {report['memory']['growth_mb']}MB (> {MAX_GROWTH_MB}MB)"
@@ -12,6 +12,11 @@ def reset_config_overrides():
     yield
     config_manager.clear_runtime_overrides()
 
+@pytest.fixture(autouse=True)
+def isolated_metrics_db(tmp_path, monkeypatch):
+    # run() pushes a metrics heartbeat; keep it out of monitoring/metrics.db
+    monkeypatch.setattr("core.metrics.METRICS_DB", str(tmp_path / "metrics.db"))
+
 @pytest.fixture
 def mock_strategy():
     mock = MagicMock()
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+from unittest.mock import patch
+
+import simulate_small_account as sim
+
+
+def _scalar_path(trades, floor_usd=sim.MIN_LOT_RISK_USD, fraction=sim.RISK_PERCENT):
+    """The original per-trade loop, kept as the reference model."""
+    balance = peak = sim.START_BALANCE
+    max_dd = 0.0
+    for r in trades:
+        balance += r * max(floor_usd, balance * fraction) - sim.SPREAD_COST_USD
+        peak = max(peak, balance)
+        max_dd = max(max_dd, (peak - balance) / peak * 100)
+        if balance < sim.BANKRUPT_BALANCE:
+            break
+    return balance, max_dd
+
+
+@pytest.fixture
+def trades_r():
+    rng = np.random.default_rng(5)
+    return np.where(rng.random(120) < 0.45, rng.uniform(1.0, 3.0, 120), -1.0)
+
+
+def test_vectorized_paths_match_scalar_loop(trades_r):
+    r_matrix = sim.sample_r_matrix(trades_r, 300, 100, np.random.default_rng(1))
+    res = sim.simulate_paths(r_matrix, sim.sizing_rule("min_lot"))
+
+    for i in range(300):
+        final, max_dd = _scalar_path(r_matrix[i])
+        assert res["final"][i] == pytest.approx(final)
+        assert res["max_dd"][i] == pytest.approx(max_dd)
+        if res["ruin_at"][i] >= 0:
+            assert res["final"][i] < sim.BANKRUPT_BALANCE
+    assert (res["ruin_at"] >= 0).any()
+
+
+def test_block_bootstrap_keeps_consecutive_trades():
+    r_matrix = sim.sample_r_matrix(np.arange(120, dtype=float), 50, 100, np.random.default_rng(2), block=10)
+    steps = np.diff(r_matrix[:, :10], axis=1)
+
+    assert r_matrix.shape == (50, 100)
+    assert np.isin(steps, (1.0, -119.0)).all()  # circular wrap at the end of the log
+
+
+def test_monte_carlo_chunks_and_summary(trades_r):
+    res = sim.monte_carlo(trades_r, paths=25_000, seed=3, chunk_paths=4_000)
+
+    assert res["paths"] == 25_000
+    assert res["trades"] == 100
+    assert 0.0 <= res["blow_rate"] <= 100.0
+    assert res["touch_target_rate"] >= res["win_rate"] - 1e-9
+    assert res["p5_final"] <= res["p95_final"]
+
+
+def test_kelly_sizing_uses_risk_manager(tmp_path):
+    db = tmp_path / "signals.db"
+    db.write_text("")
+    with patch("core.filters.risk_manager.RiskManager._calculate_kelly_fraction", return_value=0.05):
+        assert sim.sizing_rule("kelly", str(db)) == {"fraction": sim.RISK_PERCENT * 0.05,
+                                                     "floor_usd": sim.MIN_LOT_RISK_USD}
+    with patch("core.filters.risk_manager.RiskManager._calculate_kelly_fraction", return_value=0.0):
+        assert sim.sizing_rule("kelly", str(db))["fraction"] == sim.RISK_PERCENT
+    with pytest.raises(ValueError):
+        sim.sizing_rule("martingale")
+
+
+def test_kelly_fraction_matches_live_lot_sizing(tmp_path):
+    import sqlite3
+    from config.manager import config_manager
+    from core.filters.risk_manager import RiskManager
+    db = str(tmp_path / "signals.db")
+    with sqlite3.connect(db) as conn:
+        conn.execute("CREATE TABLE signals (timestamp TEXT, status TEXT, r_multiple REAL)")
+        rows = [("WIN", 2.0) if i % 5 < 3 else ("LOSS", -1.0) for i in range(20)]
+        conn.executemany("INSERT INTO signals VALUES (?, ?, ?)",
+                         [(f"2024-01-01T{i:02d}:00", status, r) for i, (status, r) in enumerate(rows)])
+        # Newest trade breaks even: no streak multiplier on the live side
+        conn.execute("INSERT INTO signals VALUES ('2024-01-02T00:00', 'BREAKEVEN', 0.0)")
+    assert RiskManager._calculate_kelly_fraction(db) > 0
+
+    balance = 1_000_000.0
+    config_manager.set_runtime_override("use_kelly_sizing", True)
+    try:
+        live = RiskManager.calculate_lot_size("EURUSD=X", 1.1000, 1.0900, balance=balance,
+                                              risk_pct_override=sim.RISK_PERCENT * 100, db_path=db)
+    finally:
+        config_manager.clear_runtime_overrides()
+    assert sim.sizing_rule("kelly", db)["fraction"] == pytest.approx(live["risk_cash"] / balance, rel=1e-3)
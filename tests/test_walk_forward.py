@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.walk_forward import WalkForwardOptimizer, entry_bars, expand_grid, score_trades
+from strategies.base_strategy import BaseStrategy
+from strategies.crt_strategy import CRTStrategy
+
+
+class TrendProbe(BaseStrategy):
+    """Trades one fixed direction every 6th bar; the right SIDE depends on the trend."""
+    SIDE = "BUY"
+    TUNABLE_PARAMS = ("SIDE",)
+
+    async def analyze(self, symbol, data, news_events, market_context):
+        entry = data['entry']
+        if len(entry) % 6:
+            return None
+        close = float(entry['close'].iloc[-1])
+        step = 0.002 if self.SIDE == "BUY" else -0.002
+        return {'symbol': symbol, 'direction': self.SIDE, 'entry_price': close,
+                'sl': close - step, 'tp1': close + step, 'quality_score': 7.0}
+
+    def get_id(self):
+        return "trend_probe"
+
+    def get_name(self):
+        return "Trend Probe"
+
+
+@pytest.fixture
+def trend_data():
+    """40 days up, then 40 days down (H1 bars used as the entry frame)."""
+    idx = pd.date_range("2024-01-01", periods=80 * 24, freq="1h", tz="UTC")
+    half = 40 * 24
+    slope = np.where(np.arange(len(idx)) < half, 0.0005, -0.0005)
+    close = 1.0 + np.cumsum(slope)
+    bars = pd.DataFrame({'open': close, 'high': close + 0.0002, 'low': close - 0.0002, 'close': close},
+                        index=idx)
+    daily = bars.resample("1D").agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last'})
+    return {"EURUSD=X": {'entry': bars, 'h1': bars, 'd1': daily}}
+
+
+def test_windows_roll_by_out_of_sample_length():
+    wf = WalkForwardOptimizer("2024-01-01", "2024-03-31", strategy_cls=TrendProbe, grid={"SIDE": ["BUY"]},
+                              in_sample_days=30, out_of_sample_days=15)
+    windows = wf.windows()
+    assert windows[0] == (pd.Timestamp("2024-01-01", tz="UTC"), pd.Timestamp("2024-01-31", tz="UTC"),
+                          pd.Timestamp("2024-02-15", tz="UTC"))
+    assert all(b[0] - a[0] == pd.Timedelta(days=15) for a, b in zip(windows, windows[1:]))
+    assert windows[-1][2] == pd.Timestamp("2024-04-01", tz="UTC")
+
+
+async def test_selects_in_sample_best_and_stitches_oos(trend_data):
+    wf = WalkForwardOptimizer("2024-01-06", "2024-03-20", strategy_cls=TrendProbe,
+                              grid={"SIDE": ["BUY", "SELL"]}, in_sample_days=20, out_of_sample_days=10,
+                              min_trades=5, symbols=["EURUSD=X"], workers=1)
+    report = await wf.run(data=trend_data)
+    windows = report["windows"]
+
+    # Uptrend windows pick BUY; once the IS window is all downtrend, SELL wins
+    assert windows["valid"].all()
+    assert windows["SIDE"].iloc[0] == "BUY"
+    assert windows["SIDE"].iloc[-1] == "SELL"
+
+    trades = report["trades"]
+    for w, row in windows.iterrows():
+        in_window = trades[trades["window"] == w]
+        assert ((in_window["timestamp"] >= row["oos_start"]) & (in_window["timestamp"] < row["oos_end"])).all()
+        assert (in_window["direction"] == row["SIDE"]).all()
+        assert len(in_window) == row["oos_trades"]
+
+    assert report["equity"].iloc[-1] == pytest.approx(trades["r"].sum())
+    assert report["summary"]["oos_trades"] == len(trades)
+
+
+def test_entry_bars_match_engine_snapshot(trend_data):
+    bars = entry_bars(trend_data, "2024-01-06", "2024-01-07")
+    entry = trend_data["EURUSD=X"]["entry"]
+    ts, symbol, pos, h1_end, d1_end, _ = bars[0]
+    assert ts == pd.Timestamp("2024-01-06", tz="UTC") and pos == entry.index.get_loc(ts)
+    assert d1_end == (trend_data["EURUSD=X"]["d1"].index <= ts).sum()
+    assert len(bars) == 48 and all(b[0] < c[0] for b, c in zip(bars, bars[1:]))
+
+
+def test_grid_and_objectives():
+    assert expand_grid({"A": [1, 2], "B": [3]}) == [{"A": 1, "B": 3}, {"A": 2, "B": 3}]
+    r = np.array([2.0, -1.0, 1.0, -1.0])
+    assert score_trades(r, "net_r", min_trades=1) == 1.0
+    assert score_trades(r, "profit_factor", min_trades=1) == 1.5
+    assert score_trades(r, "expectancy", min_trades=5) == float("-inf")
+    with pytest.raises(ValueError):
+        score_trades(r, "cagr")
+
+
+def test_crt_with_params_overrides_instance_only():
+    tuned = CRTStrategy().with_params(RANGE_ATR_MAX=3.0, TOXIC_HOURS={21})
+    assert tuned.RANGE_ATR_MAX == 3.0 and tuned.TOXIC_HOURS == {21}
+    assert CRTStrategy.RANGE_ATR_MAX == 2.5 and CRTStrategy().TOXIC_HOURS == {21, 22, 11}
+    with pytest.raises(ValueError):
+        CRTStrategy().with_params(NOT_A_KNOB=1)
+
+
+async def test_windows_without_enough_in_sample_trades_are_invalid(trend_data):
+    # TrendProbe trades every 6th H1 bar: ~80 trades per 20-day IS window, never 500
+    wf = WalkForwardOptimizer("2024-01-06", "2024-03-20", strategy_cls=TrendProbe,
+                              grid={"SIDE": ["BUY", "SELL"]}, in_sample_days=20, out_of_sample_days=10,
+                              min_trades=500, symbols=["EURUSD=X"], workers=1)
+    report = await wf.run(data=trend_data)
+    windows = report["windows"]
+    assert not windows["valid"].any() and windows["SIDE"].isna().all()
+    assert report["trades"].empty and report["summary"]["invalid_windows"] == len(windows)
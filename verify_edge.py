@@ -3,6 +3,7 @@ import pandas as pd
 import numpy as np
 from scipy.stats import spearmanr
 import warnings
+from core.alpha_factors import AlphaFactors
 
 # Suppress warnings
 warnings.simplefilter(action='ignore', category=FutureWarning)
@@ -51,12 +52,7 @@ def calculate_slope(series, period=3):
 # --- ALPHA FACTORS ---
 
 def calculate_velocity_alpha(df, period=20):
-    def get_slope(y):
-        if len(y) < 2: return 0
-        x = np.arange(len(y))
-        return np.polyfit(x, y, 1)[0]
-    
-    slope = df['Close'].rolling(period).apply(get_slope, raw=True)
+    slope = AlphaFactors.rolling_slope(df['Close'], period)
     atr = df['atr']
     return slope / atr
 